@@ -3,7 +3,10 @@
 测试 API Key 的生成、验证、授权与 FastAPI 集成行为。
 """
 
+import gc
 import hmac
+import threading
+import weakref
 from datetime import datetime, timedelta, timezone
 from typing import List, Optional, Tuple
 
@@ -236,6 +239,231 @@ class TestAPIKeyManager:
         assert key_data.has_any_scope(["read", "write", "delete"]) is True
 
 
+class TestAPIKeyManagerCacheAndBatching:
+    """APIKeyManager 本地缓存与 last_used_at 批量刷新测试"""
+
+    @pytest.fixture
+    def store(self):
+        """可统计调用次数的存储"""
+        state = {"keys": {}, "lookups": 0, "updates": [], "bulk": []}
+
+        def getter(key_or_hash):
+            state["lookups"] += 1
+            for data in state["keys"].values():
+                if key_or_hash in (data.key_hash, data.key_id):
+                    return data
+            return None
+
+        def updater(key_id, fields):
+            state["updates"].append((key_id, fields))
+            return True
+
+        def revoker(key_id):
+            state["keys"][key_id].is_active = False
+            return True
+
+        state["getter"] = getter
+        state["updater"] = updater
+        state["revoker"] = revoker
+        return state
+
+    def _make(self, store, use_bulk=False, **kwargs):
+        manager = APIKeyManager(secret_key="test-secret-key", prefix="test", **kwargs)
+        manager.set_key_store(
+            getter=store["getter"],
+            updater=store["updater"],
+            revoker=store["revoker"],
+            bulk_updater=store["bulk"].append if use_bulk else None,
+        )
+        return manager
+
+    def _add_key(self, store, manager, key_id, **kwargs):
+        full_key, key_data = build_manual_key_and_data(manager, key_id=key_id, **kwargs)
+        store["keys"][key_id] = key_data
+        return full_key, key_data
+
+    def test_negative_options_rejected(self):
+        """测试负数配置被拒绝"""
+        with pytest.raises(ValueError):
+            APIKeyManager(secret_key="x", cache_ttl=-1)
+        with pytest.raises(ValueError):
+            APIKeyManager(secret_key="x", last_used_flush_interval=-1)
+
+    def test_cache_hit_skips_store(self, store):
+        """测试缓存命中时不再访问存储"""
+        manager = self._make(store, cache_ttl=60)
+        full_key, _ = self._add_key(store, manager, "cache01")
+
+        assert manager.validate_key(full_key) is not None
+        lookups = store["lookups"]
+        for _ in range(5):
+            assert manager.validate_key(full_key) is not None
+        assert store["lookups"] == lookups
+
+    def test_cache_disabled_by_default(self, store):
+        """测试默认不缓存，每次都访问存储"""
+        manager = self._make(store)
+        full_key, _ = self._add_key(store, manager, "nocache01")
+
+        manager.validate_key(full_key)
+        lookups = store["lookups"]
+        manager.validate_key(full_key)
+        assert store["lookups"] > lookups
+
+    def test_cache_does_not_accept_wrong_key(self, store):
+        """测试缓存不会让篡改的 Key 通过"""
+        manager = self._make(store, cache_ttl=60)
+        full_key, _ = self._add_key(store, manager, "cache02")
+
+        assert manager.validate_key(full_key) is not None
+        assert manager.validate_key(full_key.replace("manual", "forged")) is None
+
+    def test_revoke_evicts_cache(self, store):
+        """测试撤销 Key 会主动使缓存失效"""
+        manager = self._make(store, cache_ttl=60)
+        full_key, _ = self._add_key(store, manager, "cache03")
+
+        assert manager.validate_key(full_key) is not None
+        assert manager.revoke_key("cache03") is True
+        assert manager.validate_key(full_key) is None
+
+    def test_invalidate_key_cache(self, store):
+        """测试应用侧修改 Key 后手动失效缓存"""
+        manager = self._make(store, cache_ttl=60)
+        full_key, key_data = self._add_key(store, manager, "cache04")
+
+        assert manager.validate_key(full_key) is not None
+        key_data.is_active = False
+        # 缓存中保存的是副本，修改存储对象不影响缓存
+        assert manager.validate_key(full_key) is not None
+
+        manager.invalidate_key_cache("cache04")
+        assert manager.validate_key(full_key) is None
+
+    def test_cached_key_expiry_still_checked(self, store):
+        """测试缓存命中时仍检查过期时间"""
+        manager = self._make(store, cache_ttl=60)
+        full_key, _ = self._add_key(
+            store, manager, "cache05",
+            expires_at=datetime.now(timezone.utc) + timedelta(hours=1),
+        )
+
+        cached = manager.validate_key(full_key)
+        assert cached is not None
+        manager._cache[cached.key_hash].expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+        assert manager.validate_key(full_key) is None
+
+    def test_batched_last_used_coalesced(self, store):
+        """测试批量模式下多次使用合并为一次批量写入"""
+        manager = self._make(store, use_bulk=True, last_used_flush_interval=3600)
+        key_a, _ = self._add_key(store, manager, "batch01")
+        key_b, _ = self._add_key(store, manager, "batch02")
+
+        for _ in range(10):
+            validated = manager.validate_key(key_a)
+            assert validated.last_used_at is not None
+        manager.validate_key(key_b)
+
+        assert store["updates"] == []
+        assert store["bulk"] == []
+        assert manager.flush_last_used() == 2
+        assert len(store["bulk"]) == 1
+        assert set(store["bulk"][0]) == {"batch01", "batch02"}
+        assert manager.flush_last_used() == 0
+        manager.close()
+
+    def test_batched_falls_back_to_updater(self, store):
+        """测试未设置 bulk_updater 时逐个调用 updater"""
+        manager = self._make(store, last_used_flush_interval=3600)
+        full_key, _ = self._add_key(store, manager, "batch03")
+
+        manager.validate_key(full_key)
+        manager.validate_key(full_key)
+        assert store["updates"] == []
+
+        manager.close()
+        assert len(store["updates"]) == 1
+        assert store["updates"][0][0] == "batch03"
+        assert "last_used_at" in store["updates"][0][1]
+
+    def test_failed_flush_is_retried(self, store):
+        """测试批量写入失败后保留数据，下个周期重试"""
+        calls = []
+
+        def flaky_bulk(pending):
+            calls.append(dict(pending))
+            if len(calls) == 1:
+                raise RuntimeError("db down")
+
+        manager = APIKeyManager(
+            secret_key="test-secret-key", prefix="test", last_used_flush_interval=3600,
+        )
+        manager.set_key_store(getter=store["getter"], bulk_updater=flaky_bulk)
+        full_key, _ = self._add_key(store, manager, "batch04")
+
+        manager.validate_key(full_key)
+        assert manager.flush_last_used() == 0
+        assert manager.flush_last_used() == 1
+        assert list(calls[1]) == ["batch04"]
+        manager.close()
+
+    def test_failed_updater_requeues_only_failed_keys(self, store):
+        """测试逐个写入时只重试失败的 Key"""
+        written = []
+
+        def flaky_updater(key_id, fields):
+            if key_id == "batch07":
+                raise RuntimeError("db down")
+            written.append(key_id)
+            return True
+
+        manager = APIKeyManager(
+            secret_key="test-secret-key", prefix="test", last_used_flush_interval=3600,
+        )
+        manager.set_key_store(getter=store["getter"], updater=flaky_updater)
+        for key_id in ("batch06", "batch07"):
+            full_key, _ = self._add_key(store, manager, key_id)
+            manager.validate_key(full_key)
+
+        assert manager.flush_last_used() == 1
+        assert written == ["batch06"]
+        assert manager.flush_last_used() == 0
+        assert written == ["batch06"]
+        manager._key_updater = store["updater"]
+        assert manager.flush_last_used() == 1
+        assert [key_id for key_id, _ in store["updates"]] == ["batch07"]
+
+    def test_flush_thread_does_not_keep_manager_alive(self, store):
+        """测试后台线程只持有弱引用，管理器可被回收且线程随之退出"""
+        manager = self._make(store, use_bulk=True, last_used_flush_interval=0.01)
+        full_key, _ = self._add_key(store, manager, "batch08")
+        manager.validate_key(full_key)
+        thread = manager._flush_thread
+        ref = weakref.ref(manager)
+
+        del manager
+        deadline = datetime.now(timezone.utc) + timedelta(seconds=2)
+        while ref() is not None and datetime.now(timezone.utc) < deadline:
+            gc.collect()
+            threading.Event().wait(0.01)
+
+        assert ref() is None
+        thread.join(timeout=2)
+        assert not thread.is_alive()
+
+    def test_background_thread_flushes(self, store):
+        """测试后台线程按间隔自动刷新"""
+        manager = self._make(store, use_bulk=True, last_used_flush_interval=0.05)
+        full_key, _ = self._add_key(store, manager, "batch05")
+
+        manager.validate_key(full_key)
+        deadline = datetime.now(timezone.utc) + timedelta(seconds=2)
+        while not store["bulk"] and datetime.now(timezone.utc) < deadline:
+            threading.Event().wait(0.01)
+        assert store["bulk"] and "batch05" in store["bulk"][0]
+        manager.close()
+
+
 class TestAPIKeyAuthProvider:
     """APIKeyAuthProvider 测试"""
 
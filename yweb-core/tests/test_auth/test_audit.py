@@ -1,8 +1,23 @@
 """登录审计模块测试"""
 
-from datetime import datetime, timezone
-
-from yweb.auth.audit import LoginAttempt, LoginAuditService, LoginFailureReason, LoginStatus
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from yweb.auth.audit import (
+    _apply_rollups,
+    LoginAttempt,
+    LoginAuditBuffer,
+    LoginAuditService,
+    LoginFailureReason,
+    LoginStatus,
+)
+from yweb.auth.models import AbstractLoginRecord, AbstractLoginRollup
 
 
 class FieldExpr:
@@ -38,7 +53,7 @@ class FakeQuery:
 
     def __init__(self):
         self.filters = []
-        self.order_by_expr = None
+        self.order_by_exprs = ()
         self.offset_value = 0
         self.limit_value = None
         self.group_by_exprs = ()
@@ -52,8 +67,8 @@ class FakeQuery:
         self.filters.extend(exprs)
         return self
 
-    def order_by(self, expr):
-        self.order_by_expr = expr
+    def order_by(self, *exprs):
+        self.order_by_exprs = exprs
         return self
 
     def offset(self, value: int):
@@ -209,7 +224,7 @@ class TestLoginAuditService:
             offset=10,
         )
         assert result == expected
-        assert FakeLoginRecord.query.order_by_expr == ("desc", "login_at")
+        assert FakeLoginRecord.query.order_by_exprs == (("desc", "login_at"), ("desc", "id"))
         assert FakeLoginRecord.query.offset_value == 10
         assert FakeLoginRecord.query.limit_value == 5
         assert any(expr.op == "eq" and expr.field == "user_id" and expr.value == 7 for expr in FakeLoginRecord.query.filters)
@@ -234,3 +249,308 @@ class TestLoginAuditService:
         assert FakeLoginRecord.query.deleted is True
         assert any(expr.op == "lt" and expr.field == "login_at" for expr in FakeLoginRecord.query.filters)
         assert any(expr.op == "eq" and expr.field == "status" and expr.value == LoginStatus.SUCCESS.value for expr in FakeLoginRecord.query.filters)
+
+
+class AuditBufferRecord(AbstractLoginRecord):
+    """批量写入测试用登录记录表"""
+    __tablename__ = "test_audit_buffer_record"
+
+
+class TestLoginAuditBuffer:
+    """LoginAuditBuffer 批量写入测试"""
+
+    @pytest.fixture
+    def engine(self, memory_engine):
+        AuditBufferRecord.__table__.create(memory_engine)
+        return memory_engine
+
+    @pytest.fixture
+    def statements(self):
+        return []
+
+    @pytest.fixture
+    def make_buffer(self, engine, statements):
+        buffers = []
+        SessionLocal = sessionmaker(bind=engine)
+
+        @contextmanager
+        def session_scope():
+            session = SessionLocal()
+            original_execute = session.execute
+
+            def execute(statement, *args, **kwargs):
+                statements.append(statement)
+                return original_execute(statement, *args, **kwargs)
+
+            session.execute = execute
+            try:
+                yield session
+                session.commit()
+            finally:
+                session.close()
+
+        def factory(**kwargs):
+            kwargs.setdefault("flush_interval_ms", 60000)
+            buffer = LoginAuditBuffer(AuditBufferRecord, session_scope=session_scope, **kwargs)
+            buffers.append(buffer)
+            return buffer
+
+        yield factory
+        for buffer in buffers:
+            buffer.close()
+
+    def _rows(self, engine):
+        with engine.connect() as conn:
+            return conn.execute(select(AuditBufferRecord.__table__)).all()
+
+    def test_invalid_options(self):
+        with pytest.raises(ValueError):
+            LoginAuditBuffer(AuditBufferRecord, batch_size=0)
+
+    def test_flush_writes_batches_with_single_insert(self, make_buffer, engine, statements):
+        """队列中的记录按 batch_size 分批，每批一条 INSERT"""
+        buffer = make_buffer(batch_size=3)
+        for i in range(5):
+            assert buffer.enqueue(username=f"user{i}", ip_address="1.1.1.1", status="failed") is True
+
+        assert buffer.get_stats()["queued"] == 5
+        assert buffer.flush() == 5
+        assert len(statements) == 2
+
+        rows = self._rows(engine)
+        assert sorted(row.username for row in rows) == [f"user{i}" for i in range(5)]
+        assert all(row.ver == 1 and row.login_at is not None for row in rows)
+        assert buffer.get_stats() == {"queued": 0, "dropped": 0, "written": 5, "failed": 0, "batches": 2}
+
+    def test_queue_full_drops_and_counts(self, make_buffer):
+        """队列满时丢弃新记录而不阻塞"""
+        buffer = make_buffer(max_queue_size=2, batch_size=10)
+        results = [buffer.enqueue(username="u", ip_address="1.1.1.1", status="failed") for _ in range(4)]
+        assert results == [True, True, False, False]
+        assert buffer.get_stats()["dropped"] == 2
+
+    def test_batch_size_wakes_background_thread(self, make_buffer, engine):
+        """积压达到 batch_size 时后台线程立即写入"""
+        buffer = make_buffer(batch_size=2)
+        buffer.enqueue(username="a", ip_address="1.1.1.1")
+        buffer.enqueue(username="b", ip_address="1.1.1.1")
+
+        deadline = time.time() + 2
+        while buffer.get_stats()["written"] < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert len(self._rows(engine)) == 2
+
+    def test_close_flushes_remaining(self, make_buffer, engine):
+        """关闭时同步写入剩余记录"""
+        buffer = make_buffer(batch_size=100)
+        buffer.enqueue(username="a", ip_address="1.1.1.1")
+        buffer.close()
+        assert len(self._rows(engine)) == 1
+
+    def test_write_failure_counted(self, engine):
+        """写入失败时计入 failed，不影响后续批次"""
+        @contextmanager
+        def broken_scope():
+            raise RuntimeError("db down")
+            yield
+
+        buffer = LoginAuditBuffer(AuditBufferRecord, session_scope=broken_scope, flush_interval_ms=60000)
+        buffer.enqueue(username="a", ip_address="1.1.1.1")
+        assert buffer.flush() == 0
+        assert buffer.get_stats()["failed"] == 1
+        buffer.close()
+
+    def test_service_records_via_buffer(self, make_buffer, engine):
+        """LoginAuditService 配置缓冲后只入队，不直接写库"""
+        buffer = make_buffer()
+        service = LoginAuditService(AuditBufferRecord, buffer=buffer)
+
+        record = service.record_failure(
+            username="alice",
+            ip_address="2.2.2.2",
+            failure_reason=LoginFailureReason.INVALID_PASSWORD.value,
+        )
+        assert record.status == LoginStatus.FAILED.value
+        assert self._rows(engine) == []
+
+        buffer.flush()
+        rows = self._rows(engine)
+        assert len(rows) == 1
+        assert rows[0].failure_reason == LoginFailureReason.INVALID_PASSWORD.value
+
+
+class AuditLoginRollup(AbstractLoginRollup):
+    """汇总测试用登录统计表"""
+    __tablename__ = "test_audit_login_rollup"
+
+
+class TestLoginRollups:
+    """汇总表维护与查询测试"""
+
+    @pytest.fixture
+    def env(self, memory_engine, monkeypatch):
+        AuditBufferRecord.__table__.create(memory_engine)
+        AuditLoginRollup.__table__.create(memory_engine)
+        SessionLocal = sessionmaker(bind=memory_engine)
+        scoped = scoped_session(SessionLocal)
+        monkeypatch.setattr(AuditBufferRecord, "query", scoped.query_property(), raising=False)
+        monkeypatch.setattr(AuditLoginRollup, "query", scoped.query_property(), raising=False)
+
+        @contextmanager
+        def session_scope():
+            session = SessionLocal()
+            try:
+                yield session
+                session.commit()
+            finally:
+                session.close()
+
+        buffer = LoginAuditBuffer(
+            AuditBufferRecord,
+            session_scope=session_scope,
+            flush_interval_ms=60000,
+            rollup_model=AuditLoginRollup,
+        )
+        yield buffer, scoped
+        buffer.close()
+        scoped.remove()
+
+    def _rollup_rows(self, scoped):
+        return scoped.query(AuditLoginRollup).order_by(AuditLoginRollup.granularity).all()
+
+    def test_buffer_maintains_hour_and_day_rollups(self, env):
+        """批量写入时累加小时/天汇总，跨批次命中同一行"""
+        buffer, scoped = env
+        login_at = datetime(2026, 3, 1, 10, 15, tzinfo=timezone.utc)
+        buffer.enqueue(username="alice", ip_address="1.1.1.1", status="failed", login_at=login_at)
+        buffer.enqueue(username="alice", ip_address="1.1.1.1", status="failed", login_at=login_at)
+        buffer.flush()
+        buffer.enqueue(
+            username="alice", ip_address="1.1.1.1", status="failed",
+            login_at=login_at + timedelta(minutes=30),
+        )
+        buffer.flush()
+
+        rows = self._rollup_rows(scoped)
+        assert [(row.granularity, row.login_count) for row in rows] == [("day", 3), ("hour", 3)]
+        assert rows[0].bucket_start.replace(tzinfo=None) == datetime(2026, 3, 1)
+        assert rows[1].bucket_start.replace(tzinfo=None) == datetime(2026, 3, 1, 10)
+
+    def test_sync_record_updates_rollups(self, env):
+        """sync_rollups=True 时 record_login 与汇总在同一事务提交"""
+        _, scoped = env
+        service = LoginAuditService(AuditBufferRecord, rollup_model=AuditLoginRollup, sync_rollups=True)
+        service.record_success(user_id=1, username="bob", ip_address="2.2.2.2")
+        service.record_success(user_id=1, username="bob", ip_address="2.2.2.2")
+
+        assert {row.login_count for row in self._rollup_rows(scoped)} == {2}
+        assert service.count_logins_by_status(user_id=1, days=1) == {"success": 2}
+
+    def test_sync_record_skips_rollups_by_default(self, env):
+        """默认同步写入只插入登录记录，不在登录请求中维护汇总表"""
+        _, scoped = env
+        service = LoginAuditService(AuditBufferRecord, rollup_model=AuditLoginRollup)
+        service.record_success(user_id=1, username="bob", ip_address="2.2.2.2")
+
+        assert self._rollup_rows(scoped) == []
+
+    def test_rollup_upsert_keeps_one_row_per_bucket(self, env):
+        """并发写入同一时间桶（不同 session 各自提交）累加到同一行"""
+        buffer, scoped = env
+        login_at = datetime(2026, 3, 1, 10, 15, tzinfo=timezone.utc)
+        rows = [{"user_id": None, "username": "frank", "ip_address": "6.6.6.6", "status": "failed", "login_at": login_at}]
+        first, second = scoped.session_factory(), scoped.session_factory()
+        try:
+            _apply_rollups(first, AuditLoginRollup, rows)
+            first.commit()
+            _apply_rollups(second, AuditLoginRollup, rows * 2)
+            second.commit()
+        finally:
+            first.close()
+            second.close()
+
+        rows = self._rollup_rows(scoped)
+        assert [(row.granularity, row.login_count) for row in rows] == [("day", 3), ("hour", 3)]
+        with pytest.raises(IntegrityError):
+            scoped.execute(insert(AuditLoginRollup.__table__).values(
+                granularity="day", bucket_start=rows[0].bucket_start, status="failed",
+                dimension_hash=rows[0].dimension_hash, username="frank", ip_address="6.6.6.6", login_count=1,
+            ))
+        scoped.rollback()
+
+    def test_rollup_counts_match_raw_counts(self, env):
+        """汇总查询结果与直接扫描登录记录表一致"""
+        buffer, _ = env
+        now = datetime.now(timezone.utc)
+        for i in range(120):
+            buffer.enqueue(
+                user_id=i % 3,
+                username=f"user{i % 3}",
+                ip_address=f"10.0.0.{i % 2}",
+                status="failed" if i % 4 else "success",
+                login_at=now - timedelta(minutes=97 * i),
+            )
+        buffer.flush()
+
+        raw = LoginAuditService(AuditBufferRecord)
+        rolled = LoginAuditService(AuditBufferRecord, buffer=buffer)
+        for days in (1, 3, 7):
+            assert rolled.count_logins_by_status(days=days) == raw.count_logins_by_status(days=days)
+            assert rolled.count_logins_by_status(user_id=1, days=days) == raw.count_logins_by_status(user_id=1, days=days)
+        for minutes in (30, 200, 1500):
+            assert rolled.get_recent_failures("user1", minutes=minutes) == raw.get_recent_failures("user1", minutes=minutes)
+            assert rolled.get_recent_failures("user1", minutes=minutes, ip_address="10.0.0.1") == \
+                raw.get_recent_failures("user1", minutes=minutes, ip_address="10.0.0.1")
+
+    def test_counts_survive_raw_cleanup(self, env):
+        """整点之前的数据只从汇总表读取"""
+        buffer, scoped = env
+        old = datetime.now(timezone.utc) - timedelta(days=2)
+        buffer.enqueue(user_id=5, username="carol", ip_address="3.3.3.3", status="failed", login_at=old)
+        buffer.flush()
+        scoped.query(AuditBufferRecord).delete()
+        scoped.commit()
+
+        service = LoginAuditService(AuditBufferRecord, rollup_model=AuditLoginRollup)
+        assert service.count_logins_by_status(user_id=5, days=7) == {"failed": 1}
+
+    def test_rebuild_rollups(self, env):
+        """从登录记录表重建汇总"""
+        buffer, scoped = env
+        for _ in range(5):
+            buffer.enqueue(username="dave", ip_address="4.4.4.4", status="failed")
+        buffer.flush()
+        scoped.query(AuditLoginRollup).delete()
+        scoped.commit()
+
+        service = LoginAuditService(AuditBufferRecord, rollup_model=AuditLoginRollup)
+        assert service.rebuild_rollups(batch_size=2) == 5
+        assert service.get_recent_failures("dave", minutes=10) == 5
+
+    def test_rollup_model_must_match_buffer(self, env):
+        buffer, _ = env
+        with pytest.raises(ValueError):
+            LoginAuditService(AuditBufferRecord, buffer=buffer, rollup_model=AbstractLoginRollup)
+
+    def test_history_keyset_pagination(self, env):
+        """before 键集分页按 (login_at, id) 倒序且不重不漏"""
+        buffer, _ = env
+        same_time = datetime.now(timezone.utc) - timedelta(minutes=5)
+        for _ in range(5):
+            buffer.enqueue(user_id=9, username="erin", ip_address="5.5.5.5", login_at=same_time)
+        buffer.flush()
+
+        service = LoginAuditService(AuditBufferRecord)
+        seen = []
+        before = None
+        while True:
+            page = service.get_user_login_history(user_id=9, limit=2, before=before)
+            if not page:
+                break
+            seen.extend(record.id for record in page)
+            before = (page[-1].login_at, page[-1].id)
+        assert seen == sorted(seen, reverse=True)
+        assert len(set(seen)) == 5
+
+        ip_page = service.get_ip_login_history("5.5.5.5", limit=10, before=(same_time, seen[1]))
+        assert [record.id for record in ip_page] == seen[2:]
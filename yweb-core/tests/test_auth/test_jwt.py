@@ -350,3 +350,84 @@ class TestJWTEdgeCases:
         assert decoded["sub"] == "测试用户"
         assert decoded["username"] == "测试用户"
 
+
+
+class TestJWTVerifyCache:
+    """已验证 Token 缓存测试"""
+    
+    def test_repeat_verify_skips_decode(self, jwt_manager, sample_token_payload, monkeypatch):
+        """测试重复验证同一 Token 时命中缓存，不再调用 jwt.decode"""
+        from yweb.auth import jwt as jwt_module
+        
+        token = jwt_manager.create_access_token(sample_token_payload)
+        calls = []
+        original_decode = jwt_module.jwt.decode
+        
+        def counting_decode(*args, **kwargs):
+            calls.append(1)
+            return original_decode(*args, **kwargs)
+        
+        monkeypatch.setattr(jwt_module.jwt, "decode", counting_decode)
+        
+        first = jwt_manager.verify_token(token)
+        second = jwt_manager.verify_token(token)
+        
+        assert len(calls) == 1
+        assert first == second
+        assert second is not first  # 返回副本，互不影响
+    
+    def test_cache_disabled(self, jwt_secret_key, sample_token_payload):
+        """测试 verify_cache_size=0 时不缓存"""
+        manager = JWTManager(secret_key=jwt_secret_key, verify_cache_size=0)
+        token = manager.create_access_token(sample_token_payload)
+        
+        assert manager.verify_token(token) is not None
+        assert len(manager._verify_cache) == 0
+    
+    def test_cache_is_bounded(self, jwt_secret_key, sample_token_payload):
+        """测试缓存容量上限（LRU 淘汰最久未用）"""
+        manager = JWTManager(secret_key=jwt_secret_key, verify_cache_size=2)
+        tokens = [
+            manager.create_access_token(sample_token_payload, expires_delta=timedelta(minutes=i + 1))
+            for i in range(3)
+        ]
+        for token in tokens:
+            manager.verify_token(token)
+        
+        assert len(manager._verify_cache) == 2
+    
+    def test_expired_cache_entry_is_not_returned(self, jwt_manager, sample_token_payload, monkeypatch):
+        """测试缓存条目到达 exp 后失效，走正常过期处理"""
+        from yweb.auth import jwt as jwt_module
+        
+        token = jwt_manager.create_access_token(sample_token_payload)
+        token_data = jwt_manager.verify_token(token)
+        
+        monkeypatch.setattr(jwt_module.time, "time", lambda: token_data.exp + 1)
+        monkeypatch.setattr(
+            jwt_module.jwt, "decode",
+            lambda *a, **kw: (_ for _ in ()).throw(jwt_module.ExpiredSignatureError()),
+        )
+        
+        assert jwt_manager.verify_token(token) is None
+        assert len(jwt_manager._verify_cache) == 0
+    
+    def test_invalid_token_not_cached(self, jwt_manager):
+        """测试无效 Token 不写入缓存"""
+        assert jwt_manager.verify_token("invalid.token") is None
+        assert len(jwt_manager._verify_cache) == 0
+    
+    def test_clear_verify_cache(self, jwt_manager, sample_token_payload):
+        """测试清空缓存（密钥轮换场景）"""
+        token = jwt_manager.create_access_token(sample_token_payload)
+        jwt_manager.verify_token(token)
+        
+        jwt_manager.secret_key = "rotated-secret-key"
+        jwt_manager.clear_verify_cache()
+        
+        assert jwt_manager.verify_token(token) is None
+    
+    def test_invalid_cache_size_raises(self, jwt_secret_key):
+        """测试负数缓存容量会抛出异常"""
+        with pytest.raises(ValueError, match="verify_cache_size"):
+            JWTManager(secret_key=jwt_secret_key, verify_cache_size=-1)
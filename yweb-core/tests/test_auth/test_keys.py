@@ -0,0 +1,307 @@
+"""签名密钥模块测试"""
+
+import time
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from jose import jwt
+
+from yweb.auth import JWTManager, KeySet, TokenPayload, TokenSigner, load_key
+from yweb.auth.oidc import OIDCManager
+
+
+def _pem_pair(private_key):
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    ).decode()
+    return private_pem, public_pem
+
+
+@pytest.fixture(scope="module")
+def rsa_pems():
+    return _pem_pair(rsa.generate_private_key(public_exponent=65537, key_size=2048))
+
+
+@pytest.fixture(scope="module")
+def rsa_pems_next():
+    return _pem_pair(rsa.generate_private_key(public_exponent=65537, key_size=2048))
+
+
+@pytest.fixture(scope="module")
+def ec_pems():
+    return _pem_pair(ec.generate_private_key(ec.SECP256R1()))
+
+
+CLAIMS = {"sub": "1", "user_id": 1, "roles": ["admin"], "exp": 2000000000}
+
+
+class TestLoadKey:
+    """load_key 测试"""
+
+    def test_no_module_level_key_cache(self, rsa_pems):
+        """原始密钥不在模块级缓存中常驻"""
+        import yweb.auth.keys as keys_module
+
+        assert not hasattr(keys_module, "_load_text_key")
+        assert load_key(rsa_pems[1], "RS256") is not load_key(rsa_pems[1], "RS256")
+
+    def test_key_object_passthrough(self):
+        key = load_key("secret", "HS256")
+        assert load_key(key, "HS256") is key
+
+    def test_invalid_key_raises_value_error(self):
+        with pytest.raises(ValueError):
+            load_key("not-a-pem", "RS256")
+
+
+class TestTokenSigner:
+    """TokenSigner 测试"""
+
+    @pytest.mark.parametrize("algorithm", ["HS256", "RS256", "ES256"])
+    def test_output_matches_jose(self, algorithm, rsa_pems, ec_pems):
+        """签名结果与 jose.jwt.encode 完全一致（ES256 签名带随机数，只比较可验证性）"""
+        private_key = {"HS256": "secret", "RS256": rsa_pems[0], "ES256": ec_pems[0]}[algorithm]
+        public_key = {"HS256": "secret", "RS256": rsa_pems[1], "ES256": ec_pems[1]}[algorithm]
+        claims = dict(CLAIMS, name="张三")
+
+        token = TokenSigner(private_key, algorithm, kid="k1").sign(claims)
+
+        if algorithm != "ES256":
+            assert token == jwt.encode(claims, private_key, algorithm=algorithm, headers={"kid": "k1"})
+        assert jwt.decode(token, public_key, algorithms=[algorithm]) == claims
+        assert jwt.get_unverified_header(token) == {"alg": algorithm, "typ": "JWT", "kid": "k1"}
+
+    def test_datetime_claims_converted(self):
+        from datetime import datetime, timezone
+
+        exp = datetime(2030, 1, 1, tzinfo=timezone.utc)
+        token = TokenSigner("secret").sign({"sub": "1", "exp": exp})
+        assert jwt.decode(token, "secret", algorithms=["HS256"])["exp"] == int(exp.timestamp())
+
+
+class TestKeySet:
+    """KeySet 测试"""
+
+    def test_resolve_by_kid(self, rsa_pems, rsa_pems_next):
+        key_set = KeySet()
+        key_set.add_key("old", rsa_pems[1], "RS256").add_key("new", rsa_pems_next[1], "RS256")
+
+        token = TokenSigner(rsa_pems[0], "RS256", kid="old").sign(CLAIMS)
+        key, algorithm = key_set.resolve(token)
+        assert algorithm == "RS256"
+        assert jwt.decode(token, key, algorithms=[algorithm]) == CLAIMS
+
+        assert key_set.resolve(TokenSigner(rsa_pems[0], "RS256").sign(CLAIMS)) is None
+        assert key_set.resolve("garbage") is None
+
+    def test_jwks_round_trip(self, rsa_pems, ec_pems):
+        """导出的 JWKS 只含公钥，可被另一个 KeySet 加载"""
+        source = KeySet()
+        source.add_key("rsa", rsa_pems[0], "RS256")
+        source.add_key("ec", ec_pems[0], "ES256")
+        source.add_key("hmac", "secret", "HS256")
+
+        jwks = source.to_jwks()
+        assert {item["kid"] for item in jwks["keys"]} == {"rsa", "ec"}
+        assert all("d" not in item for item in jwks["keys"])
+
+        target = KeySet()
+        assert target.load_jwks(jwks) == 2
+        token = TokenSigner(ec_pems[0], "ES256", kid="ec").sign(CLAIMS)
+        key, algorithm = target.resolve(token)
+        assert jwt.decode(token, key, algorithms=[algorithm]) == CLAIMS
+
+    def test_load_jwks_skips_invalid_entries(self):
+        key_set = KeySet()
+        assert key_set.load_jwks({"keys": [{"kid": "x", "kty": "RSA"}, {"kty": "RSA"}]}) == 0
+
+    def test_unknown_kid_triggers_rate_limited_refresh(self, rsa_pems, rsa_pems_next):
+        """未知 kid 触发按需刷新，min_refresh_interval 内不重复拉取"""
+        published = KeySet().add_key("k1", rsa_pems[1], "RS256")
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return published.to_jwks()
+
+        key_set = KeySet(loader=loader, min_refresh_interval=60)
+        token = TokenSigner(rsa_pems[0], "RS256", kid="k1").sign(CLAIMS)
+        assert key_set.resolve(token) is not None
+        assert len(calls) == 1
+
+        published.add_key("k2", rsa_pems_next[1], "RS256")
+        rotated = TokenSigner(rsa_pems_next[0], "RS256", kid="k2").sign(CLAIMS)
+        assert key_set.resolve(rotated) is None
+        assert len(calls) == 1
+
+        key_set.min_refresh_interval = 0
+        assert key_set.resolve(rotated) is not None
+        assert len(calls) == 2
+
+    def test_unchanged_keys_reused_across_refresh(self, rsa_pems, rsa_pems_next):
+        """JWKS 刷新时材料未变的密钥复用已解析的 Key；移除或替换密钥时 generation 递增"""
+        published = KeySet().add_key("k1", rsa_pems[1], "RS256")
+        key_set = KeySet(loader=published.to_jwks)
+        key_set.refresh()
+        parsed, generation = key_set.get_key("k1")[0], key_set.generation
+
+        published.add_key("k2", rsa_pems_next[1], "RS256")
+        key_set.refresh()
+        assert key_set.get_key("k1")[0] is parsed
+        assert key_set.generation == generation
+
+        published.remove_key("k1")
+        key_set.refresh()
+        assert key_set.generation == generation + 1
+
+        key_set.add_key("k2", rsa_pems[1], "RS256")
+        assert key_set.generation == generation + 2
+
+    def test_refresh_failure_keeps_keys(self, rsa_pems):
+        key_set = KeySet(loader=lambda: (_ for _ in ()).throw(RuntimeError("down")))
+        key_set.add_key("k1", rsa_pems[1], "RS256")
+        assert key_set.refresh() is False
+        assert key_set.kids == ["k1"]
+
+    def test_background_refresh(self, rsa_pems):
+        published = KeySet().add_key("k1", rsa_pems[1], "RS256")
+        key_set = KeySet(loader=published.to_jwks, refresh_interval=0.05)
+        try:
+            deadline = time.time() + 2
+            while "k1" not in key_set and time.time() < deadline:
+                time.sleep(0.01)
+            assert "k1" in key_set
+        finally:
+            key_set.close()
+
+
+class TestJWTManagerKeys:
+    """JWTManager 非对称密钥与轮换测试"""
+
+    @pytest.mark.parametrize("pems", ["rsa_pems", "ec_pems"])
+    def test_asymmetric_round_trip(self, pems, request):
+        private_pem, public_pem = request.getfixturevalue(pems)
+        algorithm = "RS256" if pems == "rsa_pems" else "ES256"
+        manager = JWTManager(secret_key=private_pem, algorithm=algorithm, public_key=public_pem, kid="k1")
+
+        token = manager.create_access_token(TokenPayload(sub="alice", user_id=1, username="alice"))
+        assert jwt.get_unverified_header(token)["kid"] == "k1"
+        assert manager.verify_token(token).user_id == 1
+
+    def test_key_set_verifies_previous_key(self, rsa_pems, rsa_pems_next):
+        """轮换后旧 kid 签发的 Token 仍可通过 key_set 验证"""
+        key_set = KeySet().add_key("old", rsa_pems[1], "RS256")
+        old_manager = JWTManager(secret_key=rsa_pems[0], algorithm="RS256", kid="old")
+        old_token = old_manager.create_access_token({"sub": "alice", "user_id": 1})
+
+        manager = JWTManager(
+            secret_key=rsa_pems_next[0], algorithm="RS256",
+            public_key=rsa_pems_next[1], kid="new", key_set=key_set,
+        )
+        assert manager.verify_token(old_token).user_id == 1
+        assert manager.verify_token(manager.create_access_token({"sub": "bob", "user_id": 2})).user_id == 2
+
+    def test_remove_key_invalidates_verify_cache(self, rsa_pems, rsa_pems_next):
+        """key_set 移除密钥后，按该密钥验证过的 Token 不再命中缓存"""
+        key_set = KeySet().add_key("old", rsa_pems[1], "RS256")
+        old_token = JWTManager(secret_key=rsa_pems[0], algorithm="RS256", kid="old").create_access_token(
+            {"sub": "alice", "user_id": 1}
+        )
+        manager = JWTManager(
+            secret_key=rsa_pems_next[0], algorithm="RS256",
+            public_key=rsa_pems_next[1], kid="new", key_set=key_set,
+        )
+        assert manager.verify_token(old_token) is not None
+
+        key_set.remove_key("old")
+        assert manager.verify_token(old_token) is None
+
+    def test_secret_key_assignment_rebuilds_keys(self, jwt_secret_key):
+        manager = JWTManager(secret_key=jwt_secret_key)
+        token = manager.create_access_token({"sub": "alice", "user_id": 1})
+        assert manager.verify_token(token) is not None
+
+        manager.secret_key = "another-secret-key-another-secret"
+        assert manager.verify_token(token) is None
+        assert manager.verify_token(manager.create_access_token({"sub": "a", "user_id": 1})) is not None
+
+
+class TestOIDCManagerKeys:
+    """OIDCManager 非对称密钥测试"""
+
+    def test_es256_id_token_and_jwks(self, ec_pems):
+        manager = OIDCManager(issuer="https://sso.example.com", secret_key="", algorithm="ES256")
+        manager.set_keys(private_key=ec_pems[0], public_key=ec_pems[1], kid="k1")
+
+        token = manager.create_id_token(user_id=1, client_id="app")
+        assert manager.verify_id_token(token, client_id="app")["sub"] == "1"
+
+        jwks = manager.get_jwks()
+        assert jwks["keys"][0]["kid"] == "k1"
+        assert jwks["keys"][0]["kty"] == "EC"
+        assert KeySet().load_jwks(jwks) == 1
+
+    def test_key_set_rotation(self, rsa_pems, rsa_pems_next):
+        old = OIDCManager(issuer="https://sso.example.com", secret_key="", algorithm="RS256")
+        old.set_keys(private_key=rsa_pems[0], public_key=rsa_pems[1], kid="old")
+        old_token = old.create_id_token(user_id=1, client_id="app")
+
+        key_set = KeySet().add_key("old", rsa_pems[1], "RS256").add_key("new", rsa_pems_next[1], "RS256")
+        manager = OIDCManager(issuer="https://sso.example.com", secret_key="", algorithm="RS256")
+        manager.set_keys(private_key=rsa_pems_next[0], public_key=rsa_pems_next[1], kid="new", key_set=key_set)
+
+        assert manager.verify_id_token(old_token, client_id="app")["sub"] == "1"
+        assert {item["kid"] for item in manager.get_jwks()["keys"]} == {"old", "new"}
+
+
+@pytest.mark.slow
+class TestSigningBenchmark:
+    """签发 / 验证吞吐量对比：每次传入原始密钥 vs 预解析 Key 对象
+
+    运行: pytest tests/test_auth/test_keys.py -m slow -s
+    """
+
+    ROUNDS = 200
+
+    def _rate(self, func, rounds):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            func()
+        return rounds / (time.perf_counter() - start)
+
+    def test_parsed_keys_throughput(self, rsa_pems, ec_pems):
+        pairs = {
+            "HS256": ("benchmark-secret-benchmark-secret", "benchmark-secret-benchmark-secret"),
+            "RS256": rsa_pems,
+            "ES256": ec_pems,
+        }
+        results = {}
+        for algorithm, (private_key, public_key) in pairs.items():
+            token = jwt.encode(CLAIMS, private_key, algorithm=algorithm)
+            signer = TokenSigner(private_key, algorithm)
+            verification_key = load_key(public_key, algorithm)
+            # 原始密钥路径不能命中 load_key 的缓存
+            raw_rounds = 20 if algorithm == "RS256" else self.ROUNDS
+            results[algorithm] = (
+                self._rate(lambda k=private_key, a=algorithm: jwt.encode(CLAIMS, k, algorithm=a), raw_rounds),
+                self._rate(lambda s=signer: s.sign(CLAIMS), self.ROUNDS),
+                self._rate(lambda t=token, k=public_key, a=algorithm: jwt.decode(t, k, algorithms=[a]), self.ROUNDS),
+                self._rate(
+                    lambda t=token, k=verification_key, a=algorithm: jwt.decode(t, k, algorithms=[a]), self.ROUNDS
+                ),
+            )
+
+        print("\n算法    签发(原始)  签发(预解析)  验证(原始)  验证(预解析)  tokens/s")
+        for algorithm, rates in results.items():
+            print(f"{algorithm:<7}" + "".join(f"{rate:>12.0f}" for rate in rates))
+
+        # RS256 私钥每次解析都要做密钥校验，预解析后签发至少快一个数量级
+        raw_sign, parsed_sign, _, _ = results["RS256"]
+        assert parsed_sign > raw_sign * 10
@@ -1,11 +1,23 @@
 """ldap 模块补充测试"""
 
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from types import SimpleNamespace
 
 import pytest
+from sqlalchemy.orm import scoped_session, sessionmaker
 
 from yweb.auth import ldap as ldap_mod
 from yweb.auth.base import AuthType
+from yweb.orm import BaseModel, CoreModel
+from yweb.orm.db_session import db_manager
+
+
+class LdapSyncUserModel(BaseModel):
+    """LDAP 同步回调测试模型"""
+    __tablename__ = "test_ldap_sync_users"
+    __table_args__ = {'extend_existing': True}
 
 
 class LdapValueObj:
@@ -166,6 +178,222 @@ class TestLdapManagerExtra:
         assert user.username == "alice"
 
 
+class RecordingConnection:
+    """记录调用顺序的 ldap3.Connection 桩"""
+
+    instances = []
+
+    def __init__(self, server, user=None, password=None, bind_result=True, **kwargs):
+        self.server = server
+        self.user = user
+        self.kwargs = kwargs
+        self.calls = []
+        self.closed = True
+        self.bound = False
+        self._bind_result = bind_result
+        self.last_error = ""
+        RecordingConnection.instances.append(self)
+
+    def open(self, read_server_info=True):
+        self.calls.append("open")
+        self.closed = False
+
+    def start_tls(self, read_server_info=True):
+        self.calls.append("start_tls")
+        return True
+
+    def bind(self, read_server_info=True):
+        self.calls.append(("bind", read_server_info))
+        if isinstance(self._bind_result, Exception):
+            raise self._bind_result
+        self.bound = self._bind_result
+        if self.bound and read_server_info:
+            self.server.info = "schema"
+        return self.bound
+
+    def unbind(self):
+        self.calls.append("unbind")
+        self.closed = True
+        self.bound = False
+
+
+class PooledConnObj(LdapConnObj):
+    """带健康状态的连接桩"""
+
+    def __init__(self, entries=None, fail_search=False):
+        super().__init__(entries)
+        self.closed = False
+        self.bound = True
+        self.fail_search = fail_search
+        self.searches = 0
+
+    def search(self, **_kwargs):
+        self.searches += 1
+        if self.fail_search:
+            raise Exception("connection reset")
+        return True
+
+    def unbind(self):
+        self.closed = True
+        return super().unbind()
+
+
+class TestLdapConnectionPool:
+    """LDAPManager 连接池与 DN 缓存测试"""
+
+    def _factory(self, monkeypatch, manager, entries):
+        created = []
+
+        def create_connection(*args, **kwargs):
+            conn = PooledConnObj(entries=entries)
+            created.append(conn)
+            return conn
+
+        monkeypatch.setattr(manager, "_create_connection", create_connection)
+        return created
+
+    def test_server_shared_and_schema_read_once(self, monkeypatch):
+        manager = LdapManagerFixture.build(monkeypatch)
+        manager.config.use_tls = True
+        RecordingConnection.instances = []
+        monkeypatch.setattr(ldap_mod, "Connection", RecordingConnection, raising=False)
+        monkeypatch.setattr(manager, "_create_server", lambda: SimpleNamespace(info=None))
+
+        first = manager._create_connection()
+        second = manager._create_connection("uid=alice,dc=example,dc=com", "pwd")
+
+        assert first.server is second.server
+        assert first.calls == ["open", "start_tls", ("bind", True)]
+        assert second.calls == ["open", "start_tls", ("bind", False)]
+        assert second.kwargs["auto_bind"] is False
+
+    def test_bind_failure_raises_bind_error(self, monkeypatch):
+        manager = LdapManagerFixture.build(monkeypatch)
+
+        class BindErr(Exception):
+            pass
+
+        class OperationResult(Exception):
+            pass
+
+        monkeypatch.setattr(ldap_mod, "LDAPBindError", BindErr, raising=False)
+        monkeypatch.setattr(ldap_mod, "LDAPOperationResult", OperationResult, raising=False)
+        monkeypatch.setattr(manager, "_create_server", lambda: SimpleNamespace(info="schema"))
+
+        for result in (False, OperationResult("invalidCredentials")):
+            RecordingConnection.instances = []
+            monkeypatch.setattr(
+                ldap_mod, "Connection",
+                lambda *args, _r=result, **kwargs: RecordingConnection(*args, bind_result=_r, **kwargs),
+                raising=False,
+            )
+            with pytest.raises(BindErr) as exc_info:
+                manager._create_connection("uid=alice", "bad")
+            assert RecordingConnection.instances[0].calls[-1] == "unbind"
+        assert isinstance(exc_info.value.__cause__, OperationResult)
+
+    def test_service_connections_are_reused(self, monkeypatch):
+        manager = LdapManagerFixture.build(monkeypatch)
+        entry = LdapEntryObj("uid=bob,ou=users,dc=example,dc=com", {"uid": "bob"})
+        created = self._factory(monkeypatch, manager, [entry])
+
+        for _ in range(3):
+            assert manager.get_user("bob") is not None
+        assert manager.search_users("(uid=*)")[0]["dn"].startswith("uid=bob")
+        assert len(created) == 1
+        assert created[0].searches == 4
+
+        manager.close()
+        assert created[0].unbound is True
+
+    def test_pool_disabled(self, monkeypatch):
+        manager = LdapManagerFixture.build(monkeypatch)
+        manager.config.pool_size = 0
+        created = self._factory(monkeypatch, manager, [])
+
+        manager.search_users("(uid=*)")
+        manager.search_users("(uid=*)")
+        assert len(created) == 2
+        assert all(conn.unbound for conn in created)
+
+    def test_idle_and_unhealthy_connections_evicted(self, monkeypatch):
+        manager = LdapManagerFixture.build(monkeypatch)
+        created = self._factory(monkeypatch, manager, [])
+
+        manager.search_users("(uid=*)")
+        created[0].bound = False
+        manager.search_users("(uid=*)")
+        assert len(created) == 2
+
+        manager.config.pool_idle_timeout = -1
+        manager.search_users("(uid=*)")
+        assert len(created) == 3
+        assert created[1].unbound is True
+
+    def test_non_ldap_error_discards_connection(self, monkeypatch):
+        """操作抛出非 LDAP 异常时连接被关闭，不留在池外泄漏"""
+        manager = LdapManagerFixture.build(monkeypatch)
+        created = self._factory(monkeypatch, manager, [])
+
+        def broken(conn):
+            raise KeyError("bad attribute")
+
+        with pytest.raises(KeyError):
+            manager._with_service_connection(broken)
+        assert created[0].unbound is True
+        assert len(manager._pool) == 0
+
+    def test_stale_connection_retried_once(self, monkeypatch):
+        manager = LdapManagerFixture.build(monkeypatch)
+        entry = LdapEntryObj("uid=bob,ou=users,dc=example,dc=com", {})
+        created = self._factory(monkeypatch, manager, [entry])
+
+        manager.search_users("(uid=*)")
+        created[0].fail_search = True
+        users = manager.search_users("(uid=*)")
+        assert len(users) == 1
+        assert len(created) == 2
+        assert created[0].unbound is True
+
+    def test_dn_lookup_cached(self, monkeypatch):
+        manager = LdapManagerFixture.build(monkeypatch)
+        entry = LdapEntryObj("uid=alice,ou=users,dc=example,dc=com", {"uid": "alice"})
+        created = self._factory(monkeypatch, manager, [entry])
+
+        assert manager._find_user_dn("alice") == "uid=alice,ou=users,dc=example,dc=com"
+        assert manager._find_user_dn("alice") == "uid=alice,ou=users,dc=example,dc=com"
+        assert created[0].searches == 1
+
+        manager.clear_dn_cache("alice")
+        manager._find_user_dn("alice")
+        assert created[0].searches == 2
+
+    def test_get_user_populates_dn_cache(self, monkeypatch):
+        manager = LdapManagerFixture.build(monkeypatch)
+        entry = LdapEntryObj("uid=carol,ou=users,dc=example,dc=com", {"uid": "carol"})
+        created = self._factory(monkeypatch, manager, [entry])
+
+        manager.get_user("carol")
+        assert manager._find_user_dn("carol") == "uid=carol,ou=users,dc=example,dc=com"
+        assert created[0].searches == 1
+
+    def test_dn_cache_disabled(self, monkeypatch):
+        monkeypatch.setattr(ldap_mod, "LDAP3_AVAILABLE", True)
+        monkeypatch.setattr(ldap_mod, "SUBTREE", "SUBTREE", raising=False)
+        monkeypatch.setattr(ldap_mod, "LDAPException", Exception, raising=False)
+        manager = ldap_mod.LDAPManager(
+            server="ldap://example.com:389",
+            base_dn="dc=example,dc=com",
+            dn_cache_ttl=0,
+        )
+        entry = LdapEntryObj("uid=dave,ou=users,dc=example,dc=com", {})
+        created = self._factory(monkeypatch, manager, [entry])
+
+        manager._find_user_dn("dave")
+        manager._find_user_dn("dave")
+        assert created[0].searches == 2
+
+
 class TestLdapAuthProviderExtra:
     """LDAPAuthProvider 补充测试"""
 
@@ -254,3 +482,197 @@ class TestLdapAuthProviderExtra:
         result = provider.authenticate({"username": "alice", "password": "pwd"})
         assert result.success is True
         assert sorted(result.identity.roles) == ["reader"]
+
+
+class GroupTreeManager:
+    """带嵌套组的 LDAPManager 桩，记录上级组查询的并发度"""
+
+    # 组 DN -> 上级组 DN
+    TREE = {
+        "CN=Dev,OU=G,DC=example,DC=com": ["CN=Engineering,OU=G,DC=example,DC=com"],
+        "CN=Ops,OU=G,DC=example,DC=com": ["CN=Engineering,OU=G,DC=example,DC=com"],
+        "CN=Engineering,OU=G,DC=example,DC=com": ["CN=Staff,OU=G,DC=example,DC=com"],
+        # 环：Staff 又是 Dev 的成员
+        "CN=Staff,OU=G,DC=example,DC=com": ["CN=Dev,OU=G,DC=example,DC=com"],
+    }
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.queries = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def authenticate(self, username, _password):
+        member_of = ["CN=Dev,OU=G,DC=example,DC=com", "CN=Ops,OU=G,DC=example,DC=com"]
+        return True, ldap_mod.LDAPUser(
+            dn=f"uid={username},dc=example,dc=com",
+            username=username,
+            groups=["Dev", "Ops"],
+            raw_attributes={"memberOf": member_of},
+        )
+
+    def get_group_parents(self, group_dn):
+        with self.lock:
+            self.queries.append(group_dn)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        return self.TREE.get(group_dn, [])
+
+    _parse_groups = ldap_mod.LDAPManager._parse_groups
+
+
+class TestNestedGroupsAndRoleCache:
+    """嵌套组解析与组 -> 角色缓存测试"""
+
+    def test_get_group_parents_uses_base_scope(self, monkeypatch):
+        manager = LdapManagerFixture.build(monkeypatch)
+        monkeypatch.setattr(ldap_mod, "BASE", "BASE", raising=False)
+        entry = LdapEntryObj("CN=Dev,OU=G,DC=example,DC=com", {"memberOf": ["CN=Engineering,OU=G,DC=example,DC=com"]})
+        conn = LdapConnObj(entries=[entry])
+        searches = []
+        conn.search = lambda **kwargs: searches.append(kwargs) or True
+        monkeypatch.setattr(manager, "_create_connection", lambda *args, **kwargs: conn)
+
+        assert manager.get_group_parents("CN=Dev,OU=G,DC=example,DC=com") == ["CN=Engineering,OU=G,DC=example,DC=com"]
+        conn.entries = []
+        assert manager.get_group_parents("CN=Gone,OU=G,DC=example,DC=com") == []
+        assert searches[0]["search_base"] == "CN=Dev,OU=G,DC=example,DC=com"
+        assert searches[0]["search_scope"] == "BASE"
+
+    def test_sync_provider_resolves_nested_groups(self):
+        manager = GroupTreeManager()
+        provider = ldap_mod.LDAPAuthProvider(manager, resolve_nested_groups=True)
+        result = provider.authenticate({"username": "alice", "password": "pwd"})
+        assert result.success is True
+        assert result.identity.groups == ["Dev", "Ops", "Engineering", "Staff"]
+        # 环不会导致重复查询
+        assert len(manager.queries) == len(set(manager.queries)) == 4
+
+    def test_max_group_depth_limits_levels(self):
+        provider = ldap_mod.LDAPAuthProvider(GroupTreeManager(), resolve_nested_groups=True, max_group_depth=1)
+        result = provider.authenticate({"username": "alice", "password": "pwd"})
+        assert result.identity.groups == ["Dev", "Ops", "Engineering"]
+        with pytest.raises(ValueError):
+            ldap_mod.LDAPAuthProvider(GroupTreeManager(), max_group_depth=0)
+
+    def test_callable_role_mapping_cached_per_group(self):
+        calls = []
+
+        def mapping(group):
+            calls.append(group)
+            return [f"role_{group.lower()}"]
+
+        provider = ldap_mod.LDAPAuthProvider(GroupTreeManager(), role_mapping=mapping)
+        for _ in range(3):
+            result = provider.authenticate({"username": "alice", "password": "pwd"})
+        assert sorted(result.identity.roles) == ["role_dev", "role_ops"]
+        assert sorted(calls) == ["Dev", "Ops"]
+
+        provider.clear_role_cache("Dev")
+        provider.authenticate({"username": "alice", "password": "pwd"})
+        assert sorted(calls) == ["Dev", "Dev", "Ops"]
+
+    def test_role_cache_disabled(self):
+        calls = []
+        provider = ldap_mod.LDAPAuthProvider(
+            GroupTreeManager(), role_mapping=lambda g: calls.append(g) or [g], role_cache_ttl=0,
+        )
+        provider.authenticate({"username": "alice", "password": "pwd"})
+        provider.authenticate({"username": "alice", "password": "pwd"})
+        assert len(calls) == 4
+
+
+class TestAsyncLdapAuthProvider:
+    """AsyncLDAPAuthProvider 测试"""
+
+    @pytest.mark.asyncio
+    async def test_aauthenticate_runs_off_loop_and_resolves_levels_concurrently(self):
+        manager = GroupTreeManager(delay=0.05)
+        provider = ldap_mod.AsyncLDAPAuthProvider(
+            manager, role_mapping={"Staff": ["employee"]}, resolve_nested_groups=True,
+        )
+        try:
+            result = await provider.aauthenticate({"username": "alice", "password": "pwd"})
+        finally:
+            provider.close()
+        assert result.success is True
+        assert result.identity.groups == ["Dev", "Ops", "Engineering", "Staff"]
+        assert "employee" in result.identity.roles
+        # 第一层的 Dev / Ops 并发查询
+        assert manager.max_active == 2
+
+    @pytest.mark.asyncio
+    async def test_aauthenticate_failures(self):
+        provider = ldap_mod.AsyncLDAPAuthProvider(
+            SimpleNamespace(authenticate=lambda _u, _p: (False, "Invalid credentials")),
+        )
+        try:
+            assert (await provider.aauthenticate("bad")).error_code == "INVALID_CREDENTIALS"
+            assert (await provider.aauthenticate({"username": "u"})).error_code == "MISSING_CREDENTIALS"
+            failed = await provider.aauthenticate({"username": "u", "password": "p"})
+        finally:
+            provider.close()
+        assert failed.error_code == "LDAP_AUTH_FAILED"
+        assert failed.error == "Invalid credentials"
+
+    @pytest.mark.asyncio
+    async def test_async_user_sync_callback_and_external_executor(self):
+        async def sync_user(ldap_user):
+            return SimpleNamespace(id=42)
+
+        executor = ThreadPoolExecutor(max_workers=1)
+        provider = ldap_mod.AsyncLDAPAuthProvider(
+            GroupTreeManager(), role_mapping=lambda g: [g.lower()],
+            user_sync_callback=sync_user, executor=executor,
+        )
+        result = await provider.aauthenticate({"username": "alice", "password": "pwd"})
+        provider.close()
+        # 外部线程池不由 provider 关闭
+        assert executor.submit(lambda: 1).result() == 1
+        executor.shutdown()
+        assert result.identity.user_id == 42
+        assert sorted(result.identity.roles) == ["dev", "ops"]
+
+    @pytest.mark.asyncio
+    async def test_plain_user_sync_callback_runs_in_executor(self):
+        threads = []
+
+        def sync_user(ldap_user):
+            threads.append(threading.current_thread().name)
+            return SimpleNamespace(id=7)
+
+        provider = ldap_mod.AsyncLDAPAuthProvider(GroupTreeManager(), user_sync_callback=sync_user)
+        try:
+            result = await provider.aauthenticate({"username": "alice", "password": "pwd"})
+        finally:
+            provider.close()
+        assert result.identity.user_id == 7
+        assert threads[0].startswith("yweb-ldap")
+
+    @pytest.mark.asyncio
+    async def test_plain_user_sync_callback_uses_request_session(self, memory_engine):
+        """工作线程中的 ORM 访问沿用当前请求的 request_id 与 session"""
+        BaseModel.metadata.create_all(bind=memory_engine)
+        session_scope = scoped_session(sessionmaker(bind=memory_engine), scopefunc=db_manager._get_request_id)
+        CoreModel.query = session_scope.query_property()
+        db_manager._set_request_id("ldap-login")
+        seen = []
+
+        def sync_user(ldap_user):
+            seen.append((db_manager._get_request_id(), LdapSyncUserModel.query.count()))
+            return SimpleNamespace(id=7)
+
+        provider = ldap_mod.AsyncLDAPAuthProvider(GroupTreeManager(), user_sync_callback=sync_user)
+        try:
+            await provider.aauthenticate({"username": "alice", "password": "pwd"})
+        finally:
+            provider.close()
+        try:
+            assert seen == [("ldap-login", 0)]
+            assert list(session_scope.registry.registry) == ["ldap-login"]
+        finally:
+            session_scope.remove()
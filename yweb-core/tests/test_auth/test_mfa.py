@@ -3,6 +3,8 @@
 测试 TOTP、恢复码等 MFA 功能
 """
 
+import time
+
 import pytest
 from yweb.auth.mfa import (
     MFAManager,
@@ -11,7 +13,10 @@ from yweb.auth.mfa import (
     SMSProvider,
     EmailProvider,
     MFAType,
+    MemoryTOTPReplayCache,
+    RedisTOTPReplayCache,
 )
+from yweb.auth.mfa import totp as totp_module
 
 
 class TestTOTPProvider:
@@ -376,3 +381,136 @@ class TestMFAManager:
     def test_set_primary_provider_unknown_returns_false(self, mfa_manager):
         """测试设置不存在的首选提供者返回 False"""
         assert mfa_manager.set_primary_provider(user_id=1, provider_name="unknown") is False
+
+
+class FakeReplayRedis:
+    """只支持防重放 Lua 脚本的 Redis 替身"""
+
+    def __init__(self):
+        self.data = {}
+
+    def register_script(self, script):
+        assert script is RedisTOTPReplayCache._MARK_USED_LUA
+        return self._mark_used
+
+    def _mark_used(self, keys, args):
+        (key,), (step, ttl) = keys, args
+        last = self.data.get(key)
+        if last is not None and last[0] >= step:
+            return 0
+        self.data[key] = (step, ttl)
+        return 1
+
+
+class TestTOTPReplayAndBatch:
+    """TOTP 防重放、窗口预计算与批量验证测试"""
+
+    NOW = 1_700_000_000
+
+    @pytest.fixture
+    def provider(self):
+        provider = TOTPProvider(issuer="TestApp")
+        provider.setup(user_id=1, username="alice")
+        provider.setup(user_id=2, username="bob")
+        return provider
+
+    def _code(self, provider, user_id, timestamp=None):
+        return totp_module._totp(provider._get_secret(user_id), provider.time_step, provider.digits, timestamp)
+
+    def test_code_cannot_be_replayed(self, provider):
+        code = provider.generate_current_code(user_id=1)
+        assert provider.verify(user_id=1, code=code).success is True
+
+        result = provider.verify(user_id=1, code=code)
+        assert result.success is False
+        assert result.message == "TOTP code already used"
+
+    def test_replay_is_per_user(self, provider):
+        """不同用户同一时间步互不影响"""
+        assert provider.verify(user_id=1, code=provider.generate_current_code(user_id=1)).success is True
+        assert provider.verify(user_id=2, code=provider.generate_current_code(user_id=2)).success is True
+
+    def test_replay_cache_disabled(self):
+        provider = TOTPProvider(replay_cache=False)
+        provider.setup(user_id=1)
+        code = provider.generate_current_code(user_id=1)
+        assert provider.verify(user_id=1, code=code).success is True
+        assert provider.verify(user_id=1, code=code).success is True
+
+    def test_redis_replay_cache(self):
+        redis = FakeReplayRedis()
+        provider = TOTPProvider(replay_cache=RedisTOTPReplayCache(redis, prefix="t:"))
+        provider.setup(user_id=7)
+        code = provider.generate_current_code(user_id=7)
+
+        assert provider.verify(user_id=7, code=code).success is True
+        assert provider.verify(user_id=7, code=code).success is False
+        (key, (_, ttl)), = redis.data.items()
+        assert key == "t:7"
+        assert ttl == 90  # (2 * window + 1) * time_step
+
+    def test_memory_replay_cache_expiry_and_maxsize(self, monkeypatch):
+        clock = [100.0]
+        monkeypatch.setattr(totp_module.time, "monotonic", lambda: clock[0])
+        cache = MemoryTOTPReplayCache(maxsize=2)
+
+        assert cache.mark_used(1, 10, ttl=30) is True
+        assert cache.mark_used(1, 10, ttl=30) is False
+        assert cache.mark_used(1, 9, ttl=30) is False
+        clock[0] += 31
+        assert cache.mark_used(1, 10, ttl=30) is True
+
+        cache.mark_used(2, 11, ttl=30)
+        cache.mark_used(3, 12, ttl=30)
+        assert list(cache._used) == [2, 3]
+
+    def test_earlier_code_in_window_rejected_after_newer_code(self, provider):
+        """通过较新的验证码后，窗口内更早时间步的验证码不能再使用"""
+        timestamp = int(time.time())
+        current = self._code(provider, 1, timestamp)
+        previous = self._code(provider, 1, timestamp - provider.time_step)
+        if previous == current:
+            pytest.skip("相邻时间步验证码碰巧相同")
+
+        assert provider._verify_secret(1, provider._get_secret(1), current, timestamp).success is True
+        result = provider._verify_secret(1, provider._get_secret(1), previous, timestamp)
+        assert result.success is False
+        assert result.message == "TOTP code already used"
+
+    def test_no_module_level_secret_cache(self):
+        """密钥与窗口验证码不缓存在模块级全局内存中"""
+        assert not hasattr(totp_module._decode_secret, "cache_info")
+        assert not hasattr(totp_module._window_codes, "cache_info")
+
+    def test_all_window_codes_compared(self, provider, monkeypatch):
+        """第一个时间步就匹配时也比较完整个窗口"""
+        compared = []
+        original = totp_module.hmac.compare_digest
+        monkeypatch.setattr(
+            totp_module.hmac, "compare_digest", lambda a, b: compared.append(b) or original(a, b)
+        )
+        previous = self._code(provider, 1, self.NOW - 30)
+
+        step = totp_module._match_totp(provider._get_secret(1), previous, timestamp=self.NOW)
+        assert step == self.NOW // 30 - 1
+        assert len(compared) == 3
+
+    def test_verify_many(self, provider):
+        timestamp = int(time.time())
+        results = provider.verify_many(
+            [
+                (1, self._code(provider, 1, timestamp)),
+                (2, "000000" if self._code(provider, 2, timestamp) != "000000" else "111111"),
+                (3, "123456"),
+                (1, self._code(provider, 1, timestamp)),
+            ],
+            timestamp=timestamp,
+        )
+        assert [user_id for user_id, _ in results] == [1, 2, 3, 1]
+        assert [result.success for _, result in results] == [True, False, False, False]
+        assert results[2][1].message == "TOTP not configured for this user"
+        assert results[3][1].message == "TOTP code already used"
+
+    def test_verify_many_accepts_mapping(self, provider):
+        results = dict(provider.verify_many({2: provider.generate_current_code(user_id=2)}))
+        assert results[2].success is True
@@ -3,6 +3,10 @@
 测试 OAuth 2.0 核心流程：客户端管理、授权码、Token 管理
 """
 
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
 import pytest
 from yweb.auth.oauth2 import (
     OAuth2Manager,
@@ -11,7 +15,11 @@ from yweb.auth.oauth2 import (
     OAuth2AuthProvider,
     ClientType,
     GrantType,
+    MemoryOAuth2Store,
+    RedisOAuth2Store,
+    TokenType,
 )
+from yweb.auth.oauth2.token import AuthorizationCode, DeviceCode
 from yweb.auth.base import AuthType
 
 
@@ -447,3 +455,332 @@ class TestOAuth2AuthProvider:
         result = auth_provider.validate_token("invalid-token")
         assert result.success is False
         assert result.error_code == "INVALID_TOKEN"
+
+
+class FakeOAuth2Redis:
+    """最小化的同步 Redis 替身（支持 SET 过期选项、GETDEL 与 pipeline）"""
+
+    def __init__(self, getdel_supported=True):
+        self.data = {}
+        self.expire_at = {}
+        self.getdel_supported = getdel_supported
+        self.calls = []
+
+    def _alive(self, key):
+        deadline = self.expire_at.get(key)
+        if deadline is not None and deadline <= time.time():
+            self.data.pop(key, None)
+            self.expire_at.pop(key, None)
+        return key in self.data
+
+    def get(self, key):
+        self.calls.append(("get", key))
+        return self.data[key].encode() if self._alive(key) else None
+
+    def set(self, key, value, px=None, exat=None, nx=False, xx=False, keepttl=False):
+        self.calls.append(("set", key))
+        exists = self._alive(key)
+        if (nx and exists) or (xx and not exists):
+            return None
+        self.data[key] = str(value)
+        if px is not None:
+            self.expire_at[key] = time.time() + px / 1000
+        elif exat is not None:
+            self.expire_at[key] = exat
+        elif not keepttl:
+            self.expire_at.pop(key, None)
+        return True
+
+    def getdel(self, key):
+        if not self.getdel_supported:
+            raise Exception("ERR unknown command 'getdel'")
+        value = self.get(key)
+        self.delete(key)
+        return value
+
+    def delete(self, key):
+        self.expire_at.pop(key, None)
+        return 1 if self.data.pop(key, None) is not None else 0
+
+    def pipeline(self, transaction=True):
+        return FakeOAuth2Pipeline(self)
+
+
+class FakeOAuth2Pipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.ops.append((name, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.ops]
+
+
+def _auth_code(code="code-1", expires_in=600, **kwargs):
+    return AuthorizationCode(
+        code=code,
+        client_id="app",
+        user_id=1,
+        redirect_uri="http://localhost/cb",
+        scope="openid",
+        expires_at=datetime.now(timezone.utc) + timedelta(seconds=expires_in),
+        **kwargs,
+    )
+
+
+def _token(access_token="at-1", refresh_token="rt-1", expires_in=60):
+    now = datetime.now(timezone.utc)
+    return OAuth2Token(
+        access_token=access_token,
+        refresh_token=refresh_token,
+        client_id="app",
+        user_id=1,
+        scope="openid",
+        expires_at=now + timedelta(seconds=expires_in),
+        refresh_token_expires_at=now + timedelta(days=1),
+    )
+
+
+class TestMemoryOAuth2Store:
+    """内存存储测试"""
+
+    def test_consume_code_is_one_shot(self):
+        store = MemoryOAuth2Store()
+        store.save_code(_auth_code())
+        assert store.get_code("code-1") is not None
+        assert store.consume_code("code-1").user_id == 1
+        assert store.consume_code("code-1") is None
+        assert store.get_code("code-1") is None
+
+    def test_expired_entries_hidden_and_cleaned(self):
+        store = MemoryOAuth2Store()
+        store.save_code(_auth_code(expires_in=-1))
+        store.save_token(_token(expires_in=-1))
+        assert store.get_code("code-1") is None
+        assert store.consume_code("code-1") is None
+
+        store.save_code(_auth_code("code-2", expires_in=-1))
+        removed = store.cleanup()
+        assert removed == 2  # 过期授权码 + 过期访问令牌，刷新令牌仍有效
+        assert store.get_refresh_token("rt-1") is not None
+
+    def test_device_code_user_code_index_and_poll(self):
+        store = MemoryOAuth2Store()
+        store.save_device_code(DeviceCode(device_code="dc", user_code="ABCD", client_id="app", scope="openid",
+                                          verification_uri="http://localhost/device"))
+        assert store.get_device_code_by_user_code("ABCD").device_code == "dc"
+        assert store.get_device_code_by_user_code("ZZZZ") is None
+
+        assert store.allow_device_poll("dc", 5) is True
+        assert store.allow_device_poll("dc", 5) is False
+        assert store.allow_device_poll("dc", 0) is True
+
+
+    def test_concurrent_reads_and_writes_with_cleanup(self):
+        """客户端 / Token 读写与定期清理并发执行时不出现字典迭代错误"""
+        store = MemoryOAuth2Store(cleanup_interval=0)
+        errors = []
+
+        def worker(n):
+            try:
+                for i in range(200):
+                    store.save_token(_token(f"at-{n}-{i}", f"rt-{n}-{i}", expires_in=-1))
+                    store.save_client(OAuth2Client(client_id=f"c-{n}-{i}", client_name="n"))
+                    store.get_client(f"c-{n}-{i}")
+                    store.get_token(f"at-{n}-{i}")
+                    store.revoke_token(f"rt-{n}-{i}")
+            except Exception as e:  # pragma: no cover - 失败时记录
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+
+
+class TestRedisOAuth2Store:
+    """Redis 存储测试"""
+
+    def test_token_round_trip_and_expiry(self):
+        redis = FakeOAuth2Redis()
+        store = RedisOAuth2Store(redis, prefix="t:")
+        token = _token()
+        store.save_token(token)
+
+        loaded = store.get_token("at-1")
+        assert loaded.token_type is TokenType.BEARER
+        assert loaded.expires_at == token.expires_at
+        assert store.get_refresh_token("rt-1").access_token == "at-1"
+        # 访问令牌与刷新令牌各自按过期时间失效
+        assert redis.expire_at["t:access:at-1"] < redis.expire_at["t:refresh:rt-1"]
+
+    def test_client_round_trip(self):
+        store = RedisOAuth2Store(FakeOAuth2Redis())
+        store.save_client(OAuth2Client(client_id="app", client_type=ClientType.PUBLIC, redirect_uris=["http://a"]))
+        client = store.get_client("app")
+        assert client.client_type is ClientType.PUBLIC
+        assert client.redirect_uris == ["http://a"]
+        assert store.get_client("missing") is None
+
+    @pytest.mark.parametrize("getdel_supported", [True, False])
+    def test_consume_code_is_one_shot(self, getdel_supported):
+        redis = FakeOAuth2Redis(getdel_supported=getdel_supported)
+        store = RedisOAuth2Store(redis)
+        store.save_code(_auth_code())
+        assert store.consume_code("code-1").client_id == "app"
+        assert store.consume_code("code-1") is None
+        assert "oauth2:code:code-1" not in redis.data
+
+    def test_save_expired_code_rejected(self):
+        store = RedisOAuth2Store(FakeOAuth2Redis())
+        assert store.save_code(_auth_code(expires_in=-1)) is False
+
+    def test_revoke_marks_both_keys_and_keeps_ttl(self):
+        redis = FakeOAuth2Redis()
+        store = RedisOAuth2Store(redis)
+        store.save_token(_token())
+        refresh_deadline = redis.expire_at["oauth2:refresh:rt-1"]
+
+        assert store.revoke_token("rt-1") is True
+        assert store.get_token("at-1").is_revoked is True
+        assert store.get_refresh_token("rt-1").is_revoked is True
+        assert redis.expire_at["oauth2:refresh:rt-1"] == refresh_deadline
+        assert store.revoke_token("unknown") is False
+
+    def test_device_code_flow(self):
+        store = RedisOAuth2Store(FakeOAuth2Redis())
+        store.save_device_code(DeviceCode(device_code="dc", user_code="ABCD", client_id="app", scope="openid",
+                                          verification_uri="http://localhost/device"))
+        assert store.update_device_code("dc", {"is_authorized": True, "user_id": 7}) is True
+        device_code = store.get_device_code_by_user_code("ABCD")
+        assert device_code.is_authorized is True and device_code.user_id == 7
+        assert store.update_device_code("missing", {"is_denied": True}) is False
+
+        assert store.allow_device_poll("dc", 5) is True
+        assert store.allow_device_poll("dc", 5) is False
+
+
+class TestOAuth2ManagerStore:
+    """OAuth2Manager 存储与缓存测试"""
+
+    REDIRECT_URI = "http://localhost:8000/callback"
+
+    def _issue_code(self, manager):
+        client = manager.create_client(name="Test", redirect_uris=[self.REDIRECT_URI])
+        code = manager.create_authorization_code(
+            client_id=client.client_id, user_id=1, redirect_uri=self.REDIRECT_URI, scope="openid",
+        )
+        return client, code
+
+    def test_authorization_code_flow_with_redis_store(self):
+        manager = OAuth2Manager(secret_key="test-secret", store=RedisOAuth2Store(FakeOAuth2Redis()))
+        client, code = self._issue_code(manager)
+
+        success, token = manager.exchange_code(code, client.client_id, client.client_secret, self.REDIRECT_URI)
+        assert success is True
+        assert manager.validate_token(token.access_token)[0] is True
+
+        success, error = manager.exchange_code(code, client.client_id, client.client_secret, self.REDIRECT_URI)
+        assert success is False
+        assert error["error"] == "invalid_grant"
+
+        success, refreshed = manager.refresh_token(token.refresh_token, client.client_id, client.client_secret)
+        assert success is True
+        assert manager.validate_token(token.access_token) == (False, "Token revoked")
+
+    def test_concurrent_exchange_only_one_succeeds(self):
+        manager = OAuth2Manager(secret_key="test-secret")
+        client, code = self._issue_code(manager)
+        barrier = threading.Barrier(8)
+        results = []
+
+        def exchange():
+            barrier.wait()
+            results.append(manager.exchange_code(code, client.client_id, client.client_secret, self.REDIRECT_URI)[0])
+
+        threads = [threading.Thread(target=exchange) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results.count(True) == 1
+
+    def test_token_cache_skips_store_and_revoke_evicts(self):
+        redis = FakeOAuth2Redis()
+        manager = OAuth2Manager(secret_key="test-secret", store=RedisOAuth2Store(redis), token_cache_size=100)
+        client, code = self._issue_code(manager)
+        _, token = manager.exchange_code(code, client.client_id, client.client_secret, self.REDIRECT_URI)
+
+        assert manager.validate_token(token.access_token)[0] is True
+        redis.calls.clear()
+        assert manager.introspect_token(token.access_token)["active"] is True
+        assert redis.calls == []
+
+        # 通过刷新令牌撤销同样会移除缓存中的访问令牌
+        assert manager.revoke_token(token.refresh_token) is True
+        assert manager.validate_token(token.access_token) == (False, "Token revoked")
+
+    def test_token_cache_refresh_index_bounded(self):
+        manager = OAuth2Manager(secret_key="test-secret", token_cache_size=2)
+        tokens = []
+        for _ in range(6):
+            client, code = self._issue_code(manager)
+            _, token = manager.exchange_code(code, client.client_id, client.client_secret, self.REDIRECT_URI)
+            assert manager.validate_token(token.access_token)[0] is True
+            tokens.append(token)
+
+        assert len(manager._token_cache_refresh_index) <= 4
+        assert manager.revoke_token(tokens[-1].refresh_token) is True
+        assert tokens[-1].access_token not in manager._token_cache
+        assert tokens[-1].refresh_token not in manager._token_cache_refresh_index
+
+    def test_token_cache_does_not_cache_failures(self):
+        manager = OAuth2Manager(secret_key="test-secret", token_cache_size=10)
+        assert manager.validate_token("missing") == (False, "Invalid token")
+        assert len(manager._token_cache) == 0
+
+    def test_device_poll_interval_disabled_by_default(self):
+        """默认不启用 slow_down，响应中仍建议 5 秒轮询间隔"""
+        manager = OAuth2Manager(secret_key="test-secret")
+        client = manager.create_client(
+            name="TV", redirect_uris=[], allowed_grant_types=["urn:ietf:params:oauth:grant-type:device_code"],
+        )
+        _, device_code = manager.create_device_code(client.client_id, "openid", "http://localhost/device")
+        assert device_code.interval == 5
+
+        for _ in range(3):
+            _, error = manager.device_code_token(device_code.device_code, client.client_id)
+            assert error["error"] == "authorization_pending"
+
+    def test_invalid_cache_settings(self):
+        with pytest.raises(ValueError):
+            OAuth2Manager(secret_key="test-secret", token_cache_size=-1)
+        with pytest.raises(ValueError):
+            OAuth2Manager(secret_key="test-secret", device_poll_interval=-1)
+
+    def test_device_flow_uses_user_code_index_and_slow_down(self):
+        manager = OAuth2Manager(
+            secret_key="test-secret", store=RedisOAuth2Store(FakeOAuth2Redis()), device_poll_interval=5,
+        )
+        client = manager.create_client(
+            name="TV", redirect_uris=[], allowed_grant_types=["urn:ietf:params:oauth:grant-type:device_code"],
+        )
+        _, device_code = manager.create_device_code(client.client_id, "openid", "http://localhost/device")
+
+        success, error = manager.device_code_token(device_code.device_code, client.client_id)
+        assert error["error"] == "authorization_pending"
+        success, error = manager.device_code_token(device_code.device_code, client.client_id)
+        assert error["error"] == "slow_down"
+
+        assert manager.authorize_device(device_code.user_code, user_id=1) == (True, "Device authorized")
+        manager.device_poll_interval = 0
+        success, token = manager.device_code_token(device_code.device_code, client.client_id)
+        assert success is True
+        assert token.user_id == 1
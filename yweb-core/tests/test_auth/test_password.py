@@ -9,6 +9,8 @@ from yweb.auth.password import (
     needs_rehash,
     PasswordTooShortError,
     PasswordTooLongError,
+    PasswordHashPool,
+    PasswordHashPoolBusyError,
 )
 
 from tests.helpers import get_password_helper_config
@@ -265,3 +267,100 @@ class TestPasswordUpgrade:
         
         # 清理配置
         PasswordHelper.configure(md5_salt="")
+
+
+class TestPasswordHashPool:
+    """有界哈希线程池测试"""
+    
+    def test_run_and_pending_released(self):
+        """测试任务执行后在途计数归零"""
+        pool = PasswordHashPool(max_workers=2, max_pending=4)
+        try:
+            assert pool.run(lambda a, b: a + b, 1, 2) == 3
+            assert pool.pending == 0
+        finally:
+            pool.shutdown()
+    
+    def test_fail_fast_when_full(self):
+        """测试在途任务达到上限时快速失败"""
+        import threading
+        
+        pool = PasswordHashPool(max_workers=1, max_pending=1)
+        release = threading.Event()
+        try:
+            future = pool.submit(release.wait)
+            with pytest.raises(PasswordHashPoolBusyError):
+                pool.submit(lambda: None)
+            release.set()
+            future.result()
+            assert pool.run(lambda: "ok") == "ok"
+        finally:
+            release.set()
+            pool.shutdown()
+    
+    def test_invalid_params(self):
+        """测试参数校验"""
+        with pytest.raises(ValueError):
+            PasswordHashPool(max_workers=0)
+        with pytest.raises(ValueError):
+            PasswordHashPool(max_workers=4, max_pending=2)
+    
+    def test_busy_error_is_503(self):
+        """测试线程池满异常映射为 503"""
+        assert PasswordHashPoolBusyError().status_code == 503
+
+
+class TestPasswordHelperAsync:
+    """PasswordHelper 异步 / 线程池 API 测试"""
+    
+    @pytest.mark.asyncio
+    async def test_ahash_and_averify(self):
+        """测试异步哈希与验证"""
+        hashed = await PasswordHelper.ahash("password123")
+        
+        assert await PasswordHelper.averify("password123", hashed) is True
+        assert await PasswordHelper.averify("wrong_password", hashed) is False
+        assert await PasswordHelper.averify("password123", "") is False
+    
+    @pytest.mark.asyncio
+    async def test_ahash_validates_length_before_submit(self):
+        """测试异步哈希在提交前校验长度"""
+        with pytest.raises(PasswordTooShortError):
+            await PasswordHelper.ahash("123")
+    
+    def test_verify_bounded(self):
+        """测试同步有界验证"""
+        hashed = PasswordHelper.hash("password123")
+        
+        assert PasswordHelper.verify_bounded("password123", hashed) is True
+        assert PasswordHelper.verify_bounded("wrong_password", hashed) is False
+    
+    def test_configure_pool_replaces_pool(self):
+        """测试重新配置线程池"""
+        pool = PasswordHelper.configure_pool(max_workers=1, max_pending=2)
+        
+        assert PasswordHelper.get_pool() is pool
+        assert pool.max_pending == 2
+        PasswordHelper.configure_pool()
+    
+    def test_rehash_in_background(self):
+        """测试后台重新哈希并回调"""
+        old_hash = hashlib.sha256(b"password123").hexdigest()
+        results = []
+        
+        future = PasswordHelper.rehash_in_background("password123", results.append)
+        future.result()
+        
+        assert len(results) == 1
+        assert PasswordHelper.verify("password123", results[0]) is True
+        assert PasswordHelper.needs_rehash(results[0]) is False
+        assert results[0] != old_hash
+    
+    def test_rehash_in_background_skipped_when_busy(self, monkeypatch):
+        """测试线程池满时放弃本次升级"""
+        def busy_submit(*args, **kwargs):
+            raise PasswordHashPoolBusyError()
+        
+        monkeypatch.setattr(PasswordHelper.get_pool(), "submit", busy_submit)
+        
+        assert PasswordHelper.rehash_in_background("password123", lambda h: None) is None
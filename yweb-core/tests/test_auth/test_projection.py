@@ -0,0 +1,162 @@
+"""用户投影（UserProjection）测试"""
+
+import pickle
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from yweb.auth import UserProjection
+from yweb.auth.models import AbstractSimpleRole, AbstractUser, RoleMixin
+from yweb.auth.projection import create_projection_loader
+from yweb.auth.setup import _create_user_getter
+from yweb.orm import fields
+
+
+class ProjectionRole(AbstractSimpleRole):
+    __tablename__ = "test_projection_role"
+
+
+class ProjectionUser(RoleMixin, AbstractUser):
+    __tablename__ = "test_projection_user"
+    roles = fields.ManyToMany(ProjectionRole, on_delete=fields.UNLINK, table_name="test_projection_user_role")
+
+
+@pytest.fixture
+def env(memory_engine, monkeypatch):
+    tables = [
+        ProjectionRole.__table__,
+        ProjectionUser.__table__,
+        ProjectionUser.roles.property.secondary,
+    ]
+    ProjectionUser.metadata.create_all(memory_engine, tables=tables)
+    session = scoped_session(sessionmaker(bind=memory_engine))
+    monkeypatch.setattr(ProjectionUser, "query", session.query_property(), raising=False)
+    monkeypatch.setattr(ProjectionRole, "query", session.query_property(), raising=False)
+
+    admin = ProjectionRole(name="管理员", code="admin")
+    editor = ProjectionRole(name="编辑", code="editor")
+    alice = ProjectionUser(username="alice", password_hash="x", email="alice@example.com", roles=[admin, editor])
+    bob = ProjectionUser(username="bob", password_hash="x", is_active=False)
+    carol = ProjectionUser(username="carol", password_hash="x", phone="13800000000")
+    session.add_all([admin, editor, alice, bob, carol])
+    session.commit()
+    ids = {"alice": alice.id, "bob": bob.id, "carol": carol.id}
+
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(memory_engine, "before_cursor_execute", _record)
+    yield session, ids, statements
+    event.remove(memory_engine, "before_cursor_execute", _record)
+    session.remove()
+
+
+class TestUserProjection:
+    """UserProjection 值对象测试"""
+
+    def test_read_only_and_role_api(self):
+        projection = UserProjection(1, "alice", ["admin", "editor"], {"email": "a@example.com"})
+        assert projection.has_role("admin")
+        assert projection.has_any_role("guest", "editor")
+        assert not projection.has_all_roles("admin", "guest")
+        assert projection.roles == ("admin", "editor")
+        assert projection.email == "a@example.com"
+
+        with pytest.raises(AttributeError):
+            projection.username = "bob"
+        with pytest.raises(AttributeError):
+            _ = projection.nickname
+
+    def test_pickle_round_trip(self):
+        projection = UserProjection(1, "alice", ["admin"], {"email": None}, model=ProjectionUser)
+        restored = pickle.loads(pickle.dumps(projection))
+        assert restored == projection
+        assert restored._model is ProjectionUser
+
+    def test_load_without_model(self):
+        with pytest.raises(RuntimeError):
+            UserProjection(1, "alice").load()
+
+
+class TestProjectionLoader:
+    """create_projection_loader 测试"""
+
+    def test_single_statement_with_roles(self, env):
+        _, ids, statements = env
+        load = create_projection_loader(ProjectionUser)
+
+        projection = load(ids["alice"])
+        assert len(statements) == 1
+        assert "password_hash" not in statements[0]
+        assert projection.id == ids["alice"]
+        assert projection.username == "alice"
+        assert projection.email == "alice@example.com"
+        assert projection.role_codes == {"admin", "editor"}
+
+    def test_user_without_roles(self, env):
+        _, ids, _ = env
+        projection = create_projection_loader(ProjectionUser, fields=["phone"])(ids["carol"])
+        assert projection.role_codes == frozenset()
+        assert projection.phone == "13800000000"
+
+    def test_inactive_and_missing(self, env):
+        _, ids, _ = env
+        load = create_projection_loader(ProjectionUser)
+        assert load(ids["bob"]) is None
+        assert load(-1) is None
+        assert create_projection_loader(ProjectionUser, active_field=None)(ids["bob"]).username == "bob"
+
+    def test_unknown_field_rejected(self):
+        with pytest.raises(ValueError):
+            create_projection_loader(ProjectionUser, fields=["nickname"])
+
+    def test_load_full_model(self, env):
+        _, ids, _ = env
+        projection = create_projection_loader(ProjectionUser)(ids["alice"])
+        user = projection.load()
+        assert isinstance(user, ProjectionUser)
+        assert user.username == "alice"
+
+
+class TestProjectionUserGetter:
+    """setup_auth(user_projection=...) 的用户获取函数测试"""
+
+    def test_cached_getter_returns_projection(self, env):
+        session, ids, statements = env
+        getter, cached_func = _create_user_getter(
+            ProjectionUser, active_field="is_active", cache_ttl=60, user_projection=True,
+        )
+        try:
+            first = getter(ids["alice"])
+            statements.clear()
+            second = getter(ids["alice"])
+            assert isinstance(second, UserProjection)
+            assert second == first
+            assert statements == []
+        finally:
+            cached_func.clear()
+
+    def test_role_change_invalidates(self, env):
+        session, ids, _ = env
+        getter, cached_func = _create_user_getter(
+            ProjectionUser, active_field="is_active", cache_ttl=60, user_projection=True,
+        )
+        try:
+            assert getter(ids["carol"]).role_codes == frozenset()
+            carol = session.get(ProjectionUser, ids["carol"])
+            carol.roles.append(ProjectionRole.query.filter_by(code="admin").one())
+            session.commit()
+            assert getter(ids["carol"]).role_codes == {"admin"}
+        finally:
+            cached_func.clear()
+
+    def test_without_cache(self, env):
+        _, ids, _ = env
+        getter, cached_func = _create_user_getter(
+            ProjectionUser, active_field="is_active", cache_ttl=0, user_projection=["phone"],
+        )
+        assert cached_func is None
+        assert getter(ids["carol"]).phone == "13800000000"
@@ -1,10 +1,11 @@
 """rate_limiter / validators 补充测试"""
 
+import time
 from datetime import datetime, timedelta
 
 import pytest
 
-from yweb.auth.rate_limiter import LoginRateLimiter
+from yweb.auth.rate_limiter import LoginRateLimiter, RedisLoginRateLimiter
 from yweb.auth.validators import PasswordStrength, PasswordValidator, UsernameValidator, ValidationError
 
 
@@ -81,6 +82,204 @@ class TestLoginRateLimiterExtra:
         assert limiter.get_block_remaining_seconds("not-blocked") == 0
 
 
+class FakeRateLimitRedis:
+    """模拟 Redis：字符串键（毫秒过期）+ 有序集合，脚本以 Python 实现同等语义"""
+
+    def __init__(self):
+        self.values = {}
+        self.expires = {}
+        self.zsets = {}
+
+    def _now_ms(self):
+        return int(time.time() * 1000)
+
+    def _alive(self, key):
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= self._now_ms():
+            self.values.pop(key, None)
+            self.zsets.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.values or key in self.zsets
+
+    def register_script(self, script):
+        if script is RedisLoginRateLimiter._RECORD_FAILURE_LUA:
+            return self._record_failure
+        if script is RedisLoginRateLimiter._REMAINING_LUA:
+            return self._remaining
+        raise AssertionError("unknown script")
+
+    def _record_failure(self, keys, args):
+        attempts_key, blocked_key, index_key = keys
+        window, max_attempts, block, ip, suffix = args
+        if self.pttl(blocked_key) > 0:
+            return [1, 0, 0]
+        now = self._now_ms()
+        self._alive(attempts_key)
+        zset = self.zsets.setdefault(attempts_key, {})
+        for member in [m for m, score in zset.items() if score <= now - window]:
+            del zset[member]
+        zset[f"{now}-{suffix}"] = now
+        self.expires[attempts_key] = now + window
+        remaining = max_attempts - len(zset)
+        if remaining <= 0:
+            self.values[blocked_key] = now + block
+            self.expires[blocked_key] = now + block
+            self.zsets.pop(attempts_key, None)
+            self.zsets.setdefault(index_key, {})[ip] = now + block
+            return [1, 0, 1]
+        return [0, remaining, 0]
+
+    def _remaining(self, keys, args):
+        attempts_key, blocked_key = keys
+        window, max_attempts = args
+        if self.exists(blocked_key):
+            return 0
+        now = self._now_ms()
+        count = sum(1 for score in self.zsets.get(attempts_key, {}).values() if score > now - window)
+        return max(0, max_attempts - count)
+
+    def exists(self, key):
+        return 1 if self._alive(key) else 0
+
+    def pttl(self, key):
+        if not self._alive(key):
+            return -2
+        return self.expires[key] - self._now_ms()
+
+    def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                removed += 1
+            self.values.pop(key, None)
+            self.zsets.pop(key, None)
+            self.expires.pop(key, None)
+        return removed
+
+    def zrem(self, key, *members):
+        zset = self.zsets.get(key, {})
+        return sum(1 for m in members if zset.pop(m, None) is not None)
+
+    def zremrangebyscore(self, key, low, high):
+        zset = self.zsets.get(key, {})
+        stale = [m for m, s in zset.items() if float(low) <= s <= float(high)]
+        for member in stale:
+            del zset[member]
+        return len(stale)
+
+    def zrange(self, key, start, end, withscores=False):
+        items = sorted(self.zsets.get(key, {}).items(), key=lambda kv: kv[1])
+        return [(m.encode(), s) for m, s in items] if withscores else [m.encode() for m, _ in items]
+
+    def pipeline(self):
+        redis = self
+
+        class Pipeline:
+            def __init__(self):
+                self.calls = []
+
+            def __getattr__(self, name):
+                def queue(*args, **kwargs):
+                    self.calls.append((getattr(redis, name), args, kwargs))
+                    return self
+                return queue
+
+            def execute(self):
+                return [func(*args, **kwargs) for func, args, kwargs in self.calls]
+
+        return Pipeline()
+
+
+class BrokenRedis:
+    """所有命令都失败的 Redis 客户端"""
+
+    def register_script(self, script):
+        def run(**_kwargs):
+            raise ConnectionError("redis down")
+        return run
+
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise ConnectionError("redis down")
+        return fail
+
+
+class TestRedisLoginRateLimiter:
+    """RedisLoginRateLimiter 测试"""
+
+    def test_limit_shared_across_instances(self):
+        redis = FakeRateLimitRedis()
+        worker_a = RedisLoginRateLimiter(redis, max_attempts=3, block_minutes=1)
+        worker_b = RedisLoginRateLimiter(redis, max_attempts=3, block_minutes=1)
+        ip = "10.1.0.1"
+
+        assert worker_a.record_failure(ip) == (False, 2)
+        assert worker_b.record_failure(ip) == (False, 1)
+        assert worker_a.get_remaining_attempts(ip) == 1
+        assert worker_a.record_failure(ip) == (True, 0)
+
+        assert worker_b.is_blocked(ip) is True
+        assert worker_b.get_remaining_attempts(ip) == 0
+        assert 0 < worker_b.get_block_remaining_seconds(ip) <= 60
+        assert worker_b.record_failure(ip) == (True, 0)
+        assert ip in worker_a.get_blocked_ips()
+
+    def test_block_expires_natively(self):
+        redis = FakeRateLimitRedis()
+        limiter = RedisLoginRateLimiter(redis, max_attempts=1, block_minutes=1)
+        ip = "10.1.0.2"
+
+        assert limiter.record_failure(ip) == (True, 0)
+        redis.expires[limiter._blocked_key(ip)] = redis._now_ms() - 1
+        assert limiter.is_blocked(ip) is False
+        assert limiter.get_block_remaining_seconds(ip) == 0
+        assert limiter.get_remaining_attempts(ip) == 1
+
+    def test_sliding_window_drops_old_failures(self):
+        redis = FakeRateLimitRedis()
+        limiter = RedisLoginRateLimiter(redis, max_attempts=3, block_minutes=1)
+        ip = "10.1.0.3"
+
+        limiter.record_failure(ip)
+        limiter.record_failure(ip)
+        key = limiter._attempts_key(ip)
+        old = redis._now_ms() - limiter._window_ms - 1
+        redis.zsets[key] = {f"{old}-a": old, f"{old}-b": old}
+        assert limiter.get_remaining_attempts(ip) == 3
+        assert limiter.record_failure(ip) == (False, 2)
+
+    def test_reset_and_unblock(self):
+        redis = FakeRateLimitRedis()
+        limiter = RedisLoginRateLimiter(redis, max_attempts=2, block_minutes=1)
+
+        limiter.record_failure("10.1.0.4")
+        limiter.reset("10.1.0.4")
+        assert limiter.get_remaining_attempts("10.1.0.4") == 2
+
+        limiter.record_failure("10.1.0.5")
+        limiter.record_failure("10.1.0.5")
+        assert limiter.unblock("10.1.0.5") is True
+        assert limiter.is_blocked("10.1.0.5") is False
+        assert limiter.get_blocked_ips() == {}
+        assert limiter.unblock("10.1.0.5") is False
+
+    def test_falls_back_to_memory(self):
+        limiter = RedisLoginRateLimiter(BrokenRedis(), max_attempts=2, block_minutes=1)
+        ip = "10.1.0.6"
+
+        assert limiter.record_failure(ip) == (False, 1)
+        assert limiter.record_failure(ip) == (True, 0)
+        assert limiter.is_blocked(ip) is True
+        assert ip in limiter.get_blocked_ips()
+        assert limiter.unblock(ip) is True
+        assert limiter.cleanup() == 0
+
+    def test_fallback_disabled_raises(self):
+        limiter = RedisLoginRateLimiter(BrokenRedis(), fallback=False)
+        with pytest.raises(ConnectionError):
+            limiter.is_blocked("10.1.0.7")
+
+
 class TestValidatorsExtra:
     """validators 补充分支测试"""
 
@@ -149,6 +149,61 @@ class TestBaseAuthServiceExtra:
         assert service.get_failure_reason("alice") == "账户已禁用"
         assert service.get_failure_reason("nouser") == "用户不存在"
 
+    def test_authenticate_rehashes_legacy_hash_in_background(self):
+        import hashlib
+        import threading
+        from yweb.auth.password import PasswordHelper
+
+        legacy_hash = hashlib.sha256(b"secret123").hexdigest()
+        user = UserObj(user_id=1, username="alice", is_active=True, password_hash=legacy_hash)
+        UserModelObj.users_by_name = {"alice": user}
+        UserModelObj.users_by_id = {1: user}
+
+        saved = []
+        done = threading.Event()
+
+        class RehashService(BaseAuthService):
+            def save_rehashed_password(self, user_id, new_hash):
+                saved.append((user_id, new_hash))
+                done.set()
+
+        service = RehashService(
+            user_model=UserModelObj, jwt_manager=JWTManagerObj(), rehash_on_login=True
+        )
+        assert service.authenticate("alice", "secret123") is user
+        assert done.wait(timeout=5)
+
+        assert saved[0][0] == 1
+        assert PasswordHelper.verify("secret123", saved[0][1])
+
+        # 未开启时不升级
+        saved.clear()
+        service.rehash_on_login = False
+        service.authenticate("alice", "secret123")
+        PasswordHelper.get_pool().run(lambda: None)
+        assert saved == []
+
+    def test_save_rehashed_password_uses_unique_session_scope(self, monkeypatch):
+        from contextlib import contextmanager
+        import yweb.orm as orm_mod
+
+        user = UserObj(user_id=1, username="alice")
+        UserModelObj.users_by_id = {1: user}
+        request_ids = []
+
+        @contextmanager
+        def fake_scope(request_id=None, auto_commit=True):
+            request_ids.append(request_id)
+            yield None
+
+        monkeypatch.setattr(orm_mod, "db_session_scope", fake_scope)
+        service = BaseAuthService(user_model=UserModelObj, jwt_manager=JWTManagerObj())
+        service.save_rehashed_password(1, "h1")
+        service.save_rehashed_password(1, "h2")
+
+        assert user.password_hash == "h2"
+        assert len(set(request_ids)) == 2
+
     def test_token_ops_refresh_and_logout(self):
         role = SimpleNamespace(code="admin")
         user = UserObj(user_id=1, username="alice", roles=[role], is_active=True)
@@ -352,6 +407,59 @@ class TestSetupExtra:
         with patch("yweb.auth.token_store.get_token_blacklist", return_value=None):
             assert dep_required(token="good").id == 1
 
+    def test_create_auth_dependencies_decodes_once_and_shares_state(self):
+        """一次请求只解码一次 token，结果写入 request.state 并传给黑名单"""
+        from unittest.mock import MagicMock, patch
+
+        calls = []
+        token_data = SimpleNamespace(user_id=1, token_type="access")
+
+        class J:
+            @staticmethod
+            def verify_token(token, raise_on_expired=False):
+                calls.append(token)
+                return token_data
+
+        dep_required, _ = _create_auth_dependencies(
+            J(), lambda uid: SimpleNamespace(id=uid), "/auth/token"
+        )
+
+        mock_blacklist = MagicMock()
+        mock_blacklist.is_revoked.return_value = False
+        request = SimpleNamespace(state=SimpleNamespace())
+
+        with patch("yweb.auth.token_store.get_token_blacklist", return_value=mock_blacklist):
+            assert dep_required(token="good", request=request).id == 1
+
+        assert calls == ["good"]
+        mock_blacklist.is_revoked.assert_called_once_with("good", token_data=token_data)
+        assert request.state.token_data is token_data
+
+    def test_create_auth_dependencies_revoked_before_expired(self):
+        """已撤销且已过期的 token 仍优先返回 TOKEN_REVOKED"""
+        from unittest.mock import MagicMock, patch
+        from yweb.exceptions import ErrorCode
+
+        class J:
+            @staticmethod
+            def verify_token(token, raise_on_expired=False):
+                raise AuthenticationException("访问令牌已过期", code=ErrorCode.TOKEN_EXPIRED)
+
+        dep_required, _ = _create_auth_dependencies(J(), lambda uid: None, "/auth/token")
+
+        mock_blacklist = MagicMock()
+        mock_blacklist.is_revoked.return_value = True
+        with patch("yweb.auth.token_store.get_token_blacklist", return_value=mock_blacklist):
+            with pytest.raises(AuthenticationException) as exc_info:
+                dep_required(token="old")
+        assert exc_info.value.code == ErrorCode.TOKEN_REVOKED
+
+        mock_blacklist.is_revoked.return_value = False
+        with patch("yweb.auth.token_store.get_token_blacklist", return_value=mock_blacklist):
+            with pytest.raises(AuthenticationException) as exc_info:
+                dep_required(token="old")
+        assert exc_info.value.code == ErrorCode.TOKEN_EXPIRED
+
     def test_authsetup_helpers(self):
         setup = AuthSetup(
             get_current_user=lambda: None,
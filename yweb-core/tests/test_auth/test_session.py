@@ -3,6 +3,8 @@
 测试 Session 的创建、验证、销毁和管理功能
 """
 
+import time
+
 import pytest
 from datetime import datetime, timezone, timedelta
 from fastapi import FastAPI, Depends, Response
@@ -12,6 +14,7 @@ from yweb.auth.session import (
     Session,
     SessionManager,
     SessionAuthProvider,
+    RedisSessionStore,
     set_session_cookie,
     clear_session_cookie,
 )
@@ -168,6 +171,280 @@ class TestSessionManager:
         assert session_manager.set_mfa_verified("nonexistent") is False
 
 
+class TestSessionRenewal:
+    """Session 续期写入测试"""
+    
+    def test_access_without_renew_does_not_write(self):
+        """测试剩余时间充足时访问不回写存储"""
+        storage = {}
+        writes = []
+        
+        def store(session):
+            writes.append(session.session_id)
+            storage[session.session_id] = session
+            return True
+        
+        manager = SessionManager(secret_key="k", expire_minutes=30, renew_threshold_minutes=10)
+        manager.set_stores(store=store, getter=storage.get)
+        session = manager.create_session(user_id=1)
+        assert len(writes) == 1
+        
+        for _ in range(5):
+            assert manager.get_session(session.session_id) is not None
+        assert len(writes) == 1
+    
+    def test_renew_fraction(self):
+        """测试按比例续期"""
+        manager = SessionManager(secret_key="k", expire_minutes=30, renew_fraction=0.5)
+        assert manager.renew_threshold_seconds == 900
+        
+        session = manager.create_session(user_id=1)
+        original = datetime.now(timezone.utc) + timedelta(minutes=20)
+        session.expires_at = original
+        assert manager.get_session(session.session_id).expires_at == original
+        
+        session.expires_at = datetime.now(timezone.utc) + timedelta(minutes=10)
+        renewed = manager.get_session(session.session_id)
+        assert renewed.expires_at > original
+    
+    def test_invalid_renew_fraction(self):
+        """测试非法续期比例"""
+        with pytest.raises(ValueError):
+            SessionManager(secret_key="k", renew_fraction=0)
+        with pytest.raises(ValueError):
+            SessionManager(secret_key="k", renew_fraction=1.5)
+    
+    @pytest.mark.asyncio
+    async def test_async_methods_without_store(self):
+        """测试未配置异步存储时异步方法复用同步实现"""
+        manager = SessionManager(secret_key="k", max_sessions_per_user=2)
+        session = await manager.acreate_session(user_id=1)
+        
+        is_valid, result = await manager.avalidate_session(session.session_id)
+        assert is_valid is True
+        assert result.session_id == session.session_id
+        
+        assert await manager.aset_mfa_verified(session.session_id) is True
+        assert await manager.adestroy_session(session.session_id) is True
+        assert await manager.aget_session(session.session_id) is None
+
+
+class FakeAsyncRedis:
+    """最小化的 redis.asyncio 客户端模拟（哈希 + 有序集合 + 过期）"""
+    
+    def __init__(self):
+        self.hashes = {}
+        self.zsets = {}
+        self.expire_at = {}
+        self.commands = []
+    
+    def _alive(self, key):
+        deadline = self.expire_at.get(key)
+        if deadline is not None and deadline <= time.time():
+            self.hashes.pop(key, None)
+            self.zsets.pop(key, None)
+            self.expire_at.pop(key, None)
+        return key in self.hashes or key in self.zsets
+    
+    def pipeline(self):
+        return FakePipeline(self)
+    
+    async def hset(self, key, mapping):
+        self.commands.append(("hset", key, tuple(mapping)))
+        self.hashes.setdefault(key, {}).update({k: str(v).encode() for k, v in mapping.items()})
+        return len(mapping)
+    
+    async def hgetall(self, key):
+        return dict(self.hashes[key]) if self._alive(key) and key in self.hashes else {}
+    
+    async def hget(self, key, field):
+        return (await self.hgetall(key)).get(field)
+    
+    async def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                removed += 1
+            self.hashes.pop(key, None)
+            self.zsets.pop(key, None)
+            self.expire_at.pop(key, None)
+        return removed
+    
+    async def expireat(self, key, when):
+        self.expire_at[key] = when
+        return True
+    
+    async def persist(self, key):
+        self.expire_at.pop(key, None)
+        return True
+    
+    async def zadd(self, key, mapping):
+        self._alive(key)
+        self.zsets.setdefault(key, {}).update({m: float(s) for m, s in mapping.items()})
+        return len(mapping)
+    
+    async def zrem(self, key, *members):
+        zset = self.zsets.get(key, {})
+        return sum(1 for m in members if zset.pop(m, None) is not None)
+    
+    async def zremrangebyscore(self, key, low, high):
+        zset = self.zsets.get(key, {})
+        stale = [m for m, s in zset.items() if float(low) <= s <= float(high)]
+        for member in stale:
+            del zset[member]
+        return len(stale)
+    
+    async def zcard(self, key):
+        return len(self.zsets.get(key, {})) if self._alive(key) else 0
+    
+    async def zrange(self, key, start, end, withscores=False):
+        items = sorted(self.zsets.get(key, {}).items(), key=lambda kv: kv[1]) if self._alive(key) else []
+        end = len(items) if end == -1 else end + 1
+        start = len(items) + start if start < 0 else start
+        selected = items[max(start, 0):end]
+        if withscores:
+            return [(m.encode(), s) for m, s in selected]
+        return [m.encode() for m, _ in selected]
+
+
+class FakePipeline:
+    """按顺序执行的管道模拟"""
+    
+    def __init__(self, redis):
+        self._redis = redis
+        self._calls = []
+    
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._calls.append((getattr(self._redis, name), args, kwargs))
+            return self
+        return queue
+    
+    async def execute(self):
+        return [await func(*args, **kwargs) for func, args, kwargs in self._calls]
+
+
+class TestRedisSessionStore:
+    """RedisSessionStore + 异步 SessionManager 测试"""
+    
+    @pytest.fixture
+    def redis_client(self):
+        return FakeAsyncRedis()
+    
+    @pytest.fixture
+    def manager(self, redis_client):
+        return SessionManager(
+            secret_key="k",
+            expire_minutes=30,
+            max_sessions_per_user=3,
+            store=RedisSessionStore(redis_client, prefix="test:"),
+            renew_fraction=0.5,
+        )
+    
+    @pytest.mark.asyncio
+    async def test_create_and_get(self, manager, redis_client):
+        """测试会话以哈希存储并可读回"""
+        session = await manager.acreate_session(
+            user_id=1, ip_address="127.0.0.1", data={"cart": [1, 2]},
+        )
+        key = f"test:session:{session.session_id}"
+        assert key in redis_client.hashes
+        assert redis_client.expire_at[key] >= session.expires_at.timestamp()
+        assert "test:user:1" in redis_client.zsets
+        
+        loaded = await manager.aget_session(session.session_id)
+        assert loaded.user_id == 1
+        assert loaded.ip_address == "127.0.0.1"
+        assert loaded.get_data("cart") == [1, 2]
+        assert loaded.expires_at == session.expires_at
+    
+    @pytest.mark.asyncio
+    async def test_access_without_renew_is_read_only(self, manager, redis_client):
+        """测试剩余时间充足时访问不产生写操作"""
+        session = await manager.acreate_session(user_id=1)
+        writes = len(redis_client.commands)
+        
+        for _ in range(5):
+            assert await manager.aget_session(session.session_id) is not None
+        assert len(redis_client.commands) == writes
+    
+    @pytest.mark.asyncio
+    async def test_renew_updates_only_expiry_fields(self, manager, redis_client):
+        """测试续期只写入访问时间和过期时间"""
+        session = await manager.acreate_session(user_id=1)
+        key = f"test:session:{session.session_id}"
+        soon = datetime.now(timezone.utc) + timedelta(minutes=5)
+        redis_client.hashes[key]["expires_at"] = soon.isoformat().encode()
+        
+        renewed = await manager.aget_session(session.session_id)
+        assert renewed.expires_at > soon + timedelta(minutes=20)
+        assert redis_client.commands[-1] == ("hset", key, ("last_accessed_at", "expires_at"))
+        assert redis_client.zsets["test:user:1"][session.session_id] == renewed.expires_at.timestamp()
+    
+    @pytest.mark.asyncio
+    async def test_session_limit_trims_oldest(self, manager):
+        """测试超出并发会话数时删除最早过期的会话"""
+        sessions = []
+        for _ in range(5):
+            sessions.append(await manager.acreate_session(user_id=1))
+        
+        remaining = await manager.aget_user_sessions(user_id=1)
+        assert len(remaining) == 3
+        assert {s.session_id for s in remaining} == {s.session_id for s in sessions[-3:]}
+        assert await manager.aget_session(sessions[0].session_id) is None
+    
+    @pytest.mark.asyncio
+    async def test_destroy(self, manager, redis_client):
+        """测试销毁单个会话与全部会话"""
+        first = await manager.acreate_session(user_id=1)
+        await manager.acreate_session(user_id=1)
+        
+        assert await manager.adestroy_session(first.session_id) is True
+        assert first.session_id not in redis_client.zsets["test:user:1"]
+        assert await manager.aget_session(first.session_id) is None
+        
+        assert await manager.adestroy_all_sessions(user_id=1) == 1
+        assert await manager.aget_user_sessions(user_id=1) == []
+    
+    @pytest.mark.asyncio
+    async def test_mfa_verified(self, manager):
+        """测试异步标记 MFA"""
+        session = await manager.acreate_session(user_id=1)
+        assert await manager.aset_mfa_verified(session.session_id) is True
+        assert (await manager.aget_session(session.session_id)).mfa_verified is True
+        assert await manager.aset_mfa_verified("missing") is False
+    
+    def test_sync_methods_rejected_with_async_store(self, manager):
+        """测试配置异步存储后同步方法给出明确错误"""
+        with pytest.raises(RuntimeError):
+            manager.create_session(user_id=1)
+        with pytest.raises(RuntimeError):
+            manager.get_session("any")
+    
+    def test_dependency_uses_async_store(self, manager, mock_user):
+        """测试 FastAPI 依赖通过异步存储校验会话"""
+        get_session_user = manager.create_dependency(
+            user_getter=lambda user_id: mock_user(id=user_id, username="testuser"),
+        )
+        app = FastAPI()
+        
+        @app.post("/login")
+        async def login(response: Response):
+            session = await manager.acreate_session(user_id=1)
+            set_session_cookie(response, session, secure=False)
+            return {"ok": True}
+        
+        @app.get("/me")
+        def get_me(user=Depends(get_session_user)):
+            return {"username": user.username}
+        
+        client = TestClient(app)
+        assert client.post("/login").status_code == 200
+        response = client.get("/me")
+        assert response.status_code == 200
+        assert response.json()["username"] == "testuser"
+
+
 class TestSessionAuthProvider:
     """SessionAuthProvider 测试"""
     
@@ -249,6 +526,34 @@ class TestSessionAuthProvider:
         assert result.success is False
         assert result.error_code == "INVALID_SESSION"
 
+    @pytest.mark.asyncio
+    async def test_async_provider_with_store_backed_manager(self, mock_user):
+        """配置异步存储时通过异步方法完成登录、验证与登出"""
+        manager = SessionManager(
+            secret_key="test-secret",
+            store=RedisSessionStore(FakeAsyncRedis(), prefix="test:"),
+        )
+        auth_provider = SessionAuthProvider(
+            session_manager=manager,
+            user_getter=lambda user_id: mock_user(id=user_id, username="testuser"),
+        )
+        
+        with pytest.raises(RuntimeError):
+            auth_provider.authenticate({"user_id": 1})
+        
+        login = await auth_provider.aauthenticate({"user_id": 1, "ip_address": "127.0.0.1"})
+        assert login.success is True
+        session_id = login.extra["session_id"]
+        
+        result = await auth_provider.avalidate_token(session_id)
+        assert result.success is True
+        assert result.identity.username == "testuser"
+        assert result.identity.session_id == session_id
+        
+        assert (await auth_provider.avalidate_token("not-exist")).error_code == "INVALID_SESSION"
+        assert await auth_provider.alogout(result.identity) is True
+        assert (await auth_provider.avalidate_token(session_id)).success is False
+
 
 class TestSessionFastAPIIntegration:
     """Session FastAPI 集成测试"""
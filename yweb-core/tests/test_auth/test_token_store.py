@@ -1,11 +1,16 @@
 """Token 撤销/黑名单测试"""
 
+import threading
+
 import pytest
 from datetime import datetime, timezone, timedelta
 
 from yweb.auth import JWTManager, TokenPayload
 from yweb.auth.token_store import (
+    BloomFilter,
+    BloomFilterTokenStore,
     InMemoryTokenStore,
+    RedisTokenStore,
     TokenBlacklist,
     RevokedTokenInfo,
     configure_token_blacklist,
@@ -272,6 +277,244 @@ class TestTokenBlacklist:
         """测试无效 token 且不在黑名单时返回 False"""
         assert blacklist.is_revoked("invalid.token.value") is False
 
+    def test_is_revoked_reuses_given_token_data(self, blacklist, jwt_manager, sample_payload):
+        """测试传入已验证的 token_data 时不再重复解码"""
+        from unittest.mock import patch
+
+        token = jwt_manager.create_access_token(sample_payload)
+        token_data = jwt_manager.verify_token(token)
+        blacklist.revoke_all_user_tokens(user_id=1)
+
+        with patch.object(jwt_manager, "verify_token") as mock_verify:
+            assert blacklist.is_revoked(token, token_data=token_data) is True
+            mock_verify.assert_not_called()
+
+
+class _CountingStore(InMemoryTokenStore):
+    """记录后端 exists / get_user_revocation_time 调用次数"""
+
+    def __init__(self):
+        super().__init__()
+        self.exists_calls = 0
+        self.user_revocation_calls = 0
+
+    def exists(self, token_hash):
+        self.exists_calls += 1
+        return super().exists(token_hash)
+
+    def get_user_revocation_time(self, user_id):
+        self.user_revocation_calls += 1
+        return super().get_user_revocation_time(user_id)
+
+
+class _ZSetRedis:
+    """最小 Redis 替身：仅支持 RedisTokenStore 用到的命令"""
+
+    def __init__(self):
+        self.data = {}
+        self.zsets = {}
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def set(self, key, value):
+        self.data[key] = value
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def sadd(self, key, member):
+        self.data.setdefault(key, set()).add(member)
+
+    def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    def zrem(self, key, member):
+        self.zsets.get(key, {}).pop(member, None)
+
+    def zremrangebyscore(self, key, low, high):
+        zset = self.zsets.get(key, {})
+        for member in [m for m, score in zset.items() if score <= high]:
+            del zset[member]
+
+    def zrangebyscore(self, key, low, high, withscores=False):
+        items = sorted(
+            ((m, score) for m, score in self.zsets.get(key, {}).items() if score >= low),
+            key=lambda item: item[1],
+        )
+        return items if withscores else [m for m, _ in items]
+
+
+class TestBloomFilter:
+    """布隆过滤器测试"""
+
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        keys = [f"hash-{i}" for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+
+        assert all(key in bloom for key in keys)
+        assert bloom.count == 1000
+
+    def test_false_positive_rate_within_bound(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"revoked-{i}")
+
+        false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+        assert false_positives < 300  # 期望约 1%，留足余量
+
+    def test_invalid_params(self):
+        with pytest.raises(ValueError):
+            BloomFilter(capacity=0)
+        with pytest.raises(ValueError):
+            BloomFilter(error_rate=1.5)
+
+
+class TestBloomFilterTokenStore:
+    """布隆过滤器前置存储测试"""
+
+    def test_unrevoked_token_skips_backend(self):
+        backend = _CountingStore()
+        store = BloomFilterTokenStore(backend)
+
+        assert store.exists("never-revoked") is False
+        assert backend.exists_calls == 0
+        assert store.get_stats()["filtered"] == 1
+
+    def test_revoked_token_confirmed_by_backend(self):
+        backend = _CountingStore()
+        store = BloomFilterTokenStore(backend)
+        store.add(RevokedTokenInfo(token_hash="revoked", user_id=1))
+
+        assert store.exists("revoked") is True
+        assert backend.exists_calls == 1
+
+    def test_existing_revocations_loaded_on_init(self):
+        backend = _CountingStore()
+        backend.add(RevokedTokenInfo(token_hash="old"))
+        backend.add_user_revocation(5, datetime.now(timezone.utc))
+
+        store = BloomFilterTokenStore(backend)
+
+        assert store.exists("old") is True
+        assert store.get_user_revocation_time(5) is not None
+        assert backend.user_revocation_calls == 0
+
+    def test_other_worker_revocations_visible_after_sync(self):
+        """其他实例写入后端的撤销在下次同步后生效"""
+        backend = _CountingStore()
+        store = BloomFilterTokenStore(backend, sync_interval=3600)
+
+        backend.add(RevokedTokenInfo(token_hash="remote"))
+        backend.add_user_revocation(9, datetime.now(timezone.utc))
+        assert store.exists("remote") is False  # 未到同步间隔
+
+        store.sync()
+        assert store.exists("remote") is True
+        assert store.get_user_revocation_time(9) is not None
+
+    def test_auto_sync_when_interval_elapsed(self):
+        backend = _CountingStore()
+        store = BloomFilterTokenStore(backend, sync_interval=0)
+
+        backend.add(RevokedTokenInfo(token_hash="remote"))
+        assert store.exists("remote") is True
+
+    def test_rebuild_when_capacity_exceeded(self):
+        backend = _CountingStore()
+        store = BloomFilterTokenStore(backend, capacity=2, sync_interval=3600)
+        for i in range(3):
+            store.add(RevokedTokenInfo(token_hash=f"h{i}"))
+
+        store.sync()
+
+        stats = store.get_stats()
+        assert stats["filter_capacity"] >= 6
+        assert all(store.exists(f"h{i}") for i in range(3))
+
+    def test_backend_without_delta_support_rejected(self):
+        class LegacyStore(InMemoryTokenStore):
+            supports_incremental_sync = False
+
+        with pytest.raises(ValueError, match="增量同步"):
+            BloomFilterTokenStore(LegacyStore())
+
+    def test_works_with_token_blacklist(self):
+        jwt_manager = JWTManager(secret_key="bloom-test-secret")
+        payload = TokenPayload(sub="u", user_id=1, username="u")
+        backend = _CountingStore()
+        blacklist = TokenBlacklist(BloomFilterTokenStore(backend), jwt_manager)
+
+        token = jwt_manager.create_access_token(payload)
+        assert blacklist.is_revoked(token) is False
+        blacklist.revoke_token(token)
+        assert blacklist.is_revoked(token) is True
+
+    def test_redis_store_delta_index(self):
+        redis = _ZSetRedis()
+        store = RedisTokenStore(redis, prefix="bl:")
+        store.add(RevokedTokenInfo(token_hash="h1", user_id=1))
+        store.add_user_revocation(2, datetime.now(timezone.utc))
+
+        assert store.get_revoked_since(0) == ["h1"]
+        assert list(store.get_user_revocations_since(0)) == [2]
+        assert store.get_revoked_since(datetime.now(timezone.utc).timestamp() + 60) == []
+
+        bloom_store = BloomFilterTokenStore(store)
+        assert bloom_store.exists("h1") is True
+        assert bloom_store.get_user_revocation_time(2) is not None
+
+    def test_redis_store_rebuild_keeps_long_lived_revocations(self):
+        """Token 过期时间超过默认 TTL 时，撤销索引条目与键同时失效，全量重建不会遗漏"""
+        redis = _ZSetRedis()
+        store = RedisTokenStore(redis, prefix="bl:", default_ttl_seconds=60)
+        bloom_store = BloomFilterTokenStore(store, sync_interval=3600)
+        now = datetime.now(timezone.utc)
+        bloom_store.add(RevokedTokenInfo(
+            token_hash="long",
+            revoked_at=now - timedelta(minutes=5),
+            expires_at=now + timedelta(hours=2),
+        ))
+        bloom_store.add(RevokedTokenInfo(token_hash="other"))
+
+        bloom_store.sync(full=True)
+
+        assert bloom_store.exists("long") is True
+        assert store.get_revoked_since(0) == ["other", "long"]
+
+    def test_redis_user_revoke_index_trimmed_on_write(self):
+        redis = _ZSetRedis()
+        store = RedisTokenStore(redis, prefix="bl:", default_ttl_seconds=60)
+        now = datetime.now(timezone.utc)
+        store.add_user_revocation(1, now - timedelta(minutes=5))
+        store.add_user_revocation(2, now)
+
+        assert list(store.get_user_revocations_since(0)) == [2]
+        assert store.get_user_revocation_time(1) is not None
+
+    def test_stats_counted_under_concurrency(self):
+        store = BloomFilterTokenStore(InMemoryTokenStore(), sync_interval=3600)
+        store.add(RevokedTokenInfo(token_hash="revoked"))
+
+        def worker():
+            for _ in range(500):
+                store.exists("revoked")
+                store.exists("clean")
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        stats = store.get_stats()
+        assert stats["filtered"] + stats["store_lookups"] == 8000
+
 
 class TestGlobalBlacklist:
     """全局黑名单配置测试"""
@@ -0,0 +1,94 @@
+"""顶层包延迟导入测试
+
+- ``import yweb`` 不加载 SQLAlchemy、FastAPI 等重依赖（``python -X importtime`` 统计已加载模块）
+- 延迟导入表与 __all__、TYPE_CHECKING 导入保持一致
+"""
+
+import ast
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import yweb
+
+# 只导入 yweb / yweb.log 时不应加载的依赖
+HEAVY_MODULES = ("sqlalchemy", "fastapi", "starlette", "pydantic", "jose", "passlib", "apscheduler", "redis")
+
+
+def _importtime(statement: str) -> dict:
+    """在子进程中执行导入语句，返回 {模块名: 累计耗时(微秒)}"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        cwd=str(Path(yweb.__file__).parent.parent),
+        check=True,
+    )
+    timings = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            timings[name.strip()] = int(cumulative)
+    return timings
+
+
+def _root_modules(timings: dict) -> set:
+    return {name.split(".")[0] for name in timings}
+
+
+class TestImportTime:
+    """导入依赖回归测试"""
+
+    @pytest.mark.parametrize("statement", ["import yweb", "import yweb.log"])
+    def test_heavy_dependencies_not_loaded(self, statement):
+        loaded = _root_modules(_importtime(statement))
+        assert loaded.isdisjoint(HEAVY_MODULES), loaded & set(HEAVY_MODULES)
+
+    def test_first_access_loads_submodule(self):
+        loaded = _root_modules(_importtime("import yweb; yweb.get_logger"))
+        assert loaded.isdisjoint(HEAVY_MODULES)
+        assert "sqlalchemy" in _root_modules(_importtime("from yweb import BaseModel"))
+
+
+class TestLazyExports:
+    """延迟导入表测试"""
+
+    def test_all_names_resolve(self):
+        for name in yweb.__all__:
+            assert getattr(yweb, name) is not None
+
+    def test_lazy_table_matches_all(self):
+        lazy = set(yweb._LAZY_IMPORTS)
+        exported = set(yweb.__all__) - {"__version__", "__author__", "__description__"}
+        assert lazy == exported
+
+    def test_type_checking_imports_match_lazy_table(self):
+        tree = ast.parse(Path(yweb.__file__).read_text(encoding="utf-8"))
+        block = next(
+            node for node in tree.body
+            if isinstance(node, ast.If) and getattr(node.test, "id", None) == "TYPE_CHECKING"
+        )
+        declared = {
+            alias.name: f".{node.module}"
+            for node in block.body if isinstance(node, ast.ImportFrom)
+            for alias in node.names
+        }
+        assert declared == yweb._LAZY_IMPORTS
+
+    def test_resolved_name_cached_on_module(self):
+        value = yweb.Resp
+        assert yweb.__dict__["Resp"] is value
+
+    def test_submodule_access(self):
+        import yweb.cache
+
+        assert yweb.cache is sys.modules["yweb.cache"]
+
+    def test_unknown_attribute(self):
+        with pytest.raises(AttributeError):
+            _ = yweb.not_a_real_name
+        assert "Resp" in dir(yweb)
@@ -0,0 +1,199 @@
+"""异步数据库栈测试
+
+测试 init_async_database / async_db_session_scope / get_async_db
+以及 CoreModel 的异步方法（aget、aget_many、apaginate、abulk_* 等）
+"""
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import Column, String, select
+
+from yweb.orm import (
+    BaseModel,
+    activate_soft_delete_hook,
+    async_db_session_scope,
+    close_async_database,
+    db_manager,
+    get_async_db,
+    get_async_engine,
+    init_async_database,
+)
+from yweb.orm.db_session import to_async_url
+
+pytest.importorskip("aiosqlite")
+
+
+class AsyncArticleModel(BaseModel):
+    """异步测试文章模型"""
+    __tablename__ = "test_async_articles"
+    __table_args__ = {'extend_existing': True}
+
+    title = Column(String(100))
+
+
+@pytest_asyncio.fixture
+async def async_db():
+    activate_soft_delete_hook()
+    engine, _ = init_async_database("sqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(AsyncArticleModel.metadata.create_all, tables=[AsyncArticleModel.__table__])
+    yield engine
+    await close_async_database()
+
+
+async def _create_articles(n):
+    async with async_db_session_scope() as session:
+        articles = [AsyncArticleModel(title=f"article{i}") for i in range(n)]
+        session.add_all(articles)
+        await session.flush()
+        return [a.id for a in articles]
+
+
+class TestAsyncDatabaseInit:
+    """异步引擎初始化测试"""
+
+    def test_to_async_url(self):
+        assert to_async_url("sqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
+        assert to_async_url("postgresql://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+        assert to_async_url("mysql+pymysql://u:p@h/db") == "mysql+aiomysql://u:p@h/db"
+        assert to_async_url("postgresql+asyncpg://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+
+    @pytest.mark.asyncio
+    async def test_init_from_sync_url_and_close(self, async_db):
+        assert get_async_engine() is async_db
+        assert async_db.url.drivername == "sqlite+aiosqlite"
+        assert db_manager.is_async_initialized
+
+    def test_init_requires_url(self):
+        with pytest.raises(ValueError):
+            init_async_database()
+
+    def test_session_outside_scope(self):
+        with pytest.raises(RuntimeError):
+            db_manager.get_async_session()
+
+
+class TestAsyncSessionScope:
+    """async_db_session_scope / get_async_db 测试"""
+
+    @pytest.mark.asyncio
+    async def test_commit_and_rollback(self, async_db):
+        ids = await _create_articles(1)
+
+        with pytest.raises(ValueError):
+            async with async_db_session_scope():
+                article = await AsyncArticleModel.aget(ids[0])
+                article.title = "changed"
+                raise ValueError("boom")
+
+        async with async_db_session_scope():
+            assert (await AsyncArticleModel.aget(ids[0])).title == "article0"
+
+    @pytest.mark.asyncio
+    async def test_nested_scope_reuses_session(self, async_db):
+        async with async_db_session_scope() as outer:
+            async with async_db_session_scope() as inner:
+                assert inner is outer
+            assert db_manager.get_async_session() is outer
+        with pytest.raises(RuntimeError):
+            db_manager.get_async_session()
+
+    @pytest.mark.asyncio
+    async def test_get_async_db_dependency(self, async_db):
+        gen = get_async_db()
+        session = await gen.__anext__()
+        assert db_manager.get_async_session() is session
+        with pytest.raises(StopAsyncIteration):
+            await gen.__anext__()
+
+
+class TestAsyncCoreModel:
+    """CoreModel 异步方法测试"""
+
+    @pytest.mark.asyncio
+    async def test_asave_aget_and_identity_map(self, async_db):
+        async with async_db_session_scope():
+            article = await AsyncArticleModel(title="hello").asave()
+            assert article.id is not None
+            assert await AsyncArticleModel.aget(article.id) is article
+            assert await AsyncArticleModel.aget(None) is None
+            assert await AsyncArticleModel.aget(999999) is None
+
+    @pytest.mark.asyncio
+    async def test_aget_many_in_input_order(self, async_db):
+        ids = await _create_articles(5)
+        async with async_db_session_scope():
+            articles = await AsyncArticleModel.aget_many(list(reversed(ids)) + [999999], chunk_size=2)
+            assert [a.id for a in articles] == list(reversed(ids))
+            assert len(await AsyncArticleModel.aget_all()) == 5
+            found = await AsyncArticleModel.aget_list_by_conditions({"title": "article3"})
+            assert [a.id for a in found] == [ids[3]]
+
+    @pytest.mark.asyncio
+    async def test_adelete_is_soft_delete(self, async_db):
+        ids = await _create_articles(2)
+        async with async_db_session_scope():
+            article = await AsyncArticleModel.aget(ids[0])
+            await article.adelete(commit=True)
+
+        async with async_db_session_scope() as session:
+            assert await AsyncArticleModel.aget(ids[0]) is None
+            assert [a.id for a in await AsyncArticleModel.aget_many(ids)] == [ids[1]]
+            stmt = select(AsyncArticleModel).where(AsyncArticleModel.id == ids[0])
+            deleted = (await session.scalars(stmt.execution_options(include_deleted=True))).one()
+            assert deleted.deleted_at is not None
+
+    @pytest.mark.asyncio
+    async def test_apaginate(self, async_db):
+        await _create_articles(7)
+        async with async_db_session_scope():
+            stmt = select(AsyncArticleModel).order_by(AsyncArticleModel.id)
+            page = await AsyncArticleModel.apaginate(stmt, page=2, page_size=3)
+            assert page.total_records == 7
+            assert page.total_pages == 3
+            assert [a.title for a in page.rows] == ["article3", "article4", "article5"]
+
+            with pytest.raises(TypeError):
+                await AsyncArticleModel.apaginate("not a select")
+
+    @pytest.mark.asyncio
+    async def test_abulk_operations(self, async_db):
+        ids = await _create_articles(4)
+        async with async_db_session_scope():
+            assert await AsyncArticleModel.abulk_update({"title": "article0"}, {"title": "first"}) == 1
+            assert await AsyncArticleModel.abulk_update_by_ids(ids[1:3], {"title": "middle"}) == 2
+            assert await AsyncArticleModel.abulk_update_by_ids([], {"title": "x"}) == 0
+            assert await AsyncArticleModel.abulk_soft_delete_by_ids([ids[3]]) == 1
+            assert await AsyncArticleModel.abulk_delete_by_ids([ids[2]]) == 1
+
+        async with async_db_session_scope():
+            titles = sorted(a.title for a in await AsyncArticleModel.aget_all())
+            assert titles == ["first", "middle"]
+            assert await AsyncArticleModel.abulk_delete({"title": "first"}, commit=True) == 1
+            assert await AsyncArticleModel.abulk_soft_delete({"title": "middle"}, commit=True) == 1
+            assert await AsyncArticleModel.aget_all() == []
+
+    @pytest.mark.asyncio
+    async def test_abulk_upsert(self, async_db):
+        ids = await _create_articles(2)
+        rows = [{"id": ids[0], "title": "changed"}, {"id": ids[1], "title": "article1"}, {"title": "new"}]
+        async with async_db_session_scope():
+            assert await AsyncArticleModel.abulk_upsert(rows, commit=True) == 2
+            assert await AsyncArticleModel.abulk_upsert([]) == 0
+
+        async with async_db_session_scope():
+            articles = {a.title: a for a in await AsyncArticleModel.aget_all()}
+            assert sorted(articles) == ["article1", "changed", "new"]
+            assert (articles["changed"].ver, articles["article1"].ver) == (2, 1)
+
+    @pytest.mark.asyncio
+    async def test_commit_suppressed_in_transaction_context(self, async_db, monkeypatch):
+        ids = await _create_articles(1)
+        monkeypatch.setattr(AsyncArticleModel, "_cls_should_suppress_commit", classmethod(lambda cls: True))
+
+        async with async_db_session_scope(auto_commit=False):
+            await AsyncArticleModel.abulk_update_by_ids(ids, {"title": "suppressed"}, commit=True)
+            # 未提交，退出时由外层决定；此处不提交即回滚
+
+        async with async_db_session_scope():
+            assert (await AsyncArticleModel.aget(ids[0])).title == "article0"
@@ -6,7 +6,7 @@
 import pytest
 from dataclasses import dataclass
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, create_engine
+from sqlalchemy import Column, Integer, String, create_engine, event
 from sqlalchemy.orm import sessionmaker, Session, scoped_session
 
 from yweb.orm import (
@@ -20,6 +20,7 @@ from yweb.orm import (
     init_database,
     get_db,
     SimpleSoftDeleteMixin,
+    activate_soft_delete_hook,
 )
 
 
@@ -42,6 +43,27 @@ class SoftDeleteUserModel(BaseModel):
     name = Column(String(200))
 
 
+class GetattributeUserModel(BaseModel):
+    """对照模型：保留旧版 __getattribute__ 拦截，用于属性读取基准对比"""
+    __tablename__ = "test_getattribute_users"
+    __table_args__ = {'extend_existing': True}
+    
+    email = Column(String(200))
+    
+    def __getattribute__(self, name):
+        value = super().__getattribute__(name)
+        if name == 'id' and value is None:
+            try:
+                state = super().__getattribute__('_sa_instance_state')
+                session = state.session
+                if session is not None and state.pending and not session._flushing:
+                    session.flush()
+                    return super().__getattribute__(name)
+            except (AttributeError, KeyError):
+                pass
+        return value
+
+
 # 分页测试用关联模型
 from sqlalchemy import ForeignKey, Table
 from sqlalchemy.orm import relationship
@@ -191,6 +213,154 @@ class TestBaseModel:
     
 
 
+class TestPrimaryKeyLookup:
+    """get / get_many 身份映射与查询次数测试"""
+    
+    @pytest.fixture(autouse=True)
+    def setup_db(self, memory_engine):
+        # 软删除过滤依赖钩子（监听器无法移除，保持激活状态）
+        activate_soft_delete_hook()
+        BaseModel.metadata.create_all(bind=memory_engine)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=memory_engine)
+        self.session_scope = scoped_session(SessionLocal)
+        CoreModel.query = self.session_scope.query_property()
+        
+        self.engine = memory_engine
+        self.statements = []
+        yield
+        if event.contains(memory_engine, "before_cursor_execute", self._record):
+            event.remove(memory_engine, "before_cursor_execute", self._record)
+        self.session_scope.remove()
+    
+    def _record(self, conn, cursor, statement, *args):
+        self.statements.append(statement)
+    
+    def _count_statements(self):
+        event.listen(self.engine, "before_cursor_execute", self._record)
+    
+    def _create_users(self, n):
+        users = [SoftDeleteUserModel(name=f"user{i}") for i in range(n)]
+        SoftDeleteUserModel.add_all(users, commit=True)
+        ids = [u.id for u in users]
+        # 清空身份映射，模拟新请求
+        self.session_scope.expunge_all()
+        return ids
+    
+    def test_get_uses_identity_map(self):
+        user_id = self._create_users(1)[0]
+        self._count_statements()
+        
+        first = SoftDeleteUserModel.get(user_id)
+        second = SoftDeleteUserModel.get(user_id)
+        assert first is second
+        assert len(self.statements) == 1
+    
+    def test_get_honors_soft_delete(self):
+        user_id = self._create_users(1)[0]
+        user = SoftDeleteUserModel.get(user_id)
+        user.delete(True)
+        
+        # 提交后对象已过期，重新加载时被软删除过滤
+        assert SoftDeleteUserModel.get(user_id) is None
+        
+        # 身份映射中尚未提交的软删除对象同样不返回
+        other_id = self._create_users(1)[0]
+        other = SoftDeleteUserModel.get(other_id)
+        other.deleted_at = datetime.now()
+        assert SoftDeleteUserModel.get(other_id) is None
+        assert SoftDeleteUserModel.get(None) is None
+    
+    def test_get_many_single_query_in_input_order(self):
+        ids = self._create_users(50)
+        self._count_statements()
+        
+        requested = list(reversed(ids)) + [ids[0], 999999]
+        users = SoftDeleteUserModel.get_many(requested)
+        assert [u.id for u in users] == list(reversed(ids))
+        assert len(self.statements) == 1
+        
+        # 全部命中身份映射：不再执行 SQL
+        assert SoftDeleteUserModel.get_many(ids[:10]) == users[::-1][:10]
+        assert len(self.statements) == 1
+    
+    def test_get_many_fills_only_misses(self):
+        ids = self._create_users(5)
+        cached = SoftDeleteUserModel.get(ids[1])
+        self._count_statements()
+        
+        users = SoftDeleteUserModel.get_many(ids, chunk_size=2)
+        assert users[1] is cached
+        # 4 个未命中的主键按 chunk_size=2 分两批查询
+        assert len(self.statements) == 2
+        assert "IN" in self.statements[0]
+    
+    def test_get_many_skips_soft_deleted(self):
+        ids = self._create_users(3)
+        SoftDeleteUserModel.get(ids[0]).delete(True)
+        assert [u.id for u in SoftDeleteUserModel.get_many(ids)] == ids[1:]
+        assert SoftDeleteUserModel.get_many([]) == []
+    
+    def test_query_count_benchmark(self):
+        """100 个主键：逐个 get 需要 100 次查询，get_many 只需 1 次"""
+        ids = self._create_users(100)
+        self._count_statements()
+        
+        for pk in ids:
+            SoftDeleteUserModel.get(pk)
+        per_item = len(self.statements)
+        
+        self.session_scope.expunge_all()
+        self.statements.clear()
+        SoftDeleteUserModel.get_many(ids)
+        assert per_item == 100
+        assert len(self.statements) == 1
+
+
+class TestAutoFlushId:
+    """访问 pending 对象的 id 时自动 flush"""
+    
+    @pytest.fixture(autouse=True)
+    def setup_db(self, memory_engine):
+        BaseModel.metadata.create_all(bind=memory_engine)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=memory_engine)
+        self.session_scope = scoped_session(SessionLocal)
+        CoreModel.query = self.session_scope.query_property()
+        yield
+        self.session_scope.remove()
+    
+    def test_pending_id_triggers_flush(self):
+        user = UserModel(name="张三")
+        assert user.id is None  # 未加入 session，不 flush
+        
+        user.save()
+        assert user in self.session_scope.new
+        assert user.id is not None
+        assert user not in self.session_scope.new
+    
+    def test_installed_only_on_id(self):
+        from yweb.orm.core_model import _AutoFlushIdAttribute
+        
+        assert "__getattribute__" not in vars(CoreModel)
+        assert type(UserModel.id) is _AutoFlushIdAttribute
+        assert type(UserModel.email) is not _AutoFlushIdAttribute
+        assert str(UserModel.id == 1) == "test_users.id = :id_1"
+    
+    def test_attribute_read_benchmark(self):
+        """属性读取吞吐：只在 id 上安装描述符，明显快于逐属性 __getattribute__ 拦截"""
+        import timeit
+        
+        new = UserModel(name="new", email="a@example.com").save(commit=True)
+        old = GetattributeUserModel(name="old", email="a@example.com").save(commit=True)
+        
+        def read(obj):
+            _ = obj.id, obj.name, obj.email, obj.created_at, obj.to_dict
+        
+        before = min(timeit.repeat(lambda: read(old), number=5000, repeat=5))
+        after = min(timeit.repeat(lambda: read(new), number=5000, repeat=5))
+        print(f"\n属性读取 5000 次：__getattribute__ {before * 1000:.1f}ms，id 描述符 {after * 1000:.1f}ms")
+        assert after < before
+
+
 class TestDTO:
     """DTO 测试"""
     
@@ -0,0 +1,155 @@
+"""CoreModel.bulk_upsert 测试"""
+
+import pytest
+from sqlalchemy import Column, Integer, String, event, select
+from sqlalchemy.dialects import mysql, postgresql
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from yweb.orm import BaseModel, CoreModel, IdType
+from yweb.orm.upsert import build_upsert_statements
+
+
+class UpsertProductModel(BaseModel):
+    """upsert 测试商品模型（自增主键 + 唯一业务编码）"""
+    __tablename__ = "test_upsert_products"
+    __table_args__ = {'extend_existing': True}
+
+    sku = Column(String(50), unique=True, nullable=False)
+    price = Column(Integer)
+    stock = Column(Integer)
+
+
+class UpsertSnowflakeModel(BaseModel):
+    """upsert 测试雪花主键模型"""
+    __tablename__ = "test_upsert_snowflake"
+    __table_args__ = {'extend_existing': True}
+    __pk_strategy__ = IdType.SNOWFLAKE
+
+    sku = Column(String(50), unique=True, nullable=False)
+    price = Column(Integer)
+
+
+class TestBulkUpsert:
+    """SQLite 上的 bulk_upsert 行为测试"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, memory_engine):
+        BaseModel.metadata.create_all(bind=memory_engine)
+        self.session_scope = scoped_session(sessionmaker(autoflush=False, bind=memory_engine))
+        CoreModel.query = self.session_scope.query_property()
+        self.engine = memory_engine
+        yield
+        self.session_scope.remove()
+
+    def _rows(self):
+        return {p.sku: p for p in self.session_scope.scalars(select(UpsertProductModel))}
+
+    def test_insert_then_update(self):
+        rows = [{"sku": f"s{i}", "name": f"p{i}", "price": i, "stock": 10} for i in range(5)]
+        assert UpsertProductModel.bulk_upsert(rows, conflict_keys=["sku"], commit=True) == 5
+
+        products = self._rows()
+        assert len(products) == 5
+        assert all(p.ver == 1 and p.updated_at is None for p in products.values())
+        ids = {sku: p.id for sku, p in products.items()}
+
+        changed = [{"sku": "s1", "price": 100, "stock": 10}, {"sku": "s9", "price": 9, "stock": 1}]
+        assert UpsertProductModel.bulk_upsert(changed, conflict_keys=["sku"], commit=True) == 2
+
+        products = self._rows()
+        assert len(products) == 6
+        assert products["s1"].price == 100
+        assert products["s1"].ver == 2
+        assert products["s1"].updated_at is not None
+        assert products["s1"].id == ids["s1"]
+        assert products["s1"].name == "p1"
+        assert products["s9"].ver == 1
+
+    def test_unchanged_rows_keep_version(self):
+        rows = [{"sku": "a", "price": 1, "stock": 1}, {"sku": "b", "price": 2, "stock": 2}]
+        UpsertProductModel.bulk_upsert(rows, conflict_keys=["sku"], commit=True)
+        assert UpsertProductModel.bulk_upsert(rows, conflict_keys=["sku"], commit=True) == 0
+        assert {p.ver for p in self._rows().values()} == {1}
+
+    def test_update_fields_limits_columns(self):
+        UpsertProductModel.bulk_upsert([{"sku": "a", "price": 1, "stock": 1}], conflict_keys=["sku"], commit=True)
+        UpsertProductModel.bulk_upsert(
+            [{"sku": "a", "price": 5, "stock": 99}], conflict_keys=["sku"], update_fields=["price"], commit=True
+        )
+        product = self._rows()["a"]
+        assert (product.price, product.stock, product.ver) == (5, 1, 2)
+
+        # 空列表表示冲突时不更新
+        UpsertProductModel.bulk_upsert(
+            [{"sku": "a", "price": 7}, {"sku": "c", "price": 3}], conflict_keys=["sku"], update_fields=[], commit=True
+        )
+        products = self._rows()
+        assert products["a"].price == 5
+        assert products["c"].price == 3
+
+    def test_chunks_and_mixed_keys(self):
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(self.engine, "before_cursor_execute", record)
+        try:
+            rows = [{"sku": f"s{i}", "price": i} for i in range(7)] + [{"sku": "x", "stock": 1}]
+            assert UpsertProductModel.bulk_upsert(rows, conflict_keys=["sku"], chunk_size=3, commit=True) == 8
+        finally:
+            event.remove(self.engine, "before_cursor_execute", record)
+        inserts = [sql for sql in statements if sql.startswith("INSERT")]
+        assert len(inserts) == 4
+        assert len(self._rows()) == 8
+
+    def test_generates_snowflake_ids(self):
+        rows = [{"sku": f"s{i}", "price": i} for i in range(3)]
+        UpsertSnowflakeModel.bulk_upsert(rows, conflict_keys=["sku"], commit=True)
+        items = self.session_scope.scalars(select(UpsertSnowflakeModel)).all()
+        assert len({item.id for item in items}) == 3
+        assert all(isinstance(item.id, int) and item.id > 2 ** 32 for item in items)
+
+    def test_loaded_objects_are_refreshed(self):
+        product = UpsertProductModel(sku="a", price=1)
+        product.save(commit=True)
+        assert product.price == 1
+        UpsertProductModel.bulk_upsert([{"sku": "a", "price": 2}], conflict_keys=["sku"], commit=True)
+        assert product.price == 2
+
+    def test_managed_fields_ignored_and_validation(self):
+        UpsertProductModel.bulk_upsert([{"sku": "a", "price": 1, "ver": 50, "deleted_at": None}],
+                                       conflict_keys=["sku"], commit=True)
+        assert self._rows()["a"].ver == 1
+
+        with pytest.raises(ValueError):
+            UpsertProductModel.bulk_upsert([{"sku": "a", "missing": 1}], conflict_keys=["sku"])
+        with pytest.raises(ValueError):
+            UpsertProductModel.bulk_upsert([{"price": 1}], conflict_keys=["sku"])
+        assert UpsertProductModel.bulk_upsert([]) == 0
+
+
+class TestUpsertDialects:
+    """不同方言生成的 SQL"""
+
+    def _compile(self, dialect_name, dialect, **kwargs):
+        rows = [{"sku": "a", "price": 1}, {"sku": "b", "price": 2}]
+        statements = list(build_upsert_statements(UpsertProductModel, rows, dialect_name, **kwargs))
+        assert len(statements) == 1
+        return str(statements[0].compile(dialect=dialect))
+
+    def test_postgresql(self):
+        sql = self._compile("postgresql", postgresql.dialect(), conflict_keys=["sku"])
+        assert "ON CONFLICT (sku) DO UPDATE SET price = excluded.price" in sql
+        assert "ver = (test_upsert_products.ver + " in sql
+        assert "WHERE test_upsert_products.price IS DISTINCT FROM excluded.price" in sql
+
+    def test_mysql(self):
+        sql = self._compile("mysql", mysql.dialect(), conflict_keys=["sku"])
+        assert "ON DUPLICATE KEY UPDATE ver = (test_upsert_products.ver + CASE" in sql
+        assert "price = VALUES(price)" in sql
+        assert sql.index("ver =") < sql.index("price = VALUES(price)")
+
+    def test_unsupported_dialect(self):
+        with pytest.raises(NotImplementedError):
+            list(build_upsert_statements(UpsertProductModel, [{"sku": "a"}], "oracle"))
@@ -23,6 +23,7 @@ class QueryChain:
         self.session = SimpleNamespace(
             execute=lambda stmt: SimpleNamespace(rowcount=3),
             refresh=lambda obj, attrs=None: None,
+            get=lambda cls, pk: self._first,
             query=lambda *a, **k: count_query,
             commit=lambda: None,
         )
@@ -77,6 +78,8 @@ class DummyCls:
     id = ExprField("id")
     deleted_at = ExprField("deleted_at")
 
+    _is_soft_deleted = classmethod(lambda cls, obj: False)
+
     @classmethod
     def _cls_should_suppress_commit(cls):
         return False
@@ -98,14 +101,12 @@ class DummyCls:
 
 class TestCoreModelExtraMore:
     def test_get_update_refresh_and_history_guards(self):
-        # get: count>1 / 0 / 1
-        DummyCls.query = QueryChain(count_value=2, first_obj=None)
-        with pytest.raises(ValueError):
-            CoreModel.get.__func__(DummyCls, 1)
-        DummyCls.query = QueryChain(count_value=0, first_obj=None)
+        # get: 基于 session.get，None 主键 / 不存在 / 存在
+        DummyCls.query = QueryChain(first_obj=None)
+        assert CoreModel.get.__func__(DummyCls, None) is None
         assert CoreModel.get.__func__(DummyCls, 1) is None
         one = SimpleNamespace(id=1)
-        DummyCls.query = QueryChain(count_value=1, first_obj=one)
+        DummyCls.query = QueryChain(first_obj=one)
         assert CoreModel.get.__func__(DummyCls, 1) is one
         assert CoreModel.get_list_by_conditions.__func__(DummyCls, {"x": 1}) == []
 
@@ -0,0 +1,161 @@
+"""paginate 总数统计策略测试"""
+
+import pytest
+from sqlalchemy import Column, Integer, String, event, select
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from yweb.config import DatabaseSettings
+from yweb.orm import (
+    BaseModel,
+    CoreModel,
+    activate_soft_delete_hook,
+    clear_count_cache,
+    configure_pagination,
+    init_database,
+)
+from yweb.orm import pagination
+from yweb.orm.pagination import get_count_strategy
+
+
+class CountArticleModel(BaseModel):
+    """总数统计测试文章模型"""
+    __tablename__ = "test_count_articles"
+    __table_args__ = {'extend_existing': True}
+
+    category = Column(String(20))
+    views = Column(Integer)
+
+
+class TestCountStrategies:
+    """CoreModel.paginate count_strategy 测试"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, memory_engine):
+        activate_soft_delete_hook()
+        BaseModel.metadata.create_all(bind=memory_engine)
+        self.session_scope = scoped_session(sessionmaker(autoflush=False, bind=memory_engine))
+        CoreModel.query = self.session_scope.query_property()
+
+        articles = [
+            CountArticleModel(name=f"a{i:02d}", category="xy"[i % 2], views=i)
+            for i in range(25)
+        ]
+        CountArticleModel.add_all(articles, commit=True)
+        self.articles = articles
+
+        self.engine = memory_engine
+        self.statements = []
+        event.listen(memory_engine, "before_cursor_execute", self._record)
+        yield
+        event.remove(memory_engine, "before_cursor_execute", self._record)
+        self.session_scope.remove()
+        clear_count_cache()
+        configure_pagination(count_strategy="exact", count_ttl=60)
+
+    def _record(self, conn, cursor, statement, *args):
+        self.statements.append(statement.upper())
+
+    def _count_queries(self):
+        return [sql for sql in self.statements if "COUNT(" in sql and "OVER" not in sql]
+
+    def test_exact_is_default(self):
+        page = CountArticleModel.paginate(select(CountArticleModel), page=2, page_size=10)
+        assert (page.total_records, page.total_pages, len(page.rows)) == (25, 3, 10)
+        assert len(self._count_queries()) == 1
+        assert page.total_is_estimate is False
+
+    def test_window_single_query(self):
+        stmt = select(CountArticleModel).where(CountArticleModel.category == "x").order_by(CountArticleModel.id)
+        self.statements.clear()
+        page = CountArticleModel.paginate(stmt, page=2, page_size=5, count_strategy="window")
+
+        assert len(self.statements) == 1
+        assert "COUNT(*) OVER ()" in self.statements[0]
+        assert page.total_records == 13
+        assert page.total_pages == 3
+        assert [a.name for a in page.rows] == [f"a{i:02d}" for i in range(10, 20, 2)]
+
+    def test_window_query_object_and_columns(self):
+        query = CountArticleModel.query.filter_by(category="y").order_by(CountArticleModel.id)
+        self.statements.clear()
+        page = query.paginate(page=1, page_size=4, count_strategy="window")
+        assert len(self.statements) == 1
+        assert page.total_records == 12
+        assert all(isinstance(a, CountArticleModel) for a in page.rows)
+
+        stmt = select(CountArticleModel.id, CountArticleModel.name).order_by(CountArticleModel.id)
+        page = CountArticleModel.paginate(stmt, page=1, page_size=3, count_strategy="window")
+        assert page.total_records == 25
+        assert page.rows[0] == {"id": self.articles[0].id, "name": "a00"}
+
+    def test_window_past_last_page_falls_back(self):
+        page = CountArticleModel.paginate(select(CountArticleModel), page=10, page_size=10, count_strategy="window")
+        assert page.rows == []
+        assert page.total_records == 25
+
+    def test_window_respects_soft_delete(self):
+        self.articles[0].delete(True)
+        page = CountArticleModel.paginate(select(CountArticleModel), page=1, page_size=5, count_strategy="window")
+        assert page.total_records == 24
+
+    def test_estimate_falls_back_on_sqlite(self):
+        page = CountArticleModel.query.paginate(page=1, page_size=10, count_strategy="estimate")
+        assert (page.total_records, page.total_is_estimate) == (25, False)
+
+    def test_cached(self):
+        stmt = select(CountArticleModel).where(CountArticleModel.views >= 5)
+        assert CountArticleModel.paginate(stmt, count_strategy="cached").total_records == 20
+        CountArticleModel(name="late", category="x", views=99).save(True)
+
+        self.statements.clear()
+        assert CountArticleModel.paginate(stmt, page=2, count_strategy="cached").total_records == 20
+        assert self._count_queries() == []
+
+        # 参数不同视为不同查询
+        other = select(CountArticleModel).where(CountArticleModel.views >= 20)
+        assert CountArticleModel.paginate(other, count_strategy="cached").total_records == 6
+
+        # 清空缓存后重新统计
+        clear_count_cache()
+        assert CountArticleModel.paginate(stmt, count_strategy="cached").total_records == 21
+
+    def test_cached_expires(self, monkeypatch):
+        from yweb.orm import pagination
+
+        stmt = select(CountArticleModel)
+        assert CountArticleModel.paginate(stmt, count_strategy="cached", count_ttl=30).total_records == 25
+        CountArticleModel(name="late", category="x", views=99).save(True)
+
+        now = pagination.time.monotonic()
+        monkeypatch.setattr(pagination.time, "monotonic", lambda: now + 31)
+        assert CountArticleModel.paginate(stmt, count_strategy="cached", count_ttl=30).total_records == 26
+
+    def test_configured_default(self):
+        configure_pagination(count_strategy="window")
+        self.statements.clear()
+        page = CountArticleModel.paginate(select(CountArticleModel), page=1, page_size=5)
+        assert page.total_records == 25
+        assert len(self.statements) == 1
+
+        with pytest.raises(ValueError):
+            configure_pagination(count_strategy="guess")
+        with pytest.raises(ValueError):
+            CountArticleModel.paginate(select(CountArticleModel), count_strategy="guess")
+
+
+def test_settings_default_strategy(tmp_path, monkeypatch):
+    monkeypatch.setattr(pagination, "_cursor_secret", None)
+    settings = DatabaseSettings(
+        url=f"sqlite:///{tmp_path / 'count.db'}",
+        pagination_count_strategy="cached",
+        pagination_count_ttl=15,
+        pagination_cursor_secret="shared-cursor-secret",
+    )
+    engine, session_scope = init_database(config=settings)
+    try:
+        assert get_count_strategy() == ("cached", 15)
+        assert pagination._cursor_secret == b"shared-cursor-secret"
+    finally:
+        session_scope.remove()
+        engine.dispose()
+        configure_pagination(count_strategy="exact", count_ttl=60)
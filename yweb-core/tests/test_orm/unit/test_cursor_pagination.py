@@ -0,0 +1,196 @@
+"""游标（keyset）分页测试"""
+
+import pytest
+from sqlalchemy import Column, Integer, String, event, select
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from yweb.orm import (
+    DTO,
+    BaseModel,
+    CoreModel,
+    CursorPage,
+    InvalidCursorError,
+    activate_soft_delete_hook,
+    clear_count_cache,
+    configure_cursor_secret,
+)
+from yweb.orm import pagination
+from yweb.response import CursorPageResponse
+
+
+class CursorEmployeeModel(BaseModel):
+    """游标分页测试员工模型"""
+    __tablename__ = "test_cursor_employees"
+    __table_args__ = {'extend_existing': True}
+
+    dept = Column(String(20))
+    score = Column(Integer)
+
+
+class EmployeeDTO(DTO):
+    id: int = None
+    name: str = None
+    score: int = None
+
+
+def _walk(fetch):
+    """按 next_cursor 翻完所有页，返回 (行列表, 页数)"""
+    rows, pages, cursor = [], 0, None
+    while True:
+        page = fetch(cursor)
+        rows.extend(page.rows)
+        pages += 1
+        cursor = page.next_cursor
+        if cursor is None:
+            return rows, pages
+
+
+class TestCursorPagination:
+    """CoreModel.paginate_cursor 测试"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, memory_engine, monkeypatch):
+        monkeypatch.setattr(pagination, "_cursor_secret", None)
+        configure_cursor_secret("cursor-test-secret")
+        activate_soft_delete_hook()
+        BaseModel.metadata.create_all(bind=memory_engine)
+        self.session_scope = scoped_session(sessionmaker(autoflush=False, bind=memory_engine))
+        CoreModel.query = self.session_scope.query_property()
+
+        employees = [
+            CursorEmployeeModel(name=f"emp{i:02d}", dept="ab"[i % 2], score=i % 5)
+            for i in range(23)
+        ]
+        CursorEmployeeModel.add_all(employees, commit=True)
+        self.employees = employees
+
+        self.engine = memory_engine
+        self.statements = []
+        yield
+        if event.contains(memory_engine, "before_cursor_execute", self._record):
+            event.remove(memory_engine, "before_cursor_execute", self._record)
+        self.session_scope.remove()
+        clear_count_cache()
+
+    def _record(self, conn, cursor, statement, *args):
+        self.statements.append(statement)
+
+    def _count_statements(self):
+        event.listen(self.engine, "before_cursor_execute", self._record)
+
+    def test_walk_default_order(self):
+        rows, pages = _walk(lambda c: CursorEmployeeModel.paginate_cursor(after=c, page_size=5))
+        assert [e.id for e in rows] == sorted(e.id for e in self.employees)
+        assert pages == 5
+
+        first = CursorEmployeeModel.paginate_cursor(page_size=5)
+        assert isinstance(first, CursorPage)
+        assert first.has_next
+        assert first.total_records is None
+
+    def test_descending_with_ties(self):
+        rows, _ = _walk(lambda c: CursorEmployeeModel.paginate_cursor(after=c, page_size=4, order_by=["-score"]))
+        expected = sorted(self.employees, key=lambda e: (e.score, e.id), reverse=True)
+        assert [e.id for e in rows] == [e.id for e in expected]
+
+    def test_mixed_directions(self):
+        order_by = [CursorEmployeeModel.dept, CursorEmployeeModel.score.desc()]
+        rows, _ = _walk(lambda c: CursorEmployeeModel.paginate_cursor(after=c, page_size=3, order_by=order_by))
+        # 主键跟随最后一个排序键的方向（降序）
+        expected = sorted(self.employees, key=lambda e: (e.dept, -e.score, -e.id))
+        assert [e.id for e in rows] == [e.id for e in expected]
+
+    def test_datetime_key(self):
+        rows, _ = _walk(lambda c: CursorEmployeeModel.paginate_cursor(after=c, page_size=6, order_by=["-created_at"]))
+        assert len({e.id for e in rows}) == len(self.employees)
+
+    def test_select_and_query_sources(self):
+        stmt = select(CursorEmployeeModel).where(CursorEmployeeModel.dept == "a")
+        rows, _ = _walk(lambda c: CursorEmployeeModel.paginate_cursor(stmt, after=c, page_size=5))
+        assert [e.id for e in rows] == sorted(e.id for e in self.employees if e.dept == "a")
+
+        query = CursorEmployeeModel.query.filter_by(dept="b")
+        rows, _ = _walk(lambda c: query.paginate_cursor(after=c, page_size=5, order_by=["score"]))
+        assert [e.id for e in rows] == [
+            e.id for e in sorted((e for e in self.employees if e.dept == "b"), key=lambda e: (e.score, e.id))
+        ]
+
+    def test_multi_column_select(self):
+        stmt = select(CursorEmployeeModel.id, CursorEmployeeModel.name)
+        rows, _ = _walk(lambda c: CursorEmployeeModel.paginate_cursor(stmt, after=c, page_size=10))
+        assert [r["name"] for r in rows] == [f"emp{i:02d}" for i in range(23)]
+
+    def test_index_seek_without_offset_or_count(self):
+        first = CursorEmployeeModel.paginate_cursor(page_size=5, order_by=["-score"])
+        self._count_statements()
+        CursorEmployeeModel.paginate_cursor(after=first.next_cursor, page_size=5, order_by=["-score"])
+
+        assert len(self.statements) == 1
+        sql = self.statements[0].upper()
+        assert "COUNT" not in sql
+        assert "(TEST_CURSOR_EMPLOYEES.SCORE, TEST_CURSOR_EMPLOYEES.ID) <" in sql
+
+    def test_soft_deleted_rows_excluded(self):
+        deleted_id = self.employees[0].id
+        self.employees[0].delete(True)
+        rows, _ = _walk(lambda c: CursorEmployeeModel.paginate_cursor(after=c, page_size=10))
+        assert deleted_id not in {e.id for e in rows}
+        assert len(rows) == 22
+
+    def test_invalid_cursor(self):
+        cursor = CursorEmployeeModel.paginate_cursor(page_size=5).next_cursor
+        body, signature = cursor.split(".")
+        with pytest.raises(InvalidCursorError):
+            CursorEmployeeModel.paginate_cursor(after=body[:-2] + "xx." + signature)
+        with pytest.raises(InvalidCursorError):
+            CursorEmployeeModel.paginate_cursor(after="not-a-cursor")
+        with pytest.raises(InvalidCursorError):
+            CursorEmployeeModel.paginate_cursor(after=cursor, order_by=["-score"])
+        with pytest.raises(ValueError):
+            CursorEmployeeModel.paginate_cursor(order_by=["missing"])
+
+    def test_cursor_secret_required_and_shared(self):
+        """未设置密钥时拒绝签发；同一密钥签发的游标在其他进程（重新设置后）仍然有效"""
+        cursor = CursorEmployeeModel.paginate_cursor(page_size=5).next_cursor
+
+        pagination._cursor_secret = None
+        with pytest.raises(RuntimeError, match="configure_cursor_secret"):
+            CursorEmployeeModel.paginate_cursor(page_size=5)
+
+        configure_cursor_secret("cursor-test-secret")
+        assert len(CursorEmployeeModel.paginate_cursor(after=cursor, page_size=5).rows) == 5
+        configure_cursor_secret("other-secret")
+        with pytest.raises(InvalidCursorError):
+            CursorEmployeeModel.paginate_cursor(after=cursor, page_size=5)
+
+    def test_total_strategies(self):
+        assert CursorEmployeeModel.paginate_cursor(with_total=True).total_records == 23
+
+        # SQLite 不支持估算，回退为精确计数
+        page = CursorEmployeeModel.paginate_cursor(with_total="estimate")
+        assert (page.total_records, page.total_is_estimate) == (23, False)
+
+        assert CursorEmployeeModel.paginate_cursor(with_total="cached").total_records == 23
+        self._count_statements()
+        CursorEmployeeModel(name="late", dept="a", score=1).save(True)
+        self.statements.clear()
+        assert CursorEmployeeModel.paginate_cursor(with_total="cached").total_records == 23
+        assert not any("count" in sql.lower() for sql in self.statements)
+
+        with pytest.raises(ValueError):
+            CursorEmployeeModel.paginate_cursor(with_total="guess")
+
+    def test_dto_and_response_model(self):
+        page = CursorEmployeeModel.paginate_cursor(page_size=3, with_total=True)
+        data = EmployeeDTO.from_page(page)
+        assert data["next_cursor"] == page.next_cursor
+        assert data["has_next"] is True
+        assert data["total_records"] == 23
+        assert [row.name for row in data["rows"]] == ["emp00", "emp01", "emp02"]
+
+        response = CursorPageResponse[EmployeeDTO](data=data)
+        assert response.data.page_size == 3
+
+        schema_page = CursorEmployeeModel.paginate_cursor(page_size=2, schema=EmployeeDTO)
+        assert isinstance(schema_page.rows[0], EmployeeDTO)
+        assert schema_page.to_dict()["has_next"] is True
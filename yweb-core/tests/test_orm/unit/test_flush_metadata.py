@@ -0,0 +1,128 @@
+"""flush 事件处理器的映射元数据缓存与脏检查测试"""
+
+import timeit
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import Column, ForeignKey, Integer, inspect
+from sqlalchemy.orm import configure_mappers, relationship, scoped_session, sessionmaker
+
+from yweb.orm import BaseModel, CoreModel
+from yweb.orm.core_model import (
+    _flush_metadata_cache,
+    _get_flush_metadata,
+    _only_updated_at_changed,
+)
+
+
+class FlushMetaParentModel(BaseModel):
+    """元数据缓存测试父模型"""
+    __tablename__ = "test_flush_meta_parent"
+    __table_args__ = {'extend_existing': True}
+
+
+class FlushMetaChildModel(BaseModel):
+    """元数据缓存测试子模型"""
+    __tablename__ = "test_flush_meta_child"
+    __table_args__ = {'extend_existing': True}
+
+    parent_id = Column(Integer, ForeignKey("test_flush_meta_parent.id"))
+    parent = relationship(FlushMetaParentModel, backref="children")
+
+
+@pytest.fixture
+def session(memory_engine):
+    BaseModel.metadata.create_all(bind=memory_engine)
+    session_scope = scoped_session(sessionmaker(autoflush=False, bind=memory_engine))
+    CoreModel.query = session_scope.query_property()
+    yield session_scope
+    session_scope.remove()
+
+
+class TestFlushMetadataCache:
+    """_get_flush_metadata 缓存测试"""
+
+    def test_metadata_computed_once(self):
+        configure_mappers()
+        mapper = inspect(FlushMetaChildModel)
+        meta = _get_flush_metadata(mapper)
+        assert meta.primary_key_names == ("id",)
+        assert meta.foreign_key_columns == ("parent_id",)
+        assert _get_flush_metadata(mapper) is meta
+
+        parent_meta = _get_flush_metadata(inspect(FlushMetaParentModel))
+        assert "parent_id" in parent_meta.foreign_key_names
+        assert parent_meta.foreign_key_columns == ()
+
+    def test_invalidated_on_reconfigure(self):
+        configure_mappers()
+        mapper = inspect(FlushMetaParentModel)
+        _get_flush_metadata(mapper)
+        assert mapper in _flush_metadata_cache
+
+        class FlushMetaLateModel(BaseModel):
+            __tablename__ = "test_flush_meta_late"
+            __table_args__ = {'extend_existing': True}
+
+            parent_id = Column(Integer, ForeignKey("test_flush_meta_parent.id"))
+            parent = relationship(FlushMetaParentModel, backref="late_items")
+
+        configure_mappers()
+        assert mapper not in _flush_metadata_cache
+        assert "late_items" in mapper.relationships
+
+
+class TestOnlyUpdatedAtDirtyCheck:
+    """仅 updated_at 变更的对象在 flush 前被跳过"""
+
+    def test_only_updated_at_is_skipped(self, session):
+        item = FlushMetaParentModel(name="a")
+        session.add(item)
+        session.commit()
+        ver = item.ver
+
+        item.updated_at = datetime.now() + timedelta(days=1)
+        assert _only_updated_at_changed(inspect(item))
+        session.commit()
+        assert item.ver == ver
+
+    def test_real_change_is_flushed(self, session):
+        item = FlushMetaParentModel(name="a")
+        session.add(item)
+        session.commit()
+        ver = item.ver
+
+        item.updated_at = datetime.now() + timedelta(days=1)
+        item.name = "b"
+        assert not _only_updated_at_changed(inspect(item))
+        session.commit()
+        assert item.ver == ver + 1
+
+    def test_no_change_is_not_skipped(self, session):
+        item = FlushMetaParentModel(name="a")
+        session.add(item)
+        session.commit()
+        item.name = "a"
+        assert not _only_updated_at_changed(inspect(item))
+
+    def test_dirty_check_benchmark(self, session):
+        """committed_state 快速检查 vs 遍历全部属性历史"""
+        items = [FlushMetaChildModel(name=f"c{i}") for i in range(200)]
+        session.add_all(items)
+        session.commit()
+        for item in items:
+            item.name = item.name + "!"
+        states = [inspect(item) for item in items]
+
+        def full_scan():
+            for insp in states:
+                _ = {attr.key for attr in insp.attrs if attr.history.has_changes()} == {"updated_at"}
+
+        def fast_check():
+            for insp in states:
+                _only_updated_at_changed(insp)
+
+        before = min(timeit.repeat(full_scan, number=5, repeat=3))
+        after = min(timeit.repeat(fast_check, number=5, repeat=3))
+        print(f"\n200 个脏对象 x5：全属性扫描 {before * 1000:.1f}ms，快速检查 {after * 1000:.1f}ms")
+        assert after < before
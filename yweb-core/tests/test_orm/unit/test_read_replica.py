@@ -0,0 +1,259 @@
+"""读写分离测试
+
+使用三个 SQLite 文件数据库模拟主库与两个只读副本，
+每个库预置一条 title 为库名的记录，通过查询结果判断语句被路由到哪个库。
+"""
+
+import threading
+import time
+
+import pytest
+from sqlalchemy import Column, String, create_engine, insert, select
+
+from yweb.config import DatabaseSettings
+from yweb.orm import (
+    BaseModel,
+    ReplicaRouter,
+    RoutingSession,
+    db_manager,
+    db_session_scope,
+    init_database,
+    transaction_manager,
+)
+
+
+class ReplicaArticleModel(BaseModel):
+    """读写分离测试文章模型"""
+    __tablename__ = "test_replica_articles"
+    __table_args__ = {'extend_existing': True}
+
+    title = Column(String(100))
+
+
+TITLES = select(ReplicaArticleModel.title).order_by(ReplicaArticleModel.id)
+
+
+def _prepare(url, title):
+    engine = create_engine(url)
+    ReplicaArticleModel.metadata.create_all(engine, tables=[ReplicaArticleModel.__table__])
+    with engine.begin() as conn:
+        conn.execute(insert(ReplicaArticleModel.__table__).values(title=title, ver=1))
+    engine.dispose()
+
+
+@pytest.fixture
+def replica_urls(tmp_path):
+    urls = {name: f"sqlite:///{tmp_path / name}.db" for name in ("primary", "replica1", "replica2")}
+    for name, url in urls.items():
+        _prepare(url, name)
+    return urls
+
+
+@pytest.fixture
+def routed_db(replica_urls):
+    engine, session_scope = init_database(
+        replica_urls["primary"],
+        replica_urls=[replica_urls["replica1"], replica_urls["replica2"]],
+    )
+    yield db_manager.router
+    session_scope.remove()
+    db_manager.router.dispose()
+    engine.dispose()
+
+
+def _source(session, **options):
+    """返回本次查询命中的库名"""
+    return session.scalars(TITLES, execution_options=options).first()
+
+
+class TestRoutingSession:
+    """RoutingSession 路由规则测试"""
+
+    def test_init_creates_routing_session(self, routed_db):
+        assert len(db_manager.replica_engines) == 2
+        with db_session_scope() as session:
+            assert isinstance(session, RoutingSession)
+
+    def test_reads_round_robin_across_replicas(self, routed_db):
+        with db_session_scope() as session:
+            assert [_source(session) for _ in range(4)] == ["replica1", "replica2", "replica1", "replica2"]
+            assert ReplicaArticleModel.query.first().title == "replica1"
+
+    def test_writes_go_to_primary_and_stick_in_transaction(self, routed_db):
+        with db_session_scope() as session:
+            session.add(ReplicaArticleModel(title="new"))
+            # autoflush 后同一事务内的读取走主库
+            assert session.scalars(TITLES).all() == ["primary", "new"]
+
+    def test_read_your_writes_window(self, routed_db):
+        routed_db.read_your_writes_seconds = 0.2
+        with db_session_scope() as session:
+            ReplicaArticleModel(title="new").save(commit=True)
+            assert session.scalars(TITLES).all() == ["primary", "new"]
+            time.sleep(0.25)
+            session.commit()
+            assert _source(session) in ("replica1", "replica2")
+
+    def test_rollback_does_not_open_window(self, routed_db):
+        with db_session_scope() as session:
+            session.add(ReplicaArticleModel(title="new"))
+            session.flush()
+            session.rollback()
+            assert _source(session) in ("replica1", "replica2")
+
+    def test_use_primary_escape_hatch(self, routed_db):
+        with db_session_scope() as session:
+            assert _source(session, use_primary=True) == "primary"
+            assert session.scalars(TITLES.execution_options(use_primary=True)).first() == "primary"
+            assert ReplicaArticleModel.query.execution_options(use_primary=True).first().title == "primary"
+            assert session.scalars(TITLES.with_for_update()).first() == "primary"
+
+    def test_explicit_transactions_use_primary(self, routed_db):
+        session = db_manager._session_maker()
+        try:
+            with session.begin():
+                assert _source(session) == "primary"
+        finally:
+            session.close()
+
+        with db_session_scope() as session:
+            with transaction_manager.transaction(session=session):
+                assert _source(session) == "primary"
+
+
+class TestReplicaRouter:
+    """ReplicaRouter 选择策略与延迟检测测试"""
+
+    @pytest.fixture
+    def engines(self, replica_urls):
+        engines = {name: create_engine(url) for name, url in replica_urls.items()}
+        yield engines
+        for engine in engines.values():
+            engine.dispose()
+
+    def test_invalid_strategy(self, engines):
+        with pytest.raises(ValueError):
+            ReplicaRouter(engines["primary"], [engines["replica1"]], strategy="random")
+
+    def test_least_connections(self, engines):
+        router = ReplicaRouter(
+            engines["primary"], [engines["replica1"], engines["replica2"]], strategy="least_connections",
+        )
+        with engines["replica1"].connect():
+            assert router.choose() is engines["replica2"]
+        with engines["replica2"].connect():
+            assert router.choose() is engines["replica1"]
+
+    def test_lagging_replica_removed(self, engines):
+        lags = {"replica1": 30.0, "replica2": 1.0}
+        calls = []
+
+        def probe(conn):
+            name = conn.scalar(TITLES)
+            calls.append(name)
+            return lags[name]
+
+        router = ReplicaRouter(
+            engines["primary"], [engines["replica1"], engines["replica2"]],
+            max_lag_seconds=5, lag_check_interval=60, lag_probe=probe,
+        )
+        assert [router.choose() for _ in range(3)] == [engines["replica2"]] * 3
+        # 检测结果在 lag_check_interval 内被缓存
+        assert sorted(calls) == ["replica1", "replica2"]
+
+        lags["replica2"] = 10.0
+        router.reset_lag_cache()
+        assert router.choose() is engines["primary"]
+
+    def test_probe_failure_removes_replica(self, engines):
+        def probe(conn):
+            if conn.scalar(TITLES) == "replica1":
+                raise RuntimeError("replication stopped")
+            return None
+
+        router = ReplicaRouter(
+            engines["primary"], [engines["replica1"], engines["replica2"]],
+            max_lag_seconds=5, lag_probe=probe,
+        )
+        assert router.healthy_replicas() == [engines["replica2"]]
+
+    def test_lag_probe_is_single_flight(self, engines):
+        """缓存过期时只有一个线程检测，已有结果的线程沿用旧值，没有结果的线程等待"""
+        calls = []
+        release = threading.Event()
+
+        def probe(conn):
+            calls.append(1)
+            release.wait(5)
+            return 1.0
+
+        router = ReplicaRouter(
+            engines["primary"], [engines["replica1"]],
+            max_lag_seconds=5, lag_check_interval=60, lag_probe=probe,
+        )
+        replica = engines["replica1"]
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(router.replica_lag(replica)))
+            for _ in range(4)
+        ]
+        for t in threads:
+            t.start()
+        deadline = time.time() + 2
+        while not calls and time.time() < deadline:
+            time.sleep(0.01)
+        release.set()
+        for t in threads:
+            t.join(timeout=5)
+        assert results == [1.0] * 4
+        assert len(calls) == 1
+
+        # 缓存过期后的刷新期间，其他线程直接返回上一次结果
+        router.lag_check_interval = 0
+        release.clear()
+        refresher = threading.Thread(target=router.replica_lag, args=(replica,))
+        refresher.start()
+        while len(calls) < 2 and time.time() < deadline + 2:
+            time.sleep(0.01)
+        assert router.replica_lag(replica) == 1.0
+        assert len(calls) == 2
+        release.set()
+        refresher.join(timeout=5)
+
+    def test_postgresql_lag_zero_when_wal_replayed(self):
+        """PostgreSQL 延迟查询在接收与回放位置一致时返回 0（主库空闲不误判为延迟）"""
+        from yweb.orm.replica import _LAG_QUERIES
+
+        query = _LAG_QUERIES["postgresql"]
+        assert "pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0" in query
+
+    def test_settings_fields(self, replica_urls):
+        settings = DatabaseSettings(
+            url=replica_urls["primary"],
+            replica_urls=[replica_urls["replica1"]],
+            replica_strategy="least_connections",
+            read_your_writes_seconds=0,
+        )
+        engine, session_scope = init_database(config=settings)
+        try:
+            router = db_manager.router
+            assert router.strategy == "least_connections"
+            assert router.read_your_writes_seconds == 0
+            with db_session_scope() as session:
+                ReplicaArticleModel(title="new").save(commit=True)
+                assert _source(session) == "replica1"
+        finally:
+            session_scope.remove()
+            db_manager.router.dispose()
+            engine.dispose()
+
+    def test_no_replicas_uses_plain_session(self, replica_urls):
+        engine, session_scope = init_database(replica_urls["primary"])
+        try:
+            assert db_manager.router is None
+            assert db_manager.replica_engines == []
+            with db_session_scope() as session:
+                assert not isinstance(session, RoutingSession)
+        finally:
+            session_scope.remove()
+            engine.dispose()
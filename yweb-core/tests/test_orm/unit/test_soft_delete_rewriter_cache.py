@@ -0,0 +1,153 @@
+"""软删除重写器缓存测试
+
+测试按表缓存的过滤判断、重复激活、重写幂等性，以及对编译缓存的影响
+"""
+
+import timeit
+
+import pytest
+from sqlalchemy import Column, ForeignKey, Integer, String, event, select, union_all
+from sqlalchemy.orm import relationship, scoped_session, selectinload, sessionmaker, subqueryload
+
+from yweb.orm import (
+    BaseModel,
+    CoreModel,
+    IgnoredTable,
+    SoftDeleteRewriter,
+    activate_soft_delete_hook,
+    deactivate_soft_delete_hook,
+)
+from yweb.orm.orm_extensions import soft_delete_hook
+
+
+class RewriteNoteModel(BaseModel):
+    """重写器缓存测试模型"""
+    __tablename__ = "test_rewrite_notes"
+    __table_args__ = {'extend_existing': True}
+
+    text = Column(String(100))
+
+
+class RewriteParentModel(BaseModel):
+    """关系加载测试父表模型"""
+    __tablename__ = "test_rewrite_parents"
+    __table_args__ = {'extend_existing': True}
+
+    kids = relationship("RewriteKidModel")
+
+
+class RewriteKidModel(BaseModel):
+    """关系加载测试子表模型"""
+    __tablename__ = "test_rewrite_kids"
+    __table_args__ = {'extend_existing': True}
+
+    parent_id = Column(Integer, ForeignKey("test_rewrite_parents.id"))
+
+
+class TestRewriterCache:
+    """SoftDeleteRewriter 缓存测试"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, memory_engine):
+        activate_soft_delete_hook()
+        BaseModel.metadata.create_all(bind=memory_engine)
+        self.session_scope = scoped_session(sessionmaker(autoflush=False, bind=memory_engine))
+        CoreModel.query = self.session_scope.query_property()
+        notes = [RewriteNoteModel(name=f"n{i}", text=f"t{i}") for i in range(3)]
+        RewriteNoteModel.add_all(notes, commit=True)
+        notes[0].delete(True)
+
+        self.statements = []
+        self.cache_hits = []
+        event.listen(memory_engine, "before_cursor_execute", self._record)
+        yield
+        event.remove(memory_engine, "before_cursor_execute", self._record)
+        self.session_scope.remove()
+        activate_soft_delete_hook()
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+        self.cache_hits.append(context.cache_hit == context.dialect.CACHE_HIT)
+
+    def _filters(self):
+        return [sql.count("deleted_at IS NULL") for sql in self.statements]
+
+    def test_table_criteria_cached(self):
+        rewriter = SoftDeleteRewriter(ignored_tables=[IgnoredTable(name="test_rewrite_notes")])
+        table = RewriteNoteModel.__table__
+        assert rewriter.table_criteria(table) is None
+
+        rewriter.ignored_tables.clear()
+        assert rewriter.table_criteria(table) is None
+        rewriter.clear_cache()
+        criteria = rewriter.table_criteria(table)
+        assert criteria is not None
+        assert rewriter.table_criteria(table) is criteria
+
+    def test_statement_decision_cached(self, monkeypatch):
+        rewriter = soft_delete_hook.global_rewriter
+        collect = rewriter._collect_criteria
+        calls = []
+        monkeypatch.setattr(rewriter, "_collect_criteria", lambda stmt: calls.append(stmt) or collect(stmt))
+
+        # 结构相同、参数不同的查询共用一次 FROM 分析
+        for text in ("t0", "t1", "t2"):
+            RewriteNoteModel.query.filter(RewriteNoteModel.text == text).all()
+        assert len(calls) == 1
+        assert self._filters() == [1, 1, 1]
+        assert [len(RewriteNoteModel.query.filter(RewriteNoteModel.text == t).all()) for t in ("t0", "t1")] == [0, 1]
+
+    def test_activate_twice_filters_once(self):
+        activate_soft_delete_hook()
+        activate_soft_delete_hook()
+        assert len(self.session_scope.execute(select(RewriteNoteModel)).all()) == 2
+        assert self._filters() == [1]
+
+    def test_reused_subquery_and_union_not_filtered_twice(self):
+        subquery = select(RewriteNoteModel.id).subquery()
+        stmt = select(subquery.c.id)
+        union = union_all(select(RewriteNoteModel.id), select(RewriteNoteModel.id))
+        for _ in range(3):
+            assert len(self.session_scope.execute(stmt).all()) == 2
+            assert len(self.session_scope.execute(union).all()) == 4
+        assert self._filters() == [1, 2] * 3
+
+    def test_repeated_queries_hit_compiled_cache(self):
+        for _ in range(3):
+            RewriteNoteModel.query.filter(RewriteNoteModel.text == "t1").all()
+        assert self.cache_hits[1:] == [True, True]
+
+    @pytest.mark.parametrize("loader", [subqueryload, selectinload])
+    def test_eager_loaders_filter_deleted_children(self, loader):
+        parent = RewriteParentModel(name="p")
+        parent.save(commit=True)
+        kids = [RewriteKidModel(name=f"k{i}", parent_id=parent.id) for i in (1, 2)]
+        RewriteKidModel.add_all(kids, commit=True)
+        kids[1].delete(True)
+        self.session_scope.remove()
+
+        # 关系加载语句继承父语句的 execution options，不能据此跳过过滤
+        stmt = select(RewriteParentModel).options(loader(RewriteParentModel.kids))
+        for _ in range(2):
+            loaded = self.session_scope.execute(stmt).scalars().one()
+            assert [kid.name for kid in loaded.kids] == ["k1"]
+            self.session_scope.remove()
+
+    def test_deactivated_hook_does_not_filter(self):
+        deactivate_soft_delete_hook()
+        assert len(self.session_scope.execute(select(RewriteNoteModel)).all()) == 3
+
+    def test_queries_per_second_benchmark(self):
+        """软删除钩子开启 / 关闭时的查询吞吐量"""
+        session = self.session_scope()
+        stmt = select(RewriteNoteModel).where(RewriteNoteModel.text == "t1")
+
+        def run():
+            session.execute(stmt).all()
+
+        rounds = 300
+        enabled = min(timeit.repeat(run, number=rounds, repeat=3))
+        deactivate_soft_delete_hook()
+        disabled = min(timeit.repeat(run, number=rounds, repeat=3))
+        print(f"\n软删除钩子开启 {rounds / enabled:.0f} qps，关闭 {rounds / disabled:.0f} qps")
+        assert enabled < disabled * 3
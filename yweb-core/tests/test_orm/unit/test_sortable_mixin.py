@@ -206,6 +206,26 @@ class TestGroupedSorting:
         
         assert SortProduct.get_max_sort_order({"category_id": 1}) == 3
         assert SortProduct.get_max_sort_order({"category_id": 2}) == 20
+    
+    def test_normalize_sort_order(self):
+        """测试规范化排序号（分批读取和写回）"""
+        for sort_order, name in [(10, "C"), (3, "A"), (7, "B"), (12, "D")]:
+            SortProduct(category_id=1, name=name, sort_order=sort_order).save(commit=True)
+        SortProduct(category_id=2, name="Q", sort_order=5).save(commit=True)
+        self.session_scope.remove()
+        
+        loaded = SortProduct.query.filter_by(name="B").first()
+        assert SortProduct.normalize_sort_order({"category_id": 1}, batch_size=2) == 4
+        self.session_scope().commit()
+        
+        assert [(p.name, p.sort_order) for p in SortProduct.get_sorted({"category_id": 1})] == [
+            ("A", 1), ("B", 2), ("C", 3), ("D", 4)
+        ]
+        # 调用前已加载的对象同步更新，且仍在 session 中
+        assert loaded.sort_order == 2
+        assert loaded in self.session_scope()
+        assert SortProduct.query.filter_by(name="Q").first().sort_order == 5
+        assert SortProduct.normalize_sort_order({"category_id": 1}) == 0
 
 
 class TestTreeWithSorting:
@@ -0,0 +1,93 @@
+"""CoreModel.iter_batches / stream_rows 测试"""
+
+import pytest
+from sqlalchemy import Column, Integer, String, select
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from yweb.orm import BaseModel, CoreModel, activate_soft_delete_hook
+
+
+class StreamOrderModel(BaseModel):
+    """流式迭代测试订单模型"""
+    __tablename__ = "test_stream_orders"
+    __table_args__ = {'extend_existing': True}
+
+    amount = Column(Integer)
+    status = Column(String(20))
+
+
+class TestIterBatches:
+    """分批流式迭代测试"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, memory_engine):
+        activate_soft_delete_hook()
+        BaseModel.metadata.create_all(bind=memory_engine)
+        self.session_scope = scoped_session(sessionmaker(autoflush=False, bind=memory_engine))
+        CoreModel.query = self.session_scope.query_property()
+
+        orders = [StreamOrderModel(name=f"o{i}", amount=i, status="new") for i in range(7)]
+        StreamOrderModel.add_all(orders, commit=True)
+        self.ids = [o.id for o in orders]
+        self.session_scope.remove()
+        yield
+        self.session_scope.remove()
+
+    def test_batches_and_expunge(self):
+        session = self.session_scope()
+        sizes = []
+        for batch in StreamOrderModel.iter_batches(select(StreamOrderModel).order_by(StreamOrderModel.id), batch_size=3):
+            sizes.append(len(batch))
+            # 当前批次之外不保留其他已读取的对象
+            assert len(session.identity_map) == len(batch)
+        assert sizes == [3, 3, 1]
+        assert len(session.identity_map) == 0
+
+    def test_keep_objects_without_expunge(self):
+        rows = list(StreamOrderModel.stream_rows(batch_size=2, expunge=False))
+        assert len(rows) == 7
+        assert len(self.session_scope().identity_map) == 7
+
+    def test_query_and_column_rows(self):
+        query = StreamOrderModel.query.filter(StreamOrderModel.amount >= 4).order_by(StreamOrderModel.id)
+        assert [o.amount for o in StreamOrderModel.stream_rows(query, batch_size=2)] == [4, 5, 6]
+
+        stmt = select(StreamOrderModel.id, StreamOrderModel.amount).order_by(StreamOrderModel.id)
+        rows = list(StreamOrderModel.stream_rows(stmt, batch_size=4))
+        assert rows[0] == {"id": self.ids[0], "amount": 0}
+
+        amounts = select(StreamOrderModel.amount).order_by(StreamOrderModel.amount)
+        assert list(StreamOrderModel.stream_rows(amounts)) == list(range(7))
+
+    def test_preloaded_objects_stay_in_session(self):
+        session = self.session_scope()
+        first = StreamOrderModel.get(self.ids[0])
+        assert len(list(StreamOrderModel.stream_rows(batch_size=2))) == 7
+        assert first in session
+        assert len(session.identity_map) == 1
+
+    def test_modified_batch_is_flushed_before_expunge(self):
+        for order in StreamOrderModel.stream_rows(batch_size=3):
+            order.status = "done"
+        self.session_scope().commit()
+
+        orders = StreamOrderModel.query.all()
+        assert {o.status for o in orders} == {"done"}
+        assert {o.ver for o in orders} == {2}
+
+    def test_respects_soft_delete(self):
+        StreamOrderModel.get(self.ids[0]).delete(True)
+        assert len(list(StreamOrderModel.stream_rows())) == 6
+
+    def test_early_stop_closes_result(self):
+        rows = StreamOrderModel.stream_rows(batch_size=2)
+        assert next(rows).amount is not None
+        rows.close()
+        # 游标已释放，session 可以继续正常使用
+        assert StreamOrderModel.query.count() == 7
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            next(StreamOrderModel.iter_batches(batch_size=0))
+        with pytest.raises(TypeError):
+            next(StreamOrderModel.iter_batches("select 1"))
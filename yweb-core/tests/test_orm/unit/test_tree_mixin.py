@@ -286,6 +286,34 @@ class TestTreeClassMethods:
         assert len(tree) >= 1
         # 树形结构应该有 children 字段
         assert "children" in tree[0]
+    
+    def test_rebuild_all_paths(self):
+        """测试重建路径（层级数据错乱时也能按父子关系修复）"""
+        root = TreeMenu(title="Root", sort_order=1)
+        root.save(commit=True)
+        child = TreeMenu(title="Child", parent_id=root.id, sort_order=1)
+        child.save(commit=True)
+        grandchild = TreeMenu(title="Grandchild", parent_id=child.id, sort_order=1)
+        grandchild.save(commit=True)
+        other = TreeMenu(title="Other", sort_order=2)
+        other.save(commit=True)
+        other.update_path_and_level()
+        # 孙节点的 level 比父节点小，按 level 顺序处理会读到父节点的旧路径
+        child.level, grandchild.level = 5, 2
+        self.session_scope().commit()
+        root_id, child_id, grandchild_id = root.id, child.id, grandchild.id
+        self.session_scope.remove()
+        
+        assert TreeMenu.rebuild_all_paths(batch_size=2) == 3
+        self.session_scope().commit()
+        
+        nodes = {n.title: n for n in TreeMenu.query.all()}
+        assert (nodes["Root"].path, nodes["Root"].level) == (f"/{root_id}/", 1)
+        assert (nodes["Child"].path, nodes["Child"].level) == (f"/{root_id}/{child_id}/", 2)
+        assert (nodes["Grandchild"].path, nodes["Grandchild"].level) == (
+            f"/{root_id}/{child_id}/{grandchild_id}/", 3
+        )
+        assert TreeMenu.rebuild_all_paths() == 0
 
 
 class TestTreeUtilityFunctions:
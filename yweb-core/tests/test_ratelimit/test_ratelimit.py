@@ -196,6 +196,19 @@ class TestKeyFuncs:
         result = get_user_or_ip(request)
         assert result == "user:admin"
 
+    def test_get_user_or_ip_prefers_verified_token_data(self):
+        """测试认证依赖已验证的 token_data 优先于重新解码"""
+        from types import SimpleNamespace
+
+        request = _make_mock_request(
+            headers={"authorization": "Bearer not-a-valid-jwt"},
+        )
+        request.state = SimpleNamespace(
+            token_data=SimpleNamespace(sub="alice", user_id=7)
+        )
+        result = get_user_or_ip(request)
+        assert result == "user:alice"
+
     def test_get_user_or_ip_with_invalid_token_falls_back_to_ip(self):
         """测试无效 token 时 fallback 到 IP"""
         request = _make_mock_request(
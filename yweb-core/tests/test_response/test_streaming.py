@@ -0,0 +1,138 @@
+"""流式导出响应测试
+
+测试 stream_json / stream_csv 的输出格式和数据源关闭
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel as PydanticModel
+from sqlalchemy import Column, Integer
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from yweb.orm import DTO, BaseModel, CoreModel
+from yweb.response import stream_csv, stream_json
+
+
+class StreamExportModel(BaseModel):
+    """流式导出测试模型"""
+    __tablename__ = "test_stream_export"
+    __table_args__ = {'extend_existing': True}
+
+    score = Column(Integer)
+
+
+class ScoreSchema(PydanticModel):
+    name: str
+    score: int
+
+
+class ScoreDTO(DTO):
+    name: str
+    score: int
+
+
+def _client(endpoint):
+    app = FastAPI()
+    app.get("/export")(endpoint)
+    return TestClient(app)
+
+
+class TestStreamJson:
+    """stream_json 测试"""
+
+    def test_json_array(self):
+        rows = [{"id": 1, "name": "张三", "at": datetime(2024, 1, 2, 3, 4, 5)}, {"id": 2, "name": "b", "at": None}]
+        response = _client(lambda: stream_json(iter(rows))).get("/export")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == [
+            {"id": 1, "name": "张三", "at": "2024-01-02T03:04:05"},
+            {"id": 2, "name": "b", "at": None},
+        ]
+
+    def test_empty_array(self):
+        assert _client(lambda: stream_json([])).get("/export").json() == []
+
+    def test_ndjson_with_schema(self):
+        rows = [{"name": "a", "score": 1, "extra": "x"}, {"name": "b", "score": 2}]
+        response = _client(lambda: stream_json(rows, schema=ScoreSchema, ndjson=True)).get("/export")
+
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = response.text.splitlines()
+        assert [json.loads(line) for line in lines] == [{"name": "a", "score": 1}, {"name": "b", "score": 2}]
+
+    def test_closes_source(self):
+        closed = []
+
+        def rows():
+            try:
+                yield {"id": 1}
+            finally:
+                closed.append(True)
+
+        source = rows()
+        response = _client(lambda: stream_json(source, transform=lambda row: {"key": row["id"]})).get("/export")
+        assert response.json() == [{"key": 1}]
+        assert closed == [True]
+
+
+class TestStreamCsv:
+    """stream_csv 测试"""
+
+    def test_csv_with_titles_and_filename(self):
+        rows = [{"id": 1, "name": "张三", "note": None}, {"id": 2, "name": "a,b", "note": "x"}]
+        response = _client(
+            lambda: stream_csv(rows, fields=["id", "name", "note"], titles=["编号", "姓名", "备注"], filename="用户.csv")
+        ).get("/export")
+
+        assert response.headers["content-type"] == "text/csv; charset=utf-8"
+        assert response.headers["content-disposition"] == "attachment; filename*=UTF-8''%E7%94%A8%E6%88%B7.csv"
+        text = response.content.decode("utf-8")
+        assert text.startswith("\ufeff")
+        assert list(csv.reader(io.StringIO(text[1:]))) == [
+            ["编号", "姓名", "备注"],
+            ["1", "张三", ""],
+            ["2", "a,b", "x"],
+        ]
+
+    def test_ascii_filename_without_bom(self):
+        response = _client(lambda: stream_csv([], fields=["id"], filename="users.csv", bom=False)).get("/export")
+        assert response.headers["content-disposition"] == 'attachment; filename="users.csv"'
+        assert response.text.splitlines() == ["id"]
+
+    def test_titles_length_mismatch(self):
+        with pytest.raises(ValueError):
+            stream_csv([], fields=["id", "name"], titles=["编号"])
+
+
+class TestStreamModelRows:
+    """与 CoreModel.stream_rows 配合使用"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, memory_engine):
+        BaseModel.metadata.create_all(bind=memory_engine)
+        self.session_scope = scoped_session(sessionmaker(autoflush=False, bind=memory_engine))
+        CoreModel.query = self.session_scope.query_property()
+        StreamExportModel.add_all([StreamExportModel(name=f"n{i}", score=i) for i in range(5)], commit=True)
+        yield
+        self.session_scope.remove()
+
+    def test_export_model_rows(self):
+        def export():
+            query = StreamExportModel.query.order_by(StreamExportModel.id)
+            return stream_csv(StreamExportModel.stream_rows(query, batch_size=2), fields=["name", "score"], bom=False)
+
+        lines = _client(export).get("/export").text.splitlines()
+        assert lines == ["name,score"] + [f"n{i},{i}" for i in range(5)]
+
+        def dump():
+            return stream_json(StreamExportModel.stream_rows(batch_size=2), schema=ScoreDTO)
+
+        assert [row["score"] for row in _client(dump).get("/export").json()] == list(range(5))
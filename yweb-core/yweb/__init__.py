@@ -2,252 +2,370 @@
 YWeb - FastAPI基础类库
 
 提供响应封装、中间件、ORM、认证、日志等基础功能
+
+顶层名称按需导入（PEP 562）：``import yweb`` 只加载版本信息，
+首次访问 ``yweb.Resp``、``from yweb import BaseModel`` 等名称时才导入对应子模块，
+只用 ``yweb.log`` 的脚本不会加载 SQLAlchemy、FastAPI、passlib、jose 和调度器。
 """
 
+import importlib
+from typing import TYPE_CHECKING
+
 from .version import __version__, __author__, __description__
 
-# 导出响应模块
-from .response import (
-    # 响应快捷类（推荐）
-    Resp,
-    # 响应函数（高级用法）
-    OK,
-    BadRequest,
-    Unauthorized,
-    Forbidden,
-    NotFound,
-    InternalServerError,
-    Conflict,
-    TooManyRequests,
-    Warning,
-    Info,
-    # 泛型响应模型
-    PageData,
-    PageResponse,
-    ItemResponse,
-    OkResponse,
-    # 动态模型生成工具
-    create_response_model,
-    create_item_model,
-    create_page_model,
-)
+# 子模块 -> 从该子模块导出的顶层名称
+_LAZY_MODULES = {
+    ".response": (
+        "Resp", "OK", "BadRequest", "Unauthorized", "Forbidden", "NotFound",
+        "InternalServerError", "Conflict", "TooManyRequests", "Warning", "Info", "PageData",
+        "PageResponse", "CursorPageData", "CursorPageResponse", "ItemResponse", "OkResponse", "create_response_model",
+        "create_item_model", "create_page_model", "stream_json", "stream_csv",
+    ),
+    ".middleware": (
+        "RequestLoggingMiddleware", "RequestIDMiddleware", "PerformanceMonitoringMiddleware",
+        "get_request_id",
+    ),
+    ".orm": (
+        "DTO", "BaseSchemas", "PaginationField", "PaginationTmpField", "Page", "CursorPage", "DateTimeStr",
+        "BaseModel", "init_database", "get_engine", "get_db", "IgnoredTable",
+        "SoftDeleteRewriter", "activate_soft_delete_hook", "deactivate_soft_delete_hook",
+        "is_soft_delete_active", "generate_soft_delete_mixin_class", "SimpleSoftDeleteMixin",
+    ),
+    ".auth": (
+        "JWTManager", "create_jwt_token", "verify_jwt_token", "TokenPayload", "TokenResponse",
+        "TokenData", "oauth2_scheme", "AuthDependency", "create_auth_dependency", "RoleChecker",
+        "get_token_from_header", "AuthProvider", "AuthManager", "AuthType", "UserIdentity",
+        "AuthResult", "APIKeyManager", "APIKeyData", "APIKeyAuthProvider", "Session",
+        "SessionManager", "SessionAuthProvider", "set_session_cookie", "clear_session_cookie",
+        "LDAPManager", "LDAPAuthProvider", "LDAPConfig", "LDAPType", "OIDCManager",
+        "OIDCAuthProvider",
+    ),
+    ".log": (
+        "setup_logger", "api_logger", "auth_logger", "sql_logger", "logger", "get_logger",
+        "LogFilterHook", "SensitiveDataFilterHook", "LogFilterHookManager",
+        "log_filter_hook_manager", "TimeAndSizeRotatingFileHandler", "DailyRotatingFileHandler",
+    ),
+    ".utils": (
+        "hash_password", "verify_password", "EncryptionUtil", "parse_file_size",
+        "format_file_size",
+    ),
+    ".config": (
+        "AppSettings", "JWTSettings", "DatabaseSettings", "LoggingSettings",
+        "PaginationSettings", "ConfigLoader", "ConfigManager", "load_yaml_config",
+    ),
+    ".organization": (
+        "ExternalSource", "EmployeeStatus", "Gender", "SyncStatus", "TreeMixin",
+        "AbstractOrganization", "AbstractDepartment", "AbstractEmployee",
+        "AbstractEmployeeOrgRel", "AbstractEmployeeDeptRel", "AbstractDepartmentLeader",
+        "BaseOrganizationService", "BaseSyncService", "SyncResult",
+    ),
+    ".exceptions": (
+        "Err", "ErrorCode", "ErrorCodeType", "BusinessException", "AuthenticationException",
+        "AuthorizationException", "ResourceNotFoundException", "ResourceConflictException",
+        "ValidationException", "ServiceUnavailableException", "register_exception_handlers",
+        "ValidationErrorTranslator",
+    ),
+    ".validators": (
+        "Typed", "StringLength", "RegularExpression", "Range", "Phone", "Email", "Url",
+        "IdCard", "CreditCard", "OptionalPhone", "OptionalEmail", "OptionalUrl",
+        "OptionalIdCard",
+    ),
+    ".scheduler": (
+        "Scheduler", "JobBuilder", "create_scheduler_models", "setup_scheduler",
+        "SchedulerModels", "cron", "interval", "once", "Job", "HttpJob", "RetryStrategy",
+        "JobContext", "AbstractSchedulerJob", "AbstractSchedulerJobHistory",
+        "AbstractSchedulerJobStats",
+    ),
+    ".cache": (
+        "cached", "memory_cache", "redis_cache", "cache_invalidator", "no_auto_invalidation",
+        "CachedFunction", "CacheInvalidator", "CacheBackend", "MemoryBackend", "RedisBackend",
+        "CacheStats",
+    ),
+}
+
+# 名称 -> 子模块
+_LAZY_IMPORTS = {
+    name: module
+    for module, names in _LAZY_MODULES.items()
+    for name in names
+}
+
+# 可以通过 ``yweb.<子包>`` 直接访问的子包
+_SUBMODULES = frozenset({
+    "auth", "cache", "config", "exceptions", "log", "middleware", "organization",
+    "orm", "permission", "ratelimit", "response", "scheduler", "storage", "utils",
+    "validators",
+})
+
+
+def __getattr__(name: str):
+    """延迟导入"""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is not None:
+        value = getattr(importlib.import_module(module_name, __name__), name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # 写回模块字典，之后的访问不再经过 __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    # 导出响应模块
+    from .response import (
+        # 响应快捷类（推荐）
+        Resp,
+        # 响应函数（高级用法）
+        OK,
+        BadRequest,
+        Unauthorized,
+        Forbidden,
+        NotFound,
+        InternalServerError,
+        Conflict,
+        TooManyRequests,
+        Warning,
+        Info,
+        # 泛型响应模型
+        PageData,
+        PageResponse,
+        CursorPageData,
+        CursorPageResponse,
+        ItemResponse,
+        OkResponse,
+        # 动态模型生成工具
+        create_response_model,
+        create_item_model,
+        create_page_model,
+        # 流式导出响应
+        stream_json,
+        stream_csv,
+    )
 
-# 导出中间件
-from .middleware import (
-    RequestLoggingMiddleware,
-    RequestIDMiddleware,
-    PerformanceMonitoringMiddleware,
-    get_request_id,
-)
+    # 导出中间件
+    from .middleware import (
+        RequestLoggingMiddleware,
+        RequestIDMiddleware,
+        PerformanceMonitoringMiddleware,
+        get_request_id,
+    )
 
-# 导出ORM基类
-from .orm import (
-    DTO,
-    BaseSchemas,
-    PaginationField,
-    PaginationTmpField,
-    Page,
-    DateTimeStr,
-    BaseModel,
-    init_database,
-    get_engine,
-    get_db,
-    # 软删除扩展
-    IgnoredTable,
-    SoftDeleteRewriter,
-    activate_soft_delete_hook,
-    is_soft_delete_active,
-    generate_soft_delete_mixin_class,
-    SimpleSoftDeleteMixin,
-)
+    # 导出ORM基类
+    from .orm import (
+        DTO,
+        BaseSchemas,
+        PaginationField,
+        PaginationTmpField,
+        Page,
+        CursorPage,
+        DateTimeStr,
+        BaseModel,
+        init_database,
+        get_engine,
+        get_db,
+        # 软删除扩展
+        IgnoredTable,
+        SoftDeleteRewriter,
+        activate_soft_delete_hook,
+        deactivate_soft_delete_hook,
+        is_soft_delete_active,
+        generate_soft_delete_mixin_class,
+        SimpleSoftDeleteMixin,
+    )
 
-# 导出认证模块
-from .auth import (
-    # JWT (原有)
-    JWTManager,
-    create_jwt_token,
-    verify_jwt_token,
-    TokenPayload,
-    TokenResponse,
-    TokenData,
-    oauth2_scheme,
-    AuthDependency,
-    create_auth_dependency,
-    RoleChecker,
-    get_token_from_header,
-    # 统一认证接口 (新增)
-    AuthProvider,
-    AuthManager,
-    AuthType,
-    UserIdentity,
-    AuthResult,
-    # API Key (新增)
-    APIKeyManager,
-    APIKeyData,
-    APIKeyAuthProvider,
-    # Session (新增)
-    Session,
-    SessionManager,
-    SessionAuthProvider,
-    set_session_cookie,
-    clear_session_cookie,
-    # LDAP (新增)
-    LDAPManager,
-    LDAPAuthProvider,
-    LDAPConfig,
-    LDAPType,
-    # OIDC (新增)
-    OIDCManager,
-    OIDCAuthProvider,
-)
+    # 导出认证模块
+    from .auth import (
+        # JWT (原有)
+        JWTManager,
+        create_jwt_token,
+        verify_jwt_token,
+        TokenPayload,
+        TokenResponse,
+        TokenData,
+        oauth2_scheme,
+        AuthDependency,
+        create_auth_dependency,
+        RoleChecker,
+        get_token_from_header,
+        # 统一认证接口 (新增)
+        AuthProvider,
+        AuthManager,
+        AuthType,
+        UserIdentity,
+        AuthResult,
+        # API Key (新增)
+        APIKeyManager,
+        APIKeyData,
+        APIKeyAuthProvider,
+        # Session (新增)
+        Session,
+        SessionManager,
+        SessionAuthProvider,
+        set_session_cookie,
+        clear_session_cookie,
+        # LDAP (新增)
+        LDAPManager,
+        LDAPAuthProvider,
+        LDAPConfig,
+        LDAPType,
+        # OIDC (新增)
+        OIDCManager,
+        OIDCAuthProvider,
+    )
 
-# 导出日志模块
-from .log import (
-    setup_logger,
-    api_logger,
-    auth_logger,
-    sql_logger,
-    logger,
-    get_logger,
-    # 日志过滤钩子
-    LogFilterHook,
-    SensitiveDataFilterHook,
-    LogFilterHookManager,
-    log_filter_hook_manager,
-    # 自定义日志处理器
-    TimeAndSizeRotatingFileHandler,
-    DailyRotatingFileHandler,
-)
+    # 导出日志模块
+    from .log import (
+        setup_logger,
+        api_logger,
+        auth_logger,
+        sql_logger,
+        logger,
+        get_logger,
+        # 日志过滤钩子
+        LogFilterHook,
+        SensitiveDataFilterHook,
+        LogFilterHookManager,
+        log_filter_hook_manager,
+        # 自定义日志处理器
+        TimeAndSizeRotatingFileHandler,
+        DailyRotatingFileHandler,
+    )
 
-# 导出工具函数
-from .utils import (
-    hash_password,
-    verify_password,
-    EncryptionUtil,
-    parse_file_size,
-    format_file_size,
-)
+    # 导出工具函数
+    from .utils import (
+        hash_password,
+        verify_password,
+        EncryptionUtil,
+        parse_file_size,
+        format_file_size,
+    )
 
-# 导出配置
-from .config import (
-    AppSettings,
-    JWTSettings,
-    DatabaseSettings,
-    LoggingSettings,
-    PaginationSettings,
-    ConfigLoader,
-    ConfigManager,
-    load_yaml_config,
-)
+    # 导出配置
+    from .config import (
+        AppSettings,
+        JWTSettings,
+        DatabaseSettings,
+        LoggingSettings,
+        PaginationSettings,
+        ConfigLoader,
+        ConfigManager,
+        load_yaml_config,
+    )
 
-# 导出组织管理模块
-from .organization import (
-    # 枚举
-    ExternalSource,
-    EmployeeStatus,
-    Gender,
-    SyncStatus,
-    # Mixin
-    TreeMixin,
-    # 抽象模型
-    AbstractOrganization,
-    AbstractDepartment,
-    AbstractEmployee,
-    AbstractEmployeeOrgRel,
-    AbstractEmployeeDeptRel,
-    AbstractDepartmentLeader,
-    # 服务
-    BaseOrganizationService,
-    BaseSyncService,
-    SyncResult,
-)
+    # 导出组织管理模块
+    from .organization import (
+        # 枚举
+        ExternalSource,
+        EmployeeStatus,
+        Gender,
+        SyncStatus,
+        # Mixin
+        TreeMixin,
+        # 抽象模型
+        AbstractOrganization,
+        AbstractDepartment,
+        AbstractEmployee,
+        AbstractEmployeeOrgRel,
+        AbstractEmployeeDeptRel,
+        AbstractDepartmentLeader,
+        # 服务
+        BaseOrganizationService,
+        BaseSyncService,
+        SyncResult,
+    )
 
-# 导出异常处理模块
-from .exceptions import (
-    # 异常快捷创建类（推荐）
-    Err,
-    # 错误代码枚举
-    ErrorCode,
-    ErrorCodeType,
-    # 业务异常
-    BusinessException,
-    AuthenticationException,
-    AuthorizationException,
-    ResourceNotFoundException,
-    ResourceConflictException,
-    ValidationException,
-    ServiceUnavailableException,
-    # 异常处理器
-    register_exception_handlers,
-    # 验证错误翻译器
-    ValidationErrorTranslator,
-)
+    # 导出异常处理模块
+    from .exceptions import (
+        # 异常快捷创建类（推荐）
+        Err,
+        # 错误代码枚举
+        ErrorCode,
+        ErrorCodeType,
+        # 业务异常
+        BusinessException,
+        AuthenticationException,
+        AuthorizationException,
+        ResourceNotFoundException,
+        ResourceConflictException,
+        ValidationException,
+        ServiceUnavailableException,
+        # 异常处理器
+        register_exception_handlers,
+        # 验证错误翻译器
+        ValidationErrorTranslator,
+    )
 
-# 导出验证约束模块（类似 .NET MVC 特性）
-from .validators import (
-    # 验证类型快捷类（推荐）
-    Typed,
-    # 约束函数
-    StringLength,
-    RegularExpression,
-    Range,
-    # 验证类型（高级用法）
-    Phone,
-    Email,
-    Url,
-    IdCard,
-    CreditCard,
-    # 可选验证类型
-    OptionalPhone,
-    OptionalEmail,
-    OptionalUrl,
-    OptionalIdCard,
-)
+    # 导出验证约束模块（类似 .NET MVC 特性）
+    from .validators import (
+        # 验证类型快捷类（推荐）
+        Typed,
+        # 约束函数
+        StringLength,
+        RegularExpression,
+        Range,
+        # 验证类型（高级用法）
+        Phone,
+        Email,
+        Url,
+        IdCard,
+        CreditCard,
+        # 可选验证类型
+        OptionalPhone,
+        OptionalEmail,
+        OptionalUrl,
+        OptionalIdCard,
+    )
 
-# 导出定时任务模块
-from .scheduler import (
-    # 核心类（推荐）
-    Scheduler,
-    JobBuilder,
-    # 工厂函数（推荐）
-    create_scheduler_models,
-    setup_scheduler,
-    SchedulerModels,
-    # 触发器
-    cron,
-    interval,
-    once,
-    # 任务基类
-    Job,
-    HttpJob,
-    # 重试策略
-    RetryStrategy,
-    # 执行上下文
-    JobContext,
-    # 抽象模型（高级用法）
-    AbstractSchedulerJob,
-    AbstractSchedulerJobHistory,
-    AbstractSchedulerJobStats,
-)
+    # 导出定时任务模块
+    from .scheduler import (
+        # 核心类（推荐）
+        Scheduler,
+        JobBuilder,
+        # 工厂函数（推荐）
+        create_scheduler_models,
+        setup_scheduler,
+        SchedulerModels,
+        # 触发器
+        cron,
+        interval,
+        once,
+        # 任务基类
+        Job,
+        HttpJob,
+        # 重试策略
+        RetryStrategy,
+        # 执行上下文
+        JobContext,
+        # 抽象模型（高级用法）
+        AbstractSchedulerJob,
+        AbstractSchedulerJobHistory,
+        AbstractSchedulerJobStats,
+    )
 
-# 导出缓存模块
-from .cache import (
-    # 装饰器（推荐）
-    cached,
-    memory_cache,
-    redis_cache,
-    # 自动失效（推荐）
-    cache_invalidator,
-    no_auto_invalidation,
-    # 类型
-    CachedFunction,
-    CacheInvalidator,
-    # 后端（高级用法）
-    CacheBackend,
-    MemoryBackend,
-    RedisBackend,
-    CacheStats,
-)
+    # 导出缓存模块
+    from .cache import (
+        # 装饰器（推荐）
+        cached,
+        memory_cache,
+        redis_cache,
+        # 自动失效（推荐）
+        cache_invalidator,
+        no_auto_invalidation,
+        # 类型
+        CachedFunction,
+        CacheInvalidator,
+        # 后端（高级用法）
+        CacheBackend,
+        MemoryBackend,
+        RedisBackend,
+        CacheStats,
+    )
 
 __all__ = [
     # 版本信息
@@ -271,12 +389,17 @@ __all__ = [
     # 泛型响应模型
     "PageData",
     "PageResponse",
+    "CursorPageData",
+    "CursorPageResponse",
     "ItemResponse",
-    "OperationResponse",
+    "OkResponse",
     # 动态模型生成工具
     "create_response_model",
     "create_item_model",
     "create_page_model",
+    # 流式导出响应
+    "stream_json",
+    "stream_csv",
     
     # Middleware
     "RequestLoggingMiddleware",
@@ -290,6 +413,7 @@ __all__ = [
     "PaginationField",
     "PaginationTmpField",
     "Page",
+    "CursorPage",
     "DateTimeStr",
     "BaseModel",
     "init_database",
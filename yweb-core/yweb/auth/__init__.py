@@ -96,6 +96,12 @@ from .jwt import (
     JOSE_AVAILABLE,
 )
 
+from .keys import (
+    KeySet,
+    TokenSigner,
+    load_key,
+)
+
 from .schemas import (
     TokenPayload,
     TokenResponse,
@@ -136,6 +142,8 @@ from .api_key import (
 from .session import (
     Session,
     SessionManager,
+    SessionStore,
+    RedisSessionStore,
     SessionAuthProvider,
     set_session_cookie,
     clear_session_cookie,
@@ -148,6 +156,7 @@ from .ldap import (
     LDAPUser,
     LDAPType,
     LDAPAuthProvider,
+    AsyncLDAPAuthProvider,
     create_openldap_config,
     create_active_directory_config,
     LDAP3_AVAILABLE,
@@ -167,6 +176,7 @@ from .token_store import (
     TokenStore,
     InMemoryTokenStore,
     RedisTokenStore,
+    BloomFilterTokenStore,
     TokenBlacklist,
     RevokedTokenInfo,
     get_token_blacklist,
@@ -176,6 +186,7 @@ from .token_store import (
 # 登录审计
 from .audit import (
     LoginAuditService,
+    LoginAuditBuffer,
     LoginStatus,
     LoginFailureReason,
     LoginAttempt,
@@ -197,6 +208,8 @@ from .password import (
     needs_rehash,
     PasswordTooShortError,
     PasswordTooLongError,
+    PasswordHashPool,
+    PasswordHashPoolBusyError,
 )
 
 # 抽象模型 + 角色 Mixin
@@ -204,6 +217,7 @@ from .models import (
     AbstractUser,
     AbstractSimpleRole,
     AbstractLoginRecord,
+    AbstractLoginRollup,
     RoleMixin,
 )
 
@@ -226,10 +240,12 @@ from .setup import (
     setup_auth,
     AuthSetup,
 )
+from .projection import UserProjection
 
 # IP 频率限制
 from .rate_limiter import (
     LoginRateLimiter,
+    RedisLoginRateLimiter,
 )
 
 # 预置路由工厂（已迁移至 auth/api/ 子目录）
@@ -246,6 +262,11 @@ __all__ = [
     "verify_jwt_token",
     "JOSE_AVAILABLE",
     
+    # 签名密钥
+    "KeySet",
+    "TokenSigner",
+    "load_key",
+    
     # Schemas (原有)
     "TokenPayload",
     "TokenResponse",
@@ -279,6 +300,8 @@ __all__ = [
     # Session (新增)
     "Session",
     "SessionManager",
+    "SessionStore",
+    "RedisSessionStore",
     "SessionAuthProvider",
     "set_session_cookie",
     "clear_session_cookie",
@@ -289,6 +312,7 @@ __all__ = [
     "LDAPUser",
     "LDAPType",
     "LDAPAuthProvider",
+    "AsyncLDAPAuthProvider",
     "create_openldap_config",
     "create_active_directory_config",
     "LDAP3_AVAILABLE",
@@ -304,6 +328,7 @@ __all__ = [
     "TokenStore",
     "InMemoryTokenStore",
     "RedisTokenStore",
+    "BloomFilterTokenStore",
     "TokenBlacklist",
     "RevokedTokenInfo",
     "get_token_blacklist",
@@ -311,12 +336,14 @@ __all__ = [
     
     # 登录审计
     "LoginAuditService",
+    "LoginAuditBuffer",
     "LoginStatus",
     "LoginFailureReason",
     "LoginAttempt",
     
     # IP 频率限制
     "LoginRateLimiter",
+    "RedisLoginRateLimiter",
     
     # 用户安全 Mixins
     "LockableMixin",
@@ -331,11 +358,14 @@ __all__ = [
     "needs_rehash",
     "PasswordTooShortError",
     "PasswordTooLongError",
+    "PasswordHashPool",
+    "PasswordHashPoolBusyError",
     
     # 抽象模型 + 角色 Mixin
     "AbstractUser",
     "AbstractSimpleRole",
     "AbstractLoginRecord",
+    "AbstractLoginRollup",
     "RoleMixin",
     
     # 认证服务 (新增)
@@ -351,6 +381,7 @@ __all__ = [
     # 一站式设置 (新增)
     "setup_auth",
     "AuthSetup",
+    "UserProjection",
     
     # 预置路由工厂 (新增)
     "create_user_router",
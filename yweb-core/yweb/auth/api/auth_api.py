@@ -28,6 +28,8 @@ from yweb.orm import DTO
 from yweb.log import get_logger
 from yweb.exceptions import AuthenticationException
 
+from ..password import PasswordHashPoolBusyError
+
 if TYPE_CHECKING:
     from ..service import BaseAuthService
     from ..jwt import JWTManager
@@ -135,6 +137,9 @@ def create_auth_router(
         # 1. 认证（捕获系统异常，确保失败记录被正确创建）
         try:
             user = auth_service.authenticate(username, password)
+        except PasswordHashPoolBusyError:
+            # 服务端过载（哈希线程池已满），不计入登录失败
+            raise
         except Exception as e:
             # 系统异常（数据库错误等），记录后重新抛出
             _logger.error(f"认证过程发生系统异常: {e}", exc_info=True)
@@ -34,19 +34,27 @@
         return {"user": user.username}
 """
 
+import atexit
 import secrets
 import hashlib
 import hmac
+import threading
+import weakref
 from datetime import datetime, timezone, timedelta
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from typing import Optional, List, Dict, Any, Callable
 from functools import wraps
 
 from fastapi import Depends, HTTPException, status, Request, Security
 from fastapi.security import APIKeyHeader, APIKeyQuery, APIKeyCookie
 
+from cachetools import TTLCache
+
+from yweb.log import get_logger
 from .base import AuthProvider, AuthType, UserIdentity, AuthResult
 
+logger = get_logger("yweb.auth.api_key")
+
 
 @dataclass
 class APIKeyData:
@@ -108,6 +116,44 @@ class APIKeyData:
         }
 
 
+# 开启批量刷新的管理器注册表，用于在程序退出时写入剩余的 last_used_at
+_api_key_managers: List[weakref.ref] = []
+_managers_lock = threading.Lock()
+
+
+def _flush_all_api_key_managers():
+    """程序退出时刷新所有 APIKeyManager 的 last_used_at"""
+    with _managers_lock:
+        refs = list(_api_key_managers)
+    for ref in refs:
+        manager = ref()
+        if manager is not None:
+            try:
+                manager.flush_last_used()
+            except Exception:
+                pass
+
+
+atexit.register(_flush_all_api_key_managers)
+
+
+def _flush_worker(
+    manager_ref: "weakref.ref[APIKeyManager]",
+    stop_event: threading.Event,
+    interval: float,
+) -> None:
+    """后台刷新工作线程
+
+    只持有管理器的弱引用，管理器被回收后线程随之退出。
+    """
+    while not stop_event.wait(timeout=interval):
+        manager = manager_ref()
+        if manager is None:
+            return
+        manager.flush_last_used()
+        del manager
+
+
 class APIKeyManager:
     """API Key 管理器
     
@@ -118,6 +164,10 @@ class APIKeyManager:
         prefix: API Key 前缀（如 "yweb"）
         key_length: 随机部分的字节长度
         hash_algorithm: 哈希算法
+        cache_ttl: 已验证 Key 的本地缓存时间（秒），0 表示不缓存（默认）
+        cache_maxsize: 本地缓存最大条目数
+        last_used_flush_interval: last_used_at 批量刷新间隔（秒），
+            0 表示每次验证都同步调用 updater（默认）
     
     使用示例:
         manager = APIKeyManager(
@@ -130,6 +180,14 @@ class APIKeyManager:
         
         # 验证 Key
         is_valid, key_data = manager.validate_key_format(api_key)
+        
+        # 高频调用场景：缓存验证结果 30 秒，last_used_at 每 10 秒批量写一次
+        manager = APIKeyManager(
+            secret_key="your-secret-key",
+            cache_ttl=30,
+            last_used_flush_interval=10,
+        )
+        manager.set_key_store(getter=..., bulk_updater=bulk_touch_keys)
     """
     
     def __init__(
@@ -138,17 +196,41 @@ class APIKeyManager:
         prefix: str = "yweb",
         key_length: int = 32,
         hash_algorithm: str = "sha256",
+        cache_ttl: float = 0,
+        cache_maxsize: int = 10000,
+        last_used_flush_interval: float = 0,
     ):
+        if cache_ttl < 0:
+            raise ValueError("cache_ttl 不能为负数")
+        if last_used_flush_interval < 0:
+            raise ValueError("last_used_flush_interval 不能为负数")
+        
         self.secret_key = secret_key
         self.prefix = prefix
         self.key_length = key_length
         self.hash_algorithm = hash_algorithm
+        self.cache_ttl = cache_ttl
+        self.last_used_flush_interval = last_used_flush_interval
         
         # Key 存储回调（由应用实现）
         self._key_store: Optional[Callable[[str], Optional[APIKeyData]]] = None
         self._key_saver: Optional[Callable[[APIKeyData], bool]] = None
         self._key_updater: Optional[Callable[[str, Dict[str, Any]], bool]] = None
         self._key_revoker: Optional[Callable[[str], bool]] = None
+        self._key_bulk_updater: Optional[Callable[[Dict[str, datetime]], Any]] = None
+        
+        # 已验证 Key 的本地缓存：key_hash -> APIKeyData，key_id -> key_hash 用于主动失效
+        self._cache: Optional[TTLCache] = (
+            TTLCache(maxsize=cache_maxsize, ttl=cache_ttl) if cache_ttl > 0 else None
+        )
+        self._cache_index: Dict[str, str] = {}
+        self._cache_lock = threading.Lock()
+        
+        # 待刷新的 last_used_at：key_id -> 最近一次使用时间
+        self._pending_last_used: Dict[str, datetime] = {}
+        self._pending_lock = threading.Lock()
+        self._flush_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
     
     def set_key_store(
         self,
@@ -156,6 +238,7 @@ class APIKeyManager:
         saver: Optional[Callable[[APIKeyData], bool]] = None,
         updater: Optional[Callable[[str, Dict[str, Any]], bool]] = None,
         revoker: Optional[Callable[[str], bool]] = None,
+        bulk_updater: Optional[Callable[[Dict[str, datetime]], Any]] = None,
     ) -> "APIKeyManager":
         """设置 Key 存储回调
         
@@ -164,6 +247,8 @@ class APIKeyManager:
             saver: 保存新的 APIKeyData
             updater: 更新 APIKeyData
             revoker: 撤销 Key
+            bulk_updater: 批量写入 last_used_at，参数为 {key_id: last_used_at}。
+                开启批量刷新时每个周期只调用一次；未设置则逐个调用 updater
             
         Returns:
             self: 支持链式调用
@@ -172,6 +257,8 @@ class APIKeyManager:
         self._key_saver = saver
         self._key_updater = updater
         self._key_revoker = revoker
+        self._key_bulk_updater = bulk_updater
+        self.invalidate_key_cache()
         return self
     
     def generate_key(
@@ -298,12 +385,17 @@ class APIKeyManager:
         if not self._key_store:
             return None
         
-        key_data = self._key_store(key_hash)
-        if not key_data:
-            # 尝试用 key_id 查找
-            key_data = self._key_store(key_id)
-            if not key_data or key_data.key_hash != key_hash:
-                return None
+        key_data = self._get_cached_key(key_hash)
+        if key_data is None:
+            key_data = self._key_store(key_hash)
+            if not key_data:
+                # 尝试用 key_id 查找
+                key_data = self._key_store(key_id)
+                if not key_data or key_data.key_hash != key_hash:
+                    return None
+            from_store = True
+        else:
+            from_store = False
         
         # 检查是否激活
         if not key_data.is_active:
@@ -311,16 +403,148 @@ class APIKeyManager:
         
         # 检查是否过期
         if key_data.is_expired():
+            self._evict_cached_key(key_data.key_id)
             return None
         
+        if from_store:
+            self._set_cached_key(key_data)
+        
         # 更新最后使用时间
-        if self._key_updater:
-            self._key_updater(key_data.key_id, {
-                "last_used_at": datetime.now(timezone.utc)
-            })
+        self._touch_last_used(key_data)
         
         return key_data
     
+    # ==================== 本地缓存 ====================
+    
+    def _get_cached_key(self, key_hash: str) -> Optional[APIKeyData]:
+        """从本地缓存读取已验证的 Key（返回副本，避免调用方修改缓存）"""
+        if self._cache is None:
+            return None
+        with self._cache_lock:
+            cached = self._cache.get(key_hash)
+        if cached is None:
+            return None
+        return replace(cached)
+    
+    def _set_cached_key(self, key_data: APIKeyData) -> None:
+        """缓存验证通过的 Key（仅缓存哈希匹配的正向结果）"""
+        if self._cache is None:
+            return
+        with self._cache_lock:
+            self._cache[key_data.key_hash] = replace(key_data, key=None)
+            self._cache_index[key_data.key_id] = key_data.key_hash
+            if len(self._cache_index) > self._cache.maxsize:
+                # TTLCache 自行淘汰过期条目，这里同步清理索引
+                self._cache_index = {
+                    kid: khash for kid, khash in self._cache_index.items()
+                    if khash in self._cache
+                }
+    
+    def _evict_cached_key(self, key_id: str) -> None:
+        """按 key_id 移除缓存条目"""
+        if self._cache is None:
+            return
+        with self._cache_lock:
+            key_hash = self._cache_index.pop(key_id, None)
+            if key_hash is not None:
+                self._cache.pop(key_hash, None)
+    
+    def invalidate_key_cache(self, key_id: Optional[str] = None) -> None:
+        """使本地缓存失效
+        
+        在应用侧直接修改 Key（禁用、改权限范围等）后调用；
+        多实例部署时可在收到变更通知后调用，以缩短 cache_ttl 内的不一致窗口。
+        
+        Args:
+            key_id: 指定 Key ID；为 None 时清空全部缓存
+        """
+        if key_id is not None:
+            self._evict_cached_key(key_id)
+            return
+        if self._cache is None:
+            return
+        with self._cache_lock:
+            self._cache.clear()
+            self._cache_index.clear()
+    
+    # ==================== last_used_at 批量刷新 ====================
+    
+    def _touch_last_used(self, key_data: APIKeyData) -> None:
+        """记录 Key 的使用时间"""
+        now = datetime.now(timezone.utc)
+        if self.last_used_flush_interval <= 0:
+            if self._key_updater:
+                self._key_updater(key_data.key_id, {"last_used_at": now})
+            return
+        
+        if not (self._key_bulk_updater or self._key_updater):
+            return
+        key_data.last_used_at = now
+        with self._pending_lock:
+            self._pending_last_used[key_data.key_id] = now
+            if self._flush_thread is None:
+                self._start_flush_thread()
+    
+    def _start_flush_thread(self) -> None:
+        """启动后台刷新线程（调用方需持有 _pending_lock）"""
+        self._stop_event.clear()
+        self._flush_thread = threading.Thread(
+            target=_flush_worker,
+            args=(weakref.ref(self), self._stop_event, self.last_used_flush_interval),
+            name=f"APIKeyFlushThread-{id(self)}",
+            daemon=True,
+        )
+        self._flush_thread.start()
+        with _managers_lock:
+            _api_key_managers.append(weakref.ref(self))
+    
+    def flush_last_used(self) -> int:
+        """立即写入所有待刷新的 last_used_at
+        
+        设置了 bulk_updater 时一次性写入，失败时整批放回队列；
+        否则逐个调用 updater，只有写入失败的 Key 放回队列，在下一个周期重试。
+        
+        Returns:
+            int: 本次写入的 Key 数量
+        """
+        with self._pending_lock:
+            if not self._pending_last_used:
+                return 0
+            pending = self._pending_last_used
+            self._pending_last_used = {}
+        
+        failed: Dict[str, datetime] = {}
+        if self._key_bulk_updater:
+            try:
+                self._key_bulk_updater(pending)
+            except Exception as e:
+                logger.warning(f"API Key last_used_at 批量写入失败，将在下个周期重试: {e}")
+                failed = pending
+        else:
+            for key_id, last_used_at in pending.items():
+                try:
+                    self._key_updater(key_id, {"last_used_at": last_used_at})
+                except Exception as e:
+                    logger.warning(f"API Key {key_id} last_used_at 写入失败，将在下个周期重试: {e}")
+                    failed[key_id] = last_used_at
+        
+        if failed:
+            with self._pending_lock:
+                for key_id, last_used_at in failed.items():
+                    # 期间产生的更新时间更新，保留新值
+                    self._pending_last_used.setdefault(key_id, last_used_at)
+        return len(pending) - len(failed)
+    
+    def close(self) -> None:
+        """停止后台刷新线程并写入剩余的 last_used_at"""
+        self._stop_event.set()
+        thread = self._flush_thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        with self._pending_lock:
+            self._flush_thread = None
+        self.flush_last_used()
+    
     def revoke_key(self, key_id: str) -> bool:
         """撤销 API Key
         
@@ -330,6 +554,7 @@ class APIKeyManager:
         Returns:
             bool: 是否成功撤销
         """
+        self._evict_cached_key(key_id)
         if self._key_revoker:
             return self._key_revoker(key_id)
         if self._key_updater:
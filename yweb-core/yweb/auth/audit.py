@@ -11,14 +11,35 @@
     
     audit_service = LoginAuditService(LoginRecord)
     audit_service.record_login(user_id=1, username="john", ip_address="192.168.1.1")
+    
+    # 高峰期：缓冲后批量写入，登录请求不再承担写库与提交延迟
+    audit_service = LoginAuditService(LoginRecord, buffer=LoginAuditBuffer(LoginRecord))
+    
+    # 大表统计：按小时/天预聚合，计数查询只扫描时间桶
+    class LoginRollup(AbstractLoginRollup):
+        __tablename__ = "login_rollup"
+    
+    audit_service = LoginAuditService(
+        LoginRecord,
+        buffer=LoginAuditBuffer(LoginRecord, rollup_model=LoginRollup),
+    )
 """
 
+import atexit
+import hashlib
+import queue
+import threading
+import weakref
+from contextlib import contextmanager
 from datetime import datetime, timezone, timedelta
-from typing import Optional, List, Any, Type, TypeVar
+from typing import Optional, List, Any, Type, TypeVar, Callable, ContextManager, Dict, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
-from .models import AbstractLoginRecord
+from yweb.log import get_logger
+from .models import AbstractLoginRecord, AbstractLoginRollup
+
+logger = get_logger("yweb.auth.audit")
 
 
 class LoginStatus(str, Enum):
@@ -68,6 +89,369 @@ class LoginAttempt:
     device_info: Optional[str] = None
 
 
+# ==================== 汇总表维护 ====================
+
+# 汇总时间粒度
+ROLLUP_HOUR = "hour"
+ROLLUP_DAY = "day"
+
+_ROLLUP_STEPS = {
+    ROLLUP_HOUR: timedelta(hours=1),
+    ROLLUP_DAY: timedelta(days=1),
+}
+
+# 汇总行的维度字段
+_ROLLUP_KEY_FIELDS = ("granularity", "bucket_start", "user_id", "username", "ip_address", "status")
+
+
+def _as_utc(moment: datetime) -> datetime:
+    """统一为 UTC 时间（无时区的时间视为 UTC）"""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def _floor_bucket(moment: datetime, granularity: str) -> datetime:
+    """时间所在桶的起点"""
+    moment = _as_utc(moment)
+    if granularity == ROLLUP_DAY:
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _ceil_bucket(moment: datetime, granularity: str) -> datetime:
+    """不早于该时间的第一个桶起点"""
+    start = _floor_bucket(moment, granularity)
+    if start < _as_utc(moment):
+        start += _ROLLUP_STEPS[granularity]
+    return start
+
+
+def _create_pk_factory(model) -> Optional[Callable[[], Any]]:
+    """非自增主键需在批量 INSERT 前生成（Core INSERT 不触发 before_insert 事件）"""
+    from yweb.orm.primary_key_config import PrimaryKeyConfig, IdType
+    from yweb.orm.primary_key_generators import create_primary_key_generator
+    
+    if not getattr(model, "__use_auto_pk__", True):
+        return None
+    strategy = getattr(model, "__pk_strategy__", None) or PrimaryKeyConfig.get_strategy()
+    if strategy == IdType.AUTO_INCREMENT:
+        return None
+    return create_primary_key_generator(
+        strategy=strategy,
+        short_uuid_length=PrimaryKeyConfig.get_short_uuid_length(),
+        snowflake_worker_id=PrimaryKeyConfig.get_snowflake_worker_id(),
+        snowflake_datacenter_id=PrimaryKeyConfig.get_snowflake_datacenter_id(),
+        custom_generator=PrimaryKeyConfig.get_custom_generator(),
+    )
+
+
+def _dimension_hash(user_id: Any, username: str, ip_address: str) -> str:
+    """汇总行维度摘要（user_id 可为空，不能直接参与唯一约束）"""
+    return hashlib.sha1(f"{user_id}\x1f{username}\x1f{ip_address}".encode()).hexdigest()
+
+
+def _apply_rollups(
+    session,
+    rollup_model: Type[AbstractLoginRollup],
+    rows: List[Dict[str, Any]],
+    pk_factory: Optional[Callable[[], Any]] = None,
+) -> None:
+    """把一批登录记录累加到汇总表
+    
+    PostgreSQL / SQLite / MySQL 每批一条多行 upsert，冲突时在数据库端累加 login_count，
+    不需要先读取已有汇总行；其他数据库先 SELECT 再分别 UPDATE / INSERT。
+    """
+    from sqlalchemy import inspect as sa_inspect
+    from yweb.orm.upsert import UPSERT_DIALECTS
+    
+    deltas: Dict[tuple, int] = {}
+    for row in rows:
+        login_at = row.get("login_at") or datetime.now(timezone.utc)
+        for granularity in _ROLLUP_STEPS:
+            key = (
+                granularity,
+                _floor_bucket(login_at, granularity),
+                row.get("user_id"),
+                row["username"],
+                row["ip_address"],
+                row.get("status") or LoginStatus.SUCCESS.value,
+            )
+            deltas[key] = deltas.get(key, 0) + 1
+    if not deltas:
+        return
+    
+    values = []
+    for key, delta in deltas.items():
+        item = dict(zip(_ROLLUP_KEY_FIELDS, key), login_count=delta)
+        item["dimension_hash"] = _dimension_hash(item["user_id"], item["username"], item["ip_address"])
+        if pk_factory is not None:
+            item["id"] = pk_factory()
+        values.append(item)
+    
+    table = rollup_model.__table__
+    dialect_name = session.get_bind(mapper=sa_inspect(rollup_model)).dialect.name
+    if dialect_name not in UPSERT_DIALECTS:
+        _apply_rollups_fallback(session, table, values)
+        return
+    
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.mysql import insert
+    stmt = insert(table).values(values)
+    if dialect_name in ("postgresql", "sqlite"):
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.granularity, table.c.bucket_start, table.c.status, table.c.dimension_hash],
+            set_={"login_count": table.c.login_count + stmt.excluded.login_count},
+        )
+    else:
+        stmt = stmt.on_duplicate_key_update(login_count=table.c.login_count + stmt.inserted.login_count)
+    session.execute(stmt)
+
+
+def _apply_rollups_fallback(session, table, values: List[Dict[str, Any]]) -> None:
+    """不支持 upsert 的数据库：SELECT 已有汇总行后 executemany 累加，未命中的多行 INSERT"""
+    from sqlalchemy import and_, bindparam, insert, or_, select, update
+    
+    buckets = {(item["granularity"], item["bucket_start"]) for item in values}
+    existing = session.execute(
+        select(table.c.id, table.c.granularity, table.c.bucket_start, table.c.status, table.c.dimension_hash).where(
+            or_(*[
+                and_(table.c.granularity == granularity, table.c.bucket_start == bucket_start)
+                for granularity, bucket_start in buckets
+            ]),
+            table.c.dimension_hash.in_({item["dimension_hash"] for item in values}),
+        )
+    ).all()
+    existing_ids = {
+        (row.granularity, _as_utc(row.bucket_start), row.status, row.dimension_hash): row.id
+        for row in existing
+    }
+    
+    updates = []
+    inserts = []
+    for item in values:
+        row_id = existing_ids.get(
+            (item["granularity"], item["bucket_start"], item["status"], item["dimension_hash"])
+        )
+        if row_id is not None:
+            updates.append({"_id": row_id, "_delta": item["login_count"]})
+        else:
+            inserts.append(item)
+    
+    if updates:
+        session.execute(
+            update(table)
+            .where(table.c.id == bindparam("_id"))
+            .values(login_count=table.c.login_count + bindparam("_delta")),
+            updates,
+        )
+    if inserts:
+        session.execute(insert(table).values(inserts))
+
+
+# 全局注册表，用于在程序退出时刷新所有审计缓冲
+_audit_buffers: List[weakref.ref] = []
+_audit_buffers_lock = threading.Lock()
+
+
+def _flush_all_audit_buffers():
+    """程序退出时刷新所有审计缓冲"""
+    with _audit_buffers_lock:
+        refs = list(_audit_buffers)
+    for ref in refs:
+        buffer = ref()
+        if buffer is not None:
+            try:
+                buffer.flush()
+            except Exception:
+                pass
+
+
+atexit.register(_flush_all_audit_buffers)
+
+
+class LoginAuditBuffer:
+    """登录审计缓冲写入器
+    
+    将登录记录放入有界内存队列，由后台线程每 batch_size 条或每 flush_interval_ms 毫秒
+    用一条 ``INSERT ... VALUES (...), (...)`` 批量写入，登录请求只负责入队。
+    队列满时丢弃新记录并计数（不阻塞登录）；程序退出时自动刷新剩余记录。
+    
+    Args:
+        record_model: 登录记录模型类（继承自 AbstractLoginRecord）
+        max_queue_size: 队列容量
+        batch_size: 单次批量写入的最大条数，队列积压达到该值时立即唤醒写入
+        flush_interval_ms: 定时写入间隔（毫秒）
+        session_scope: 返回 session 上下文管理器的函数（默认使用 db_session_scope）
+        rollup_model: 登录统计汇总模型（可选，继承自 AbstractLoginRollup），
+            设置后每批记录在同一事务内累加到小时/天汇总表
+    
+    使用示例:
+        audit_buffer = LoginAuditBuffer(LoginRecord, batch_size=500, flush_interval_ms=1000)
+        audit_service = LoginAuditService(LoginRecord, buffer=audit_buffer)
+        
+        # 应用关闭时
+        audit_buffer.close()
+        
+        # 监控
+        audit_buffer.get_stats()  # {"queued": 0, "dropped": 0, "written": 1200, ...}
+    """
+    
+    def __init__(
+        self,
+        record_model: Type[LoginRecordType],
+        max_queue_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval_ms: int = 1000,
+        session_scope: Optional[Callable[[], ContextManager[Any]]] = None,
+        rollup_model: Optional[Type[AbstractLoginRollup]] = None,
+    ):
+        if max_queue_size <= 0 or batch_size <= 0 or flush_interval_ms <= 0:
+            raise ValueError("max_queue_size、batch_size、flush_interval_ms 必须大于 0")
+        
+        self.record_model = record_model
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self._session_scope = session_scope or self._default_session_scope
+        self._pk_factory = _create_pk_factory(record_model)
+        self.rollup_model = rollup_model
+        self._rollup_pk_factory = _create_pk_factory(rollup_model) if rollup_model is not None else None
+        
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue_size)
+        self._flush_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._dropped = 0
+        self._written = 0
+        self._failed = 0
+        self._batches = 0
+        
+        # 后台写入线程
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._flush_thread = threading.Thread(
+            target=self._flush_worker,
+            name=f"LoginAuditFlushThread-{id(self)}",
+            daemon=True,
+        )
+        self._flush_thread.start()
+        
+        with _audit_buffers_lock:
+            _audit_buffers.append(weakref.ref(self))
+    
+    @contextmanager
+    def _default_session_scope(self):
+        from yweb.orm import db_session_scope
+        
+        with db_session_scope(request_id=f"login-audit-{id(self)}") as session:
+            yield session
+    
+    def enqueue(self, **fields) -> bool:
+        """记录入队
+        
+        Args:
+            **fields: 登录记录字段（user_id、username、ip_address、status 等）
+        
+        Returns:
+            bool: 是否入队成功（队列已满时返回 False 并计入 dropped）
+        """
+        fields.setdefault("login_at", datetime.now(timezone.utc))
+        try:
+            self._queue.put_nowait(fields)
+        except queue.Full:
+            with self._stats_lock:
+                self._dropped += 1
+            return False
+        if self._queue.qsize() >= self.batch_size:
+            self._wake_event.set()
+        return True
+    
+    def _flush_worker(self):
+        """后台写入线程"""
+        while not self._stop_event.is_set():
+            self._wake_event.wait(timeout=self.flush_interval)
+            self._wake_event.clear()
+            if self._stop_event.is_set():
+                break
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"登录审计批量写入异常: {e}", exc_info=True)
+    
+    def _drain(self) -> List[Dict[str, Any]]:
+        rows = []
+        while len(rows) < self.batch_size:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+    
+    def _write_batch(self, rows: List[Dict[str, Any]]) -> None:
+        """一条 INSERT 写入一批记录，并在同一事务内更新汇总表"""
+        from sqlalchemy import insert
+        
+        if self._pk_factory is not None:
+            for row in rows:
+                row.setdefault("id", self._pk_factory())
+        with self._session_scope() as session:
+            session.execute(insert(self.record_model.__table__).values(rows))
+            if self.rollup_model is not None:
+                _apply_rollups(session, self.rollup_model, rows, self._rollup_pk_factory)
+    
+    def flush(self) -> int:
+        """同步写入队列中的全部记录
+        
+        Returns:
+            int: 本次成功写入的记录数
+        """
+        written = 0
+        with self._flush_lock:
+            while True:
+                rows = self._drain()
+                if not rows:
+                    break
+                try:
+                    self._write_batch(rows)
+                except Exception as e:
+                    with self._stats_lock:
+                        self._failed += len(rows)
+                    logger.error(f"登录审计批量写入失败，丢弃 {len(rows)} 条记录: {e}")
+                    continue
+                written += len(rows)
+                with self._stats_lock:
+                    self._written += len(rows)
+                    self._batches += 1
+        return written
+    
+    def close(self) -> None:
+        """停止后台线程并写入剩余记录"""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._flush_thread.is_alive() and self._flush_thread is not threading.current_thread():
+            self._flush_thread.join(timeout=5)
+        self.flush()
+    
+    def get_stats(self) -> Dict[str, int]:
+        """获取缓冲统计
+        
+        Returns:
+            dict: queued（当前积压）、dropped（队列满丢弃）、written（已写入）、
+                failed（写入失败丢弃）、batches（批次数）
+        """
+        with self._stats_lock:
+            return {
+                "queued": self._queue.qsize(),
+                "dropped": self._dropped,
+                "written": self._written,
+                "failed": self._failed,
+                "batches": self._batches,
+            }
+
+
 class LoginAuditService:
     """登录审计服务
     
@@ -94,12 +478,34 @@ class LoginAuditService:
         )
     """
     
-    def __init__(self, record_model: Type[LoginRecordType]):
+    def __init__(
+        self,
+        record_model: Type[LoginRecordType],
+        buffer: Optional[LoginAuditBuffer] = None,
+        rollup_model: Optional[Type[AbstractLoginRollup]] = None,
+        sync_rollups: bool = False,
+    ):
         """
         Args:
             record_model: 登录记录模型类（继承自 AbstractLoginRecord）
+            buffer: 审计缓冲写入器（可选），设置后 record_login 只入队，由后台批量写入
+            rollup_model: 登录统计汇总模型（可选，继承自 AbstractLoginRollup），
+                设置后计数类查询从汇总表按时间桶求和。使用缓冲写入时默认取 buffer.rollup_model
+            sync_rollups: 未使用缓冲写入时，是否在每次 record_login 的事务内同步累加汇总表。
+                默认 False：汇总表只由 LoginAuditBuffer 批量写入和 rebuild_rollups() 维护，
+                登录请求不承担额外的汇总写入
         """
+        if buffer is not None:
+            if rollup_model is None:
+                rollup_model = buffer.rollup_model
+            elif rollup_model is not buffer.rollup_model:
+                raise ValueError("rollup_model 必须与 buffer.rollup_model 一致，否则汇总表不会随批量写入更新")
+        
         self.record_model = record_model
+        self.buffer = buffer
+        self.rollup_model = rollup_model
+        self.sync_rollups = sync_rollups
+        self._rollup_pk_factory = _create_pk_factory(rollup_model) if rollup_model is not None else None
     
     def record_login(
         self,
@@ -124,12 +530,12 @@ class LoginAuditService:
             failure_reason: 失败原因
             location: 地理位置
             device_info: 设备信息
-            commit: 是否立即提交
+            commit: 是否立即提交（使用缓冲写入时忽略）
             
         Returns:
-            登录记录对象
+            登录记录对象（使用缓冲写入时为未持久化的对象）
         """
-        record = self.record_model(
+        fields = dict(
             user_id=user_id,
             username=username,
             ip_address=ip_address,
@@ -141,6 +547,16 @@ class LoginAuditService:
             login_at=datetime.now(timezone.utc),
         )
         
+        if self.buffer is not None:
+            self.buffer.enqueue(**fields)
+            return self.record_model(**fields)
+        
+        record = self.record_model(**fields)
+        
+        # 显式开启时，汇总表与登录记录在同一事务内提交
+        if self.rollup_model is not None and self.sync_rollups:
+            _apply_rollups(record.session, self.rollup_model, [fields], self._rollup_pk_factory)
+        
         # 使用 BaseModel 的 add 方法
         if hasattr(record, 'add'):
             record.add(commit)
@@ -191,17 +607,29 @@ class LoginAuditService:
         limit: int = 20,
         offset: int = 0,
         status: Optional[str] = None,
+        before: Optional[Tuple[datetime, Any]] = None,
     ) -> List[LoginRecordType]:
         """获取用户登录历史
         
+        按 (login_at, id) 倒序返回。翻页建议使用 before 键集分页：
+        传入上一页最后一条记录的 (login_at, id)，查询沿 (user_id, login_at) 索引
+        直接定位，页数再深也不需要扫描并丢弃 offset 行。
+        
         Args:
             user_id: 用户 ID
             limit: 返回数量
             offset: 偏移量
             status: 过滤状态
+            before: 上一页最后一条记录的 (login_at, id)
             
         Returns:
             登录记录列表
+        
+        使用示例:
+            page = audit_service.get_user_login_history(user_id=1, limit=20)
+            next_page = audit_service.get_user_login_history(
+                user_id=1, limit=20, before=(page[-1].login_at, page[-1].id)
+            )
         """
         query = self.record_model.query.filter(
             self.record_model.user_id == user_id
@@ -210,8 +638,11 @@ class LoginAuditService:
         if status:
             query = query.filter(self.record_model.status == status)
         
+        query = self._apply_keyset(query, before)
+        
         return query.order_by(
-            self.record_model.login_at.desc()
+            self.record_model.login_at.desc(),
+            self.record_model.id.desc(),
         ).offset(offset).limit(limit).all()
     
     def get_recent_failures(
@@ -234,6 +665,12 @@ class LoginAuditService:
         """
         since = datetime.now(timezone.utc) - timedelta(minutes=minutes)
         
+        if self.rollup_model is not None:
+            filters = {"username": username, "status": LoginStatus.FAILED.value}
+            if ip_address:
+                filters["ip_address"] = ip_address
+            return self._count_from_rollups(since, filters).get(LoginStatus.FAILED.value, 0)
+        
         query = self.record_model.query.filter(
             self.record_model.username == username,
             self.record_model.status == LoginStatus.FAILED.value,
@@ -250,26 +687,32 @@ class LoginAuditService:
         ip_address: str,
         limit: int = 20,
         hours: int = 24,
+        before: Optional[Tuple[datetime, Any]] = None,
     ) -> List[LoginRecordType]:
         """获取 IP 的登录历史
         
-        用于检测异常登录。
+        用于检测异常登录。按 (login_at, id) 倒序返回，翻页方式同 get_user_login_history。
         
         Args:
             ip_address: IP 地址
             limit: 返回数量
             hours: 时间范围（小时）
+            before: 上一页最后一条记录的 (login_at, id)
             
         Returns:
             登录记录列表
         """
         since = datetime.now(timezone.utc) - timedelta(hours=hours)
         
-        return self.record_model.query.filter(
+        query = self.record_model.query.filter(
             self.record_model.ip_address == ip_address,
             self.record_model.login_at >= since,
-        ).order_by(
-            self.record_model.login_at.desc()
+        )
+        query = self._apply_keyset(query, before)
+        
+        return query.order_by(
+            self.record_model.login_at.desc(),
+            self.record_model.id.desc(),
         ).limit(limit).all()
     
     def get_last_successful_login(
@@ -302,6 +745,9 @@ class LoginAuditService:
         
         since = datetime.now(timezone.utc) - timedelta(days=days)
         
+        if self.rollup_model is not None:
+            return self._count_from_rollups(since, {"user_id": user_id} if user_id else {})
+        
         query = self.record_model.query.filter(
             self.record_model.login_at >= since
         )
@@ -346,3 +792,108 @@ class LoginAuditService:
         query.delete()
         
         return count
+    
+    def rebuild_rollups(self, batch_size: int = 1000, commit: bool = True) -> int:
+        """根据登录记录表重建汇总表
+        
+        首次启用 rollup_model 时用于回填历史数据，也可用于修复汇总数据。
+        原始记录按主键分批读取，不会一次性加载到内存。
+        
+        注意：cleanup_old_records 删除的记录不再参与重建，重建后更早时间段的统计会随之减少。
+        
+        Args:
+            batch_size: 每批读取的记录数
+            commit: 是否提交
+            
+        Returns:
+            参与汇总的记录数
+        """
+        from sqlalchemy import delete
+        
+        if self.rollup_model is None:
+            raise ValueError("未配置 rollup_model")
+        
+        model = self.record_model
+        session = model.query.session
+        session.execute(delete(self.rollup_model.__table__))
+        
+        total = 0
+        last_id = None
+        while True:
+            query = model.query.with_entities(
+                model.id, model.user_id, model.username,
+                model.ip_address, model.status, model.login_at,
+            )
+            if last_id is not None:
+                query = query.filter(model.id > last_id)
+            rows = query.order_by(model.id).limit(batch_size).all()
+            if not rows:
+                break
+            _apply_rollups(session, self.rollup_model, [dict(row._mapping) for row in rows], self._rollup_pk_factory)
+            total += len(rows)
+            last_id = rows[-1].id
+        
+        if commit:
+            session.commit()
+        return total
+    
+    def _apply_keyset(self, query, before: Optional[Tuple[datetime, Any]]):
+        """追加 (login_at, id) < before 的键集分页条件"""
+        if before is None:
+            return query
+        
+        from sqlalchemy import and_, or_
+        
+        login_at, record_id = before
+        model = self.record_model
+        return query.filter(or_(
+            model.login_at < login_at,
+            and_(model.login_at == login_at, model.id < record_id),
+        ))
+    
+    def _count_from_rollups(self, since: datetime, filters: Dict[str, Any]) -> Dict[str, int]:
+        """按状态统计 since 至今的登录次数
+        
+        [since, 下一个整点) 不足一小时的部分查询登录记录表（最多一小时的数据），
+        其余时间先按小时桶、再按天桶从汇总表求和，扫描量与时间桶数成正比。
+        """
+        from sqlalchemy import func
+        
+        record, rollup = self.record_model, self.rollup_model
+        hour_start = _ceil_bucket(since, ROLLUP_HOUR)
+        day_start = _ceil_bucket(since, ROLLUP_DAY)
+        
+        counts: Dict[str, int] = {}
+        
+        def merge(results):
+            for status, count in results:
+                if count:
+                    counts[status] = counts.get(status, 0) + int(count)
+        
+        if hour_start > since:
+            merge(record.query.filter(
+                record.login_at >= since,
+                record.login_at < hour_start,
+                *[getattr(record, name) == value for name, value in filters.items()],
+            ).with_entities(
+                record.status, func.count(record.id)
+            ).group_by(record.status).all())
+        
+        rollup_filters = [getattr(rollup, name) == value for name, value in filters.items()]
+        merge(rollup.query.filter(
+            rollup.granularity == ROLLUP_HOUR,
+            rollup.bucket_start >= hour_start,
+            rollup.bucket_start < day_start,
+            *rollup_filters,
+        ).with_entities(
+            rollup.status, func.sum(rollup.login_count)
+        ).group_by(rollup.status).all())
+        merge(rollup.query.filter(
+            rollup.granularity == ROLLUP_DAY,
+            rollup.bucket_start >= day_start,
+            *rollup_filters,
+        ).with_entities(
+            rollup.status, func.sum(rollup.login_count)
+        ).group_by(rollup.status).all())
+        
+        return counts
@@ -27,10 +27,15 @@
     decoded = jwt_manager.verify_token(access_token)
 """
 
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone, timedelta
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, Union, Tuple
 from dataclasses import asdict
 
+from .keys import KeySet, TokenSigner, load_key
 from .schemas import TokenPayload, TokenData
 
 # 尝试导入 jose，如果没有安装则提供友好提示
@@ -56,6 +61,16 @@ class JWTManager:
         refresh_token_sliding_days: Refresh Token 滑动过期阈值（天），
                                     当用 Refresh Token 换取新 Access Token 时，
                                     如果剩余时间少于此值，也会返回新的 Refresh Token
+        verify_cache_size: 已验证 Token 的 LRU 缓存容量（按 Token 哈希索引），
+                           命中时跳过签名校验直接返回解码结果，缓存项在 exp 到期后失效。
+                           0 表示禁用缓存
+        public_key: 验证公钥（RS256/ES256 等非对称算法，secret_key 为私钥时使用），
+                    不传则用 secret_key 验证
+        kid: 签名密钥 ID，写入 Token 头部
+        key_set: 按 kid 索引的验证密钥集合（密钥轮换），Token 头部带 kid 时优先从中选择验证密钥
+    
+    密钥在构造时解析为 Key 对象并缓存，签发时复用预编码的 JWT 头部，
+    RS256/ES256 不会在每次签发、验证时重新解析 PEM。
     
     使用示例:
         jwt_manager = JWTManager(
@@ -84,6 +99,10 @@ class JWTManager:
         access_token_expire_minutes: int = 30,
         refresh_token_expire_days: int = 7,
         refresh_token_sliding_days: int = 2,
+        verify_cache_size: int = 1024,
+        public_key: Optional[str] = None,
+        kid: Optional[str] = None,
+        key_set: Optional[KeySet] = None,
     ):
         if not JOSE_AVAILABLE:
             raise ImportError(
@@ -107,11 +126,70 @@ class JWTManager:
         if refresh_token_sliding_days < 0:
             raise ValueError("refresh_token_sliding_days 必须大于等于 0（0 表示禁用滑动过期）")
         
-        self.secret_key = secret_key
+        if verify_cache_size < 0:
+            raise ValueError("verify_cache_size 必须大于等于 0（0 表示禁用验证缓存）")
+        
         self.algorithm = algorithm
         self.access_token_expire_minutes = access_token_expire_minutes
         self.refresh_token_expire_days = refresh_token_expire_days
         self.refresh_token_sliding_days = refresh_token_sliding_days
+        self.verify_cache_size = verify_cache_size
+        self.key_set = key_set
+        
+        # 已验证 Token 缓存: token_hash -> (TokenData, exp)
+        self._verify_cache: "OrderedDict[str, Tuple[TokenData, int]]" = OrderedDict()
+        self._verify_cache_lock = threading.Lock()
+        # 缓存对应的 key_set 版本，key_set 移除或替换密钥后整体失效
+        self._verify_cache_key_set_version = self._key_set_version()
+        
+        self.set_keys(secret_key, public_key=public_key, kid=kid)
+    
+    @property
+    def secret_key(self) -> str:
+        """签名密钥（赋值时重新解析密钥并清空验证缓存）"""
+        return self._secret_key
+    
+    @secret_key.setter
+    def secret_key(self, value: str) -> None:
+        self.set_keys(value, public_key=self.public_key, kid=self.kid)
+    
+    def set_keys(
+        self,
+        secret_key: str,
+        public_key: Optional[str] = None,
+        kid: Optional[str] = None,
+    ) -> "JWTManager":
+        """更换签名 / 验证密钥
+        
+        密钥立即解析为 Key 对象，并清空已验证 Token 缓存。
+        
+        Args:
+            secret_key: 签名密钥（对称密钥或 PEM 私钥）
+            public_key: 验证公钥（不传则用 secret_key 验证）
+            kid: 签名密钥 ID
+            
+        Returns:
+            self: 支持链式调用
+        """
+        signer = TokenSigner(secret_key, self.algorithm, kid=kid)
+        verification_key = load_key(public_key, self.algorithm) if public_key else signer.key
+        
+        self._secret_key = secret_key
+        self.public_key = public_key
+        self.kid = kid
+        self._signer = signer
+        self._verification_key = verification_key
+        self.clear_verify_cache()
+        return self
+    
+    def _decode(self, token: str) -> Dict[str, Any]:
+        """校验签名并解码（Token 头部带 kid 且在 key_set 中时使用对应密钥）"""
+        key, algorithm = self._verification_key, self.algorithm
+        if self.key_set is not None:
+            entry = self.key_set.resolve(token)
+            if entry is not None:
+                key, algorithm = entry
+        return jwt.decode(token, key, algorithms=[algorithm])
     
     def create_access_token(
         self,
@@ -151,7 +229,7 @@ class JWTManager:
         data["exp"] = expire
         data["iat"] = datetime.now(timezone.utc)
         
-        return jwt.encode(data, self.secret_key, algorithm=self.algorithm)
+        return self._signer.sign(data)
     
     def create_refresh_token(
         self,
@@ -190,7 +268,7 @@ class JWTManager:
         data["exp"] = expire
         data["iat"] = datetime.now(timezone.utc)
         
-        return jwt.encode(data, self.secret_key, algorithm=self.algorithm)
+        return self._signer.sign(data)
     
     def verify_token(
         self, token: str, raise_on_expired: bool = False
@@ -207,15 +285,24 @@ class JWTManager:
             
         Raises:
             AuthenticationException: 当 raise_on_expired=True 且 Token 已过期时
+        
+        Note:
+            启用 verify_cache_size 时，同一 Token 在 exp 之前的重复验证直接命中缓存，
+            不再重复签名校验。更换 secret_key 后应调用 clear_verify_cache()；
+            key_set 移除或替换密钥时缓存自动失效。
         """
+        cache_key = None
+        if self.verify_cache_size > 0:
+            cache_key = hash_token(token)
+            key_set_version = self._key_set_version()
+            cached = self._get_cached_token_data(cache_key, key_set_version)
+            if cached is not None:
+                return cached
+        
         try:
-            payload = jwt.decode(
-                token,
-                self.secret_key,
-                algorithms=[self.algorithm]
-            )
+            payload = self._decode(token)
             
-            return TokenData(
+            token_data = TokenData(
                 sub=payload.get("sub"),
                 user_id=payload.get("user_id"),
                 username=payload.get("username"),
@@ -225,6 +312,9 @@ class JWTManager:
                 exp=payload.get("exp"),
                 iat=payload.get("iat"),
             )
+            if cache_key is not None:
+                self._set_cached_token_data(cache_key, token_data, key_set_version)
+            return token_data
         except ExpiredSignatureError:
             if raise_on_expired:
                 from yweb.exceptions import AuthenticationException, ErrorCode
@@ -238,6 +328,56 @@ class JWTManager:
         except Exception:
             return None
     
+    def _key_set_version(self) -> Optional[Tuple[int, int]]:
+        """当前 key_set 的标识与版本（未配置 key_set 时为 None）"""
+        if self.key_set is None:
+            return None
+        return (id(self.key_set), self.key_set.generation)
+    
+    def _get_cached_token_data(
+        self, cache_key: str, key_set_version: Optional[Tuple[int, int]]
+    ) -> Optional[TokenData]:
+        """从验证缓存读取 TokenData，已到 exp 的条目会被移除"""
+        with self._verify_cache_lock:
+            if key_set_version != self._verify_cache_key_set_version:
+                # key_set 移除或替换了密钥：按旧密钥验证通过的结果全部作废
+                self._verify_cache.clear()
+                self._verify_cache_key_set_version = key_set_version
+                return None
+            entry = self._verify_cache.get(cache_key)
+            if entry is None:
+                return None
+            token_data, exp = entry
+            if exp <= time.time():
+                # 已过期：交给 jwt.decode 走正常的过期处理
+                del self._verify_cache[cache_key]
+                return None
+            self._verify_cache.move_to_end(cache_key)
+        # 返回副本，避免调用方修改影响缓存
+        return token_data.model_copy()
+    
+    def _set_cached_token_data(
+        self,
+        cache_key: str,
+        token_data: TokenData,
+        key_set_version: Optional[Tuple[int, int]],
+    ) -> None:
+        """写入验证缓存（无 exp 的 Token 不缓存；验证期间 key_set 变化时不缓存）"""
+        if not token_data.exp:
+            return
+        with self._verify_cache_lock:
+            if key_set_version != self._verify_cache_key_set_version:
+                return
+            self._verify_cache[cache_key] = (token_data.model_copy(), token_data.exp)
+            self._verify_cache.move_to_end(cache_key)
+            while len(self._verify_cache) > self.verify_cache_size:
+                self._verify_cache.popitem(last=False)
+    
+    def clear_verify_cache(self) -> None:
+        """清空已验证 Token 缓存（密钥轮换后调用）"""
+        with self._verify_cache_lock:
+            self._verify_cache.clear()
+    
     def decode_token(self, token: str) -> Optional[Dict[str, Any]]:
         """解码令牌（返回原始字典）
         
@@ -248,11 +388,7 @@ class JWTManager:
             解码后的字典，验证失败返回 None
         """
         try:
-            return jwt.decode(
-                token,
-                self.secret_key,
-                algorithms=[self.algorithm]
-            )
+            return self._decode(token)
         except JWTError:
             return None
         except Exception:
@@ -457,6 +593,11 @@ class JWTManager:
 
 
 # 便捷函数
+def hash_token(token: str) -> str:
+    """计算 Token 的 SHA-256 哈希值（用于缓存和黑名单索引，不保存原始 Token）"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
 def create_jwt_token(
     data: Dict[str, Any],
     secret_key: str,
@@ -489,7 +630,7 @@ def create_jwt_token(
     to_encode["exp"] = expire
     to_encode["iat"] = datetime.now(timezone.utc)
     
-    return jwt.encode(to_encode, secret_key, algorithm=algorithm)
+    return jwt.encode(to_encode, load_key(secret_key, algorithm), algorithm=algorithm)
 
 
 def verify_jwt_token(
@@ -511,7 +652,7 @@ def verify_jwt_token(
         raise ImportError("python-jose 未安装。请运行: pip install python-jose[cryptography]")
     
     try:
-        return jwt.decode(token, secret_key, algorithms=[algorithm])
+        return jwt.decode(token, load_key(secret_key, algorithm), algorithms=[algorithm])
     except JWTError:
         return None
     except Exception:
@@ -0,0 +1,370 @@
+"""签名密钥模块
+
+把 PEM / JWK / 对称密钥预解析为 python-jose 的 Key 对象，签发与验证时直接复用，
+RS256/ES256 不再在每次调用时重新解析 PEM。
+
+- load_key: 解析密钥（已解析的 Key 对象原样返回）
+- TokenSigner: 预解析签名密钥 + 预编码 JWT 头部的签名器
+- KeySet: 按 kid 索引的验证密钥集合，支持 JWKS 加载与后台刷新（密钥轮换）
+
+使用示例:
+    from yweb.auth import KeySet, TokenSigner
+
+    signer = TokenSigner(private_pem, "RS256", kid="2024-01")
+    token = signer.sign({"sub": "1", "exp": 1700000000})
+
+    # 轮换：新旧公钥同时在集合中，按 Token 头部的 kid 选择验证密钥
+    key_set = KeySet()
+    key_set.add_key("2024-01", public_pem_old, "RS256")
+    key_set.add_key("2024-07", public_pem_new, "RS256")
+
+    # 从 jwks_uri 拉取，每 10 分钟后台刷新，遇到未知 kid 时按需刷新
+    key_set = KeySet(loader=lambda: httpx.get(jwks_uri).json(), refresh_interval=600)
+"""
+
+import json
+import threading
+import time
+from calendar import timegm
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from yweb.log import get_logger
+
+# 尝试导入 jose，如果没有安装则提供友好提示
+try:
+    from jose import jwk, jwt
+    from jose.backends.base import Key
+    from jose.utils import base64url_encode
+    JOSE_AVAILABLE = True
+except ImportError:
+    JOSE_AVAILABLE = False
+    jwk = None
+    jwt = None
+    Key = None
+    base64url_encode = None
+
+logger = get_logger("yweb.auth.keys")
+
+# 非对称算法前缀（其余视为 HMAC 对称密钥）
+ASYMMETRIC_ALGORITHM_PREFIXES = ("RS", "ES", "PS")
+
+
+def is_asymmetric_algorithm(algorithm: str) -> bool:
+    """是否为非对称签名算法"""
+    return algorithm[:2] in ASYMMETRIC_ALGORITHM_PREFIXES
+
+
+def _require_jose() -> None:
+    if not JOSE_AVAILABLE:
+        raise ImportError("python-jose 未安装。请运行: pip install python-jose[cryptography]")
+
+
+def load_key(key: Any, algorithm: str):
+    """把密钥材料解析为 Key 对象
+
+    不做全局缓存（避免原始密钥常驻进程），需要复用时保存返回的 Key 对象，
+    或使用 TokenSigner / KeySet。
+
+    Args:
+        key: 对称密钥、PEM 字符串、JWK 字典或已解析的 Key 对象
+        algorithm: 签名算法
+
+    Returns:
+        python-jose Key 对象
+
+    Raises:
+        ValueError: 密钥无法解析
+    """
+    _require_jose()
+    if isinstance(key, Key):
+        return key
+    try:
+        return jwk.construct(key, algorithm)
+    except Exception as e:
+        raise ValueError(f"无法解析 {algorithm} 密钥: {e}") from e
+
+
+def _key_fingerprint(key: Any, algorithm: str) -> Optional[Hashable]:
+    """密钥材料的可哈希标识，用于 KeySet 内判断密钥是否变化（Key 对象返回 None）"""
+    if isinstance(key, (str, bytes)):
+        return (key, algorithm)
+    if isinstance(key, dict):
+        return (json.dumps(key, sort_keys=True), algorithm)
+    return None
+
+
+def _encode_segment(data: Dict[str, Any], sort_keys: bool = False) -> bytes:
+    return base64url_encode(json.dumps(data, separators=(",", ":"), sort_keys=sort_keys).encode("utf-8"))
+
+
+class TokenSigner:
+    """JWT 签名器
+
+    签名密钥只解析一次，JWT 头部在构造时编码好，每次签发只序列化载荷并签名。
+    输出与 ``jose.jwt.encode(claims, key, algorithm, headers={"kid": kid})`` 完全一致。
+
+    Args:
+        key: 签名密钥（对称密钥、PEM 私钥、JWK 字典或 Key 对象）
+        algorithm: 签名算法
+        kid: 密钥 ID（写入 JWT 头部，供验证方选择公钥）
+        headers: 额外的 JWT 头部字段
+    """
+
+    def __init__(
+        self,
+        key: Any,
+        algorithm: str = "HS256",
+        kid: Optional[str] = None,
+        headers: Optional[Dict[str, Any]] = None,
+    ):
+        self.algorithm = algorithm
+        self.kid = kid
+        self.key = load_key(key, algorithm)
+
+        header = {"alg": algorithm, "typ": "JWT"}
+        if headers:
+            header.update(headers)
+        if kid:
+            header["kid"] = kid
+        self._encoded_header = _encode_segment(header, sort_keys=True)
+
+    def sign(self, claims: Dict[str, Any]) -> str:
+        """签发 JWT
+
+        Args:
+            claims: 载荷，exp / iat / nbf 可以是 datetime
+
+        Returns:
+            JWT 字符串
+        """
+        claims = dict(claims)
+        for time_claim in ("exp", "iat", "nbf"):
+            value = claims.get(time_claim)
+            if isinstance(value, datetime):
+                claims[time_claim] = timegm(value.utctimetuple())
+
+        signing_input = self._encoded_header + b"." + _encode_segment(claims)
+        signature = base64url_encode(self.key.sign(signing_input))
+        return (signing_input + b"." + signature).decode("utf-8")
+
+
+class KeySet:
+    """按 kid 索引的验证密钥集合
+
+    密钥在加入集合时解析一次。验证时按 Token 头部的 kid 直接取出 Key 对象，
+    轮换期间新旧密钥可同时存在。JWKS 刷新时材料未变的密钥直接复用已解析的 Key 对象；
+    有密钥被移除或替换时 generation 递增，JWTManager 据此清空已验证 Token 缓存。
+
+    Args:
+        loader: 返回 JWKS 字典（``{"keys": [...]}``）的函数，例如从 jwks_uri 拉取
+        refresh_interval: 后台刷新间隔（秒），0 表示不启动后台线程
+        min_refresh_interval: 遇到未知 kid 时按需刷新的最小间隔（秒），
+            防止伪造 kid 的请求频繁触发拉取
+        default_algorithm: JWK 未声明 alg 时使用的算法
+    """
+
+    def __init__(
+        self,
+        loader: Optional[Callable[[], Dict[str, Any]]] = None,
+        refresh_interval: float = 0,
+        min_refresh_interval: float = 30,
+        default_algorithm: str = "RS256",
+    ):
+        if refresh_interval < 0 or min_refresh_interval < 0:
+            raise ValueError("refresh_interval、min_refresh_interval 必须大于等于 0")
+        _require_jose()
+
+        self.loader = loader
+        self.refresh_interval = refresh_interval
+        self.min_refresh_interval = min_refresh_interval
+        self.default_algorithm = default_algorithm
+
+        # kid -> (Key, algorithm)；整体替换，读取无需加锁
+        self._keys: Dict[str, Tuple[Any, str]] = {}
+        # kid -> 密钥材料标识，仅用于本集合内复用已解析的 Key
+        self._fingerprints: Dict[str, Optional[Hashable]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._last_refresh = 0.0
+
+        self._stop_event = threading.Event()
+        self._refresh_thread: Optional[threading.Thread] = None
+        if loader is not None and refresh_interval > 0:
+            self._refresh_thread = threading.Thread(
+                target=self._refresh_worker,
+                name=f"KeySetRefreshThread-{id(self)}",
+                daemon=True,
+            )
+            self._refresh_thread.start()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, kid: str) -> bool:
+        return kid in self._keys
+
+    @property
+    def kids(self) -> List[str]:
+        """当前全部 kid"""
+        return list(self._keys)
+
+    @property
+    def generation(self) -> int:
+        """密钥被移除或替换的次数（只增加密钥时不变）"""
+        return self._generation
+
+    def _parsed_keys(self) -> Dict[Hashable, Any]:
+        """当前集合内 密钥材料标识 -> 已解析 Key"""
+        return {
+            fingerprint: self._keys[kid][0]
+            for kid, fingerprint in self._fingerprints.items()
+            if fingerprint is not None
+        }
+
+    def add_key(self, kid: str, key: Any, algorithm: Optional[str] = None) -> "KeySet":
+        """加入（或替换）一个密钥
+
+        Returns:
+            self: 支持链式调用
+        """
+        algorithm = algorithm or self.default_algorithm
+        fingerprint = _key_fingerprint(key, algorithm)
+        parsed = self._parsed_keys().get(fingerprint) if fingerprint is not None else None
+        if parsed is None:
+            parsed = load_key(key, algorithm)
+        with self._lock:
+            replaced = kid in self._keys and (
+                fingerprint is None or self._fingerprints.get(kid) != fingerprint
+            )
+            keys = dict(self._keys)
+            keys[kid] = (parsed, algorithm)
+            fingerprints = dict(self._fingerprints)
+            fingerprints[kid] = fingerprint
+            self._keys, self._fingerprints = keys, fingerprints
+            if replaced:
+                self._generation += 1
+        return self
+
+    def remove_key(self, kid: str) -> bool:
+        """移除密钥（轮换结束、旧 Token 全部过期后调用）"""
+        with self._lock:
+            if kid not in self._keys:
+                return False
+            keys = dict(self._keys)
+            del keys[kid]
+            fingerprints = dict(self._fingerprints)
+            fingerprints.pop(kid, None)
+            self._keys, self._fingerprints = keys, fingerprints
+            self._generation += 1
+        return True
+
+    def get_key(self, kid: str) -> Optional[Tuple[Any, str]]:
+        """按 kid 获取 (Key, algorithm)"""
+        return self._keys.get(kid)
+
+    def load_jwks(self, jwks: Dict[str, Any]) -> int:
+        """用 JWKS 替换当前密钥集合
+
+        无 kid 或无法解析的 JWK 会被跳过并记录警告。
+
+        Returns:
+            int: 成功加载的密钥数
+        """
+        parsed_keys = self._parsed_keys()
+        keys: Dict[str, Tuple[Any, str]] = {}
+        fingerprints: Dict[str, Optional[Hashable]] = {}
+        for jwk_dict in jwks.get("keys", []):
+            kid = jwk_dict.get("kid")
+            if not kid or jwk_dict.get("use", "sig") != "sig":
+                continue
+            algorithm = jwk_dict.get("alg") or self.default_algorithm
+            fingerprint = _key_fingerprint(jwk_dict, algorithm)
+            parsed = parsed_keys.get(fingerprint)
+            try:
+                if parsed is None:
+                    parsed = load_key(jwk_dict, algorithm)
+            except ValueError as e:
+                logger.warning(f"跳过无法解析的 JWK (kid={kid}): {e}")
+                continue
+            keys[kid] = (parsed, algorithm)
+            fingerprints[kid] = fingerprint
+        with self._lock:
+            changed = any(
+                kid not in fingerprints or fingerprint is None or fingerprints[kid] != fingerprint
+                for kid, fingerprint in self._fingerprints.items()
+            )
+            self._keys, self._fingerprints = keys, fingerprints
+            if changed:
+                self._generation += 1
+        return len(keys)
+
+    def to_jwks(self) -> Dict[str, Any]:
+        """导出公钥 JWKS（对称密钥不公开）"""
+        keys = []
+        for kid, (key, algorithm) in self._keys.items():
+            if not is_asymmetric_algorithm(algorithm):
+                continue
+            public_jwk = key.public_key().to_dict()
+            public_jwk.update({"kid": kid, "alg": algorithm, "use": "sig"})
+            keys.append(public_jwk)
+        return {"keys": keys}
+
+    def refresh(self) -> bool:
+        """调用 loader 重新加载密钥
+
+        Returns:
+            bool: 是否刷新成功（未配置 loader 或 loader 失败返回 False，保留原有密钥）
+        """
+        if self.loader is None:
+            return False
+        self._last_refresh = time.monotonic()
+        try:
+            jwks = self.loader()
+        except Exception as e:
+            logger.warning(f"刷新 JWKS 失败: {e}")
+            return False
+        self.load_jwks(jwks)
+        return True
+
+    def resolve(self, token: str) -> Optional[Tuple[Any, str]]:
+        """按 Token 头部的 kid 选择验证密钥
+
+        kid 未知时，距上次刷新超过 min_refresh_interval 则按需刷新一次再查找。
+
+        Returns:
+            (Key, algorithm)，头部无 kid、kid 未知或头部无法解析时返回 None
+        """
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except Exception:
+            return None
+        if not kid:
+            return None
+
+        entry = self._keys.get(kid)
+        if entry is None and self.loader is not None:
+            if time.monotonic() - self._last_refresh >= self.min_refresh_interval:
+                self.refresh()
+                entry = self._keys.get(kid)
+        return entry
+
+    def _refresh_worker(self):
+        """后台刷新线程"""
+        while not self._stop_event.is_set():
+            self.refresh()
+            self._stop_event.wait(timeout=self.refresh_interval)
+
+    def close(self) -> None:
+        """停止后台刷新线程"""
+        self._stop_event.set()
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            self._refresh_thread.join(timeout=5)
+
+
+__all__ = [
+    "KeySet",
+    "TokenSigner",
+    "load_key",
+    "is_asymmetric_algorithm",
+]
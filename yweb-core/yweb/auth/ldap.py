@@ -7,6 +7,10 @@
 - Active Directory 认证
 - 用户属性同步
 - 组成员关系查询
+- 服务账号连接池（复用 Server 与 schema 信息，健康检查 + 空闲回收）
+- 用户名 -> DN 缓存
+- 嵌套组解析与组 -> 角色映射缓存
+- 异步认证提供者（阻塞的 ldap3 调用在线程池中执行，嵌套组按层并发查询）
 
 使用示例:
     from yweb.auth.ldap import LDAPManager, LDAPAuthProvider
@@ -31,24 +35,41 @@
     # 获取用户组
     groups = ldap_manager.get_user_groups("john")
 
+    # 应用关闭时释放连接池
+    ldap_manager.close()
+
 注意：
     此模块需要安装 ldap3 库：pip install ldap3
     对于 Active Directory，建议使用 LDAPS (636 端口) 或 STARTTLS
 """
 
+import asyncio
+import contextvars
+import inspect
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Optional, List, Dict, Any, Callable
+from typing import Optional, List, Dict, Any, Callable, Deque, Iterable, Set, Tuple, TypeVar, Union
 from enum import Enum
 
+from cachetools import TTLCache
+
+from yweb.log import get_logger
 from .base import AuthProvider, AuthType, UserIdentity, AuthResult
 
+logger = get_logger("yweb.auth.ldap")
+
+T = TypeVar("T")
+
 
 # 尝试导入 ldap3
 try:
     import ldap3
-    from ldap3 import Server, Connection, ALL, SUBTREE, NTLM
-    from ldap3.core.exceptions import LDAPException, LDAPBindError
+    from ldap3 import Server, Connection, ALL, BASE, SUBTREE, NTLM
+    from ldap3.core.exceptions import LDAPException, LDAPBindError, LDAPOperationResult
     LDAP3_AVAILABLE = True
 except ImportError:
     LDAP3_AVAILABLE = False
@@ -74,6 +95,10 @@ class LDAPConfig:
         use_ssl: 是否使用 SSL
         use_tls: 是否使用 STARTTLS
         timeout: 连接超时（秒）
+        pool_size: 服务账号连接池保留的最大空闲连接数（0 表示不复用连接）
+        pool_idle_timeout: 空闲连接回收时间（秒）
+        dn_cache_ttl: 用户名 -> DN 缓存时间（秒，0 表示不缓存）
+        dn_cache_maxsize: DN 缓存最大条目数
     """
     server: str
     base_dn: str
@@ -84,6 +109,12 @@ class LDAPConfig:
     use_tls: bool = False
     timeout: int = 10
     
+    # 连接池与缓存配置
+    pool_size: int = 5
+    pool_idle_timeout: int = 300
+    dn_cache_ttl: int = 300
+    dn_cache_maxsize: int = 1024
+    
     # 用户搜索配置
     user_search_base: Optional[str] = None  # 用户搜索基础 DN，默认使用 base_dn
     user_search_filter: str = "(uid={username})"  # 用户搜索过滤器
@@ -176,9 +207,11 @@ class LDAPManager:
         use_tls: bool = False,
         timeout: int = 10,
         config: LDAPConfig = None,
+        pool_size: int = 5,
+        dn_cache_ttl: int = 300,
     ):
         """
-        可以通过参数或 config 对象初始化。
+        可以通过参数或 config 对象初始化（使用 config 时以 config 中的连接池配置为准）。
         """
         if not LDAP3_AVAILABLE:
             raise ImportError(
@@ -197,6 +230,8 @@ class LDAPManager:
                 use_ssl=use_ssl,
                 use_tls=use_tls,
                 timeout=timeout,
+                pool_size=pool_size,
+                dn_cache_ttl=dn_cache_ttl,
             )
         
         # 设置 AD 特定的默认值
@@ -206,6 +241,23 @@ class LDAPManager:
             if "username" in self.config.attributes_mapping:
                 if self.config.attributes_mapping["username"] == "uid":
                     self.config.attributes_mapping["username"] = "sAMAccountName"
+        
+        # Server 对象（含 schema 信息）在所有连接间共享，只在首次绑定时读取
+        self._server: Optional["Server"] = None
+        self._server_lock = threading.Lock()
+        
+        # 服务账号连接池：(连接, 归还时间)
+        self._pool: Deque[Tuple["Connection", float]] = deque()
+        self._pool_lock = threading.Lock()
+        
+        # 用户名 -> DN 缓存
+        self._dn_cache: Optional[TTLCache] = None
+        if self.config.dn_cache_ttl > 0:
+            self._dn_cache = TTLCache(
+                maxsize=self.config.dn_cache_maxsize,
+                ttl=self.config.dn_cache_ttl,
+            )
+        self._dn_cache_lock = threading.Lock()
     
     def _create_server(self) -> "Server":
         """创建 LDAP 服务器对象"""
@@ -216,14 +268,26 @@ class LDAPManager:
             connect_timeout=self.config.timeout,
         )
     
+    def _get_server(self) -> "Server":
+        """获取共享的 LDAP 服务器对象"""
+        if self._server is None:
+            with self._server_lock:
+                if self._server is None:
+                    self._server = self._create_server()
+        return self._server
+    
     def _create_connection(
         self,
         user_dn: str = None,
         password: str = None,
         auto_bind: bool = True,
     ) -> "Connection":
-        """创建 LDAP 连接"""
-        server = self._create_server()
+        """创建 LDAP 连接
+        
+        复用共享的 Server 对象，仅在尚未获取服务器信息时读取 schema；
+        启用 STARTTLS 时先升级再绑定，避免明文发送凭证。
+        """
+        server = self._get_server()
         
         # 使用提供的凭证或管理员凭证
         dn = user_dn or self.config.bind_dn
@@ -245,16 +309,131 @@ class LDAPManager:
             user=dn,
             password=pwd,
             authentication=authentication,
-            auto_bind=auto_bind,
+            auto_bind=False,
             raise_exceptions=True,
+            receive_timeout=self.config.timeout,
         )
         
-        # STARTTLS
-        if self.config.use_tls and not self.config.use_ssl:
-            conn.start_tls()
+        if auto_bind:
+            conn.open(read_server_info=False)
+            # STARTTLS
+            if self.config.use_tls and not self.config.use_ssl:
+                conn.start_tls(read_server_info=False)
+            try:
+                bound = conn.bind(read_server_info=server.info is None)
+            except LDAPOperationResult as e:
+                conn.unbind()
+                raise LDAPBindError(str(e)) from e
+            if not bound:
+                conn.unbind()
+                raise LDAPBindError(conn.last_error or "bind failed")
         
         return conn
     
+    # ==================== 服务账号连接池 ====================
+    
+    @staticmethod
+    def _is_healthy(conn: "Connection") -> bool:
+        """连接是否仍可用（未关闭且已绑定）"""
+        return not getattr(conn, "closed", False) and getattr(conn, "bound", True)
+    
+    @staticmethod
+    def _discard(conn: "Connection") -> None:
+        """关闭连接，忽略关闭过程中的异常"""
+        try:
+            conn.unbind()
+        except Exception:
+            pass
+    
+    def _acquire_connection(self) -> Tuple["Connection", bool]:
+        """从连接池获取服务账号连接
+        
+        Returns:
+            tuple: (连接, 是否为复用的连接)
+        """
+        now = time.monotonic()
+        while True:
+            with self._pool_lock:
+                if not self._pool:
+                    break
+                conn, released_at = self._pool.pop()
+            if now - released_at > self.config.pool_idle_timeout or not self._is_healthy(conn):
+                self._discard(conn)
+                continue
+            return conn, True
+        return self._create_connection(), False
+    
+    def _release_connection(self, conn: "Connection") -> None:
+        """归还连接，超出池容量时关闭"""
+        if self._is_healthy(conn):
+            with self._pool_lock:
+                if len(self._pool) < self.config.pool_size:
+                    self._pool.append((conn, time.monotonic()))
+                    return
+        self._discard(conn)
+    
+    def _with_service_connection(self, operation: Callable[["Connection"], T]) -> T:
+        """使用服务账号连接执行操作
+        
+        复用的连接可能已被服务器断开，失败时丢弃并用新连接重试一次。
+        """
+        conn, reused = self._acquire_connection()
+        try:
+            return self._run_with_connection(conn, operation)
+        except LDAPException:
+            if not reused:
+                raise
+        return self._run_with_connection(self._create_connection(), operation)
+    
+    def _run_with_connection(self, conn: "Connection", operation: Callable[["Connection"], T]) -> T:
+        """执行操作：成功时归还连接，任何异常都丢弃连接，避免连接泄漏"""
+        succeeded = False
+        try:
+            result = operation(conn)
+            succeeded = True
+            return result
+        finally:
+            if succeeded:
+                self._release_connection(conn)
+            else:
+                self._discard(conn)
+    
+    def close(self) -> None:
+        """关闭连接池中的所有连接"""
+        with self._pool_lock:
+            pooled = list(self._pool)
+            self._pool.clear()
+        for conn, _ in pooled:
+            self._discard(conn)
+    
+    # ==================== DN 缓存 ====================
+    
+    def _get_cached_dn(self, username: str) -> Optional[str]:
+        if self._dn_cache is None:
+            return None
+        with self._dn_cache_lock:
+            return self._dn_cache.get(username)
+    
+    def _cache_dn(self, username: str, user_dn: str) -> None:
+        if self._dn_cache is None:
+            return
+        with self._dn_cache_lock:
+            self._dn_cache[username] = user_dn
+    
+    def clear_dn_cache(self, username: Optional[str] = None) -> None:
+        """清除 DN 缓存
+        
+        Args:
+            username: 指定用户名；为 None 时清空全部
+        """
+        if self._dn_cache is None:
+            return
+        with self._dn_cache_lock:
+            if username is None:
+                self._dn_cache.clear()
+            else:
+                self._dn_cache.pop(username, None)
+    
     def authenticate(
         self,
         username: str,
@@ -275,7 +454,7 @@ class LDAPManager:
             if not user_dn:
                 return False, "User not found"
             
-            # 尝试绑定
+            # 使用短连接进行用户绑定（共享 Server，不重复读取 schema）
             try:
                 conn = self._create_connection(user_dn, password)
                 conn.unbind()
@@ -300,29 +479,33 @@ class LDAPManager:
         if self.config.user_dn_template:
             return self.config.user_dn_template.format(username=username)
         
-        # 搜索用户
-        try:
-            conn = self._create_connection()
-            
-            search_base = self.config.user_search_base or self.config.base_dn
-            search_filter = self.config.user_search_filter.format(username=username)
-            
+        cached = self._get_cached_dn(username)
+        if cached:
+            return cached
+        
+        search_base = self.config.user_search_base or self.config.base_dn
+        search_filter = self.config.user_search_filter.format(username=username)
+        
+        def search(conn) -> Optional[str]:
             conn.search(
                 search_base=search_base,
                 search_filter=search_filter,
                 search_scope=SUBTREE,
                 attributes=["distinguishedName", "dn"],
             )
-            
             if conn.entries:
-                entry = conn.entries[0]
-                return str(entry.entry_dn)
-            
-            conn.unbind()
+                return str(conn.entries[0].entry_dn)
             return None
-            
+        
+        # 搜索用户
+        try:
+            user_dn = self._with_service_connection(search)
         except LDAPException:
             return None
+        
+        if user_dn:
+            self._cache_dn(username, user_dn)
+        return user_dn
     
     def get_user(self, username: str) -> Optional[LDAPUser]:
         """获取用户信息
@@ -333,29 +516,27 @@ class LDAPManager:
         Returns:
             LDAPUser: 用户信息对象
         """
-        try:
-            conn = self._create_connection()
-            
-            search_base = self.config.user_search_base or self.config.base_dn
-            search_filter = self.config.user_search_filter.format(username=username)
-            
-            # 获取所有配置的属性
-            attributes = list(self.config.attributes_mapping.values())
-            attributes.append("memberOf")  # 组成员关系
-            
+        search_base = self.config.user_search_base or self.config.base_dn
+        search_filter = self.config.user_search_filter.format(username=username)
+        
+        # 获取所有配置的属性
+        attributes = list(self.config.attributes_mapping.values())
+        attributes.append("memberOf")  # 组成员关系
+        
+        def search(conn):
             conn.search(
                 search_base=search_base,
                 search_filter=search_filter,
                 search_scope=SUBTREE,
                 attributes=attributes,
             )
-            
-            if not conn.entries:
-                conn.unbind()
+            return conn.entries[0] if conn.entries else None
+        
+        try:
+            entry = self._with_service_connection(search)
+            if entry is None:
                 return None
             
-            entry = conn.entries[0]
-            
             # 解析属性
             user = LDAPUser(
                 dn=str(entry.entry_dn),
@@ -377,7 +558,7 @@ class LDAPManager:
                 if member_of:
                     user.groups = self._parse_groups(member_of)
             
-            conn.unbind()
+            self._cache_dn(username, user.dn)
             return user
             
         except LDAPException as e:
@@ -397,6 +578,36 @@ class LDAPManager:
             return user.groups
         return []
     
+    def get_group_parents(self, group_dn: str) -> List[str]:
+        """获取组的上级组 DN（组自身的 memberOf）
+        
+        用于解析嵌套组：用户直接所属的组可能又是其他组的成员。
+        
+        Args:
+            group_dn: 组 DN
+            
+        Returns:
+            List[str]: 上级组 DN 列表，查询失败时返回空列表
+        """
+        def search(conn) -> List[str]:
+            conn.search(
+                search_base=group_dn,
+                search_filter="(objectClass=*)",
+                search_scope=BASE,
+                attributes=["memberOf"],
+            )
+            if not conn.entries:
+                return []
+            entry = conn.entries[0]
+            if not hasattr(entry, "memberOf"):
+                return []
+            return [str(dn) for dn in entry.memberOf.values or []]
+        
+        try:
+            return self._with_service_connection(search)
+        except LDAPException:
+            return []
+    
     def _parse_groups(self, member_of: List[str]) -> List[str]:
         """从 memberOf 属性解析组名"""
         groups = []
@@ -426,12 +637,10 @@ class LDAPManager:
         Returns:
             List[Dict]: 用户列表
         """
-        try:
-            conn = self._create_connection()
-            
-            search_base = self.config.user_search_base or self.config.base_dn
-            attrs = attributes or list(self.config.attributes_mapping.values())
-            
+        search_base = self.config.user_search_base or self.config.base_dn
+        attrs = attributes or list(self.config.attributes_mapping.values())
+        
+        def search(conn) -> List[Dict[str, Any]]:
             conn.search(
                 search_base=search_base,
                 search_filter=filter_str,
@@ -447,9 +656,10 @@ class LDAPManager:
                 }
                 user_dict.update(entry.entry_attributes_as_dict)
                 users.append(user_dict)
-            
-            conn.unbind()
             return users
+        
+        try:
+            return self._with_service_connection(search)
             
         except LDAPException:
             return []
@@ -471,6 +681,28 @@ class LDAPManager:
             return False, f"Error: {str(e)}"
 
 
+RoleMapping = Union[Dict[str, List[str]], Callable[[str], Iterable[str]]]
+
+
+def _member_of_dns(ldap_user: LDAPUser) -> List[str]:
+    """用户直接所属组的 DN（get_user 返回的原始 memberOf 属性）"""
+    member_of = ldap_user.raw_attributes.get("memberOf") or []
+    if isinstance(member_of, str):
+        member_of = [member_of]
+    return [str(dn) for dn in member_of]
+
+
+def _next_group_level(parents: Iterable[List[str]], seen: Set[str]) -> List[str]:
+    """合并一层查询结果，返回尚未访问过的上级组 DN"""
+    level = []
+    for dns in parents:
+        for dn in dns:
+            if dn not in seen:
+                seen.add(dn)
+                level.append(dn)
+    return level
+
+
 class LDAPAuthProvider(AuthProvider):
     """LDAP 认证提供者
     
@@ -493,40 +725,70 @@ class LDAPAuthProvider(AuthProvider):
     def __init__(
         self,
         ldap_manager: LDAPManager,
-        role_mapping: Dict[str, List[str]] = None,
+        role_mapping: RoleMapping = None,
         user_sync_callback: Callable[[LDAPUser], Any] = None,
+        resolve_nested_groups: bool = False,
+        max_group_depth: int = 5,
+        role_cache_ttl: int = 300,
+        role_cache_size: int = 1024,
     ):
         """
         Args:
             ldap_manager: LDAP 管理器
-            role_mapping: LDAP 组到角色的映射
+            role_mapping: LDAP 组到角色的映射，字典或 ``(group) -> 角色列表`` 函数
             user_sync_callback: 用户同步回调（用于同步用户到本地数据库）
+            resolve_nested_groups: 是否解析嵌套组（组的 memberOf 逐层向上查询）
+            max_group_depth: 嵌套组最大解析层数
+            role_cache_ttl: 函数式 role_mapping 的组 -> 角色缓存时间（秒，0 表示不缓存）
+            role_cache_size: 组 -> 角色缓存最大条目数
         """
+        if max_group_depth < 1:
+            raise ValueError("max_group_depth 必须大于等于 1")
         self.ldap_manager = ldap_manager
         self.role_mapping = role_mapping or {}
         self.user_sync_callback = user_sync_callback
+        self.resolve_nested_groups = resolve_nested_groups
+        self.max_group_depth = max_group_depth
+        
+        # 组 -> 角色缓存（仅函数式映射需要，字典映射本身就是 O(1) 查找）
+        self._role_cache: Optional[TTLCache] = None
+        if callable(self.role_mapping) and role_cache_ttl > 0:
+            self._role_cache = TTLCache(maxsize=role_cache_size, ttl=role_cache_ttl)
+        self._role_cache_lock = threading.Lock()
     
     @property
     def auth_type(self) -> AuthType:
         return AuthType.LDAP
     
-    def authenticate(self, credentials: Any) -> AuthResult:
-        """验证 LDAP 凭证
+    @staticmethod
+    def _parse_credentials(credentials: Any) -> Tuple[Optional[str], Optional[str], Optional[AuthResult]]:
+        """校验凭证格式
         
-        Args:
-            credentials: 凭证字典 {"username": "xxx", "password": "xxx"}
-            
         Returns:
-            AuthResult: 认证结果
+            tuple: (username, password, 失败结果或 None)
         """
         if not isinstance(credentials, dict):
-            return AuthResult.fail("Invalid credentials format", "INVALID_CREDENTIALS")
+            return None, None, AuthResult.fail("Invalid credentials format", "INVALID_CREDENTIALS")
         
         username = credentials.get("username")
         password = credentials.get("password")
         
         if not username or not password:
-            return AuthResult.fail("Username and password required", "MISSING_CREDENTIALS")
+            return None, None, AuthResult.fail("Username and password required", "MISSING_CREDENTIALS")
+        return username, password, None
+    
+    def authenticate(self, credentials: Any) -> AuthResult:
+        """验证 LDAP 凭证
+        
+        Args:
+            credentials: 凭证字典 {"username": "xxx", "password": "xxx"}
+            
+        Returns:
+            AuthResult: 认证结果
+        """
+        username, password, error = self._parse_credentials(credentials)
+        if error:
+            return error
         
         # LDAP 认证
         success, result = self.ldap_manager.authenticate(username, password)
@@ -535,19 +797,46 @@ class LDAPAuthProvider(AuthProvider):
             return AuthResult.fail(result, "LDAP_AUTH_FAILED")
         
         ldap_user = result
+        if self.resolve_nested_groups:
+            ldap_user.groups = self._resolve_groups(ldap_user)
         
         # 映射角色
         roles = self._map_roles(ldap_user.groups)
         
         # 同步用户（如果配置了回调）
-        local_user_id = None
+        local_user = None
         if self.user_sync_callback:
             local_user = self.user_sync_callback(ldap_user)
-            if local_user:
-                local_user_id = getattr(local_user, "id", None)
         
-        # 构建用户身份
-        identity = UserIdentity(
+        return AuthResult.ok(self._build_identity(ldap_user, roles, local_user))
+    
+    def _resolve_groups(self, ldap_user: LDAPUser) -> List[str]:
+        """逐层查询上级组，返回包含嵌套组在内的全部组名"""
+        member_of = _member_of_dns(ldap_user)
+        seen = set(member_of)
+        level = member_of
+        for _ in range(self.max_group_depth):
+            if not level:
+                break
+            level = _next_group_level(
+                (self.ldap_manager.get_group_parents(dn) for dn in level), seen,
+            )
+        return self._merge_groups(ldap_user, seen)
+    
+    def _merge_groups(self, ldap_user: LDAPUser, group_dns: Iterable[str]) -> List[str]:
+        """把嵌套组名追加到用户直接所属组之后（保持原顺序、去重）"""
+        groups = list(ldap_user.groups)
+        known = set(groups)
+        for name in self.ldap_manager._parse_groups(sorted(group_dns)):
+            if name not in known:
+                known.add(name)
+                groups.append(name)
+        return groups
+    
+    def _build_identity(self, ldap_user: LDAPUser, roles: List[str], local_user: Any = None) -> UserIdentity:
+        """构建用户身份"""
+        local_user_id = getattr(local_user, "id", None) if local_user else None
+        return UserIdentity(
             user_id=local_user_id or ldap_user.username,
             username=ldap_user.username,
             email=ldap_user.email,
@@ -563,25 +852,181 @@ class LDAPAuthProvider(AuthProvider):
                 "title": ldap_user.title,
             },
         )
+    
+    def _roles_for_group(self, group: str) -> List[str]:
+        """单个组对应的角色（函数式映射的结果按组缓存）"""
+        if not callable(self.role_mapping):
+            # 默认将组名作为角色
+            return self.role_mapping.get(group, [group])
         
-        return AuthResult.ok(identity)
+        if self._role_cache is not None:
+            with self._role_cache_lock:
+                cached = self._role_cache.get(group)
+            if cached is not None:
+                return cached
+        
+        roles = list(self.role_mapping(group) or [])
+        if self._role_cache is not None:
+            with self._role_cache_lock:
+                self._role_cache[group] = roles
+        return roles
     
     def _map_roles(self, groups: List[str]) -> List[str]:
         """将 LDAP 组映射到角色"""
         roles = []
         for group in groups:
-            if group in self.role_mapping:
-                roles.extend(self.role_mapping[group])
-            else:
-                # 默认将组名作为角色
-                roles.append(group)
+            roles.extend(self._roles_for_group(group))
         return list(set(roles))  # 去重
     
+    def clear_role_cache(self, group: Optional[str] = None) -> None:
+        """清除组 -> 角色缓存
+        
+        Args:
+            group: 指定组名；为 None 时清空全部
+        """
+        if self._role_cache is None:
+            return
+        with self._role_cache_lock:
+            if group is None:
+                self._role_cache.clear()
+            else:
+                self._role_cache.pop(group, None)
+    
     def validate_token(self, token: str) -> AuthResult:
         """LDAP 不支持 Token 验证"""
         return AuthResult.fail("LDAP does not support token validation", "NOT_SUPPORTED")
 
 
+class AsyncLDAPAuthProvider(LDAPAuthProvider):
+    """异步 LDAP 认证提供者
+    
+    ldap3 的绑定与搜索都是阻塞调用。``aauthenticate`` 把它们放到线程池执行，
+    不占用事件循环；启用 resolve_nested_groups 时，同一层的上级组查询并发发出，
+    总耗时约为 层数 × 单次往返，而不是 组数 × 单次往返。
+    
+    同步的 ``authenticate`` 仍然可用（行为与 LDAPAuthProvider 一致）。
+    
+    使用示例:
+        provider = AsyncLDAPAuthProvider(
+            ldap_manager,
+            role_mapping=lambda group: role_service.roles_for_group(group),
+            resolve_nested_groups=True,
+        )
+        
+        result = await provider.aauthenticate({
+            "username": "john",
+            "password": "secret",
+        })
+        
+        # 应用关闭时
+        provider.close()
+    """
+    
+    def __init__(
+        self,
+        ldap_manager: LDAPManager,
+        role_mapping: RoleMapping = None,
+        user_sync_callback: Callable[[LDAPUser], Any] = None,
+        resolve_nested_groups: bool = False,
+        max_group_depth: int = 5,
+        role_cache_ttl: int = 300,
+        role_cache_size: int = 1024,
+        executor: Optional[Executor] = None,
+        max_workers: int = 8,
+    ):
+        """
+        Args:
+            executor: 执行阻塞 LDAP 调用的线程池；为 None 时创建专用线程池
+            max_workers: 专用线程池的线程数（同时也是单层嵌套组查询的最大并发数）
+            
+        其余参数同 LDAPAuthProvider。
+        user_sync_callback 可以是协程函数（直接 await），普通函数放到线程池执行。
+        """
+        super().__init__(
+            ldap_manager,
+            role_mapping=role_mapping,
+            user_sync_callback=user_sync_callback,
+            resolve_nested_groups=resolve_nested_groups,
+            max_group_depth=max_group_depth,
+            role_cache_ttl=role_cache_ttl,
+            role_cache_size=role_cache_size,
+        )
+        if executor is None and max_workers < 1:
+            raise ValueError("max_workers 必须大于等于 1")
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="yweb-ldap",
+        )
+    
+    async def _run(self, fn: Callable[..., T], *args) -> T:
+        """在线程池中执行阻塞调用
+        
+        复制当前上下文（request_id 等 ContextVar），使回调中的 ORM 访问
+        使用当前请求的 session，而不是在工作线程里生成并锁定新的 request_id。
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, contextvars.copy_context().run, fn, *args)
+    
+    async def aauthenticate(self, credentials: Any) -> AuthResult:
+        """异步验证 LDAP 凭证
+        
+        Args:
+            credentials: 凭证字典 {"username": "xxx", "password": "xxx"}
+            
+        Returns:
+            AuthResult: 认证结果
+        """
+        username, password, error = self._parse_credentials(credentials)
+        if error:
+            return error
+        
+        success, result = await self._run(self.ldap_manager.authenticate, username, password)
+        if not success:
+            return AuthResult.fail(result, "LDAP_AUTH_FAILED")
+        
+        ldap_user = result
+        if self.resolve_nested_groups:
+            ldap_user.groups = await self._aresolve_groups(ldap_user)
+        
+        # 函数式映射可能查库，放到线程池；字典映射直接计算
+        if callable(self.role_mapping):
+            roles = await self._run(self._map_roles, ldap_user.groups)
+        else:
+            roles = self._map_roles(ldap_user.groups)
+        
+        local_user = None
+        if self.user_sync_callback:
+            # 普通同步回调通常会查库，不能阻塞事件循环
+            if inspect.iscoroutinefunction(self.user_sync_callback):
+                local_user = await self.user_sync_callback(ldap_user)
+            else:
+                local_user = await self._run(self.user_sync_callback, ldap_user)
+                if inspect.isawaitable(local_user):
+                    local_user = await local_user
+        
+        return AuthResult.ok(self._build_identity(ldap_user, roles, local_user))
+    
+    async def _aresolve_groups(self, ldap_user: LDAPUser) -> List[str]:
+        """按层并发查询上级组"""
+        member_of = _member_of_dns(ldap_user)
+        seen = set(member_of)
+        level = member_of
+        for _ in range(self.max_group_depth):
+            if not level:
+                break
+            parents = await asyncio.gather(
+                *(self._run(self.ldap_manager.get_group_parents, dn) for dn in level)
+            )
+            level = _next_group_level(parents, seen)
+        return self._merge_groups(ldap_user, seen)
+    
+    def close(self) -> None:
+        """关闭专用线程池（外部传入的 executor 由调用方负责关闭）"""
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
+
+
 # 便捷函数：创建常见的 LDAP 配置
 def create_openldap_config(
     server: str,
@@ -31,7 +31,12 @@ from .base import (
     MFAVerifyResult,
 )
 
-from .totp import TOTPProvider
+from .totp import (
+    TOTPProvider,
+    TOTPReplayCache,
+    MemoryTOTPReplayCache,
+    RedisTOTPReplayCache,
+)
 from .otp import OTPProvider, SMSProvider, EmailProvider
 from .recovery import RecoveryCodeProvider
 from .manager import MFAManager
@@ -45,6 +50,9 @@ __all__ = [
     
     # Providers
     "TOTPProvider",
+    "TOTPReplayCache",
+    "MemoryTOTPReplayCache",
+    "RedisTOTPReplayCache",
     "OTPProvider",
     "SMSProvider",
     "EmailProvider",
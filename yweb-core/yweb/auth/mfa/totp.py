@@ -10,10 +10,13 @@
     print(setup_data.secret)  # JBSWY3DPEHPK3PXP
     print(setup_data.uri)  # otpauth://totp/MyApp:john?secret=...
     
-    # 验证代码
+    # 验证代码（同一验证码及窗口内更早的验证码在通过后都不能再使用）
     result = provider.verify(user_id=1, code="123456")
     if result.success:
         print("验证成功")
+    
+    # 多实例部署：防重放记录存到 Redis
+    provider = TOTPProvider(issuer="MyApp", replay_cache=RedisTOTPReplayCache(redis_client))
 """
 
 import time
@@ -21,7 +24,10 @@ import hmac
 import struct
 import base64
 import hashlib
-from typing import Optional, Any, Dict, Callable
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Any, Dict, Callable, Iterable, List, Mapping, Tuple, Union
 from urllib.parse import quote
 
 from .base import MFAProvider, MFAType, MFASetupData, MFAVerifyResult
@@ -35,6 +41,11 @@ def _generate_secret(length: int = 32) -> str:
     return base64.b32encode(random_bytes).decode("utf-8").rstrip("=")
 
 
+def _decode_secret(secret: str) -> bytes:
+    """解码 Base32 密钥"""
+    return base64.b32decode(secret.upper() + "=" * (-len(secret) % 8))
+
+
 def _hotp(secret: str, counter: int, digits: int = 6) -> str:
     """HOTP (HMAC-based One-Time Password)
     
@@ -47,7 +58,7 @@ def _hotp(secret: str, counter: int, digits: int = 6) -> str:
         str: 一次性密码
     """
     # 解码密钥
-    key = base64.b32decode(secret.upper() + "=" * (-len(secret) % 8))
+    key = _decode_secret(secret)
     
     # 计算 HMAC
     counter_bytes = struct.pack(">Q", counter)
@@ -81,6 +92,43 @@ def _totp(secret: str, time_step: int = 30, digits: int = 6, timestamp: int = No
     return _hotp(secret, counter, digits)
 
 
+def _window_codes(secret: str, counter: int, window: int, digits: int) -> Tuple[Tuple[int, str], ...]:
+    """计算时间窗口内全部 (时间步, 验证码)
+    
+    不做缓存：每个时间步一次 HMAC-SHA1 开销很小，缓存反而会把明文密钥和有效验证码长期留在进程内存中。
+    """
+    return tuple(
+        (step, _hotp(secret, step, digits))
+        for step in range(counter - window, counter + window + 1)
+    )
+
+
+def _match_totp(
+    secret: str,
+    code: str,
+    time_step: int = 30,
+    digits: int = 6,
+    window: int = 1,
+    timestamp: int = None,
+) -> Optional[int]:
+    """在时间窗口内匹配 TOTP
+    
+    与窗口内每个验证码都做一次常量时间比较（不提前返回），
+    耗时与验证码是否正确、匹配到哪个时间步无关。
+    
+    Returns:
+        匹配的时间步，未匹配返回 None
+    """
+    if timestamp is None:
+        timestamp = int(time.time())
+    
+    matched = None
+    for step, expected in _window_codes(secret, timestamp // time_step, window, digits):
+        if hmac.compare_digest(code, expected):
+            matched = step
+    return matched
+
+
 def _verify_totp(
     secret: str,
     code: str,
@@ -102,17 +150,93 @@ def _verify_totp(
     Returns:
         bool: 是否验证通过
     """
-    if timestamp is None:
-        timestamp = int(time.time())
+    return _match_totp(secret, code, time_step, digits, window, timestamp) is not None
+
+
+class TOTPReplayCache(ABC):
+    """TOTP 防重放缓存
     
-    # 在时间窗口内验证
-    for offset in range(-window, window + 1):
-        check_time = timestamp + (offset * time_step)
-        expected = _totp(secret, time_step, digits, check_time)
-        if hmac.compare_digest(code, expected):
-            return True
+    记录每个用户最后一次通过验证的时间步，拒绝不大于它的时间步（RFC 6238 第 5.2 节）：
+    同一验证码不能再次使用，窗口内更早的验证码也不能在之后被使用。
+    """
     
-    return False
+    @abstractmethod
+    def mark_used(self, user_id: Any, step: int, ttl: int) -> bool:
+        """登记用户本次通过验证的时间步
+        
+        Args:
+            user_id: 用户 ID
+            step: 匹配到的时间步
+            ttl: 记录保留时间（秒），超过验证窗口后即可丢弃
+            
+        Returns:
+            bool: step 大于该用户上次登记的时间步时登记并返回 True，否则返回 False
+        """
+        pass
+
+
+class MemoryTOTPReplayCache(TOTPReplayCache):
+    """内存防重放缓存（单进程）
+    
+    Args:
+        maxsize: 最大记录数（用户数），超出时淘汰最早的记录
+    """
+    
+    def __init__(self, maxsize: int = 100000):
+        self.maxsize = maxsize
+        self._used: "OrderedDict[Any, Tuple[int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def mark_used(self, user_id: Any, step: int, ttl: int) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            # 记录按写入顺序排列，TTL 相同，从头部清理过期记录即可
+            while self._used:
+                oldest_key, (_, expires_at) = next(iter(self._used.items()))
+                if expires_at > now and len(self._used) < self.maxsize:
+                    break
+                del self._used[oldest_key]
+            
+            last = self._used.get(user_id)
+            if last is not None and last[1] > now and step <= last[0]:
+                return False
+            self._used[user_id] = (step, now + ttl)
+            self._used.move_to_end(user_id)
+        return True
+    
+    def clear(self) -> None:
+        """清空记录"""
+        with self._lock:
+            self._used.clear()
+
+
+class RedisTOTPReplayCache(TOTPReplayCache):
+    """Redis 防重放缓存（多实例部署）
+    
+    每个用户一个键保存最后通过验证的时间步，Lua 脚本原子比较并写入，自动过期。
+    
+    Args:
+        redis_client: Redis 客户端实例
+        prefix: 键前缀
+    """
+    
+    # KEYS[1]=用户键；ARGV: step, ttl
+    _MARK_USED_LUA = """
+    local last = redis.call('GET', KEYS[1])
+    if last and tonumber(last) >= tonumber(ARGV[1]) then
+        return 0
+    end
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+    return 1
+    """
+    
+    def __init__(self, redis_client, prefix: str = "totp:used:"):
+        self._redis = redis_client
+        self._prefix = prefix
+        self._mark_used_script = redis_client.register_script(self._MARK_USED_LUA)
+    
+    def mark_used(self, user_id: Any, step: int, ttl: int) -> bool:
+        return bool(self._mark_used_script(keys=[f"{self._prefix}{user_id}"], args=[step, ttl]))
 
 
 class TOTPProvider(MFAProvider):
@@ -128,6 +252,10 @@ class TOTPProvider(MFAProvider):
         secret_length: 密钥长度
         secret_store: 密钥存储回调
         secret_getter: 密钥获取回调
+        replay_cache: 防重放缓存。
+            - True（默认）: 使用进程内 MemoryTOTPReplayCache
+            - TOTPReplayCache 实例: 如多实例部署使用 RedisTOTPReplayCache
+            - False / None: 不防重放
     """
     
     def __init__(
@@ -139,6 +267,7 @@ class TOTPProvider(MFAProvider):
         secret_length: int = 32,
         secret_store: Callable[[Any, str], bool] = None,
         secret_getter: Callable[[Any], Optional[str]] = None,
+        replay_cache: Union[bool, TOTPReplayCache, None] = True,
     ):
         self.issuer = issuer
         self.digits = digits
@@ -146,6 +275,11 @@ class TOTPProvider(MFAProvider):
         self.window = window
         self.secret_length = secret_length
         
+        # 防重放
+        if replay_cache is True:
+            replay_cache = MemoryTOTPReplayCache()
+        self.replay_cache: Optional[TOTPReplayCache] = replay_cache or None
+        
         # 存储回调
         self._secret_store = secret_store
         self._secret_getter = secret_getter
@@ -251,8 +385,41 @@ class TOTPProvider(MFAProvider):
         Returns:
             MFAVerifyResult: 验证结果
         """
-        # 获取密钥
-        secret = self._get_secret(user_id)
+        return self._verify_secret(user_id, self._get_secret(user_id), code, int(time.time()))
+    
+    def verify_many(
+        self,
+        codes: Union[Mapping[Any, str], Iterable[Tuple[Any, str]]],
+        timestamp: Optional[int] = None,
+    ) -> List[Tuple[Any, MFAVerifyResult]]:
+        """批量验证 TOTP 代码
+        
+        用于迁移、批量核对等工具场景：所有代码按同一时间戳验证，
+        通过的代码同样登记到防重放缓存。
+        
+        Args:
+            codes: {user_id: code} 或 (user_id, code) 序列
+            timestamp: 验证时间戳（默认当前时间）
+            
+        Returns:
+            [(user_id, MFAVerifyResult), ...]，顺序与输入一致
+        """
+        if timestamp is None:
+            timestamp = int(time.time())
+        items = codes.items() if isinstance(codes, Mapping) else codes
+        return [
+            (user_id, self._verify_secret(user_id, self._get_secret(user_id), code, timestamp))
+            for user_id, code in items
+        ]
+    
+    def _verify_secret(
+        self,
+        user_id: Any,
+        secret: Optional[str],
+        code: str,
+        timestamp: int,
+    ) -> MFAVerifyResult:
+        """用给定密钥验证代码并登记防重放"""
         if not secret:
             return MFAVerifyResult.fail("TOTP not configured for this user")
         
@@ -264,16 +431,24 @@ class TOTPProvider(MFAProvider):
             return MFAVerifyResult.fail(f"Code must be {self.digits} digits")
         
         # 验证代码
-        if _verify_totp(
+        step = _match_totp(
             secret=secret,
             code=code,
             time_step=self.time_step,
             digits=self.digits,
             window=self.window,
-        ):
-            return MFAVerifyResult.ok("TOTP verification successful")
+            timestamp=timestamp,
+        )
+        if step is None:
+            return MFAVerifyResult.fail("Invalid TOTP code")
+        
+        # 防重放：窗口内的验证码在窗口结束前都可能再次匹配，记录保留整个窗口
+        if self.replay_cache is not None:
+            ttl = (2 * self.window + 1) * self.time_step
+            if not self.replay_cache.mark_used(user_id, step, ttl):
+                return MFAVerifyResult.fail("TOTP code already used")
         
-        return MFAVerifyResult.fail("Invalid TOTP code")
+        return MFAVerifyResult.ok("TOTP verification successful")
     
     def is_enabled(self, user_id: Any) -> bool:
         """检查用户是否启用了 TOTP"""
@@ -4,6 +4,7 @@
 - AbstractUser: 用户抽象模型（BaseModel），包含登录认证所需的最小字段集
 - AbstractSimpleRole: 轻量级角色抽象模型（BaseModel），简单角色标识
 - AbstractLoginRecord: 登录记录抽象模型（CoreModel），审计日志
+- AbstractLoginRollup: 登录统计汇总抽象模型（CoreModel），按小时/天预聚合
 - RoleMixin: 角色管理 Mixin，为用户模型提供角色便捷方法
 
 角色模型层级关系:
@@ -49,7 +50,7 @@
 
 from typing import Optional, List
 from datetime import datetime, timezone
-from sqlalchemy import String, Boolean, DateTime, Integer, Text, Index
+from sqlalchemy import String, Boolean, DateTime, Integer, Text, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 from yweb.orm import BaseModel, CoreModel
@@ -548,6 +549,78 @@ class AbstractLoginRecord(CoreModel):
         return cls.query.count()
 
 
+class AbstractLoginRollup(CoreModel):
+    """登录统计汇总抽象基类
+    
+    按 小时/天 预聚合的登录次数，由 LoginAuditBuffer 批量写入时增量维护
+    （或 LoginAuditService(sync_rollups=True) 逐条维护）。配置后
+    count_logins_by_status()、get_recent_failures() 按时间桶求和，不再扫描原始登录记录表。
+    
+    每行是一个 (granularity, bucket_start, user_id, username, ip_address, status)
+    组合的计数。dimension_hash 为 (user_id, username, ip_address) 的摘要，
+    与 granularity、bucket_start、status 组成唯一约束，写入使用 upsert 累加，
+    并发写入同一组合不会产生重复行。
+    
+    使用示例:
+        class LoginRollup(AbstractLoginRollup):
+            __tablename__ = "login_rollup"
+        
+        buffer = LoginAuditBuffer(LoginRecord, rollup_model=LoginRollup)
+        audit_service = LoginAuditService(LoginRecord, buffer=buffer)
+    """
+    __abstract__ = True
+    
+    granularity: Mapped[str] = mapped_column(
+        String(10),
+        nullable=False,
+        comment="时间粒度: hour/day"
+    )
+    bucket_start: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        comment="时间桶起点（UTC）"
+    )
+    user_id: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        nullable=True,
+        comment="用户ID"
+    )
+    username: Mapped[str] = mapped_column(
+        String(255),
+        nullable=False,
+        comment="用户名"
+    )
+    ip_address: Mapped[str] = mapped_column(
+        String(50),
+        nullable=False,
+        comment="IP地址"
+    )
+    status: Mapped[str] = mapped_column(
+        String(20),
+        nullable=False,
+        comment="登录状态"
+    )
+    dimension_hash: Mapped[str] = mapped_column(
+        String(40),
+        nullable=False,
+        comment="(user_id, username, ip_address) 摘要，用于唯一约束"
+    )
+    login_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        comment="登录次数"
+    )
+    
+    # 定义索引（子类可以覆盖）
+    __table_args__ = (
+        UniqueConstraint('granularity', 'bucket_start', 'status', 'dimension_hash'),
+        Index('ix_login_rollup_user', 'granularity', 'user_id', 'bucket_start'),
+        Index('ix_login_rollup_username', 'granularity', 'username', 'bucket_start'),
+        Index('ix_login_rollup_bucket', 'granularity', 'bucket_start'),
+    )
+
+
 class RoleMixin:
     """角色管理 Mixin
     
@@ -603,5 +676,5 @@ class RoleMixin:
 
 __all__ = [
     "AbstractUser", "AbstractSimpleRole", "AbstractLoginRecord",
-    "RoleMixin",
+    "AbstractLoginRollup", "RoleMixin",
 ]
@@ -8,6 +8,10 @@
     - Device Code: 智能设备和 CLI 工具
     - Refresh Token: Token 刷新
 
+存储:
+    - MemoryOAuth2Store: 内存存储（默认，单进程）
+    - RedisOAuth2Store: Redis 存储（多实例部署）
+
 使用示例:
     from yweb.auth.oauth2 import (
         OAuth2Manager,
@@ -59,6 +63,7 @@ from .grants import (
     RefreshTokenGrant,
     DeviceCodeGrant,
 )
+from .store import OAuth2Store, MemoryOAuth2Store, RedisOAuth2Store
 from .manager import OAuth2Manager
 from .provider import OAuth2AuthProvider
 
@@ -78,6 +83,11 @@ __all__ = [
     "RefreshTokenGrant",
     "DeviceCodeGrant",
     
+    # Store
+    "OAuth2Store",
+    "MemoryOAuth2Store",
+    "RedisOAuth2Store",
+    
     # Manager
     "OAuth2Manager",
     
@@ -126,6 +126,7 @@ class AuthorizationCodeGrant(BaseGrant):
         code_consumer: Callable[[str], bool],
         access_token_expire_seconds: int = 3600,
         refresh_token_expire_seconds: int = 86400 * 30,
+        code_taker: Optional[Callable[[str], Optional[AuthorizationCode]]] = None,
     ):
         """
         Args:
@@ -133,9 +134,12 @@ class AuthorizationCodeGrant(BaseGrant):
             code_consumer: 标记授权码已使用
             access_token_expire_seconds: 访问令牌过期时间
             refresh_token_expire_seconds: 刷新令牌过期时间
+            code_taker: 原子地取出并删除授权码（可选）。设置后验证阶段直接取出授权码，
+                并发交换同一授权码只有一个请求成功，不再调用 code_store / code_consumer
         """
         self.code_store = code_store
         self.code_consumer = code_consumer
+        self.code_taker = code_taker
         self.access_token_expire_seconds = access_token_expire_seconds
         self.refresh_token_expire_seconds = refresh_token_expire_seconds
     
@@ -151,8 +155,11 @@ class AuthorizationCodeGrant(BaseGrant):
         if not context.redirect_uri:
             return False, {"error": "invalid_request", "error_description": "Missing redirect_uri"}
         
-        # 获取授权码信息
-        auth_code = self.code_store(context.code)
+        # 获取授权码信息（code_taker 取出即消费，失败的交换同样使授权码作废）
+        if self.code_taker:
+            auth_code = self.code_taker(context.code)
+        else:
+            auth_code = self.code_store(context.code)
         if not auth_code:
             return False, {"error": "invalid_grant", "error_description": "Invalid authorization code"}
         
@@ -209,8 +216,9 @@ class AuthorizationCodeGrant(BaseGrant):
     
     def create_token(self, context: GrantContext) -> OAuth2Token:
         """创建访问令牌"""
-        # 标记授权码已使用
-        self.code_consumer(context.code)
+        # 标记授权码已使用（code_taker 已在验证阶段取出）
+        if not self.code_taker:
+            self.code_consumer(context.code)
         
         now = datetime.now(timezone.utc)
         
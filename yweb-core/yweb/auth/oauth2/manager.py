@@ -8,6 +8,9 @@ from typing import Optional, Dict, Any, Callable, List
 import hashlib
 import hmac
 import base64
+import threading
+
+from cachetools import TTLCache
 
 from .client import OAuth2Client, generate_client_id, generate_client_secret
 from .token import (
@@ -26,6 +29,7 @@ from .grants import (
     RefreshTokenGrant,
     DeviceCodeGrant,
 )
+from .store import OAuth2Store, MemoryOAuth2Store
 
 
 class OAuth2Manager:
@@ -42,7 +46,14 @@ class OAuth2Manager:
             access_token_expire_minutes=30,
         )
         
-        # 设置存储回调
+        # 多实例部署使用 Redis 存储
+        manager = OAuth2Manager(
+            secret_key="your-secret-key",
+            store=RedisOAuth2Store(redis_client),
+            token_cache_size=10000,
+        )
+        
+        # 或设置存储回调（优先于 store）
         manager.set_stores(
             client_getter=get_client_by_id,
             token_saver=save_token,
@@ -82,6 +93,10 @@ class OAuth2Manager:
         authorization_code_expire_minutes: int = 10,
         device_code_expire_minutes: int = 30,
         rotate_refresh_token: bool = True,
+        store: Optional[OAuth2Store] = None,
+        token_cache_size: int = 0,
+        token_cache_ttl: int = 30,
+        device_poll_interval: int = 0,
     ):
         """
         Args:
@@ -91,20 +106,37 @@ class OAuth2Manager:
             authorization_code_expire_minutes: 授权码过期时间（分钟）
             device_code_expire_minutes: 设备码过期时间（分钟）
             rotate_refresh_token: 是否轮换刷新令牌
+            store: 存储（默认 MemoryOAuth2Store，多实例部署使用 RedisOAuth2Store）
+            token_cache_size: 访问令牌本地 LRU 缓存容量，0 表示禁用。
+                启用后 validate_token / introspect_token 命中缓存不再访问存储
+            token_cache_ttl: 访问令牌本地缓存时间（秒），即其他实例撤销 Token 后本实例的最长感知延迟
+            device_poll_interval: 设备码最小轮询间隔（秒），轮询过快返回 slow_down，默认 0 表示不限制
+                （设备码响应中的 interval 仍建议客户端每 5 秒轮询一次）
         """
+        if token_cache_size < 0 or token_cache_ttl <= 0:
+            raise ValueError("token_cache_size 必须大于等于 0，token_cache_ttl 必须大于 0")
+        if device_poll_interval < 0:
+            raise ValueError("device_poll_interval 必须大于等于 0")
+        
         self.secret_key = secret_key
         self.access_token_expire_seconds = access_token_expire_minutes * 60
         self.refresh_token_expire_seconds = refresh_token_expire_days * 86400
         self.authorization_code_expire_seconds = authorization_code_expire_minutes * 60
         self.device_code_expire_seconds = device_code_expire_minutes * 60
         self.rotate_refresh_token = rotate_refresh_token
+        self.device_poll_interval = device_poll_interval
         
-        # 内存存储（默认，生产环境应替换为持久化存储）
-        self._clients: Dict[str, OAuth2Client] = {}
-        self._tokens: Dict[str, OAuth2Token] = {}
-        self._refresh_tokens: Dict[str, OAuth2Token] = {}
-        self._authorization_codes: Dict[str, AuthorizationCode] = {}
-        self._device_codes: Dict[str, DeviceCode] = {}
+        # 存储（默认内存存储，仅适用于单进程）
+        self.store: OAuth2Store = store if store is not None else MemoryOAuth2Store()
+        
+        # 访问令牌本地缓存
+        self.token_cache_size = token_cache_size
+        self._token_cache: Optional[TTLCache] = (
+            TTLCache(maxsize=token_cache_size, ttl=token_cache_ttl) if token_cache_size > 0 else None
+        )
+        self._token_cache_lock = threading.Lock()
+        # 刷新令牌 -> 访问令牌，撤销刷新令牌时直接定位缓存条目
+        self._token_cache_refresh_index: Dict[str, str] = {}
         
         # 存储回调
         self._client_getter: Optional[Callable[[str], Optional[OAuth2Client]]] = None
@@ -155,6 +187,7 @@ class OAuth2Manager:
             code_saver: 保存授权码
             code_getter: 获取授权码
             code_consumer: 标记授权码已使用
+                （设置 code_getter 后授权码由回调管理，不再使用 store 的一次性消费）
             device_code_saver: 保存设备码
             device_code_getter: 获取设备码
             device_code_updater: 更新设备码
@@ -200,6 +233,7 @@ class OAuth2Manager:
             code_consumer=self._consume_code,
             access_token_expire_seconds=self.access_token_expire_seconds,
             refresh_token_expire_seconds=self.refresh_token_expire_seconds,
+            code_taker=None if self._code_getter else self.store.consume_code,
         )
         
         # Client Credentials
@@ -230,94 +264,111 @@ class OAuth2Manager:
         """获取客户端"""
         if self._client_getter:
             return self._client_getter(client_id)
-        return self._clients.get(client_id)
+        return self.store.get_client(client_id)
     
     def _save_client(self, client: OAuth2Client) -> bool:
         """保存客户端"""
         if self._client_saver:
             return self._client_saver(client)
-        self._clients[client.client_id] = client
-        return True
+        return self.store.save_client(client)
     
     def _get_code(self, code: str) -> Optional[AuthorizationCode]:
         """获取授权码"""
         if self._code_getter:
             return self._code_getter(code)
-        return self._authorization_codes.get(code)
+        return self.store.get_code(code)
     
     def _save_code(self, auth_code: AuthorizationCode) -> bool:
         """保存授权码"""
         if self._code_saver:
             return self._code_saver(auth_code)
-        self._authorization_codes[auth_code.code] = auth_code
-        return True
+        return self.store.save_code(auth_code)
     
     def _consume_code(self, code: str) -> bool:
         """标记授权码已使用"""
         if self._code_consumer:
             return self._code_consumer(code)
-        if code in self._authorization_codes:
-            self._authorization_codes[code].is_used = True
-            return True
-        return False
+        return self.store.consume_code(code) is not None
     
     def _get_token(self, access_token: str) -> Optional[OAuth2Token]:
         """获取 Token"""
         if self._token_getter:
             return self._token_getter(access_token)
-        return self._tokens.get(access_token)
+        return self.store.get_token(access_token)
     
     def _get_refresh_token(self, refresh_token: str) -> Optional[OAuth2Token]:
         """获取刷新令牌对应的 Token"""
         if self._refresh_token_getter:
             return self._refresh_token_getter(refresh_token)
-        return self._refresh_tokens.get(refresh_token)
+        return self.store.get_refresh_token(refresh_token)
     
     def _save_token(self, token: OAuth2Token) -> bool:
         """保存 Token"""
         if self._token_saver:
             return self._token_saver(token)
-        self._tokens[token.access_token] = token
-        if token.refresh_token:
-            self._refresh_tokens[token.refresh_token] = token
-        return True
+        return self.store.save_token(token)
     
     def _revoke_token(self, token: str) -> bool:
         """撤销 Token"""
+        self._evict_cached_token(token)
         if self._token_revoker:
             return self._token_revoker(token)
-        
-        # 检查是访问令牌还是刷新令牌
-        if token in self._tokens:
-            self._tokens[token].is_revoked = True
-            return True
-        if token in self._refresh_tokens:
-            self._refresh_tokens[token].is_revoked = True
-            return True
-        return False
+        return self.store.revoke_token(token)
     
     def _get_device_code(self, device_code: str) -> Optional[DeviceCode]:
         """获取设备码"""
         if self._device_code_getter:
             return self._device_code_getter(device_code)
-        return self._device_codes.get(device_code)
+        return self.store.get_device_code(device_code)
     
     def _save_device_code(self, device_code: DeviceCode) -> bool:
         """保存设备码"""
         if self._device_code_saver:
             return self._device_code_saver(device_code)
-        self._device_codes[device_code.device_code] = device_code
-        return True
+        return self.store.save_device_code(device_code)
     
     def _update_device_code(self, device_code: str, updates: Dict[str, Any]) -> bool:
         """更新设备码"""
         if self._device_code_updater:
             return self._device_code_updater(device_code, updates)
-        if device_code in self._device_codes:
-            for key, value in updates.items():
-                setattr(self._device_codes[device_code], key, value)
-            return True
-        return False
+        return self.store.update_device_code(device_code, updates)
+    
+    def _evict_cached_token(self, token: str) -> None:
+        """从本地缓存移除 Token（访问令牌或刷新令牌）"""
+        if self._token_cache is None:
+            return
+        with self._token_cache_lock:
+            cached = self._token_cache.pop(token, None)
+            if cached is not None:
+                if cached.refresh_token:
+                    self._token_cache_refresh_index.pop(cached.refresh_token, None)
+                return
+            access_token = self._token_cache_refresh_index.pop(token, None)
+            if access_token is not None:
+                self._token_cache.pop(access_token, None)
+    
+    def _cache_token(self, access_token: str, token: OAuth2Token) -> None:
+        """写入本地缓存并维护刷新令牌索引"""
+        with self._token_cache_lock:
+            self._token_cache[access_token] = token
+            if token.refresh_token:
+                index = self._token_cache_refresh_index
+                index[token.refresh_token] = access_token
+                # 缓存条目按 TTL 静默过期，索引超过容量两倍时按缓存现状重建（均摊 O(1)）
+                if len(index) > 2 * self._token_cache.maxsize:
+                    self._token_cache_refresh_index = {
+                        cached.refresh_token: key
+                        for key, cached in self._token_cache.items()
+                        if cached.refresh_token
+                    }
+    
+    def clear_token_cache(self) -> None:
+        """清空访问令牌本地缓存"""
+        if self._token_cache is None:
+            return
+        with self._token_cache_lock:
+            self._token_cache.clear()
+            self._token_cache_refresh_index.clear()
     
     # ========== 客户端管理 ==========
     
@@ -662,6 +713,7 @@ class OAuth2Manager:
             scope=scope,
             verification_uri=verification_uri,
             expires_in=self.device_code_expire_seconds,
+            interval=self.device_poll_interval or 5,
         )
         
         self._save_device_code(device_code)
@@ -683,14 +735,9 @@ class OAuth2Manager:
         Returns:
             tuple: (success, message)
         """
-        # 查找设备码（通过用户码）
-        device_code = None
-        for dc in self._device_codes.values():
-            if dc.user_code == user_code and not dc.is_expired():
-                device_code = dc
-                break
-        
-        if not device_code:
+        # 查找设备码（通过用户码索引）
+        device_code = self.store.get_device_code_by_user_code(user_code)
+        if not device_code or device_code.is_expired():
             return False, "Invalid or expired user code"
         
         if device_code.is_authorized or device_code.is_denied:
@@ -726,6 +773,10 @@ class OAuth2Manager:
         if not client:
             return False, {"error": "invalid_client", "error_description": "Client not found"}
         
+        # 轮询节流（RFC 8628 3.5）
+        if self.device_poll_interval and not self.store.allow_device_poll(device_code, self.device_poll_interval):
+            return False, {"error": "slow_down", "error_description": "Polling too frequently"}
+        
         # 创建上下文
         context = GrantContext(
             client=client,
@@ -759,8 +810,17 @@ class OAuth2Manager:
             
         Returns:
             tuple: (is_valid, token_data_or_error)
+        
+        Note:
+            启用 token_cache_size 时，有效 Token 在 token_cache_ttl 内直接从本地缓存返回；
+            过期仍按 Token 自身的 expires_at 判断，本实例撤销会立即移除缓存。
         """
-        token = self._get_token(access_token)
+        token = None
+        if self._token_cache is not None:
+            with self._token_cache_lock:
+                token = self._token_cache.get(access_token)
+        if token is None:
+            token = self._get_token(access_token)
         if not token:
             return False, "Invalid token"
         
@@ -768,8 +828,11 @@ class OAuth2Manager:
             return False, "Token revoked"
         
         if token.is_expired():
+            self._evict_cached_token(access_token)
             return False, "Token expired"
         
+        if self._token_cache is not None:
+            self._cache_token(access_token, token)
         return True, token
     
     def revoke_token(self, token: str, token_type_hint: Optional[str] = None) -> bool:
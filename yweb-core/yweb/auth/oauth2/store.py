@@ -0,0 +1,500 @@
+"""OAuth 2.0 存储
+
+提供 OAuth2Manager 使用的客户端、授权码、Token、设备码存储。
+
+- OAuth2Store: 存储抽象基类
+- MemoryOAuth2Store: 内存存储（默认，单进程），读取时判断过期并定期清理
+- RedisOAuth2Store: Redis 存储（多实例部署），授权码 GETDEL 一次性消费，
+  Token / 设备码使用 Redis 原生过期
+
+使用示例:
+    import redis
+    from yweb.auth.oauth2 import OAuth2Manager, RedisOAuth2Store
+
+    store = RedisOAuth2Store(redis.Redis(host="localhost", port=6379, db=0))
+    manager = OAuth2Manager(secret_key="your-secret-key", store=store)
+"""
+
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import asdict, fields
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, Dict, Optional, Type, TypeVar
+
+from .client import OAuth2Client, ClientType
+from .token import OAuth2Token, AuthorizationCode, DeviceCode, TokenType
+
+
+T = TypeVar("T")
+
+# 序列化时需要还原的字段类型
+_ENUM_FIELDS = {"token_type": TokenType, "client_type": ClientType}
+
+
+class OAuth2Store(ABC):
+    """OAuth 2.0 存储抽象基类"""
+
+    # ---------- 客户端 ----------
+
+    @abstractmethod
+    def get_client(self, client_id: str) -> Optional[OAuth2Client]:
+        """获取客户端"""
+        pass
+
+    @abstractmethod
+    def save_client(self, client: OAuth2Client) -> bool:
+        """保存客户端"""
+        pass
+
+    # ---------- 授权码 ----------
+
+    @abstractmethod
+    def save_code(self, auth_code: AuthorizationCode) -> bool:
+        """保存授权码（到期自动失效）"""
+        pass
+
+    @abstractmethod
+    def get_code(self, code: str) -> Optional[AuthorizationCode]:
+        """获取授权码（不消费）"""
+        pass
+
+    @abstractmethod
+    def consume_code(self, code: str) -> Optional[AuthorizationCode]:
+        """原子地取出并删除授权码
+
+        并发交换同一授权码时只有一个调用方能拿到结果。
+
+        Returns:
+            授权码对象，不存在、已消费或已过期返回 None
+        """
+        pass
+
+    # ---------- Token ----------
+
+    @abstractmethod
+    def save_token(self, token: OAuth2Token) -> bool:
+        """保存 Token（访问令牌与刷新令牌分别按各自过期时间失效）"""
+        pass
+
+    @abstractmethod
+    def get_token(self, access_token: str) -> Optional[OAuth2Token]:
+        """根据访问令牌获取 Token"""
+        pass
+
+    @abstractmethod
+    def get_refresh_token(self, refresh_token: str) -> Optional[OAuth2Token]:
+        """根据刷新令牌获取 Token"""
+        pass
+
+    @abstractmethod
+    def revoke_token(self, token: str) -> bool:
+        """撤销 Token（访问令牌或刷新令牌，同一 Token 的两者一起标记为已撤销）"""
+        pass
+
+    # ---------- 设备码 ----------
+
+    @abstractmethod
+    def save_device_code(self, device_code: DeviceCode) -> bool:
+        """保存设备码（同时建立用户码索引）"""
+        pass
+
+    @abstractmethod
+    def get_device_code(self, device_code: str) -> Optional[DeviceCode]:
+        """获取设备码"""
+        pass
+
+    @abstractmethod
+    def get_device_code_by_user_code(self, user_code: str) -> Optional[DeviceCode]:
+        """根据用户码获取设备码"""
+        pass
+
+    @abstractmethod
+    def update_device_code(self, device_code: str, updates: Dict[str, Any]) -> bool:
+        """更新设备码字段"""
+        pass
+
+    @abstractmethod
+    def allow_device_poll(self, device_code: str, interval: int) -> bool:
+        """登记一次设备轮询
+
+        Returns:
+            bool: 距上次轮询已超过 interval 秒返回 True，否则返回 False（应答 slow_down）
+        """
+        pass
+
+
+def _remaining_seconds(expires_at: Optional[datetime]) -> Optional[float]:
+    """距过期的秒数（无过期时间返回 None）"""
+    if expires_at is None:
+        return None
+    return (expires_at - datetime.now(timezone.utc)).total_seconds()
+
+
+def _is_past(expires_at: Optional[datetime]) -> bool:
+    remaining = _remaining_seconds(expires_at)
+    return remaining is not None and remaining <= 0
+
+
+def _refresh_expires_at(token: OAuth2Token) -> Optional[datetime]:
+    return token.refresh_token_expires_at or token.expires_at
+
+
+class MemoryOAuth2Store(OAuth2Store):
+    """内存存储
+
+    适用于单进程部署和测试。所有读写都在同一把锁内完成；过期数据在读取时视为不存在，
+    并在写入时每隔 cleanup_interval 秒清理一次，避免无限增长。
+
+    Args:
+        cleanup_interval: 过期数据清理间隔（秒）
+    """
+
+    def __init__(self, cleanup_interval: int = 60):
+        self.cleanup_interval = cleanup_interval
+        self._lock = threading.Lock()
+        self._clients: Dict[str, OAuth2Client] = {}
+        self._codes: Dict[str, AuthorizationCode] = {}
+        self._tokens: Dict[str, OAuth2Token] = {}
+        self._refresh_tokens: Dict[str, OAuth2Token] = {}
+        self._device_codes: Dict[str, DeviceCode] = {}
+        self._user_codes: Dict[str, str] = {}
+        self._device_polls: Dict[str, float] = {}
+        self._last_cleanup = time.monotonic()
+
+    def get_client(self, client_id: str) -> Optional[OAuth2Client]:
+        with self._lock:
+            return self._clients.get(client_id)
+
+    def save_client(self, client: OAuth2Client) -> bool:
+        with self._lock:
+            self._clients[client.client_id] = client
+        return True
+
+    def save_code(self, auth_code: AuthorizationCode) -> bool:
+        with self._lock:
+            self._codes[auth_code.code] = auth_code
+            self._maybe_cleanup()
+        return True
+
+    def get_code(self, code: str) -> Optional[AuthorizationCode]:
+        with self._lock:
+            auth_code = self._codes.get(code)
+        if auth_code is None or auth_code.is_expired():
+            return None
+        return auth_code
+
+    def consume_code(self, code: str) -> Optional[AuthorizationCode]:
+        with self._lock:
+            auth_code = self._codes.pop(code, None)
+        if auth_code is None or auth_code.is_used or auth_code.is_expired():
+            return None
+        return auth_code
+
+    def save_token(self, token: OAuth2Token) -> bool:
+        with self._lock:
+            self._tokens[token.access_token] = token
+            if token.refresh_token:
+                self._refresh_tokens[token.refresh_token] = token
+            self._maybe_cleanup()
+        return True
+
+    def get_token(self, access_token: str) -> Optional[OAuth2Token]:
+        with self._lock:
+            return self._tokens.get(access_token)
+
+    def get_refresh_token(self, refresh_token: str) -> Optional[OAuth2Token]:
+        with self._lock:
+            return self._refresh_tokens.get(refresh_token)
+
+    def revoke_token(self, token: str) -> bool:
+        with self._lock:
+            token_data = self._tokens.get(token) or self._refresh_tokens.get(token)
+            if token_data is None:
+                return False
+            token_data.is_revoked = True
+        return True
+
+    def save_device_code(self, device_code: DeviceCode) -> bool:
+        with self._lock:
+            self._device_codes[device_code.device_code] = device_code
+            self._user_codes[device_code.user_code] = device_code.device_code
+            self._maybe_cleanup()
+        return True
+
+    def get_device_code(self, device_code: str) -> Optional[DeviceCode]:
+        with self._lock:
+            return self._device_codes.get(device_code)
+
+    def get_device_code_by_user_code(self, user_code: str) -> Optional[DeviceCode]:
+        with self._lock:
+            device_code = self._user_codes.get(user_code)
+            if device_code is None:
+                return None
+            return self._device_codes.get(device_code)
+
+    def update_device_code(self, device_code: str, updates: Dict[str, Any]) -> bool:
+        with self._lock:
+            entry = self._device_codes.get(device_code)
+            if entry is None:
+                return False
+            for key, value in updates.items():
+                setattr(entry, key, value)
+        return True
+
+    def allow_device_poll(self, device_code: str, interval: int) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            last = self._device_polls.get(device_code)
+            if last is not None and now - last < interval:
+                return False
+            self._device_polls[device_code] = now
+        return True
+
+    def cleanup(self) -> int:
+        """清理过期数据
+
+        Returns:
+            int: 清理的条目数
+        """
+        with self._lock:
+            return self._cleanup()
+
+    def _maybe_cleanup(self) -> None:
+        """写入时按间隔触发清理（调用方已持有锁）"""
+        if time.monotonic() - self._last_cleanup >= self.cleanup_interval:
+            self._cleanup()
+
+    def _cleanup(self) -> int:
+        self._last_cleanup = time.monotonic()
+        removed = 0
+
+        for code in [c for c, item in self._codes.items() if item.is_expired()]:
+            del self._codes[code]
+            removed += 1
+
+        for access_token in [t for t, item in self._tokens.items() if item.is_expired()]:
+            del self._tokens[access_token]
+            removed += 1
+        for refresh_token in [
+            t for t, item in self._refresh_tokens.items() if _is_past(_refresh_expires_at(item))
+        ]:
+            del self._refresh_tokens[refresh_token]
+            removed += 1
+
+        for device_code in [d for d, item in self._device_codes.items() if item.is_expired()]:
+            entry = self._device_codes.pop(device_code)
+            self._user_codes.pop(entry.user_code, None)
+            self._device_polls.pop(device_code, None)
+            removed += 1
+
+        return removed
+
+
+def _dump(obj: Any) -> str:
+    """数据类序列化为 JSON（datetime 转 ISO 格式，枚举转值）"""
+    def default(value):
+        if isinstance(value, datetime):
+            return value.isoformat()
+        if isinstance(value, Enum):
+            return value.value
+        raise TypeError(f"无法序列化 {type(value).__name__}")
+
+    return json.dumps(asdict(obj), default=default, separators=(",", ":"))
+
+
+def _load(cls: Type[T], raw: Any) -> Optional[T]:
+    """从 JSON 还原数据类"""
+    if raw is None:
+        return None
+    if isinstance(raw, bytes):
+        raw = raw.decode("utf-8")
+    data = json.loads(raw)
+    for f in fields(cls):
+        value = data.get(f.name)
+        if value is None:
+            continue
+        if f.name in _ENUM_FIELDS:
+            data[f.name] = _ENUM_FIELDS[f.name](value)
+        elif isinstance(value, str) and f.name.endswith("_at"):
+            data[f.name] = datetime.fromisoformat(value)
+    return cls(**data)
+
+
+class RedisOAuth2Store(OAuth2Store):
+    """Redis 存储
+
+    适用于多实例部署：
+
+    - 授权码：``SET PX`` 写入，交换时 ``GETDEL`` 一次性取出（Redis < 6.2 时退化为 MULTI 中的 GET + DEL）
+    - 访问令牌 / 刷新令牌：分别以 ``EXAT`` 设置到各自的过期时间，过期后由 Redis 自动删除
+    - 设备码：``EXAT`` 过期，用户码单独建立索引；轮询节流用 ``SET NX PX``，不读取设备码
+
+    使用示例:
+        import redis
+
+        store = RedisOAuth2Store(redis.Redis(host="localhost", port=6379, db=0), prefix="oauth2:")
+
+    注意: 需要安装 redis 包: pip install redis
+    """
+
+    def __init__(self, redis_client, prefix: str = "oauth2:"):
+        """
+        Args:
+            redis_client: Redis 客户端实例
+            prefix: 键前缀
+        """
+        self._redis = redis_client
+        self._prefix = prefix
+        self._getdel_supported = True
+
+    def _client_key(self, client_id: str) -> str:
+        return f"{self._prefix}client:{client_id}"
+
+    def _code_key(self, code: str) -> str:
+        return f"{self._prefix}code:{code}"
+
+    def _access_key(self, access_token: str) -> str:
+        return f"{self._prefix}access:{access_token}"
+
+    def _refresh_key(self, refresh_token: str) -> str:
+        return f"{self._prefix}refresh:{refresh_token}"
+
+    def _device_key(self, device_code: str) -> str:
+        return f"{self._prefix}device:{device_code}"
+
+    def _user_code_key(self, user_code: str) -> str:
+        return f"{self._prefix}user_code:{user_code}"
+
+    def _device_poll_key(self, device_code: str) -> str:
+        return f"{self._prefix}device_poll:{device_code}"
+
+    @staticmethod
+    def _exat(expires_at: Optional[datetime]) -> Optional[int]:
+        return int(expires_at.timestamp()) + 1 if expires_at is not None else None
+
+    # ---------- 客户端 ----------
+
+    def get_client(self, client_id: str) -> Optional[OAuth2Client]:
+        return _load(OAuth2Client, self._redis.get(self._client_key(client_id)))
+
+    def save_client(self, client: OAuth2Client) -> bool:
+        self._redis.set(self._client_key(client.client_id), _dump(client))
+        return True
+
+    # ---------- 授权码 ----------
+
+    def save_code(self, auth_code: AuthorizationCode) -> bool:
+        remaining = _remaining_seconds(auth_code.expires_at)
+        if remaining is not None and remaining <= 0:
+            return False
+        px = int(remaining * 1000) if remaining is not None else None
+        self._redis.set(self._code_key(auth_code.code), _dump(auth_code), px=px)
+        return True
+
+    def get_code(self, code: str) -> Optional[AuthorizationCode]:
+        return _load(AuthorizationCode, self._redis.get(self._code_key(code)))
+
+    def consume_code(self, code: str) -> Optional[AuthorizationCode]:
+        key = self._code_key(code)
+        raw = None
+        if self._getdel_supported:
+            try:
+                raw = self._redis.getdel(key)
+            except Exception as e:
+                # 旧版 Redis 不支持 GETDEL，后续改用事务
+                if "unknown command" not in str(e).lower():
+                    raise
+                self._getdel_supported = False
+        if not self._getdel_supported:
+            pipe = self._redis.pipeline(transaction=True)
+            pipe.get(key)
+            pipe.delete(key)
+            raw, _ = pipe.execute()
+
+        auth_code = _load(AuthorizationCode, raw)
+        if auth_code is None or auth_code.is_used or auth_code.is_expired():
+            return None
+        return auth_code
+
+    # ---------- Token ----------
+
+    def save_token(self, token: OAuth2Token) -> bool:
+        payload = _dump(token)
+        pipe = self._redis.pipeline(transaction=False)
+        if not token.is_expired():
+            pipe.set(self._access_key(token.access_token), payload, exat=self._exat(token.expires_at))
+        refresh_expires_at = _refresh_expires_at(token)
+        if token.refresh_token and not _is_past(refresh_expires_at):
+            pipe.set(self._refresh_key(token.refresh_token), payload, exat=self._exat(refresh_expires_at))
+        pipe.execute()
+        return True
+
+    def get_token(self, access_token: str) -> Optional[OAuth2Token]:
+        return _load(OAuth2Token, self._redis.get(self._access_key(access_token)))
+
+    def get_refresh_token(self, refresh_token: str) -> Optional[OAuth2Token]:
+        return _load(OAuth2Token, self._redis.get(self._refresh_key(refresh_token)))
+
+    def revoke_token(self, token: str) -> bool:
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.get(self._access_key(token))
+        pipe.get(self._refresh_key(token))
+        access_raw, refresh_raw = pipe.execute()
+
+        token_data = _load(OAuth2Token, access_raw or refresh_raw)
+        if token_data is None:
+            return False
+        token_data.is_revoked = True
+
+        # 保留剩余过期时间，只更新撤销标记（xx: 已过期删除的键不重新写入）
+        payload = _dump(token_data)
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.set(self._access_key(token_data.access_token), payload, xx=True, keepttl=True)
+        if token_data.refresh_token:
+            pipe.set(self._refresh_key(token_data.refresh_token), payload, xx=True, keepttl=True)
+        pipe.execute()
+        return True
+
+    # ---------- 设备码 ----------
+
+    def save_device_code(self, device_code: DeviceCode) -> bool:
+        if device_code.is_expired():
+            return False
+        exat = self._exat(device_code.expires_at)
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.set(self._device_key(device_code.device_code), _dump(device_code), exat=exat)
+        pipe.set(self._user_code_key(device_code.user_code), device_code.device_code, exat=exat)
+        pipe.execute()
+        return True
+
+    def get_device_code(self, device_code: str) -> Optional[DeviceCode]:
+        return _load(DeviceCode, self._redis.get(self._device_key(device_code)))
+
+    def get_device_code_by_user_code(self, user_code: str) -> Optional[DeviceCode]:
+        device_code = self._redis.get(self._user_code_key(user_code))
+        if device_code is None:
+            return None
+        if isinstance(device_code, bytes):
+            device_code = device_code.decode("utf-8")
+        return self.get_device_code(device_code)
+
+    def update_device_code(self, device_code: str, updates: Dict[str, Any]) -> bool:
+        entry = self.get_device_code(device_code)
+        if entry is None:
+            return False
+        for key, value in updates.items():
+            setattr(entry, key, value)
+        return bool(self._redis.set(self._device_key(device_code), _dump(entry), xx=True, keepttl=True))
+
+    def allow_device_poll(self, device_code: str, interval: int) -> bool:
+        return bool(self._redis.set(self._device_poll_key(device_code), 1, px=interval * 1000, nx=True))
+
+
+__all__ = [
+    "OAuth2Store",
+    "MemoryOAuth2Store",
+    "RedisOAuth2Store",
+]
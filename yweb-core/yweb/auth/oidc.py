@@ -27,6 +27,10 @@
     
     # 验证 ID Token
     claims = oidc_manager.verify_id_token(id_token)
+    
+    # RS256 / ES256：密钥只解析一次，kid 写入头部并通过 /.well-known/jwks.json 公开
+    oidc_manager = OIDCManager(issuer="https://sso.example.com", secret_key="", algorithm="RS256")
+    oidc_manager.set_keys(private_key=private_pem, public_key=public_pem, kid="2024-01")
 """
 
 from dataclasses import dataclass, field
@@ -37,6 +41,7 @@ import time
 from fastapi import HTTPException, status
 
 from .base import AuthProvider, AuthType, UserIdentity, AuthResult
+from .keys import KeySet, TokenSigner, is_asymmetric_algorithm, load_key
 
 # 尝试导入 JWT 库
 try:
@@ -210,23 +215,33 @@ class OIDCManager:
         self.id_token_expire_seconds = id_token_expire_minutes * 60
         self.user_claims_getter = user_claims_getter
         
-        # RSA 密钥对（用于签名，可选）
+        # 非对称密钥对（RS256/ES256 等，用于签名，可选）
         self._private_key = None
         self._public_key = None
         self._jwks = None
+        self._kid = None
+        self._key_set: Optional[KeySet] = None
+        
+        # 预解析的签名器与验证密钥（首次使用时构建，set_keys 后重建）
+        self._signer: Optional[TokenSigner] = None
+        self._verification_key_obj = None
     
     def set_keys(
         self,
         private_key: str = None,
         public_key: str = None,
         jwks: Dict = None,
+        kid: Optional[str] = None,
+        key_set: Optional[KeySet] = None,
     ) -> "OIDCManager":
         """设置签名密钥
         
         Args:
-            private_key: RSA 私钥（PEM 格式）
-            public_key: RSA 公钥（PEM 格式）
-            jwks: JSON Web Key Set
+            private_key: 私钥（PEM 格式，RS256/ES256 等非对称算法使用）
+            public_key: 公钥（PEM 格式）
+            jwks: JSON Web Key Set（原样由 get_jwks 返回）
+            kid: 签名密钥 ID，写入 ID Token 头部
+            key_set: 按 kid 索引的验证密钥集合，轮换期间用于验证旧密钥签发的 ID Token
             
         Returns:
             self: 支持链式调用
@@ -234,6 +249,10 @@ class OIDCManager:
         self._private_key = private_key
         self._public_key = public_key
         self._jwks = jwks
+        self._kid = kid
+        self._key_set = key_set
+        self._signer = None
+        self._verification_key_obj = None
         return self
     
     def set_user_claims_getter(
@@ -310,11 +329,7 @@ class OIDCManager:
             claims.update(extra_claims)
         
         # 签名
-        return jwt.encode(
-            claims,
-            self._get_signing_key(),
-            algorithm=self.algorithm,
-        )
+        return self._get_signer().sign(claims)
     
     def verify_id_token(
         self,
@@ -333,10 +348,11 @@ class OIDCManager:
             Dict: 声明字典，验证失败返回 None
         """
         try:
+            key, algorithm = self._resolve_verification_key(id_token)
             claims = jwt.decode(
                 id_token,
-                self._get_verification_key(),
-                algorithms=[self.algorithm],
+                key,
+                algorithms=[algorithm],
                 audience=client_id,
                 issuer=self.issuer,
             )
@@ -354,25 +370,45 @@ class OIDCManager:
     
     def _get_signing_key(self) -> str:
         """获取签名密钥"""
-        if self._private_key and self.algorithm.startswith("RS"):
+        if self._private_key and is_asymmetric_algorithm(self.algorithm):
             return self._private_key
         return self.secret_key
     
     def _get_verification_key(self) -> str:
         """获取验证密钥"""
-        if self._public_key and self.algorithm.startswith("RS"):
+        if self._public_key and is_asymmetric_algorithm(self.algorithm):
             return self._public_key
         return self.secret_key
     
+    def _get_signer(self) -> TokenSigner:
+        """获取预解析的签名器"""
+        if self._signer is None:
+            self._signer = TokenSigner(self._get_signing_key(), self.algorithm, kid=self._kid)
+        return self._signer
+    
+    def _get_verification_key_obj(self):
+        """获取预解析的验证密钥"""
+        if self._verification_key_obj is None:
+            self._verification_key_obj = load_key(self._get_verification_key(), self.algorithm)
+        return self._verification_key_obj
+    
+    def _resolve_verification_key(self, token: str):
+        """选择验证密钥：Token 头部 kid 命中 key_set 时使用对应密钥，否则使用当前密钥"""
+        if self._key_set is not None:
+            entry = self._key_set.resolve(token)
+            if entry is not None:
+                return entry
+        return self._get_verification_key_obj(), self.algorithm
+    
     def _compute_hash(self, value: str) -> str:
         """计算哈希（用于 at_hash, c_hash）"""
         import hashlib
         import base64
         
-        # 使用算法对应的哈希
-        if self.algorithm in ("HS256", "RS256"):
+        # 使用算法对应的哈希（HS256/RS256/ES256 -> SHA-256，以此类推）
+        if self.algorithm.endswith("256"):
             hash_func = hashlib.sha256
-        elif self.algorithm in ("HS384", "RS384"):
+        elif self.algorithm.endswith("384"):
             hash_func = hashlib.sha384
         else:
             hash_func = hashlib.sha512
@@ -484,12 +520,18 @@ class OIDCManager:
         if self._jwks:
             return self._jwks
         
+        if self._key_set is not None:
+            return self._key_set.to_jwks()
+        
         # 如果使用对称密钥，不公开
-        if not self._public_key:
+        if not self._public_key or not is_asymmetric_algorithm(self.algorithm):
             return {"keys": []}
         
-        # TODO: 从公钥生成 JWK
-        return {"keys": []}
+        public_jwk = self._get_verification_key_obj().public_key().to_dict()
+        public_jwk["use"] = "sig"
+        if self._kid:
+            public_jwk["kid"] = self._kid
+        return {"keys": [public_jwk]}
 
 
 class OIDCAuthProvider(AuthProvider):
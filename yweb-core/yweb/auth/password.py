@@ -18,11 +18,26 @@
     # 检查是否需要重新哈希（升级算法）
     if PasswordHelper.needs_rehash(old_hash):
         new_hash = PasswordHelper.hash(password)
+
+异步 / 有界线程池:
+    # 哈希计算放到专用有界线程池，不阻塞事件循环
+    PasswordHelper.configure_pool(max_workers=4, max_pending=16)
+    
+    is_valid = await PasswordHelper.averify("my_password", hashed)
+    new_hash = await PasswordHelper.ahash("my_password")
 """
 
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Optional, Callable, List
 from passlib.context import CryptContext
 
+from yweb.exceptions import ServiceUnavailableException
+from yweb.log import get_logger
+
+logger = get_logger("yweb.auth.password")
+
 # 密码哈希上下文
 # 默认使用 pbkdf2_sha256，同时支持验证旧的 MD5 和 SHA256 格式
 _pwd_context = CryptContext(
@@ -41,6 +56,87 @@ class PasswordTooLongError(ValueError):
     pass
 
 
+class PasswordHashPoolBusyError(ServiceUnavailableException):
+    """密码哈希线程池已满（快速失败，返回 503）"""
+    
+    def __init__(self, message: str = "登录请求过多，请稍后重试", **kwargs):
+        super().__init__(message, **kwargs)
+
+
+class PasswordHashPool:
+    """密码哈希专用的有界线程池
+    
+    pbkdf2 计算由 hashlib 完成，执行期间释放 GIL，因此线程池即可获得真正的并行。
+    排队 + 执行中的任务数超过 max_pending 时立即抛出 PasswordHashPoolBusyError，
+    避免撞库攻击时大量请求堆积、占满 Web 工作线程。
+    
+    使用示例:
+        pool = PasswordHashPool(max_workers=4, max_pending=16)
+        ok = pool.run(PasswordHelper.verify, password, hashed)          # 同步等待
+        ok = await pool.arun(PasswordHelper.verify, password, hashed)   # 异步等待
+    """
+    
+    def __init__(self, max_workers: int = 4, max_pending: int = 16):
+        """
+        Args:
+            max_workers: 工作线程数
+            max_pending: 最大在途任务数（排队 + 执行中）
+        """
+        if max_workers <= 0:
+            raise ValueError("max_workers 必须大于 0")
+        if max_pending < max_workers:
+            raise ValueError("max_pending 不能小于 max_workers")
+        
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="yweb-password",
+        )
+        self._pending = 0
+        self._lock = threading.Lock()
+    
+    @property
+    def pending(self) -> int:
+        """当前在途任务数"""
+        return self._pending
+    
+    def _release(self, _future: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+    
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """提交任务
+        
+        Raises:
+            PasswordHashPoolBusyError: 在途任务数已达 max_pending
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PasswordHashPoolBusyError()
+            self._pending += 1
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(self._release)
+        return future
+    
+    def run(self, fn: Callable, *args, **kwargs):
+        """提交任务并同步等待结果"""
+        return self.submit(fn, *args, **kwargs).result()
+    
+    async def arun(self, fn: Callable, *args, **kwargs):
+        """提交任务并异步等待结果（不阻塞事件循环）"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """关闭线程池"""
+        self._executor.shutdown(wait=wait)
+
+
 class PasswordHelper:
     """密码工具类
     
@@ -73,6 +169,10 @@ class PasswordHelper:
     # 用于兼容旧 MD5 格式的盐值（可被业务项目覆盖）
     _md5_salt: str = ""
     
+    # 哈希计算线程池（首次使用时按默认参数创建）
+    _pool: Optional[PasswordHashPool] = None
+    _pool_lock = threading.Lock()
+    
     @classmethod
     def configure(
         cls,
@@ -200,6 +300,93 @@ class PasswordHelper:
         except Exception:
             return True
     
+    # ==================== 线程池 / 异步 API ====================
+    
+    @classmethod
+    def configure_pool(cls, max_workers: int = 4, max_pending: int = 16) -> PasswordHashPool:
+        """配置哈希计算线程池（替换并关闭旧线程池）
+        
+        Args:
+            max_workers: 工作线程数，建议不超过 CPU 核数
+            max_pending: 最大在途任务数，超出时快速失败
+            
+        Returns:
+            新的线程池
+        """
+        pool = PasswordHashPool(max_workers=max_workers, max_pending=max_pending)
+        with cls._pool_lock:
+            old_pool, cls._pool = cls._pool, pool
+        if old_pool is not None:
+            old_pool.shutdown(wait=False)
+        return pool
+    
+    @classmethod
+    def get_pool(cls) -> PasswordHashPool:
+        """获取哈希计算线程池（未配置时按默认参数创建）"""
+        if cls._pool is None:
+            with cls._pool_lock:
+                if cls._pool is None:
+                    cls._pool = PasswordHashPool()
+        return cls._pool
+    
+    @classmethod
+    def verify_bounded(cls, password: str, hash: str) -> bool:
+        """在有界线程池中验证密码（同步等待）
+        
+        用于同步路由：同时进行的哈希计算数受线程池限制，
+        超出 max_pending 时抛出 PasswordHashPoolBusyError 而不是排队。
+        """
+        if not hash:
+            return False
+        return cls.get_pool().run(cls.verify, password, hash)
+    
+    @classmethod
+    async def averify(cls, password: str, hash: str) -> bool:
+        """异步验证密码（在有界线程池中计算，不阻塞事件循环）
+        
+        Raises:
+            PasswordHashPoolBusyError: 线程池已满
+        """
+        if not hash:
+            return False
+        return await cls.get_pool().arun(cls.verify, password, hash)
+    
+    @classmethod
+    async def ahash(cls, password: str, validate: bool = True) -> str:
+        """异步哈希密码（在有界线程池中计算，不阻塞事件循环）
+        
+        Raises:
+            PasswordTooShortError / PasswordTooLongError: 密码长度不合法
+            PasswordHashPoolBusyError: 线程池已满
+        """
+        if validate:
+            cls.validate_length(password)
+        return await cls.get_pool().arun(cls.hash, password, False)
+    
+    @classmethod
+    def rehash_in_background(
+        cls,
+        password: str,
+        on_rehashed: Callable[[str], None],
+    ) -> Optional[Future]:
+        """在线程池中重新哈希密码，完成后回调 on_rehashed(new_hash)
+        
+        用于登录成功后透明升级旧哈希，不占用请求路径。
+        线程池已满时放弃本次升级（下次登录再试），返回 None。
+        回调在线程池的工作线程中执行。
+        """
+        def _task() -> None:
+            try:
+                on_rehashed(cls.hash(password, validate=False))
+            except Exception as e:
+                logger.warning(f"后台升级密码哈希失败: {e}")
+        
+        try:
+            return cls.get_pool().submit(_task)
+        except PasswordHashPoolBusyError:
+            logger.debug("密码哈希线程池已满，跳过本次哈希升级")
+            return None
+    
     @classmethod
     def _is_hex(cls, s: str) -> bool:
         """检查字符串是否为十六进制"""
@@ -0,0 +1,236 @@
+"""认证用户投影模块
+
+认证热路径只需要用户 ID、用户名、角色编码等少量字段。UserProjection 是这些字段的
+只读投影（``__slots__``，可 pickle），由 setup_auth(user_projection=...) 按列查询构建并缓存，
+避免每次请求加载、快照、merge 完整的 ORM 用户对象。
+
+（与 AuthProvider 返回的 UserIdentity 不同，UserProjection 直接作为 get_current_user 的返回值。）
+
+- UserProjection: 只读用户投影
+- create_projection_loader: 创建按列投影的加载函数
+
+使用示例:
+    auth = setup_auth(User, role_model=True, user_projection=True)
+
+    @app.get("/orders")
+    def list_orders(user = Depends(auth.get_current_user)):
+        # user 是 UserProjection
+        if not user.has_role("admin"):
+            ...
+        return Order.query.filter_by(owner_id=user.id).all()
+
+    @app.put("/me")
+    def update_me(data: UpdateMe, user = Depends(auth.get_current_user)):
+        # 需要完整模型时再加载
+        db_user = user.load()
+        db_user.nickname = data.nickname
+        db_user.save(commit=True)
+"""
+
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Optional, Sequence, Type
+
+from yweb.log import get_logger
+
+logger = get_logger("yweb.auth.projection")
+
+# 默认投影的用户字段（模型上存在才查询）
+DEFAULT_PROJECTION_FIELDS = ("username", "email")
+
+
+class UserProjection:
+    """只读用户投影
+
+    与 RoleMixin 保持一致的角色 API（has_role / has_any_role / has_all_roles / role_codes），
+    额外投影的字段可直接按属性访问。
+
+    Attributes:
+        id: 用户 ID
+        username: 用户名
+        role_codes: 角色编码集合
+    """
+
+    __slots__ = ("id", "username", "role_codes", "_fields", "_model")
+
+    def __init__(
+        self,
+        id: Any,
+        username: Optional[str] = None,
+        role_codes: Iterable[str] = (),
+        fields: Optional[Dict[str, Any]] = None,
+        model: Optional[Type] = None,
+    ):
+        object.__setattr__(self, "id", id)
+        object.__setattr__(self, "username", username)
+        object.__setattr__(self, "role_codes", frozenset(role_codes))
+        object.__setattr__(self, "_fields", dict(fields or {}))
+        object.__setattr__(self, "_model", model)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("UserProjection 是只读对象，修改用户请先调用 load() 获取完整模型")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("UserProjection 是只读对象")
+
+    def __getattr__(self, name: str) -> Any:
+        # 仅在常规属性查找失败时调用：从额外投影字段中查找
+        try:
+            return object.__getattribute__(self, "_fields")[name]
+        except KeyError:
+            raise AttributeError(
+                f"UserProjection 没有字段 '{name}'，"
+                f"可在 user_projection 中声明该字段，或调用 load() 获取完整模型"
+            ) from None
+
+    def __reduce__(self):
+        return (
+            UserProjection,
+            (self.id, self.username, self.role_codes, self._fields, self._model),
+        )
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, UserProjection):
+            return NotImplemented
+        return (
+            self.id == other.id
+            and self.username == other.username
+            and self.role_codes == other.role_codes
+            and self._fields == other._fields
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.id, self.username, self.role_codes))
+
+    def __repr__(self) -> str:
+        return f"UserProjection(id={self.id!r}, username={self.username!r}, roles={sorted(self.role_codes)!r})"
+
+    @property
+    def roles(self) -> Sequence[str]:
+        """角色编码列表（兼容按 user.roles 读取角色的代码，如 JWTManager.refresh_tokens）"""
+        return tuple(sorted(self.role_codes))
+
+    def has_role(self, role_code: str) -> bool:
+        """检查是否拥有指定角色"""
+        return role_code in self.role_codes
+
+    def has_any_role(self, *role_codes: str) -> bool:
+        """检查是否拥有任一指定角色"""
+        return not self.role_codes.isdisjoint(role_codes)
+
+    def has_all_roles(self, *role_codes: str) -> bool:
+        """检查是否拥有所有指定角色"""
+        return self.role_codes.issuperset(role_codes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        data = {"id": self.id, "username": self.username, "roles": list(self.roles)}
+        data.update(self._fields)
+        return data
+
+    def load(self):
+        """加载完整的用户模型（每次调用都会查询数据库）
+
+        Raises:
+            RuntimeError: 未关联用户模型
+        """
+        if self._model is None:
+            raise RuntimeError("UserProjection 未关联用户模型，无法加载")
+        return self._model.get(self.id)
+
+
+def _has_column(user_model: Type, name: str) -> bool:
+    from sqlalchemy import inspect as sa_inspect
+
+    try:
+        return name in sa_inspect(user_model).columns
+    except Exception:
+        return False
+
+
+def _resolve_role_code_column(user_model: Type):
+    """返回 (roles 关系属性, 角色编码列)，未配置角色时返回 (None, None)"""
+    from sqlalchemy import inspect as sa_inspect
+
+    try:
+        relationship = sa_inspect(user_model).relationships.get("roles")
+    except Exception:
+        return None, None
+    if relationship is None:
+        return None, None
+    role_model = relationship.mapper.class_
+    if not _has_column(role_model, "code"):
+        return None, None
+    return user_model.roles, role_model.code
+
+
+def create_projection_loader(
+    user_model: Type,
+    active_field: Optional[str] = "is_active",
+    fields: Optional[Sequence[str]] = None,
+) -> Callable[[Any], Optional[UserProjection]]:
+    """创建用户投影加载函数
+
+    每次加载只执行一条 SQL：按列选择用户字段，并 LEFT JOIN roles 关系取角色编码。
+
+    Args:
+        user_model: 用户模型类
+        active_field: 活跃状态字段名，为 None 时不检查
+        fields: 额外投影的字段（username / email 存在时默认投影）
+
+    Returns:
+        (user_id) -> UserProjection 的函数，用户不存在或未激活返回 None
+
+    Raises:
+        ValueError: fields 中包含模型上不存在的列
+    """
+    extra_fields = [name for name in (fields or ()) if name not in ("id", "username")]
+    unknown = [name for name in extra_fields if not _has_column(user_model, name)]
+    if unknown:
+        raise ValueError(f"{user_model.__name__} 没有字段: {', '.join(unknown)}")
+
+    projected = [name for name in DEFAULT_PROJECTION_FIELDS if _has_column(user_model, name)]
+    projected += [name for name in extra_fields if name not in projected]
+    check_active = bool(active_field) and _has_column(user_model, active_field)
+    roles_attr, role_code_column = _resolve_role_code_column(user_model)
+
+    columns = [user_model.id] + [getattr(user_model, name) for name in projected]
+    if check_active:
+        columns.append(getattr(user_model, active_field).label("_projection_active"))
+    if role_code_column is not None:
+        columns.append(role_code_column.label("_projection_role_code"))
+
+    def load_projection(user_id: Any) -> Optional[UserProjection]:
+        from sqlalchemy import select
+
+        stmt = select(*columns).where(user_model.id == user_id)
+        if roles_attr is not None:
+            stmt = stmt.outerjoin(roles_attr)
+        rows = user_model.query.session.execute(stmt).all()
+        if not rows:
+            return None
+
+        first = rows[0]._mapping
+        if check_active and not first["_projection_active"]:
+            return None
+
+        role_codes: FrozenSet[str] = frozenset()
+        if role_code_column is not None:
+            role_codes = frozenset(
+                row._mapping["_projection_role_code"] for row in rows
+                if row._mapping["_projection_role_code"] is not None
+            )
+        values = {name: first[name] for name in projected}
+        return UserProjection(
+            id=first["id"],
+            username=values.pop("username", None),
+            role_codes=role_codes,
+            fields=values,
+            model=user_model,
+        )
+
+    return load_projection
+
+
+__all__ = [
+    "UserProjection",
+    "create_projection_loader",
+]
@@ -31,11 +31,20 @@
     print(f"剩余尝试次数: {remaining}")
 
     limiter.reset("192.168.1.100")  # 登录成功时重置
+
+    # 多实例部署：Redis 滑动窗口（Redis 不可用时自动回退到内存实现）
+    import redis
+    from yweb.auth import RedisLoginRateLimiter
+
+    limiter = RedisLoginRateLimiter(redis.Redis(), max_attempts=10, block_minutes=15)
+    auth = setup_auth(app=app, user_model=User, ip_rate_limiter=limiter)
 """
 
+import secrets
 import threading
+import time
 from datetime import datetime, timedelta
-from typing import Tuple
+from typing import Any, Callable, Tuple
 
 from yweb.log import get_logger
 
@@ -46,7 +55,7 @@ class LoginRateLimiter:
     """基于 IP 的登录频率限制器
     
     线程安全的内存实现，适合单实例部署。
-    多实例部署可继承此类，用 Redis 替换存储。
+    多实例部署使用 RedisLoginRateLimiter。
     
     Args:
         max_attempts: 时间窗口内最大失败次数（默认 10）
@@ -243,3 +252,200 @@ class LoginRateLimiter:
                 cleaned += 1
             
             return cleaned
+
+
+class RedisLoginRateLimiter(LoginRateLimiter):
+    """基于 Redis 的分布式登录频率限制器
+    
+    与 LoginRateLimiter 接口一致，多个实例共享计数，限制在整个集群内精确生效：
+    
+    - 失败记录保存在有序集合中（滑动窗口），由 Lua 脚本原子地清理、计数、封锁
+    - 封锁使用带过期时间的键，到期自动解除，无需调用 cleanup()
+    - 时间取自 Redis 服务器，不受各实例时钟偏差影响
+    
+    Redis 调用失败时记录警告并回退到内存实现（fallback=False 时直接抛出异常）。
+    
+    Args:
+        redis_client: Redis 客户端实例（同步）
+        max_attempts: 时间窗口内最大失败次数（默认 10）
+        block_minutes: 封锁时长（分钟，默认 15）
+        window_minutes: 失败计数的滑动窗口（分钟，默认等于 block_minutes）
+        prefix: 键前缀
+        fallback: Redis 不可用时是否回退到内存实现
+    
+    注意: 需要安装 redis 包: pip install redis
+    """
+    
+    # KEYS: 失败记录, 封锁键, 封锁索引
+    # ARGV: 窗口毫秒, 最大次数, 封锁毫秒, IP, 随机后缀
+    # 返回: {是否封锁, 剩余次数, 是否本次触发封锁}
+    _RECORD_FAILURE_LUA = """
+if redis.replicate_commands then redis.replicate_commands() end
+if redis.call('PTTL', KEYS[2]) > 0 then
+    return {1, 0, 0}
+end
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local window = tonumber(ARGV[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+redis.call('ZADD', KEYS[1], now, now .. '-' .. ARGV[5])
+redis.call('PEXPIRE', KEYS[1], window)
+local remaining = tonumber(ARGV[2]) - redis.call('ZCARD', KEYS[1])
+if remaining <= 0 then
+    local block = tonumber(ARGV[3])
+    redis.call('SET', KEYS[2], now + block, 'PX', block)
+    redis.call('DEL', KEYS[1])
+    redis.call('ZREMRANGEBYSCORE', KEYS[3], '-inf', now)
+    redis.call('ZADD', KEYS[3], now + block, ARGV[4])
+    return {1, 0, 1}
+end
+return {0, remaining, 0}
+"""
+    
+    # KEYS: 失败记录, 封锁键
+    # ARGV: 窗口毫秒, 最大次数
+    # 返回: 剩余次数
+    _REMAINING_LUA = """
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    return 0
+end
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local count = redis.call('ZCOUNT', KEYS[1], now - tonumber(ARGV[1]), '+inf')
+return math.max(0, tonumber(ARGV[2]) - count)
+"""
+    
+    def __init__(
+        self,
+        redis_client,
+        max_attempts: int = 10,
+        block_minutes: int = 15,
+        window_minutes: int = None,
+        prefix: str = "login_rate:",
+        fallback: bool = True,
+    ):
+        super().__init__(
+            max_attempts=max_attempts,
+            block_minutes=block_minutes,
+            window_minutes=window_minutes,
+        )
+        self._redis = redis_client
+        self._prefix = prefix
+        self._fallback = fallback
+        self._window_ms = self.window_minutes * 60 * 1000
+        self._block_ms = self.block_minutes * 60 * 1000
+        self._record_failure_script = redis_client.register_script(self._RECORD_FAILURE_LUA)
+        self._remaining_script = redis_client.register_script(self._REMAINING_LUA)
+    
+    def _attempts_key(self, ip: str) -> str:
+        return f"{self._prefix}attempts:{ip}"
+    
+    def _blocked_key(self, ip: str) -> str:
+        return f"{self._prefix}blocked:{ip}"
+    
+    def _blocked_index_key(self) -> str:
+        """封锁索引（有序集合，score 为解封时间毫秒），用于管理员查看"""
+        return f"{self._prefix}blocked_index"
+    
+    def _call(self, operation: Callable[[], Any], fallback: Callable[[], Any]) -> Any:
+        """执行 Redis 操作，失败时回退到内存实现"""
+        try:
+            return operation()
+        except Exception as e:
+            if not self._fallback:
+                raise
+            logger.warning(f"Redis 登录频率限制不可用，回退到内存实现: {e}")
+            return fallback()
+    
+    def is_blocked(self, ip: str) -> bool:
+        return self._call(
+            lambda: bool(self._redis.exists(self._blocked_key(ip))),
+            lambda: super(RedisLoginRateLimiter, self).is_blocked(ip),
+        )
+    
+    def get_block_remaining_seconds(self, ip: str) -> int:
+        def operation() -> int:
+            ttl_ms = self._redis.pttl(self._blocked_key(ip))
+            return max(0, int(ttl_ms) // 1000) if ttl_ms and ttl_ms > 0 else 0
+        
+        return self._call(
+            operation,
+            lambda: super(RedisLoginRateLimiter, self).get_block_remaining_seconds(ip),
+        )
+    
+    def get_remaining_attempts(self, ip: str) -> int:
+        return self._call(
+            lambda: int(self._remaining_script(
+                keys=[self._attempts_key(ip), self._blocked_key(ip)],
+                args=[self._window_ms, self.max_attempts],
+            )),
+            lambda: super(RedisLoginRateLimiter, self).get_remaining_attempts(ip),
+        )
+    
+    def record_failure(self, ip: str) -> Tuple[bool, int]:
+        def operation() -> Tuple[bool, int]:
+            blocked, remaining, newly_blocked = self._record_failure_script(
+                keys=[self._attempts_key(ip), self._blocked_key(ip), self._blocked_index_key()],
+                args=[self._window_ms, self.max_attempts, self._block_ms, ip, secrets.token_hex(4)],
+            )
+            if int(newly_blocked):
+                logger.warning(f"IP 已被封锁: {ip}, 封锁{self.block_minutes}分钟")
+            return bool(int(blocked)), int(remaining)
+        
+        return self._call(
+            operation,
+            lambda: super(RedisLoginRateLimiter, self).record_failure(ip),
+        )
+    
+    def reset(self, ip: str) -> None:
+        self._call(
+            lambda: self._redis.delete(self._attempts_key(ip)),
+            lambda: super(RedisLoginRateLimiter, self).reset(ip),
+        )
+    
+    def unblock(self, ip: str) -> bool:
+        def operation() -> bool:
+            pipe = self._redis.pipeline()
+            pipe.delete(self._blocked_key(ip))
+            pipe.delete(self._attempts_key(ip))
+            pipe.zrem(self._blocked_index_key(), ip)
+            was_blocked = bool(pipe.execute()[0])
+            if was_blocked:
+                logger.info(f"IP 封锁已手动解除: {ip}")
+            return was_blocked
+        
+        return self._call(
+            operation,
+            lambda: super(RedisLoginRateLimiter, self).unblock(ip),
+        )
+    
+    def get_blocked_ips(self) -> dict:
+        def operation() -> dict:
+            index_key = self._blocked_index_key()
+            pipe = self._redis.pipeline()
+            pipe.zremrangebyscore(index_key, "-inf", int(time.time() * 1000))
+            pipe.zrange(index_key, 0, -1, withscores=True)
+            entries = pipe.execute()[-1]
+            return {
+                (ip.decode() if isinstance(ip, bytes) else ip): datetime.fromtimestamp(score / 1000)
+                for ip, score in entries
+            }
+        
+        return self._call(
+            operation,
+            lambda: super(RedisLoginRateLimiter, self).get_blocked_ips(),
+        )
+    
+    def cleanup(self) -> int:
+        """清理内存回退期间产生的记录与过期的封锁索引
+        
+        Redis 中的计数与封锁键自动过期，通常无需调用。
+        """
+        cleaned = super().cleanup()
+        try:
+            cleaned += int(self._redis.zremrangebyscore(
+                self._blocked_index_key(), "-inf", int(time.time() * 1000),
+            ))
+        except Exception as e:
+            logger.warning(f"清理 Redis 封锁索引失败: {e}")
+        return cleaned
@@ -185,6 +185,10 @@ class BaseAuthService(AbstractAuthService):
         max_login_attempts: 账户级别最大失败次数，二级防线（默认 20，需 LockableMixin）
         lock_duration_minutes: 账户锁定时长（分钟，默认 30，需 LockableMixin）
         rate_limiter: IP 频率限制器（可选，一级防线，推荐启用）
+        rehash_on_login: 登录成功且哈希需要升级时，在后台线程池中重新哈希并保存（默认 False）
+    
+    密码验证在 PasswordHelper 的有界线程池中执行，线程池满时抛出
+    PasswordHashPoolBusyError（503），避免撞库请求占满 Web 工作线程。
     
     可覆写的方法:
         - get_user_roles(user): 自定义角色提取逻辑
@@ -192,6 +196,7 @@ class BaseAuthService(AbstractAuthService):
         - update_last_login(user_id, **kwargs): 自定义登录记录逻辑
         - on_authenticate_success(user, **kwargs): 认证成功后的钩子
         - on_authenticate_failure(username, **kwargs): 认证失败后的钩子
+        - save_rehashed_password(user_id, new_hash): 保存升级后的密码哈希
     
     使用示例:
         # 最简用法
@@ -216,6 +221,7 @@ class BaseAuthService(AbstractAuthService):
         max_login_attempts: int = 20,
         lock_duration_minutes: int = 30,
         rate_limiter: Optional["LoginRateLimiter"] = None,
+        rehash_on_login: bool = False,
     ):
         self.user_model = user_model
         self.jwt_manager = jwt_manager
@@ -226,6 +232,7 @@ class BaseAuthService(AbstractAuthService):
         self.max_login_attempts = max_login_attempts
         self.lock_duration_minutes = lock_duration_minutes
         self.rate_limiter = rate_limiter
+        self.rehash_on_login = rehash_on_login
     
     # ==================== 核心认证方法 ====================
     
@@ -264,10 +271,16 @@ class BaseAuthService(AbstractAuthService):
             return None
         
         from .password import PasswordHelper
-        if not PasswordHelper.verify(password, user.password_hash):
+        if not PasswordHelper.verify_bounded(password, user.password_hash):
             logger.debug(f"认证失败: 用户 '{username}' 密码错误")
             return None
         
+        if self.rehash_on_login and PasswordHelper.needs_rehash(user.password_hash):
+            user_id = user.id
+            PasswordHelper.rehash_in_background(
+                password, lambda new_hash: self.save_rehashed_password(user_id, new_hash)
+            )
+        
         return user
     
     def get_failure_reason(self, username: str) -> str:
@@ -504,6 +517,26 @@ class BaseAuthService(AbstractAuthService):
         except Exception as e:
             logger.error(f"更新最后登录时间失败: {e}", exc_info=True)
     
+    def save_rehashed_password(self, user_id: int, new_hash: str) -> None:
+        """保存升级后的密码哈希（在后台线程中调用，使用独立 session）
+        
+        子类可覆写以使用自定义的持久化方式。
+        
+        Args:
+            user_id: 用户 ID
+            new_hash: 按当前参数重新计算的密码哈希
+        """
+        from uuid import uuid4
+        from yweb.orm import db_session_scope
+        
+        # request_id 决定 scoped session 的归属，必须每次唯一，避免并发升级共用同一个 session
+        with db_session_scope(request_id=f"password-rehash-{user_id}-{uuid4().hex}"):
+            user = self.user_model.get(user_id)
+            if user:
+                user.password_hash = new_hash
+                user.update()
+                logger.info(f"密码哈希已升级: user_id={user_id}")
+    
     # ==================== 可覆写的钩子方法 ====================
     
     def get_user_roles(self, user) -> List[str]:
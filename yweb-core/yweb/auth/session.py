@@ -5,8 +5,9 @@
 支持功能：
 - Session 创建和管理
 - 多种存储后端（内存、Redis、数据库）
-- Session 过期和续期
+- Session 过期和续期（仅在剩余时间不足时续期，避免每次访问都写存储）
 - 并发会话控制
+- 异步接口（acreate_session / aget_session 等），可配合 RedisSessionStore 使用
 
 使用示例:
     from yweb.auth.session import SessionManager, SessionAuthProvider
@@ -34,15 +35,28 @@
             secure=True,
         )
         return {"message": "Logged in"}
+    
+    # 多实例部署：使用 Redis 存储（redis.asyncio 客户端）
+    import redis.asyncio as redis
+    
+    session_manager = SessionManager(
+        secret_key="your-secret-key",
+        store=RedisSessionStore(redis.from_url("redis://localhost:6379/0")),
+        renew_fraction=0.5,
+    )
+    session = await session_manager.acreate_session(user_id=1)
 """
 
+import json
 import secrets
 import hashlib
+from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from datetime import datetime, timezone, timedelta
 from typing import Optional, Any, Dict, List, Callable
 
 from fastapi import Depends, HTTPException, status, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import APIKeyCookie
 
 from .base import AuthProvider, AuthType, UserIdentity, AuthResult
@@ -118,6 +132,242 @@ def generate_session_id(length: int = 32) -> str:
     return secrets.token_urlsafe(length)
 
 
+class SessionStore(ABC):
+    """异步会话存储抽象基类
+    
+    SessionManager 设置 store 后，异步方法（acreate_session、aget_session 等）
+    直接使用该存储，不再经过同步回调。
+    """
+    
+    @abstractmethod
+    async def save(self, session: Session) -> bool:
+        """完整保存会话（创建、修改会话数据时调用）"""
+        pass
+    
+    @abstractmethod
+    async def get(self, session_id: str) -> Optional[Session]:
+        """根据 session_id 获取会话"""
+        pass
+    
+    @abstractmethod
+    async def delete(self, session_id: str, user_id: Any = None) -> bool:
+        """删除会话
+        
+        Args:
+            session_id: 会话 ID
+            user_id: 所属用户 ID（已知时传入，可省去一次查询）
+        """
+        pass
+    
+    @abstractmethod
+    async def refresh(self, session: Session) -> bool:
+        """续期会话：只写入 last_accessed_at / expires_at 并刷新 TTL"""
+        pass
+    
+    @abstractmethod
+    async def get_user_sessions(self, user_id: Any) -> List[Session]:
+        """获取用户的所有有效会话（按过期时间升序）"""
+        pass
+    
+    @abstractmethod
+    async def trim_user_sessions(self, user_id: Any, keep: int) -> int:
+        """删除用户最早过期的会话，使剩余会话数不超过 keep
+        
+        Returns:
+            int: 删除的会话数量
+        """
+        pass
+
+
+def _to_str(value: Any) -> Optional[str]:
+    """Redis 返回值统一转为字符串"""
+    if value is None:
+        return None
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    return str(value)
+
+
+def _format_dt(value: Optional[datetime]) -> str:
+    return value.isoformat() if value else ""
+
+
+def _parse_dt(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+class RedisSessionStore(SessionStore):
+    """Redis 会话存储
+    
+    数据结构：
+    - ``{prefix}session:{session_id}``: Hash，保存会话字段，过期时间与会话一致
+    - ``{prefix}user:{user_id}``: 有序集合，member 为 session_id，score 为过期时间戳
+    
+    并发会话限制与清理只操作有序集合的头部（O(log n)），
+    续期只更新两个字段和 TTL，不重写整个会话。
+    
+    使用示例:
+        import redis.asyncio as redis
+        
+        store = RedisSessionStore(redis.from_url("redis://localhost:6379/0"))
+        session_manager = SessionManager(secret_key="xxx", store=store)
+    
+    注意: 需要安装 redis 包: pip install redis
+    """
+    
+    def __init__(self, redis_client, prefix: str = "session:"):
+        """
+        Args:
+            redis_client: Redis 异步客户端实例（redis.asyncio.Redis）
+            prefix: 键前缀
+        """
+        self._redis = redis_client
+        self._prefix = prefix
+    
+    def _session_key(self, session_id: str) -> str:
+        return f"{self._prefix}session:{session_id}"
+    
+    def _user_key(self, user_id: Any) -> str:
+        return f"{self._prefix}user:{user_id}"
+    
+    @staticmethod
+    def _to_hash(session: Session) -> Dict[str, str]:
+        return {
+            "session_id": session.session_id,
+            "user_id": json.dumps(session.user_id),
+            "created_at": _format_dt(session.created_at),
+            "expires_at": _format_dt(session.expires_at),
+            "last_accessed_at": _format_dt(session.last_accessed_at),
+            "ip_address": session.ip_address or "",
+            "user_agent": session.user_agent or "",
+            "data": json.dumps(session.data, ensure_ascii=False, default=str),
+            "is_active": "1" if session.is_active else "0",
+            "mfa_verified": "1" if session.mfa_verified else "0",
+            "mfa_verified_at": _format_dt(session.mfa_verified_at),
+        }
+    
+    @staticmethod
+    def _from_hash(raw: Dict[Any, Any]) -> Session:
+        fields = {_to_str(k): _to_str(v) for k, v in raw.items()}
+        return Session(
+            session_id=fields["session_id"],
+            user_id=json.loads(fields["user_id"]),
+            created_at=_parse_dt(fields.get("created_at")),
+            expires_at=_parse_dt(fields.get("expires_at")),
+            last_accessed_at=_parse_dt(fields.get("last_accessed_at")),
+            ip_address=fields.get("ip_address") or None,
+            user_agent=fields.get("user_agent") or None,
+            data=json.loads(fields.get("data") or "{}"),
+            is_active=fields.get("is_active") == "1",
+            mfa_verified=fields.get("mfa_verified") == "1",
+            mfa_verified_at=_parse_dt(fields.get("mfa_verified_at")),
+        )
+    
+    async def _index(self, session: Session) -> None:
+        """更新用户索引，并让索引的 TTL 覆盖其中最晚过期的会话"""
+        user_key = self._user_key(session.user_id)
+        now = datetime.now(timezone.utc).timestamp()
+        pipe = self._redis.pipeline()
+        if session.expires_at:
+            pipe.zadd(user_key, {session.session_id: session.expires_at.timestamp()})
+        else:
+            pipe.zadd(user_key, {session.session_id: "+inf"})
+        pipe.zremrangebyscore(user_key, "-inf", now)
+        pipe.zrange(user_key, -1, -1, withscores=True)
+        results = await pipe.execute()
+        
+        latest = results[-1]
+        if latest and latest[0][1] != float("inf"):
+            await self._redis.expireat(user_key, int(latest[0][1]) + 1)
+        else:
+            await self._redis.persist(user_key)
+    
+    async def save(self, session: Session) -> bool:
+        key = self._session_key(session.session_id)
+        pipe = self._redis.pipeline()
+        pipe.delete(key)
+        pipe.hset(key, mapping=self._to_hash(session))
+        if session.expires_at:
+            pipe.expireat(key, int(session.expires_at.timestamp()) + 1)
+        await pipe.execute()
+        await self._index(session)
+        return True
+    
+    async def get(self, session_id: str) -> Optional[Session]:
+        raw = await self._redis.hgetall(self._session_key(session_id))
+        if not raw:
+            return None
+        return self._from_hash(raw)
+    
+    async def delete(self, session_id: str, user_id: Any = None) -> bool:
+        key = self._session_key(session_id)
+        if user_id is None:
+            raw_user_id = await self._redis.hget(key, "user_id")
+            if raw_user_id is not None:
+                user_id = json.loads(_to_str(raw_user_id))
+        
+        pipe = self._redis.pipeline()
+        pipe.delete(key)
+        if user_id is not None:
+            pipe.zrem(self._user_key(user_id), session_id)
+        results = await pipe.execute()
+        return bool(results[0])
+    
+    async def refresh(self, session: Session) -> bool:
+        key = self._session_key(session.session_id)
+        pipe = self._redis.pipeline()
+        pipe.hset(key, mapping={
+            "last_accessed_at": _format_dt(session.last_accessed_at),
+            "expires_at": _format_dt(session.expires_at),
+        })
+        if session.expires_at:
+            pipe.expireat(key, int(session.expires_at.timestamp()) + 1)
+        await pipe.execute()
+        await self._index(session)
+        return True
+    
+    async def get_user_sessions(self, user_id: Any) -> List[Session]:
+        user_key = self._user_key(user_id)
+        now = datetime.now(timezone.utc).timestamp()
+        pipe = self._redis.pipeline()
+        pipe.zremrangebyscore(user_key, "-inf", now)
+        pipe.zrange(user_key, 0, -1)
+        session_ids = [_to_str(sid) for sid in (await pipe.execute())[-1]]
+        if not session_ids:
+            return []
+        
+        pipe = self._redis.pipeline()
+        for session_id in session_ids:
+            pipe.hgetall(self._session_key(session_id))
+        sessions = []
+        for raw in await pipe.execute():
+            if raw:
+                session = self._from_hash(raw)
+                if session.is_valid():
+                    sessions.append(session)
+        return sessions
+    
+    async def trim_user_sessions(self, user_id: Any, keep: int) -> int:
+        user_key = self._user_key(user_id)
+        now = datetime.now(timezone.utc).timestamp()
+        pipe = self._redis.pipeline()
+        pipe.zremrangebyscore(user_key, "-inf", now)
+        pipe.zcard(user_key)
+        count = (await pipe.execute())[-1]
+        
+        excess = count - max(keep, 0)
+        if excess <= 0:
+            return 0
+        
+        session_ids = [_to_str(sid) for sid in await self._redis.zrange(user_key, 0, excess - 1)]
+        pipe = self._redis.pipeline()
+        for session_id in session_ids:
+            pipe.delete(self._session_key(session_id))
+        pipe.zrem(user_key, *session_ids)
+        await pipe.execute()
+        return len(session_ids)
+
+
 class SessionManager:
     """Session 管理器
     
@@ -130,6 +380,11 @@ class SessionManager:
         auto_renew: 是否自动续期
         renew_threshold_minutes: 续期阈值（剩余时间少于此值时续期）
         cookie_name: Cookie 名称
+        store: 异步会话存储（如 RedisSessionStore），设置后需使用 a* 异步方法
+        renew_fraction: 按比例设置续期阈值（如 0.5 表示剩余时间不足一半时续期），
+            设置后覆盖 renew_threshold_minutes
+    
+    续期只在剩余时间低于阈值时写入存储，其余访问只校验、不回写。
     """
     
     def __init__(
@@ -140,13 +395,22 @@ class SessionManager:
         auto_renew: bool = True,
         renew_threshold_minutes: int = 10,
         cookie_name: str = "session_id",
+        store: Optional[SessionStore] = None,
+        renew_fraction: Optional[float] = None,
     ):
+        if renew_fraction is not None and not 0 < renew_fraction <= 1:
+            raise ValueError("renew_fraction 必须在 (0, 1] 范围内")
+        
         self.secret_key = secret_key
         self.expire_seconds = expire_minutes * 60
         self.max_sessions_per_user = max_sessions_per_user
         self.auto_renew = auto_renew
-        self.renew_threshold_seconds = renew_threshold_minutes * 60
+        if renew_fraction is not None:
+            self.renew_threshold_seconds = self.expire_seconds * renew_fraction
+        else:
+            self.renew_threshold_seconds = renew_threshold_minutes * 60
         self.cookie_name = cookie_name
+        self._store = store
         
         # 内存存储（默认，生产环境应替换为 Redis 或数据库）
         self._sessions: Dict[str, Session] = {}
@@ -206,16 +470,37 @@ class SessionManager:
         Returns:
             Session: 会话对象
         """
+        self._ensure_sync_storage()
+        
         # 检查并发会话限制
         if self.max_sessions_per_user > 0:
             self._enforce_session_limit(user_id)
         
-        session_id = generate_session_id()
-        expire_time = expire_seconds or self.expire_seconds
+        session = self._build_session(user_id, ip_address, user_agent, data, expire_seconds)
         
+        # 保存
+        self._save_session(session)
+        
+        # 记录用户会话
+        if user_id not in self._user_sessions:
+            self._user_sessions[user_id] = []
+        self._user_sessions[user_id].append(session.session_id)
+        
+        return session
+    
+    def _build_session(
+        self,
+        user_id: Any,
+        ip_address: Optional[str],
+        user_agent: Optional[str],
+        data: Optional[Dict[str, Any]],
+        expire_seconds: Optional[int],
+    ) -> Session:
+        """构造新会话对象"""
+        expire_time = expire_seconds or self.expire_seconds
         now = datetime.now(timezone.utc)
-        session = Session(
-            session_id=session_id,
+        return Session(
+            session_id=generate_session_id(),
             user_id=user_id,
             created_at=now,
             expires_at=now + timedelta(seconds=expire_time),
@@ -224,16 +509,22 @@ class SessionManager:
             user_agent=user_agent,
             data=data or {},
         )
+    
+    def _touch_and_renew(self, session: Session) -> bool:
+        """更新访问时间，剩余时间低于阈值时续期
         
-        # 保存
-        self._save_session(session)
-        
-        # 记录用户会话
-        if user_id not in self._user_sessions:
-            self._user_sessions[user_id] = []
-        self._user_sessions[user_id].append(session_id)
-        
-        return session
+        Returns:
+            bool: 是否续期（需要写回存储）
+        """
+        session.touch()
+        if not (self.auto_renew and session.expires_at):
+            return False
+        now = session.last_accessed_at
+        remaining = (session.expires_at - now).total_seconds()
+        if remaining >= self.renew_threshold_seconds:
+            return False
+        session.expires_at = now + timedelta(seconds=self.expire_seconds)
+        return True
     
     def get_session(self, session_id: str) -> Optional[Session]:
         """获取会话
@@ -244,6 +535,7 @@ class SessionManager:
         Returns:
             Session: 会话对象，或 None
         """
+        self._ensure_sync_storage()
         session = self._get_session(session_id)
         
         if not session:
@@ -253,16 +545,9 @@ class SessionManager:
             self.destroy_session(session_id)
             return None
         
-        # 更新访问时间
-        session.touch()
-        
-        # 自动续期
-        if self.auto_renew and session.expires_at:
-            remaining = (session.expires_at - datetime.now(timezone.utc)).total_seconds()
-            if remaining < self.renew_threshold_seconds:
-                session.expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.expire_seconds)
-        
-        self._save_session(session)
+        # 更新访问时间，仅续期时写回存储
+        if self._touch_and_renew(session):
+            self._save_session(session)
         return session
     
     def validate_session(self, session_id: str) -> tuple:
@@ -290,6 +575,7 @@ class SessionManager:
         Returns:
             bool: 是否成功
         """
+        self._ensure_sync_storage()
         session = self._get_session(session_id)
         if session:
             # 从用户会话列表中移除
@@ -326,6 +612,7 @@ class SessionManager:
         Returns:
             List[Session]: 会话列表
         """
+        self._ensure_sync_storage()
         if self._user_sessions_getter:
             return self._user_sessions_getter(user_id)
         
@@ -348,6 +635,7 @@ class SessionManager:
         Returns:
             bool: 是否成功
         """
+        self._ensure_sync_storage()
         session = self._get_session(session_id)
         if not session:
             return False
@@ -367,6 +655,116 @@ class SessionManager:
             for i in range(excess):
                 self.destroy_session(sessions[i].session_id)
     
+    def _ensure_sync_storage(self):
+        """同步方法不支持异步存储"""
+        if self._store is not None:
+            raise RuntimeError(
+                "SessionManager 已配置异步存储，请使用 acreate_session / aget_session 等异步方法"
+            )
+    
+    def _has_sync_callbacks(self) -> bool:
+        """是否设置了同步存储回调（可能阻塞，需放入线程池执行）"""
+        return any((
+            self._session_store,
+            self._session_getter,
+            self._session_deleter,
+            self._user_sessions_getter,
+        ))
+    
+    async def _run_sync(self, func: Callable, *args, **kwargs):
+        """在异步方法中执行同步实现：内存存储直接调用，回调存储放入线程池"""
+        if self._has_sync_callbacks():
+            return await run_in_threadpool(func, *args, **kwargs)
+        return func(*args, **kwargs)
+    
+    # ==================== 异步接口 ====================
+    
+    async def acreate_session(
+        self,
+        user_id: Any,
+        ip_address: str = None,
+        user_agent: str = None,
+        data: Dict[str, Any] = None,
+        expire_seconds: int = None,
+    ) -> Session:
+        """创建会话（异步）
+        
+        参数同 create_session。配置了 store 时，并发会话限制只删除最早过期的会话，
+        不再加载用户的全部会话。
+        """
+        if self._store is None:
+            return await self._run_sync(
+                self.create_session, user_id, ip_address, user_agent, data, expire_seconds
+            )
+        
+        if self.max_sessions_per_user > 0:
+            await self._store.trim_user_sessions(user_id, self.max_sessions_per_user - 1)
+        
+        session = self._build_session(user_id, ip_address, user_agent, data, expire_seconds)
+        await self._store.save(session)
+        return session
+    
+    async def aget_session(self, session_id: str) -> Optional[Session]:
+        """获取会话（异步），仅在续期时写回存储"""
+        if self._store is None:
+            return await self._run_sync(self.get_session, session_id)
+        
+        session = await self._store.get(session_id)
+        if not session:
+            return None
+        
+        if not session.is_valid():
+            await self._store.delete(session_id, session.user_id)
+            return None
+        
+        if self._touch_and_renew(session):
+            await self._store.refresh(session)
+        return session
+    
+    async def avalidate_session(self, session_id: str) -> tuple:
+        """验证会话（异步）
+        
+        Returns:
+            tuple: (is_valid, session_or_error)
+        """
+        session = await self.aget_session(session_id)
+        
+        if not session:
+            return False, "Session not found or expired"
+        
+        return True, session
+    
+    async def adestroy_session(self, session_id: str) -> bool:
+        """销毁会话（异步）"""
+        if self._store is None:
+            return await self._run_sync(self.destroy_session, session_id)
+        return await self._store.delete(session_id)
+    
+    async def adestroy_all_sessions(self, user_id: Any) -> int:
+        """销毁用户的所有会话（异步）"""
+        if self._store is None:
+            return await self._run_sync(self.destroy_all_sessions, user_id)
+        return await self._store.trim_user_sessions(user_id, 0)
+    
+    async def aget_user_sessions(self, user_id: Any) -> List[Session]:
+        """获取用户的所有会话（异步）"""
+        if self._store is None:
+            return await self._run_sync(self.get_user_sessions, user_id)
+        return await self._store.get_user_sessions(user_id)
+    
+    async def aset_mfa_verified(self, session_id: str) -> bool:
+        """标记会话已通过 MFA 验证（异步）"""
+        if self._store is None:
+            return await self._run_sync(self.set_mfa_verified, session_id)
+        
+        session = await self._store.get(session_id)
+        if not session:
+            return False
+        
+        session.mfa_verified = True
+        session.mfa_verified_at = datetime.now(timezone.utc)
+        return await self._store.save(session)
+    
     def _save_session(self, session: Session) -> bool:
         """保存会话"""
         if self._session_store:
@@ -420,7 +818,7 @@ class SessionManager:
                 return None
             
             # 验证会话
-            is_valid, result = self.validate_session(session_id)
+            is_valid, result = await self.avalidate_session(session_id)
             if not is_valid:
                 if auto_error:
                     raise HTTPException(
@@ -462,6 +860,9 @@ class SessionAuthProvider(AuthProvider):
     """Session 认证提供者
     
     实现 AuthProvider 接口，用于统一认证管理。
+    
+    SessionManager 配置了异步存储（如 RedisSessionStore）时，同步方法不可用，
+    请使用 aauthenticate / avalidate_token / arevoke_token / alogout。
     """
     
     def __init__(
@@ -486,12 +887,9 @@ class SessionAuthProvider(AuthProvider):
             "user_agent": "Mozilla/5.0...",
         }
         """
-        if not isinstance(credentials, dict):
-            return AuthResult.fail("Invalid credentials format", "INVALID_CREDENTIALS")
-        
-        user_id = credentials.get("user_id")
-        if not user_id:
-            return AuthResult.fail("User ID required", "USER_ID_REQUIRED")
+        user_id, error = self._parse_credentials(credentials)
+        if error:
+            return error
         
         # 创建会话
         session = self.session_manager.create_session(
@@ -500,9 +898,63 @@ class SessionAuthProvider(AuthProvider):
             user_agent=credentials.get("user_agent"),
             data=credentials.get("data"),
         )
+        return self._login_result(user_id, session)
+    
+    async def aauthenticate(self, credentials: Any) -> AuthResult:
+        """验证凭证并创建会话（异步，支持异步会话存储）"""
+        user_id, error = self._parse_credentials(credentials)
+        if error:
+            return error
+        
+        session = await self.session_manager.acreate_session(
+            user_id=user_id,
+            ip_address=credentials.get("ip_address"),
+            user_agent=credentials.get("user_agent"),
+            data=credentials.get("data"),
+        )
+        return self._login_result(user_id, session)
+    
+    def validate_token(self, token: str) -> AuthResult:
+        """验证会话"""
+        return self._validation_result(*self.session_manager.validate_session(token))
+    
+    async def avalidate_token(self, token: str) -> AuthResult:
+        """验证会话（异步，支持异步会话存储）"""
+        return self._validation_result(*await self.session_manager.avalidate_session(token))
+    
+    def revoke_token(self, token: str) -> bool:
+        """销毁会话"""
+        return self.session_manager.destroy_session(token)
+    
+    async def arevoke_token(self, token: str) -> bool:
+        """销毁会话（异步）"""
+        return await self.session_manager.adestroy_session(token)
+    
+    def logout(self, identity: UserIdentity) -> bool:
+        """登出"""
+        if identity.session_id:
+            return self.session_manager.destroy_session(identity.session_id)
+        return False
+    
+    async def alogout(self, identity: UserIdentity) -> bool:
+        """登出（异步）"""
+        if identity.session_id:
+            return await self.session_manager.adestroy_session(identity.session_id)
+        return False
+    
+    @staticmethod
+    def _parse_credentials(credentials: Any) -> tuple:
+        """解析凭证，返回 (user_id, 错误结果)"""
+        if not isinstance(credentials, dict):
+            return None, AuthResult.fail("Invalid credentials format", "INVALID_CREDENTIALS")
         
-        # 获取用户信息
-        user = None
+        user_id = credentials.get("user_id")
+        if not user_id:
+            return None, AuthResult.fail("User ID required", "USER_ID_REQUIRED")
+        return user_id, None
+    
+    def _user_fields(self, user_id: Any) -> tuple:
+        """获取用户信息，返回 (username, email, roles)"""
         username = str(user_id)
         email = None
         roles = []
@@ -513,7 +965,10 @@ class SessionAuthProvider(AuthProvider):
                 username = getattr(user, "username", str(user_id))
                 email = getattr(user, "email", None)
                 roles = getattr(user, "roles", [])
-        
+        return username, email, roles
+    
+    def _login_result(self, user_id: Any, session: Session) -> AuthResult:
+        username, email, roles = self._user_fields(user_id)
         identity = UserIdentity(
             user_id=user_id,
             username=username,
@@ -529,28 +984,12 @@ class SessionAuthProvider(AuthProvider):
             expires_at=session.expires_at.isoformat() if session.expires_at else None,
         )
     
-    def validate_token(self, token: str) -> AuthResult:
-        """验证会话"""
-        is_valid, result = self.session_manager.validate_session(token)
-        
+    def _validation_result(self, is_valid: bool, result: Any) -> AuthResult:
         if not is_valid:
             return AuthResult.fail(result, "INVALID_SESSION")
         
         session = result
-        
-        # 获取用户信息
-        user = None
-        username = str(session.user_id)
-        email = None
-        roles = []
-        
-        if self.user_getter:
-            user = self.user_getter(session.user_id)
-            if user:
-                username = getattr(user, "username", str(session.user_id))
-                email = getattr(user, "email", None)
-                roles = getattr(user, "roles", [])
-        
+        username, email, roles = self._user_fields(session.user_id)
         identity = UserIdentity(
             user_id=session.user_id,
             username=username,
@@ -562,16 +1001,6 @@ class SessionAuthProvider(AuthProvider):
         )
         
         return AuthResult.ok(identity)
-    
-    def revoke_token(self, token: str) -> bool:
-        """销毁会话"""
-        return self.session_manager.destroy_session(token)
-    
-    def logout(self, identity: UserIdentity) -> bool:
-        """登出"""
-        if identity.session_id:
-            return self.session_manager.destroy_session(identity.session_id)
-        return False
 
 
 def set_session_cookie(
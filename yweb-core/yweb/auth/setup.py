@@ -46,7 +46,14 @@
             cache_ttl=120,
         )
     
-    级别5：完全自定义（使用 create_auth_dependency）::
+    级别5：轻量用户投影（认证热路径只查询必要的列）::
+    
+        auth = setup_auth(User, role_model=True, user_projection=True)
+        
+        # get_current_user 返回只读的 UserProjection（id / username / 角色编码），
+        # 需要完整模型时调用 user.load()
+    
+    级别6：完全自定义（使用 create_auth_dependency）::
     
         from yweb.auth import create_auth_dependency
         
@@ -57,7 +64,7 @@
 """
 
 from dataclasses import dataclass, field
-from typing import Type, Optional, Callable, Any, Union
+from typing import Type, Optional, Callable, Any, Union, Sequence
 
 from .jwt import JWTManager
 from yweb.log import get_logger
@@ -170,6 +177,7 @@ class AuthSetup:
         max_login_attempts: int = 20,
         lock_duration_minutes: int = 30,
         rate_limiter=None,
+        rehash_on_login: bool = False,
     ) -> "BaseAuthService":
         """便捷创建 BaseAuthService
         
@@ -183,6 +191,7 @@ class AuthSetup:
             max_login_attempts: 账户级别最大失败次数（默认 20，需 LockableMixin）
             lock_duration_minutes: 账户锁定时长（分钟，默认 30，需 LockableMixin）
             rate_limiter: LoginRateLimiter 实例（可选，IP 频率限制）
+            rehash_on_login: 登录成功后在后台升级过时的密码哈希（默认 False）
             
         Returns:
             BaseAuthService 实例
@@ -224,6 +233,7 @@ class AuthSetup:
             max_login_attempts=max_login_attempts,
             lock_duration_minutes=lock_duration_minutes,
             rate_limiter=rate_limiter,
+            rehash_on_login=rehash_on_login,
         )
     
     def mount_routes(
@@ -257,6 +267,7 @@ class AuthSetup:
         lock_duration_minutes: int = 30,
         ip_max_attempts: int = 10,
         ip_block_minutes: int = 15,
+        ip_rate_limiter: Optional[Any] = None,
     ) -> None:
         """挂载认证相关的预置路由到 FastAPI 应用
         
@@ -296,6 +307,8 @@ class AuthSetup:
             enable_kick: 是否启用 POST /kick（踢出用户，默认关闭）
             login_response_builder: 自定义登录响应构建函数
             user_response_dto: 自定义用户响应 DTO 类型
+            ip_rate_limiter: IP 频率限制器实例（如 RedisLoginRateLimiter），
+                设置后忽略 ip_max_attempts / ip_block_minutes
         
         使用示例::
         
@@ -373,6 +386,7 @@ class AuthSetup:
                 lock_duration_minutes=lock_duration_minutes,
                 ip_max_attempts=ip_max_attempts,
                 ip_block_minutes=ip_block_minutes,
+                ip_rate_limiter=ip_rate_limiter,
             )
     
     def _mount_auth_routes(
@@ -396,6 +410,7 @@ class AuthSetup:
         lock_duration_minutes: int = 30,
         ip_max_attempts: int = 10,
         ip_block_minutes: int = 15,
+        ip_rate_limiter: Optional[Any] = None,
     ) -> None:
         """内部方法：解析参数并挂载认证端点路由"""
         from .api import create_auth_router
@@ -415,7 +430,9 @@ class AuthSetup:
         
         # 2. 创建 IP 频率限制器
         resolved_rate_limiter = None
-        if ip_max_attempts and ip_max_attempts > 0:
+        if ip_rate_limiter is not None:
+            resolved_rate_limiter = ip_rate_limiter
+        elif ip_max_attempts and ip_max_attempts > 0:
             from .rate_limiter import LoginRateLimiter
             resolved_rate_limiter = LoginRateLimiter(
                 max_attempts=ip_max_attempts,
@@ -486,6 +503,7 @@ def setup_auth(
     role_model: Union[bool, Type, None] = None,
     role_table_name: Optional[str] = None,
     role_assoc_table_name: Optional[str] = None,
+    user_projection: Union[bool, Sequence[str], None] = None,
     # 路由挂载（可选，提供 app 时自动挂载）
     app=None,
     login_record_model: Union[bool, Type, None] = None,
@@ -517,6 +535,7 @@ def setup_auth(
     lock_duration_minutes: int = 30,
     ip_max_attempts: int = 10,
     ip_block_minutes: int = 15,
+    ip_rate_limiter: Optional[Any] = None,
 ) -> AuthSetup:
     """一站式认证设置
     
@@ -546,6 +565,11 @@ def setup_auth(
             - AbstractSimpleRole 子类: 使用自定义 Role + 自动设置 User.roles 关系 + 混入 RoleMixin
         role_table_name: 角色表名（仅 role_model=True 时生效，默认 "role"）
         role_assoc_table_name: 用户-角色关联表名（默认 "user_role"）
+        user_projection: 认证用户的加载方式。支持以下类型：
+            - None / False: 加载完整 ORM 用户对象（默认）
+            - True: 只查询 id / username / email 和角色编码，返回只读 UserProjection
+            - 字段名列表: 在 True 的基础上额外投影这些字段（如 ["nickname", "dept_id"]）
+            UserProjection 按值缓存，无需快照和 Session merge；需要完整模型时调用 projection.load()
         app: FastAPI 应用实例（可选）。提供时自动挂载路由。
         login_record_model: 登录记录模型配置。支持以下类型：
             - None: 提供 app 时默认 True（一站式模式自动启用登录记录），否则不启用
@@ -586,6 +610,8 @@ def setup_auth(
         lock_duration_minutes: 账户锁定时长（分钟，默认 30，需 LockableMixin）
         ip_max_attempts: 同一 IP 最大失败次数，一级防线（默认 10，0 为禁用）
         ip_block_minutes: IP 封锁时长（分钟，默认 15）
+        ip_rate_limiter: IP 频率限制器实例（多实例部署时使用 RedisLoginRateLimiter），
+            设置后忽略 ip_max_attempts / ip_block_minutes
     
     Returns:
         AuthSetup 对象，包含认证依赖、auth_service、token_blacklist 等
@@ -649,6 +675,7 @@ def setup_auth(
         user_model=user_model,
         active_field=active_field,
         cache_ttl=cache_ttl,
+        user_projection=user_projection,
     )
     
     # 4. 创建认证依赖
@@ -663,6 +690,7 @@ def setup_auth(
         f"认证设置完成: user_model={user_model.__name__}, "
         f"token_url={token_url}, cache_ttl={cache_ttl}s, "
         f"active_field={active_field}{role_info}"
+        f"{', user_projection=on' if user_projection else ''}"
     )
     
     auth_setup = AuthSetup(
@@ -721,6 +749,7 @@ def setup_auth(
             lock_duration_minutes=lock_duration_minutes,
             ip_max_attempts=ip_max_attempts,
             ip_block_minutes=ip_block_minutes,
+            ip_rate_limiter=ip_rate_limiter,
         )
     
     return auth_setup
@@ -957,6 +986,7 @@ def _create_jwt_manager(jwt_settings) -> JWTManager:
             access_token_expire_minutes=jwt_conf.access_token_expire_minutes,
             refresh_token_expire_days=jwt_conf.refresh_token_expire_days,
             refresh_token_sliding_days=getattr(jwt_conf, 'refresh_token_sliding_days', 2),
+            verify_cache_size=getattr(jwt_conf, 'verify_cache_size', 1024),
         )
     
     elif isinstance(jwt_settings, dict):
@@ -970,6 +1000,7 @@ def _create_jwt_manager(jwt_settings) -> JWTManager:
             access_token_expire_minutes=getattr(jwt_settings, 'access_token_expire_minutes', 30),
             refresh_token_expire_days=getattr(jwt_settings, 'refresh_token_expire_days', 7),
             refresh_token_sliding_days=getattr(jwt_settings, 'refresh_token_sliding_days', 2),
+            verify_cache_size=getattr(jwt_settings, 'verify_cache_size', 1024),
         )
     
     else:
@@ -983,6 +1014,7 @@ def _create_user_getter(
     user_model: Type,
     active_field: Optional[str],
     cache_ttl: int,
+    user_projection: Union[bool, Sequence[str], None] = None,
 ):
     """创建用户获取函数（可选缓存 + 活跃检查）
     
@@ -993,9 +1025,15 @@ def _create_user_getter(
     2. @cached(orm_model=...) 自动处理 detached 对象的 Session merge
     3. watch_relationships=True 自动监听 M2M 集合变更触发缓存失效
     
+    启用 user_projection 时改为按列投影 UserProjection，缓存的是只读值对象，
+    不做 pickle 快照和 Session merge；失效策略与 ORM 模式相同。
+    
     Returns:
         (user_getter, cached_func) 元组。cached_func 在无缓存时为 None。
     """
+    if user_projection:
+        return _create_projection_getter(user_model, active_field, cache_ttl, user_projection)
+    
     _eager_options = _build_eager_options(user_model) if cache_ttl > 0 else []
     
     def _get_user(user_id: int):
@@ -1033,6 +1071,39 @@ def _create_user_getter(
     return cached_get_user, cached_get_user
 
 
+def _create_projection_getter(
+    user_model: Type,
+    active_field: Optional[str],
+    cache_ttl: int,
+    user_projection: Union[bool, Sequence[str]],
+):
+    """创建 UserProjection 获取函数（可选缓存）"""
+    from .projection import create_projection_loader
+    
+    fields = None if user_projection is True else list(user_projection)
+    load_projection = create_projection_loader(user_model, active_field=active_field, fields=fields)
+    
+    if cache_ttl <= 0:
+        return load_projection, None
+    
+    try:
+        from yweb.cache import cached, cache_invalidator
+    except ImportError:
+        logger.warning("yweb.cache 不可用，跳过缓存配置")
+        return load_projection, None
+    
+    cached_load_projection = cached(
+        ttl=cache_ttl,
+        key_prefix="user:projection",
+    )(load_projection)
+    
+    cache_invalidator.register(
+        user_model, cached_load_projection, watch_relationships=True
+    )
+    
+    return cached_load_projection, cached_load_projection
+
+
 def _build_eager_options(user_model: Type) -> list:
     """自动检测用户模型上的 ManyToMany 关系，构建 selectinload 预加载选项
     
@@ -1069,10 +1140,13 @@ def _create_auth_dependencies(
     - 依赖函数在请求时执行，此时全局黑名单已就绪
     - 未配置黑名单时 get_token_blacklist() 返回 None，检查自动跳过
     
+    每个请求只解码一次 Token：验证结果同时用于黑名单检查和用户加载，
+    并写入 request.state.token_data，供限流 key_func 等后续环节复用。
+    
     Returns:
         (get_current_user, get_current_user_optional) 元组
     """
-    from fastapi import Depends
+    from fastapi import Depends, Request
     from fastapi.security import OAuth2PasswordBearer
     from yweb.exceptions import AuthenticationException, ErrorCode
     
@@ -1080,7 +1154,10 @@ def _create_auth_dependencies(
     oauth2 = OAuth2PasswordBearer(tokenUrl=token_url, auto_error=False)
     
     def _make_dependency(auto_error: bool):
-        def dependency(token: Optional[str] = Depends(oauth2)):
+        def dependency(
+            token: Optional[str] = Depends(oauth2),
+            request: Request = None,
+        ):
             if not token:
                 if auto_error:
                     raise AuthenticationException(
@@ -1089,11 +1166,23 @@ def _create_auth_dependencies(
                     )
                 return None
             
+            # raise_on_expired=auto_error：必须认证时区分过期/无效，
+            # 可选认证时静默返回 None
+            # Token 过期 → AuthenticationException(TOKEN_EXPIRED)，黑名单检查后再抛出
+            # Token 无效 → 返回 None，下面统一处理
+            expired_error = None
+            try:
+                token_data = jwt_manager.verify_token(
+                    token, raise_on_expired=auto_error
+                )
+            except AuthenticationException as e:
+                token_data, expired_error = None, e
+            
             # 黑名单检查：踢出 / 登出 / 改密码后的 token 立即失效
             # 延迟获取全局黑名单，请求时 mount_routes 已完成配置
             from .token_store import get_token_blacklist
             blacklist = get_token_blacklist()
-            if blacklist and blacklist.is_revoked(token):
+            if blacklist and blacklist.is_revoked(token, token_data=token_data):
                 if auto_error:
                     raise AuthenticationException(
                         "登录已失效，请重新登录",
@@ -1101,13 +1190,9 @@ def _create_auth_dependencies(
                     )
                 return None
             
-            # raise_on_expired=auto_error：必须认证时区分过期/无效，
-            # 可选认证时静默返回 None
-            # Token 过期 → AuthenticationException(TOKEN_EXPIRED)
-            # Token 无效 → 返回 None，下面统一处理
-            token_data = jwt_manager.verify_token(
-                token, raise_on_expired=auto_error
-            )
+            if expired_error is not None:
+                raise expired_error
+            
             if not token_data or not token_data.user_id:
                 if auto_error:
                     raise AuthenticationException(
@@ -1124,6 +1209,9 @@ def _create_auth_dependencies(
                     )
                 return None
             
+            if request is not None:
+                request.state.token_data = token_data
+            
             user = user_getter(token_data.user_id)
             if not user:
                 if auto_error:
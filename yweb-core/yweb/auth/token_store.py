@@ -26,13 +26,27 @@ Redis 存储示例:
     redis_client = redis.Redis(host='localhost', port=6379, db=0)
     store = RedisTokenStore(redis_client, prefix="token_blacklist:")
     blacklist = TokenBlacklist(store)
+
+本地布隆过滤器示例（多实例部署，减少每次请求的 Redis 往返）:
+    from yweb.auth.token_store import BloomFilterTokenStore, RedisTokenStore, TokenBlacklist
+    
+    store = BloomFilterTokenStore(RedisTokenStore(redis_client), sync_interval=5)
+    blacklist = TokenBlacklist(store)
 """
 
+import hashlib
+import math
+import threading
+import time
 from abc import ABC, abstractmethod
 from datetime import datetime, timezone, timedelta
-from typing import Optional, Dict, Any, Set, List
+from typing import Optional, Dict, Any, Set, List, TYPE_CHECKING
 from dataclasses import dataclass, field
 
+if TYPE_CHECKING:
+    from .jwt import JWTManager
+    from .schemas import TokenData
+
 
 @dataclass
 class RevokedTokenInfo:
@@ -69,8 +83,13 @@ class TokenStore(ABC):
     """Token 存储抽象基类
     
     定义 Token 撤销所需的存储接口。
+    
+    支持增量同步的实现需将 supports_incremental_sync 置为 True，
+    并实现 get_revoked_since / get_user_revocations_since。
     """
     
+    supports_incremental_sync: bool = False
+    
     @abstractmethod
     def add(self, info: RevokedTokenInfo) -> bool:
         """添加被撤销的 Token
@@ -164,6 +183,28 @@ class TokenStore(ABC):
             清理的数量
         """
         pass
+    
+    def get_revoked_since(self, since: float) -> List[str]:
+        """获取指定时间之后被撤销的 Token 哈希（supports_incremental_sync 为 True 时实现）
+        
+        Args:
+            since: Unix 时间戳（秒），0 表示全部
+            
+        Returns:
+            Token 哈希列表
+        """
+        raise NotImplementedError(f"{type(self).__name__} 不支持增量同步")
+    
+    def get_user_revocations_since(self, since: float) -> Dict[int, datetime]:
+        """获取指定时间之后新增的用户级撤销记录（supports_incremental_sync 为 True 时实现）
+        
+        Args:
+            since: Unix 时间戳（秒），0 表示全部
+            
+        Returns:
+            {user_id: 撤销时间}
+        """
+        raise NotImplementedError(f"{type(self).__name__} 不支持增量同步")
 
 
 class InMemoryTokenStore(TokenStore):
@@ -175,6 +216,8 @@ class InMemoryTokenStore(TokenStore):
         store = InMemoryTokenStore()
     """
     
+    supports_incremental_sync = True
+    
     def __init__(self):
         self._tokens: Dict[str, RevokedTokenInfo] = {}
         self._user_tokens: Dict[int, Set[str]] = {}
@@ -224,6 +267,19 @@ class InMemoryTokenStore(TokenStore):
             self.remove(h)
         
         return len(expired)
+    
+    def get_revoked_since(self, since: float) -> List[str]:
+        return [
+            h for h, info in list(self._tokens.items())
+            if info.revoked_at.timestamp() >= since
+        ]
+    
+    def get_user_revocations_since(self, since: float) -> Dict[int, datetime]:
+        return {
+            user_id: revoked_at
+            for user_id, revoked_at in list(self._user_revocations.items())
+            if revoked_at.timestamp() >= since
+        }
 
 
 class RedisTokenStore(TokenStore):
@@ -240,6 +296,8 @@ class RedisTokenStore(TokenStore):
     注意: 需要安装 redis 包: pip install redis
     """
     
+    supports_incremental_sync = True
+    
     def __init__(
         self,
         redis_client,
@@ -265,6 +323,18 @@ class RedisTokenStore(TokenStore):
     def _user_revoke_key(self, user_id: int) -> str:
         return f"{self._prefix}user_revoke:{user_id}"
     
+    def _token_index_key(self) -> str:
+        """撤销索引（有序集合，score 为对应键的过期时间），用于全量同步"""
+        return f"{self._prefix}token_index"
+    
+    def _token_recent_index_key(self) -> str:
+        """最近撤销索引（有序集合，score 为写入时间），用于增量同步"""
+        return f"{self._prefix}token_recent_index"
+    
+    def _user_revoke_index_key(self) -> str:
+        """用户级撤销索引（有序集合，score 为撤销时间），用于增量同步，只保留默认 TTL 时长"""
+        return f"{self._prefix}user_revoke_index"
+    
     def add(self, info: RevokedTokenInfo) -> bool:
         import json
         
@@ -282,6 +352,16 @@ class RedisTokenStore(TokenStore):
         if info.user_id:
             self._redis.sadd(self._user_key(info.user_id), info.token_hash)
         
+        # 撤销索引按键的过期时间记分，与键同时失效，全量重建时不会遗漏仍有效的撤销；
+        # 最近撤销索引只服务增量同步，保留默认 TTL 时长即可
+        now = time.time()
+        index_key = self._token_index_key()
+        self._redis.zadd(index_key, {info.token_hash: now + ttl})
+        self._redis.zremrangebyscore(index_key, "-inf", now)
+        recent_key = self._token_recent_index_key()
+        self._redis.zadd(recent_key, {info.token_hash: now})
+        self._redis.zremrangebyscore(recent_key, "-inf", now - self._default_ttl)
+        
         return True
     
     def exists(self, token_hash: str) -> bool:
@@ -302,6 +382,8 @@ class RedisTokenStore(TokenStore):
         
         if info and info.user_id:
             self._redis.srem(self._user_key(info.user_id), token_hash)
+        self._redis.zrem(self._token_index_key(), token_hash)
+        self._redis.zrem(self._token_recent_index_key(), token_hash)
         
         return result
     
@@ -321,6 +403,10 @@ class RedisTokenStore(TokenStore):
     def add_user_revocation(self, user_id: int, revoked_at: datetime) -> bool:
         key = self._user_revoke_key(user_id)
         self._redis.set(key, revoked_at.isoformat())
+        index_key = self._user_revoke_index_key()
+        self._redis.zadd(index_key, {str(user_id): revoked_at.timestamp()})
+        # 早于默认 TTL 的用户级撤销所覆盖的 Token 均已过期，索引中不再保留
+        self._redis.zremrangebyscore(index_key, "-inf", time.time() - self._default_ttl)
         return True
     
     def get_user_revocation_time(self, user_id: int) -> Optional[datetime]:
@@ -337,6 +423,221 @@ class RedisTokenStore(TokenStore):
     def cleanup_expired(self) -> int:
         # Redis 自动通过 TTL 清理，这里返回 0
         return 0
+    
+    def get_revoked_since(self, since: float) -> List[str]:
+        if since <= 0:
+            # 全量：所有键尚未过期的撤销
+            members = self._redis.zrangebyscore(self._token_index_key(), time.time(), "+inf")
+        else:
+            members = self._redis.zrangebyscore(self._token_recent_index_key(), since, "+inf")
+        return [m.decode() if isinstance(m, bytes) else m for m in members]
+    
+    def get_user_revocations_since(self, since: float) -> Dict[int, datetime]:
+        members = self._redis.zrangebyscore(
+            self._user_revoke_index_key(), since, "+inf", withscores=True
+        )
+        result = {}
+        for member, score in members:
+            if isinstance(member, bytes):
+                member = member.decode()
+            result[int(member)] = datetime.fromtimestamp(score, tz=timezone.utc)
+        return result
+
+
+class BloomFilter:
+    """简单的布隆过滤器
+    
+    只会误报（可能存在），不会漏报（一定不存在）。
+    使用双重哈希（Kirsch-Mitzenmacher）从一次 blake2b 摘要推导 k 个位置。
+    
+    使用示例:
+        bloom = BloomFilter(capacity=100000, error_rate=0.001)
+        bloom.add("abc")
+        "abc" in bloom  # True
+    """
+    
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.001):
+        """
+        Args:
+            capacity: 预期元素数量
+            error_rate: 期望误报率（元素数不超过 capacity 时）
+        """
+        if capacity <= 0:
+            raise ValueError("capacity 必须大于 0")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate 必须在 (0, 1) 区间内")
+        
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+    
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+    
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+    
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class BloomFilterTokenStore(TokenStore):
+    """带本地布隆过滤器的 Token 存储（包装另一个存储）
+    
+    绝大多数 Token 从未被撤销，本存储在进程内维护一份撤销哈希的布隆过滤器：
+    - exists(): 过滤器判定"一定不存在"时直接返回 False，跳过后端查询；
+      只有"可能存在"时才查询后端存储确认
+    - get_user_revocation_time(): 用户级撤销时间完全由本地映射回答
+    - 其他 Worker 的撤销通过后端的 get_revoked_since / get_user_revocations_since
+      增量拉取（每 sync_interval 秒最多一次，在访问时触发）
+    
+    一致性：其他实例的撤销最多延迟 sync_interval 秒生效；本实例的撤销立即生效。
+    
+    使用示例:
+        store = BloomFilterTokenStore(RedisTokenStore(redis_client), sync_interval=5)
+        blacklist = TokenBlacklist(store, jwt_manager)
+    
+    注意: 后端存储必须声明 supports_incremental_sync 并实现
+    get_revoked_since / get_user_revocations_since（InMemoryTokenStore 与 RedisTokenStore 已内置）。
+    """
+    
+    supports_incremental_sync = True
+    
+    def __init__(
+        self,
+        store: TokenStore,
+        sync_interval: float = 5.0,
+        capacity: int = 100000,
+        error_rate: float = 0.001,
+        clock_skew_seconds: float = 5.0,
+    ):
+        """
+        Args:
+            store: 后端存储
+            sync_interval: 增量同步间隔（秒）
+            capacity: 布隆过滤器容量，撤销数超过容量时自动全量重建
+            error_rate: 布隆过滤器误报率
+            clock_skew_seconds: 增量拉取的时间回溯量，容忍各实例间的时钟偏差
+        """
+        if not store.supports_incremental_sync:
+            raise ValueError(
+                f"BloomFilterTokenStore 需要后端支持增量同步: {type(store).__name__}"
+            )
+        self._store = store
+        self._sync_interval = sync_interval
+        self._capacity = capacity
+        self._error_rate = error_rate
+        self._clock_skew = clock_skew_seconds
+        self._lock = threading.Lock()
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._user_revocations: Dict[int, datetime] = {}
+        self._last_sync = 0.0
+        self._stats = {"filtered": 0, "store_lookups": 0, "syncs": 0}
+        
+        self.sync(full=True)
+    
+    @property
+    def store(self) -> TokenStore:
+        """后端存储"""
+        return self._store
+    
+    def sync(self, full: bool = False) -> None:
+        """从后端拉取撤销增量（full=True 时全量重建过滤器）"""
+        with self._lock:
+            self._sync_locked(full)
+    
+    def _sync_locked(self, full: bool) -> None:
+        now = time.time()
+        rebuild = full or self._bloom.count >= self._capacity
+        since = 0.0 if rebuild else max(0.0, self._last_sync - self._clock_skew)
+        token_hashes = self._store.get_revoked_since(since)
+        user_revocations = self._store.get_user_revocations_since(since)
+        
+        if rebuild:
+            self._capacity = max(self._capacity, len(token_hashes) * 2)
+            self._bloom = BloomFilter(self._capacity, self._error_rate)
+            self._user_revocations = {}
+        for token_hash in token_hashes:
+            if token_hash not in self._bloom:
+                self._bloom.add(token_hash)
+        self._user_revocations.update(user_revocations)
+        self._last_sync = now
+        self._stats["syncs"] += 1
+    
+    def _maybe_sync(self) -> None:
+        """到期时增量同步；已有线程在同步时直接使用当前过滤器，不排队等待"""
+        if time.time() - self._last_sync < self._sync_interval:
+            return
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            if time.time() - self._last_sync >= self._sync_interval:
+                self._sync_locked(full=False)
+        finally:
+            self._lock.release()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """过滤统计：filtered=本地直接判定未撤销次数，store_lookups=回源查询次数"""
+        with self._lock:
+            return {
+                **self._stats,
+                "filter_size": self._bloom.count,
+                "filter_capacity": self._capacity,
+                "user_revocations": len(self._user_revocations),
+            }
+    
+    def add(self, info: RevokedTokenInfo) -> bool:
+        result = self._store.add(info)
+        with self._lock:
+            self._bloom.add(info.token_hash)
+        return result
+    
+    def exists(self, token_hash: str) -> bool:
+        self._maybe_sync()
+        maybe_revoked = token_hash in self._bloom
+        with self._lock:
+            self._stats["store_lookups" if maybe_revoked else "filtered"] += 1
+        if not maybe_revoked:
+            return False
+        return self._store.exists(token_hash)
+    
+    def get(self, token_hash: str) -> Optional[RevokedTokenInfo]:
+        return self._store.get(token_hash)
+    
+    def remove(self, token_hash: str) -> bool:
+        # 布隆过滤器不支持删除，残留位只会导致一次回源查询
+        return self._store.remove(token_hash)
+    
+    def get_by_user(self, user_id: int) -> List[RevokedTokenInfo]:
+        return self._store.get_by_user(user_id)
+    
+    def add_user_revocation(self, user_id: int, revoked_at: datetime) -> bool:
+        result = self._store.add_user_revocation(user_id, revoked_at)
+        with self._lock:
+            self._user_revocations[user_id] = revoked_at
+        return result
+    
+    def get_user_revocation_time(self, user_id: int) -> Optional[datetime]:
+        self._maybe_sync()
+        return self._user_revocations.get(user_id)
+    
+    def cleanup_expired(self) -> int:
+        return self._store.cleanup_expired()
+    
+    def get_revoked_since(self, since: float) -> List[str]:
+        return self._store.get_revoked_since(since)
+    
+    def get_user_revocations_since(self, since: float) -> Dict[int, datetime]:
+        return self._store.get_user_revocations_since(since)
 
 
 class TokenBlacklist:
@@ -375,8 +676,8 @@ class TokenBlacklist:
     
     def _hash_token(self, token: str) -> str:
         """计算 Token 哈希值"""
-        import hashlib
-        return hashlib.sha256(token.encode()).hexdigest()
+        from .jwt import hash_token
+        return hash_token(token)
     
     def _get_token_info(self, token: str) -> tuple:
         """从 Token 中提取信息
@@ -436,7 +737,7 @@ class TokenBlacklist:
         """
         return self._store.add_user_revocation(user_id, datetime.now(timezone.utc))
     
-    def is_revoked(self, token: str) -> bool:
+    def is_revoked(self, token: str, token_data: Optional["TokenData"] = None) -> bool:
         """检查 Token 是否被撤销
         
         检查逻辑:
@@ -445,6 +746,8 @@ class TokenBlacklist:
         
         Args:
             token: JWT Token 字符串
+            token_data: 调用方已验证的 TokenData（可选）。传入时直接复用，
+                        避免同一请求内重复解码 Token
             
         Returns:
             是否被撤销
@@ -456,14 +759,14 @@ class TokenBlacklist:
             return True
         
         # 检查用户级别的撤销
-        if self._jwt_manager:
+        if token_data is None and self._jwt_manager:
             token_data = self._jwt_manager.verify_token(token)
-            if token_data and token_data.user_id:
-                revoke_time = self._store.get_user_revocation_time(token_data.user_id)
-                if revoke_time and token_data.iat:
-                    token_issued_at = datetime.fromtimestamp(token_data.iat, tz=timezone.utc)
-                    if token_issued_at < revoke_time:
-                        return True
+        if token_data and token_data.user_id:
+            revoke_time = self._store.get_user_revocation_time(token_data.user_id)
+            if revoke_time and token_data.iat:
+                token_issued_at = datetime.fromtimestamp(token_data.iat, tz=timezone.utc)
+                if token_issued_at < revoke_time:
+                    return True
         
         return False
     
@@ -41,6 +41,7 @@ from .base_schemas import (
     PaginationField,
     PaginationTmpField,
     Page,
+    CursorPage,
     DateTimeStr,
     format_datetime_to_string,
 )
@@ -57,7 +58,17 @@ from .db_session import (
     on_request_end,
     db_session_scope,
     with_db_session,
+    # 异步 API
+    init_async_database,
+    get_async_engine,
+    get_async_db,
+    async_db_session_scope,
+    close_async_database,
 )
+# 读写分离
+from .replica import ReplicaRouter, RoutingSession
+# 游标分页
+from .pagination import InvalidCursorError, configure_cursor_secret, configure_pagination, clear_count_cache
 
 # 软删除扩展
 from .orm_extensions import (
@@ -226,6 +237,7 @@ __all__ = [
     "PaginationField",
     "PaginationTmpField",
     "Page",
+    "CursorPage",
     "DateTimeStr",
     "format_datetime_to_string",
     
@@ -244,6 +256,21 @@ __all__ = [
     "on_request_end",
     "db_session_scope",
     "with_db_session",
+    "init_async_database",
+    "get_async_engine",
+    "get_async_db",
+    "async_db_session_scope",
+    "close_async_database",
+    
+    # Pagination
+    "InvalidCursorError",
+    "configure_cursor_secret",
+    "configure_pagination",
+    "clear_count_cache",
+    
+    # Read Replicas
+    "ReplicaRouter",
+    "RoutingSession",
     
     # Soft Delete Extensions
     "IgnoredTable",
@@ -190,7 +190,7 @@ class DTO(BaseModel):
     def from_page(cls: Type[T], page_result):
         """从分页结果批量转换，返回兼容 PageResponse 的结构
         
-        适用场景：分页列表查询
+        适用场景：分页列表查询（游标分页结果返回兼容 CursorPageResponse 的结构）
         
         Args:
             page_result: 分页结果对象，需包含 rows/items、total_records、page 等属性
@@ -208,6 +208,17 @@ class DTO(BaseModel):
         # 批量转换为 DTO
         rows = [cls.from_entity(item) for item in items]
         
+        # 游标分页结果（CursorPage）：返回兼容 CursorPageResponse 的结构
+        if hasattr(page_result, 'next_cursor'):
+            return {
+                "rows": rows,
+                "page_size": page_result.page_size,
+                "next_cursor": page_result.next_cursor,
+                "has_next": page_result.next_cursor is not None,
+                "total_records": getattr(page_result, 'total_records', None),
+                "total_is_estimate": getattr(page_result, 'total_is_estimate', False),
+            }
+        
         # 返回兼容 PageResponse 的结构（优先使用 yweb 属性名）
         return {
             "rows": rows,
@@ -215,6 +226,7 @@ class DTO(BaseModel):
             "page": getattr(page_result, 'page', 1),
             "page_size": getattr(page_result, 'page_size', getattr(page_result, 'per_page', 10)),
             "total_pages": getattr(page_result, 'total_pages', getattr(page_result, 'pages', 1)),
+            "total_is_estimate": getattr(page_result, 'total_is_estimate', False),
             "has_prev": getattr(page_result, 'has_prev', False),
             "has_next": getattr(page_result, 'has_next', False),
         }
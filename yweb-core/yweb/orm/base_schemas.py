@@ -40,6 +40,7 @@ class Page(Generic[T]):
     page: int  # 当前页码
     page_size: int  # 每页条数
     total_pages: int  # 总页数
+    total_is_estimate: bool = False  # 总条数是否为估算值（estimate 统计策略）
 
     @property
     def has_next(self) -> bool:
@@ -57,6 +58,7 @@ class Page(Generic[T]):
             "page": self.page,
             "page_size": self.page_size,
             "total_pages": self.total_pages,
+            "total_is_estimate": self.total_is_estimate,
             "has_next": self.has_next,
             "has_prev": self.has_prev
         }
@@ -70,6 +72,35 @@ class Page(Generic[T]):
         yield 'has_prev', self.has_prev
 
 
+@dataclass
+class CursorPage(Generic[T]):
+    """游标分页结果（CoreModel.paginate_cursor 返回）
+    
+    没有页码概念：用 next_cursor 请求下一页，next_cursor 为 None 表示已到末尾。
+    total_records 只在请求统计总数时才有值。
+    """
+    rows: List[T]  # 当前页数据
+    page_size: int  # 每页条数
+    next_cursor: Optional[str] = None  # 下一页游标
+    total_records: Optional[int] = None  # 总条数（未统计时为 None）
+    total_is_estimate: bool = False  # 总条数是否为估算值
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def to_dict(self):
+        """转换为字典格式，支持JSON序列化"""
+        return {
+            "rows": self.rows,
+            "page_size": self.page_size,
+            "next_cursor": self.next_cursor,
+            "has_next": self.has_next,
+            "total_records": self.total_records,
+            "total_is_estimate": self.total_is_estimate,
+        }
+
+
 # 标记
 class BaseSchemas(PydanticBaseModel):
     """基础参数"""
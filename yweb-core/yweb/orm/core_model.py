@@ -8,16 +8,21 @@ from __future__ import annotations
 
 import math
 import re
+import weakref
+from dataclasses import dataclass
 from sqlalchemy import select, func, event, delete, update, inspect
 from sqlalchemy import Integer, String, DateTime
-from sqlalchemy.orm import Mapped, mapped_column, declared_attr, Session, Query
+from sqlalchemy.orm import Mapped, Mapper, mapped_column, declared_attr, Session, Query
+from sqlalchemy.orm.attributes import InstrumentedAttribute, instance_state
 from datetime import datetime
-from typing import Optional, Type, TypeVar, List, Union, ClassVar, TYPE_CHECKING, overload
+from typing import Optional, Type, TypeVar, List, Iterable, Iterator, Union, ClassVar, FrozenSet, Tuple, TYPE_CHECKING, overload
 
 if TYPE_CHECKING:
     from typing_extensions import Self
+    from sqlalchemy.ext.asyncio import AsyncSession
 
-from .base_schemas import Page
+from .base_schemas import Page, CursorPage
+from .orm_extensions import soft_delete_hook
 from .orm_extensions.soft_delete_mixin import SimpleSoftDeleteMixin
 from .history.history_helper import is_versioning_initialized
 from .id_model import IdModel, Base
@@ -228,42 +233,6 @@ class CoreModel(IdModel):
     def __repr__(self):
         return f"<{self.__class__.__name__} id={self.id}>"
     
-    def __getattribute__(self, name):
-        """属性访问拦截器
-        
-        当访问 id 属性时，如果 id 为 None 且对象处于 pending 状态，
-        自动触发 flush 以获取主键 ID。
-        
-        主键生成时机（都在 flush 过程中）：
-        - 自增主键：数据库 INSERT 时生成
-        - 非自增主键（UUID、雪花算法等）：before_insert 事件中生成
-        
-        这样用户无需手动调用 flush() 或 save(commit=True) 就能获取 ID：
-        
-            user = User(name="张三")
-            user.save()
-            print(user.id)  # 自动 flush，立即可用
-        """
-        value = super().__getattribute__(name)
-        
-        # 只拦截 id 属性访问
-        if name == 'id' and value is None:
-            try:
-                # 获取 SQLAlchemy 实例状态
-                state = super().__getattribute__('_sa_instance_state')
-                session = state.session
-                # 如果对象在 session 的 new 集合中（pending 状态），且 session 未在 flushing
-                # 注意：必须检查 _flushing 标志，避免在 flush 过程中（如 before_insert 事件）再次 flush
-                if session is not None and state.pending and not session._flushing:
-                    session.flush()
-                    # flush 后重新获取 id 值
-                    return super().__getattribute__(name)
-            except (AttributeError, KeyError):
-                # 对象可能还没有 _sa_instance_state（未添加到 session）
-                pass
-        
-        return value
-    
     @property
     def session(self) -> Session:
         """获取当前session
@@ -548,14 +517,86 @@ class CoreModel(IdModel):
         return self
     
     @classmethod
-    def get(cls, id: int):
-        """根据ID获取对象，不存在返回None"""
-        obj = cls.query.filter_by(id=id)
-        if obj.count()>1:
-            raise ValueError(f"{cls.__name__}【{id}】：找到多条数据，请检查主键是否唯一")
-        if obj.count()==0:
+    def _is_soft_deleted(cls, obj) -> bool:
+        """身份映射中的对象是否已被软删除（未激活软删除钩子时始终为 False）"""
+        rewriter = soft_delete_hook.global_rewriter
+        return rewriter is not None and rewriter.is_deleted(obj)
+    
+    @classmethod
+    def get(cls, id: PKType) -> Optional[Self]:
+        """根据ID获取对象，不存在返回None
+        
+        基于 ``Session.get``：对象已在当前会话的身份映射中时直接返回，不执行 SQL；
+        否则按主键查询一次（软删除过滤照常生效）。主键保证唯一，无需额外计数。
+        """
+        if id is None:
+            return None
+        obj = cls.query.session.get(cls, id)
+        if obj is None or cls._is_soft_deleted(obj):
             return None
-        return obj.first()
+        return obj
+    
+    @classmethod
+    def get_many(cls, ids: Iterable[PKType], chunk_size: int = 500) -> List[Self]:
+        """根据ID列表批量获取对象
+        
+        身份映射中已有（且未过期）的对象直接使用，其余主键用 ``IN`` 查询一次取回
+        （超过 chunk_size 时分批）。结果按输入顺序返回，重复 ID 只返回一次，
+        不存在或已软删除的 ID 被跳过。
+        
+        Args:
+            ids: 主键列表
+            chunk_size: 单条 IN 查询的最大主键数
+            
+        Returns:
+            对象列表
+        
+        使用示例:
+            roles = Role.get_many(role_ids)
+            codes = [role.code for role in roles]
+        """
+        ids = cls._unique_ids(ids)
+        if not ids:
+            return []
+        
+        session = cls.query.session
+        found, missing = cls._identity_map_lookup(session, ids)
+        for start in range(0, len(missing), chunk_size):
+            chunk = missing[start:start + chunk_size]
+            for obj in cls.query.filter(cls.id.in_(chunk)).all():
+                found[obj.id] = obj
+        return cls._ordered_visible(ids, found)
+    
+    @staticmethod
+    def _unique_ids(ids: Iterable[PKType]) -> List[PKType]:
+        """去重并去掉 None，保持输入顺序"""
+        return [pk for pk in dict.fromkeys(ids) if pk is not None]
+    
+    @classmethod
+    def _identity_map_lookup(cls, session: Session, ids: List[PKType]) -> tuple:
+        """在身份映射中查找主键
+        
+        Returns:
+            tuple: ({主键: 对象} 命中且未过期的对象, [需要查询的主键])
+        """
+        mapper = inspect(cls)
+        found = {}
+        missing = []
+        for pk in ids:
+            obj = session.identity_map.get(mapper.identity_key_from_primary_key([pk]))
+            if obj is not None and isinstance(obj, cls) and not inspect(obj).expired:
+                found[pk] = obj
+            else:
+                missing.append(pk)
+        return found, missing
+    
+    @classmethod
+    def _ordered_visible(cls, ids: List[PKType], found: dict) -> list:
+        """按输入顺序返回存在且未软删除的对象"""
+        return [
+            found[pk] for pk in ids
+            if pk in found and not cls._is_soft_deleted(found[pk])
+        ]
     
     @classmethod    
     def get_list_by_conditions(cls, conditions: dict):
@@ -993,7 +1034,9 @@ class CoreModel(IdModel):
         page: int = 1,
         page_size: int = 10,
         max_page_size: int = 100,
-        schema: Optional[Type[T]] = None
+        schema: Optional[Type[T]] = None,
+        count_strategy: Optional[str] = None,
+        count_ttl: Optional[float] = None,
     ) -> Page:
         """分页查询
         
@@ -1003,9 +1046,16 @@ class CoreModel(IdModel):
             page_size: 每页数量
             max_page_size: 最大页大小
             schema: 可选的Pydantic schema
+            count_strategy: 总数统计策略，默认取 configure_pagination() / 配置中的设置（exact）
+                - exact: 单独执行 COUNT 查询
+                - window: 在分页查询中附加 COUNT(*) OVER()，一次查询同时得到数据和总数；
+                  数据库不支持窗口函数、DISTINCT 查询或多实体 Query 时回退为 exact
+                - estimate: 读取执行计划的估算行数（PostgreSQL/MySQL），其他数据库回退为 exact
+                - cached: 按“SQL + 参数”缓存总数 count_ttl 秒
+            count_ttl: cached 策略的缓存秒数，默认 60
             
         Returns:
-            Page分页对象
+            Page分页对象（estimate 策略得到估算值时 total_is_estimate 为 True）
             
         使用示例:
             # Query对象分页
@@ -1014,40 +1064,92 @@ class CoreModel(IdModel):
             # Select语句分页
             stmt = select(User).where(User.is_active == True)
             page_result = User.paginate(stmt, page=1, page_size=10)
+            
+            # 大表列表：总数缓存 30 秒
+            page_result = User.paginate(stmt, page=2, count_strategy="cached", count_ttl=30)
         """
+        from .pagination import count_rows, get_count_strategy, supports_window_count
+        
         # 参数规范化
         page = max(page, 1)
         page_size = max(1, min(page_size, max_page_size))
+        offset = (page - 1) * page_size
+        default_strategy, default_ttl = get_count_strategy()
+        strategy = count_strategy or default_strategy
+        ttl = default_ttl if count_ttl is None else count_ttl
         
         from sqlalchemy.orm.query import Query
         from sqlalchemy.sql.selectable import Select
         
+        total = None
+        is_estimate = False
+        
         if isinstance(query_or_stmt, Query):
             # 处理Query对象
             query = query_or_stmt
-            total = query.count()
-            total_pages = math.ceil(total / page_size) if total > 0 else 0
-            items = query.offset((page - 1) * page_size).limit(page_size).all()
+            session = query.session
+            use_window = (
+                strategy == "window"
+                and len(query.column_descriptions) == 1
+                and not query._distinct
+                and supports_window_count(session.get_bind())
+            )
+            if use_window:
+                rows = query.add_columns(func.count().over()).offset(offset).limit(page_size).all()
+                items = [row[0] for row in rows]
+                if rows:
+                    total = rows[0][-1]
+                elif page == 1:
+                    total = 0
+            else:
+                items = query.offset(offset).limit(page_size).all()
+            
+            if total is None:
+                if strategy in ("exact", "window"):
+                    total = query.count()
+                else:
+                    total, is_estimate = count_rows(session, query.statement, strategy, ttl=ttl)
             
         elif isinstance(query_or_stmt, Select):
             # 处理Select语句
             stmt = query_or_stmt
-            
-            # 获取总数
-            count_stmt = select(func.count()).select_from(stmt.order_by(None).subquery())
-            total = cls.query.session.scalar(count_stmt) or 0
-            total_pages = math.ceil(total / page_size) if total > 0 else 0
+            session = cls.query.session
+            use_window = (
+                strategy == "window"
+                and not stmt._distinct
+                and supports_window_count(session.get_bind())
+            )
             
             # 执行分页查询
-            pagination_stmt = stmt.offset((page - 1) * page_size).limit(page_size)
-            result = cls.query.session.execute(pagination_stmt)
-            
-            # 智能数据转换
-            column_keys = result.keys()
-            if len(column_keys) == 1:
-                raw_data = result.scalars().unique().all()
+            if use_window:
+                # 窗口函数在 LIMIT 之前计算，每行都带有过滤后的总数
+                total_label = "__yweb_total_count"
+                result = session.execute(
+                    stmt.add_columns(func.count().over().label(total_label)).offset(offset).limit(page_size)
+                )
+                single = len(result.keys()) == 2
+                rows = result.unique().all() if single else result.mappings().all()
+                if rows:
+                    total = rows[0][-1] if single else rows[0][total_label]
+                elif page == 1:
+                    total = 0
+                if single:
+                    raw_data = [row[0] for row in rows]
+                else:
+                    raw_data = [{k: v for k, v in row.items() if k != total_label} for row in rows]
             else:
-                raw_data = result.mappings().all()
+                result = session.execute(stmt.offset(offset).limit(page_size))
+                
+                # 智能数据转换
+                column_keys = result.keys()
+                if len(column_keys) == 1:
+                    raw_data = result.scalars().unique().all()
+                else:
+                    raw_data = result.mappings().all()
+            
+            # 获取总数
+            if total is None:
+                total, is_estimate = count_rows(session, stmt, strategy, ttl=ttl)
             
             items = []
             for item in raw_data:
@@ -1058,12 +1160,114 @@ class CoreModel(IdModel):
         else:
             raise TypeError(f"不支持的参数类型: {type(query_or_stmt)}")
         
+        total_pages = math.ceil(total / page_size) if total > 0 else 0
         return Page(
             rows=items,
             total_records=total,
             page=page,
             page_size=page_size,
-            total_pages=total_pages
+            total_pages=total_pages,
+            total_is_estimate=is_estimate,
+        )
+    
+    @classmethod
+    def paginate_cursor(
+        cls,
+        query_or_stmt=None,
+        after: Optional[str] = None,
+        page_size: int = 10,
+        max_page_size: int = 100,
+        order_by=None,
+        schema: Optional[Type[T]] = None,
+        with_total: Union[bool, str] = False,
+        count_ttl: float = 60,
+    ) -> CursorPage:
+        """游标（keyset）分页查询
+        
+        与 paginate() 的 OFFSET/LIMIT 不同，游标分页用上一页最后一行的排序键定位：
+        WHERE (k1, k2) > (v1, v2) ORDER BY k1, k2 LIMIT n，
+        可以直接利用索引定位，翻到很深的页也不需要扫描前面的行。
+        
+        Args:
+            query_or_stmt: Query对象或Select语句，默认 select(cls)
+            after: 上一页返回的 next_cursor，为空表示第一页
+            page_size: 每页数量
+            max_page_size: 最大页大小
+            order_by: 排序键列表，支持属性名（"-" 前缀表示降序）、模型列或 desc() 表达式；
+                      会自动追加主键保证排序唯一。排序列不应包含 NULL 值
+            schema: 可选的Pydantic schema
+            with_total: 是否统计总数：False（默认，不统计）、True/"exact"（精确）、
+                        "estimate"（PostgreSQL/MySQL 执行计划估算）、"cached"（缓存 count_ttl 秒）
+            count_ttl: "cached" 策略的缓存秒数
+            
+        Returns:
+            CursorPage 游标分页对象
+            
+        Raises:
+            InvalidCursorError: 游标被篡改或与当前排序规则不匹配
+            
+        使用示例:
+            page = User.paginate_cursor(page_size=20, order_by=["-created_at"])
+            next_page = User.paginate_cursor(after=page.next_cursor, page_size=20, order_by=["-created_at"])
+            
+            # Query对象
+            page = User.query.filter_by(is_active=True).paginate_cursor(after=cursor)
+        """
+        from sqlalchemy.orm.query import Query
+        from sqlalchemy.sql.selectable import Select
+        from .pagination import (
+            resolve_sort_keys, sort_fingerprint, keyset_predicate,
+            row_key_values, encode_cursor, decode_cursor, count_rows,
+        )
+        
+        page_size = max(1, min(page_size, max_page_size))
+        keys = resolve_sort_keys(cls, order_by)
+        fingerprint = sort_fingerprint(keys)
+        predicate = keyset_predicate(keys, decode_cursor(after, fingerprint)) if after else None
+        order_clauses = [key.clause for key in keys]
+        
+        if query_or_stmt is None:
+            query_or_stmt = select(cls)
+        
+        if isinstance(query_or_stmt, Query):
+            session = query_or_stmt.session
+            base_stmt = query_or_stmt.statement
+            query = query_or_stmt.order_by(None).order_by(*order_clauses)
+            if predicate is not None:
+                query = query.filter(predicate)
+            rows = query.limit(page_size + 1).all()
+        elif isinstance(query_or_stmt, Select):
+            session = cls.query.session
+            base_stmt = query_or_stmt
+            stmt = query_or_stmt.order_by(None).order_by(*order_clauses)
+            if predicate is not None:
+                stmt = stmt.where(predicate)
+            result = session.execute(stmt.limit(page_size + 1))
+            if len(result.keys()) == 1:
+                rows = result.scalars().unique().all()
+            else:
+                rows = result.mappings().all()
+        else:
+            raise TypeError(f"不支持的参数类型: {type(query_or_stmt)}")
+        
+        # 多取一行判断是否还有下一页
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = encode_cursor(row_key_values(rows[-1], keys), fingerprint)
+        
+        total = None
+        is_estimate = False
+        if with_total:
+            strategy = "exact" if with_total is True else with_total
+            total, is_estimate = count_rows(session, base_stmt, strategy, ttl=count_ttl)
+        
+        return CursorPage(
+            rows=[schema.model_validate(item) for item in rows] if schema else list(rows),
+            page_size=page_size,
+            next_cursor=next_cursor,
+            total_records=total,
+            total_is_estimate=is_estimate,
         )
     
     @classmethod
@@ -1071,16 +1275,29 @@ class CoreModel(IdModel):
         """为Query对象添加paginate方法"""
         from sqlalchemy.orm.query import Query
         
-        def paginate_method(self, page: int = 1, page_size: int = 10, max_page_size: int = 100, schema=None):
+        def paginate_method(self, page: int = 1, page_size: int = 10, max_page_size: int = 100, schema=None,
+                            count_strategy: str = None, count_ttl: float = None):
             """Query对象的paginate方法"""
             model_class = self.column_descriptions[0]['type'] if self.column_descriptions else None
             if model_class and hasattr(model_class, 'paginate'):
-                return model_class.paginate(self, page=page, page_size=page_size, max_page_size=max_page_size, schema=schema)
+                return model_class.paginate(
+                    self, page=page, page_size=page_size, max_page_size=max_page_size, schema=schema,
+                    count_strategy=count_strategy, count_ttl=count_ttl,
+                )
             else:
-                # 回退到通用分页逻辑
+                # 回退到通用分页逻辑（window 策略按 exact 处理）
+                from .pagination import count_rows, get_count_strategy
+                
                 page = max(page, 1)
                 page_size = max(1, min(page_size, max_page_size))
-                total = self.count()
+                default_strategy, default_ttl = get_count_strategy()
+                strategy = count_strategy or default_strategy
+                is_estimate = False
+                if strategy in ("exact", "window"):
+                    total = self.count()
+                else:
+                    ttl = default_ttl if count_ttl is None else count_ttl
+                    total, is_estimate = count_rows(self.session, self.statement, strategy, ttl=ttl)
                 total_pages = math.ceil(total / page_size) if total > 0 else 0
                 items = self.offset((page - 1) * page_size).limit(page_size).all()
                 
@@ -1089,11 +1306,148 @@ class CoreModel(IdModel):
                     total_records=total,
                     page=page,
                     page_size=page_size,
-                    total_pages=total_pages
+                    total_pages=total_pages,
+                    total_is_estimate=is_estimate,
                 )
         
         if not hasattr(Query, 'paginate'):
             Query.paginate = paginate_method
+        
+        def paginate_cursor_method(self, after: str = None, page_size: int = 10, max_page_size: int = 100,
+                                   order_by=None, schema=None, with_total=False, count_ttl: float = 60):
+            """Query对象的paginate_cursor方法"""
+            model_class = self.column_descriptions[0]['type'] if self.column_descriptions else None
+            if not (model_class and hasattr(model_class, 'paginate_cursor')):
+                raise TypeError("paginate_cursor 只支持查询 CoreModel 子类的 Query")
+            return model_class.paginate_cursor(
+                self, after=after, page_size=page_size, max_page_size=max_page_size,
+                order_by=order_by, schema=schema, with_total=with_total, count_ttl=count_ttl,
+            )
+        
+        if not hasattr(Query, 'paginate_cursor'):
+            Query.paginate_cursor = paginate_cursor_method
+    
+    # ==================== 流式迭代 ====================
+    
+    @classmethod
+    def iter_batches(
+        cls,
+        query_or_stmt=None,
+        batch_size: int = 1000,
+        expunge: bool = True,
+    ) -> Iterator[list]:
+        """分批流式迭代查询结果
+        
+        基于 yield_per（同时开启 stream_results 服务端游标）逐批读取，
+        不会像 .all() 那样一次性把整张表加载到内存。
+        expunge=True 时，每批在被消费完、读取下一批之前从 session 中移除，
+        内存中只保留一个批次的对象；移除前如果批次中有被修改的对象，会先 flush。
+        
+        Args:
+            query_or_stmt: Query对象或Select语句，默认 select(cls)
+            batch_size: 每批行数
+            expunge: 是否在读取下一批前从 session 移除上一批对象。
+                     迭代开始前已在 session 中的对象不会被移除
+            
+        Yields:
+            每批行的列表：单列查询（包括查询单个模型）为对象/值，多列查询为字典
+            
+        注意：
+            迭代期间数据库连接被游标占用。MySQL 的流式游标在读完之前不允许在同一连接上
+            执行其他语句，循环内不要触发懒加载、查询或 flush；需要修改数据时先只读出
+            主键等轻量字段，迭代结束后再写入。
+            
+        使用示例:
+            for users in User.iter_batches(User.query.filter_by(is_active=True), batch_size=500):
+                send_newsletter(users)
+        """
+        from sqlalchemy.orm.query import Query
+        from sqlalchemy.sql.selectable import Select
+        
+        if batch_size < 1:
+            raise ValueError("batch_size 必须大于 0")
+        if query_or_stmt is None:
+            query_or_stmt = select(cls)
+        
+        if isinstance(query_or_stmt, Query):
+            session = query_or_stmt.session
+            stmt = query_or_stmt.statement
+        elif isinstance(query_or_stmt, Select):
+            session = cls.query.session
+            stmt = query_or_stmt
+        else:
+            raise TypeError(f"不支持的参数类型: {type(query_or_stmt)}")
+        
+        preloaded = set(session.identity_map.keys()) if expunge else None
+        result = session.execute(stmt.execution_options(yield_per=batch_size))
+        try:
+            if len(result.keys()) == 1:
+                partitions = result.scalars().partitions()
+            else:
+                partitions = result.mappings().partitions()
+            for batch in partitions:
+                yield list(batch)
+                if expunge:
+                    cls._release_batch(session, batch, preloaded)
+        finally:
+            result.close()
+    
+    @classmethod
+    def stream_rows(
+        cls,
+        query_or_stmt=None,
+        batch_size: int = 1000,
+        expunge: bool = True,
+    ) -> Iterator:
+        """逐行流式迭代查询结果
+        
+        iter_batches() 的逐行版本，可以直接传给 yweb.response.stream_json / stream_csv。
+        
+        Args:
+            query_or_stmt: Query对象或Select语句，默认 select(cls)
+            batch_size: 每次从数据库读取的行数
+            expunge: 是否在读取下一批前从 session 移除上一批对象
+            
+        使用示例:
+            for user in User.stream_rows(batch_size=500):
+                writer.writerow([user.id, user.username])
+        """
+        for batch in cls.iter_batches(query_or_stmt, batch_size=batch_size, expunge=expunge):
+            yield from batch
+    
+    @staticmethod
+    def _release_batch(session: Session, batch, preloaded: set) -> None:
+        """从 session 中移除一批已消费的对象（有修改的先 flush）"""
+        loaded = [
+            obj for obj in batch
+            if hasattr(obj, '_sa_instance_state')
+            and obj in session
+            and instance_state(obj).key not in preloaded
+        ]
+        if any(instance_state(obj).modified for obj in loaded):
+            session.flush()
+        for obj in loaded:
+            session.expunge(obj)
+    
+    @classmethod
+    def _apply_changes_by_id(cls, changes: dict, batch_size: int = 1000) -> None:
+        """按主键分批加载对象并写入字段修改
+        
+        走 ORM flush，版本号、更新时间和修改历史照常维护；每批 flush 后移除新加载的对象。
+        
+        Args:
+            changes: {主键: {字段名: 新值}}
+            batch_size: 每批加载的对象数量
+        """
+        session = cls.query.session
+        ids = list(changes)
+        for start in range(0, len(ids), batch_size):
+            preloaded = set(session.identity_map.keys())
+            objs = session.scalars(select(cls).where(cls.id.in_(ids[start:start + batch_size]))).all()
+            for obj in objs:
+                for key, value in changes[obj.id].items():
+                    setattr(obj, key, value)
+            cls._release_batch(session, objs, preloaded)
     
     # ==================== 批量操作方法 ====================
     
@@ -1162,6 +1516,75 @@ class CoreModel(IdModel):
         cls.__cls_commit(commit)
         return rowcount
     
+    @classmethod
+    def bulk_upsert(
+        cls,
+        rows: List[dict],
+        conflict_keys: Optional[List[str]] = None,
+        update_fields: Optional[List[str]] = None,
+        chunk_size: int = 500,
+        commit: bool = False,
+    ) -> int:
+        """批量插入或更新（upsert）
+        
+        每 chunk_size 行编译为一条语句，不经过 unit of work，也不需要先 SELECT 判断存在性：
+        - PostgreSQL / SQLite：INSERT ... ON CONFLICT (conflict_keys) DO UPDATE
+        - MySQL / MariaDB：INSERT ... ON DUPLICATE KEY UPDATE
+        
+        系统字段处理：
+        - 缺少主键的行按模型主键策略（UUID、雪花等）批量生成主键，自增主键由数据库生成
+        - 新插入行 ver=1；更新的行 ver+1、updated_at 设为当前时间
+        - 冲突行的字段值没有变化时不更新（ver / updated_at 不变）
+        - 传入的 created_at / updated_at / deleted_at / ver 会被忽略
+        
+        注意：
+        - 不触发 ORM 事件（before_insert、历史记录等），已加载到 session 的同类对象会被过期以便重新加载
+        - PostgreSQL / SQLite 要求 conflict_keys 上有唯一约束或唯一索引
+        
+        Args:
+            rows: 字典列表，键为模型属性名
+            conflict_keys: 冲突判定字段，默认主键
+            update_fields: 冲突时更新的字段，默认为行中除冲突字段、主键外的全部字段；
+                           传空列表表示冲突时不做任何更新
+            chunk_size: 每条语句的最大行数
+            commit: 是否自动提交
+            
+        Returns:
+            受影响的行数（数据库返回的 rowcount 之和；MySQL 中更新的行计为 2）
+            
+        使用示例:
+            User.bulk_upsert(
+                [{"code": "u001", "name": "张三"}, {"code": "u002", "name": "李四"}],
+                conflict_keys=["code"],
+                update_fields=["name"],
+                commit=True,
+            )
+        """
+        from .upsert import build_upsert_statements
+        
+        if not rows:
+            return 0
+        
+        session = cls.query.session
+        dialect_name = session.get_bind(mapper=inspect(cls)).dialect.name
+        rowcount = 0
+        for stmt in build_upsert_statements(
+            cls, rows, dialect_name,
+            conflict_keys=conflict_keys, update_fields=update_fields, chunk_size=chunk_size,
+        ):
+            rowcount += session.execute(stmt).rowcount
+        cls._expire_loaded(session)
+        cls.__cls_commit(commit)
+        return rowcount
+    
+    @classmethod
+    def _expire_loaded(cls, session: Session) -> None:
+        """过期 session 中已加载且没有未提交修改的本类对象（批量语句绕过了 ORM）"""
+        dirty = session.dirty
+        for obj in list(session.identity_map.values()):
+            if isinstance(obj, cls) and obj not in dirty:
+                session.expire(obj)
+    
     # ==================== 软删除方法（可选） ====================
     
     @classmethod
@@ -1296,6 +1719,227 @@ class CoreModel(IdModel):
         
         return count_query.scalar() or 0
     
+    # ==================== 异步方法 ====================
+    # 需要先调用 init_async_database()，并在 async_db_session_scope() / get_async_db 中使用。
+    # 软删除过滤、时间戳等事件规则与同步方法相同；commit=True 同样受事务上下文抑制。
+    
+    @staticmethod
+    def _async_session() -> "AsyncSession":
+        """当前上下文中的 AsyncSession"""
+        from .db_session import db_manager
+        return db_manager.get_async_session()
+    
+    @classmethod
+    async def _acls_commit(cls, session: "AsyncSession", commit: bool = False) -> None:
+        """异步版 __cls_commit"""
+        if commit and not cls._cls_should_suppress_commit():
+            await session.commit()
+    
+    @classmethod
+    async def aget(cls, id: PKType) -> Optional[Self]:
+        """get() 的异步版本"""
+        if id is None:
+            return None
+        obj = await cls._async_session().get(cls, id)
+        if obj is None or cls._is_soft_deleted(obj):
+            return None
+        return obj
+    
+    @classmethod
+    async def aget_many(cls, ids: Iterable[PKType], chunk_size: int = 500) -> List[Self]:
+        """get_many() 的异步版本"""
+        ids = cls._unique_ids(ids)
+        if not ids:
+            return []
+        
+        session = cls._async_session()
+        found, missing = cls._identity_map_lookup(session.sync_session, ids)
+        for start in range(0, len(missing), chunk_size):
+            chunk = missing[start:start + chunk_size]
+            for obj in (await session.scalars(select(cls).where(cls.id.in_(chunk)))).all():
+                found[obj.id] = obj
+        return cls._ordered_visible(ids, found)
+    
+    @classmethod
+    async def aget_list_by_conditions(cls, conditions: dict) -> List[Self]:
+        """get_list_by_conditions() 的异步版本"""
+        result = await cls._async_session().scalars(select(cls).filter_by(**conditions))
+        return list(result.all())
+    
+    @classmethod
+    async def aget_all(cls) -> List[Self]:
+        """get_all() 的异步版本"""
+        result = await cls._async_session().scalars(select(cls))
+        return list(result.all())
+    
+    @classmethod
+    async def apaginate(
+        cls,
+        stmt,
+        page: int = 1,
+        page_size: int = 10,
+        max_page_size: int = 100,
+        schema: Optional[Type[T]] = None
+    ) -> Page:
+        """paginate() 的异步版本
+        
+        只支持 select() 语句（Query 对象绑定同步 Session）。
+        
+        使用示例:
+            stmt = select(User).where(User.is_active == True)
+            page_result = await User.apaginate(stmt, page=1, page_size=10)
+        """
+        from sqlalchemy.sql.selectable import Select
+        
+        if not isinstance(stmt, Select):
+            raise TypeError(f"apaginate 只支持 select() 语句，不支持: {type(stmt)}")
+        
+        page = max(page, 1)
+        page_size = max(1, min(page_size, max_page_size))
+        session = cls._async_session()
+        
+        count_stmt = select(func.count()).select_from(stmt.order_by(None).subquery())
+        total = await session.scalar(count_stmt) or 0
+        total_pages = math.ceil(total / page_size) if total > 0 else 0
+        
+        result = await session.execute(stmt.offset((page - 1) * page_size).limit(page_size))
+        if len(result.keys()) == 1:
+            raw_data = result.scalars().unique().all()
+        else:
+            raw_data = result.mappings().all()
+        items = [schema.model_validate(item) for item in raw_data] if schema else list(raw_data)
+        
+        return Page(
+            rows=items,
+            total_records=total,
+            page=page,
+            page_size=page_size,
+            total_pages=total_pages
+        )
+    
+    async def asave(self, commit: bool = False) -> Self:
+        """save() 的异步版本
+        
+        异步会话无法在访问 id 时隐式 flush，因此不提交时会立即 flush，
+        返回后即可读取自动生成的字段。
+        """
+        session = self._async_session()
+        session.add(self)
+        if commit and not self._should_suppress_commit():
+            await session.commit()
+        else:
+            await session.flush()
+        return self
+    
+    async def adelete(self, commit: bool = False) -> None:
+        """delete() 的异步版本（软删除钩子激活时转为软删除）"""
+        session = self._async_session()
+        await session.delete(self)
+        if commit and not self._should_suppress_commit():
+            await session.commit()
+        else:
+            await session.flush()
+    
+    async def arefresh(self, attribute_names: list = None) -> Self:
+        """refresh() 的异步版本"""
+        await self._async_session().refresh(self, attribute_names)
+        return self
+    
+    @classmethod
+    async def abulk_update(cls, filters: dict, values: dict, commit: bool = False) -> int:
+        """bulk_update() 的异步版本"""
+        stmt = update(cls)
+        for key, value in filters.items():
+            column = getattr(cls, key, None)
+            if column is not None:
+                stmt = stmt.where(column == value)
+        
+        session = cls._async_session()
+        result = await session.execute(stmt.values(**values))
+        await cls._acls_commit(session, commit)
+        return result.rowcount
+    
+    @classmethod
+    async def abulk_update_by_ids(cls, ids: list, values: dict, commit: bool = False) -> int:
+        """bulk_update_by_ids() 的异步版本"""
+        if not ids:
+            return 0
+        
+        session = cls._async_session()
+        result = await session.execute(update(cls).where(cls.id.in_(ids)).values(**values))
+        await cls._acls_commit(session, commit)
+        return result.rowcount
+    
+    @classmethod
+    async def abulk_delete(cls, filters: dict, commit: bool = False) -> int:
+        """bulk_delete() 的异步版本（物理删除）"""
+        stmt = delete(cls)
+        for key, value in filters.items():
+            column = getattr(cls, key, None)
+            if column is not None:
+                stmt = stmt.where(column == value)
+        
+        session = cls._async_session()
+        result = await session.execute(stmt)
+        await cls._acls_commit(session, commit)
+        return result.rowcount
+    
+    @classmethod
+    async def abulk_delete_by_ids(cls, ids: list, commit: bool = False) -> int:
+        """bulk_delete_by_ids() 的异步版本（物理删除）"""
+        if not ids:
+            return 0
+        
+        session = cls._async_session()
+        result = await session.execute(delete(cls).where(cls.id.in_(ids)))
+        await cls._acls_commit(session, commit)
+        return result.rowcount
+    
+    @classmethod
+    async def abulk_upsert(
+        cls,
+        rows: List[dict],
+        conflict_keys: Optional[List[str]] = None,
+        update_fields: Optional[List[str]] = None,
+        chunk_size: int = 500,
+        commit: bool = False,
+    ) -> int:
+        """bulk_upsert() 的异步版本"""
+        from .upsert import build_upsert_statements
+        
+        if not rows:
+            return 0
+        
+        session = cls._async_session()
+        dialect_name = session.get_bind(mapper=inspect(cls)).dialect.name
+        rowcount = 0
+        for stmt in build_upsert_statements(
+            cls, rows, dialect_name,
+            conflict_keys=conflict_keys, update_fields=update_fields, chunk_size=chunk_size,
+        ):
+            rowcount += (await session.execute(stmt)).rowcount
+        cls._expire_loaded(session.sync_session)
+        await cls._acls_commit(session, commit)
+        return rowcount
+    
+    @classmethod
+    async def abulk_soft_delete(cls, filters: dict, commit: bool = False) -> int:
+        """bulk_soft_delete() 的异步版本"""
+        return await cls.abulk_update(
+            filters=filters,
+            values={'deleted_at': datetime.now()},
+            commit=commit
+        )
+    
+    @classmethod
+    async def abulk_soft_delete_by_ids(cls, ids: list, commit: bool = False) -> int:
+        """bulk_soft_delete_by_ids() 的异步版本"""
+        return await cls.abulk_update_by_ids(
+            ids=ids,
+            values={'deleted_at': datetime.now()},
+            commit=commit
+        )
+    
     def __is_commit(self, commit=False):
         """实例方法：根据参数决定是否提交
         
@@ -1358,6 +2002,47 @@ CoreModel._add_paginate_to_query()
 
 
 
+# ==================== id 自动 flush ====================
+
+class _AutoFlushIdAttribute(InstrumentedAttribute):
+    """id 属性描述符：读取 pending 对象的 id 时自动 flush
+    
+    当 id 为 None 且对象处于 pending 状态时，自动触发 flush 以获取主键 ID。
+    
+    主键生成时机（都在 flush 过程中）：
+    - 自增主键：数据库 INSERT 时生成
+    - 非自增主键（UUID、雪花算法等）：before_insert 事件中生成
+    
+    这样用户无需手动调用 flush() 或 save(commit=True) 就能获取 ID：
+    
+        user = User(name="张三")
+        user.save()
+        print(user.id)  # 自动 flush，立即可用
+    
+    只替换 id 这一个类属性，其他列、关系和方法的访问不经过额外的 Python 调用。
+    """
+    __slots__ = ()
+    
+    def __get__(self, instance, owner):
+        value = super().__get__(instance, owner)
+        if value is None and instance is not None:
+            state = instance_state(instance)
+            session = state.session
+            # 注意：必须检查 _flushing 标志，避免在 flush 过程中（如 before_insert 事件）再次 flush
+            if session is not None and state.pending and not session._flushing:
+                session.flush()
+                return super().__get__(instance, owner)
+        return value
+
+
+@event.listens_for(CoreModel, 'after_mapper_constructed', propagate=True)
+def event_install_auto_flush_id(mapper, class_):
+    """映射完成后把 id 的 InstrumentedAttribute 换成 _AutoFlushIdAttribute"""
+    attr = mapper.class_manager.get('id')
+    if attr is not None and type(attr) is InstrumentedAttribute:
+        attr.__class__ = _AutoFlushIdAttribute
+
+
 # ==================== 事件监听器 ====================
 
 @event.listens_for(CoreModel, 'before_delete', propagate=True)
@@ -1379,6 +2064,49 @@ def event_before_delete(mapper, connection, target):
             )
 
 
+# ==================== flush 事件的映射元数据缓存 ====================
+
+@dataclass(frozen=True)
+class _FlushMetadata:
+    """flush 事件处理器用到的映射元数据（每个 mapper 计算一次）"""
+    primary_key_names: Tuple[str, ...]
+    foreign_key_names: FrozenSet[str]
+    # 模型列中属于外键的列名（保持列定义顺序）
+    foreign_key_columns: Tuple[str, ...]
+
+
+_flush_metadata_cache: "weakref.WeakKeyDictionary[Mapper, _FlushMetadata]" = weakref.WeakKeyDictionary()
+
+
+def _get_flush_metadata(mapper: Mapper) -> _FlushMetadata:
+    """获取 mapper 的 flush 元数据，首次访问时计算并缓存"""
+    meta = _flush_metadata_cache.get(mapper)
+    if meta is None:
+        foreign_key_names = frozenset(
+            foreign_key.name
+            for relationship in mapper.relationships
+            for foreign_key in relationship._calculated_foreign_keys
+        )
+        meta = _FlushMetadata(
+            primary_key_names=tuple(column.name for column in mapper.primary_key),
+            foreign_key_names=foreign_key_names,
+            foreign_key_columns=tuple(
+                column.name for column in mapper.columns if column.name in foreign_key_names
+            ),
+        )
+        _flush_metadata_cache[mapper] = meta
+    return meta
+
+
+@event.listens_for(Mapper, 'after_configured')
+def event_invalidate_flush_metadata():
+    """映射（重新）配置完成后清空缓存
+    
+    后配置的模型可能通过 backref 给已有 mapper 增加关系，外键集合随之变化。
+    """
+    _flush_metadata_cache.clear()
+
+
 @event.listens_for(CoreModel, 'before_update', propagate=True)
 def event_before_update(mapper, connection, target):
     """在更新前检查外键变更，实现子表记录的软删除
@@ -1393,33 +2121,20 @@ def event_before_update(mapper, connection, target):
     if hasattr(target, 'with_foreign_key_none') and target.with_foreign_key_none:
         return
     
-    # 获取主键名称
-    primary_key_names = [column.name for column in mapper.primary_key]
-    if not primary_key_names:
-        return
-    
-    # 获取外键名称
-    foreign_key_names = [
-        foreign_key.name 
-        for relationship in mapper.relationships 
-        for foreign_key in relationship._calculated_foreign_keys
-    ]
-    if not foreign_key_names:
+    meta = _get_flush_metadata(mapper)
+    if not meta.primary_key_names or not meta.foreign_key_names:
         return
     
     # 检查哪些外键被设置为None
-    target_columns = [column.name for column in inspect(target).mapper.columns]
+    foreign_keys_in_target = meta.foreign_key_columns
     foreign_keys_set_to_none = []
-    foreign_keys_in_target = []
     
-    for col_name in target_columns:
-        if col_name in foreign_key_names:
-            foreign_keys_in_target.append(col_name)
-            try:
-                if getattr(target, col_name) is None:
-                    foreign_keys_set_to_none.append(col_name)
-            except Exception:
-                continue
+    for col_name in foreign_keys_in_target:
+        try:
+            if getattr(target, col_name) is None:
+                foreign_keys_set_to_none.append(col_name)
+        except Exception:
+            continue
     
     # 如果没有外键被设置为None，或者只有部分外键被设置为None，不处理
     if not foreign_keys_set_to_none:
@@ -1444,6 +2159,22 @@ def event_before_update(mapper, connection, target):
     setattr(target, 'deleted_at', datetime.now().isoformat())
 
 
+def _only_updated_at_changed(insp) -> bool:
+    """对象的变更是否只有 updated_at
+    
+    只检查 committed_state 中记录过修改的属性（未修改的属性不会出现在其中），
+    遇到第一个 updated_at 之外的实际变更立即返回。
+    """
+    committed_state = insp.committed_state
+    if 'updated_at' not in committed_state:
+        return False
+    attrs = insp.attrs
+    for key in committed_state:
+        if key != 'updated_at' and attrs[key].history.has_changes():
+            return False
+    return attrs['updated_at'].history.has_changes()
+
+
 @event.listens_for(Session, 'before_flush')
 def event_before_flush(session, flush_context, instances):
     """在flush之前检查dirty对象，跳过没有实际数据变更的对象
@@ -1468,17 +2199,11 @@ def event_before_flush(session, flush_context, instances):
         if insp is None or insp.session is not session:
             continue
 
-        # 获取所有发生变更的属性
-        attrs_changed = {
-            attr.key for attr in insp.attrs
-            if attr.history.has_changes()
-        }
-
         # 仅当唯一的变更是 updated_at 时才跳过
-        # 注意：attrs_changed 为空集时不能跳过，因为对象可能因
+        # 注意：没有任何变更时不能跳过，因为对象可能因
         # ManyToMany back_populates 被标记为 dirty，expunge 会导致
         # 关联表 INSERT 失败（SAWarning: Object not in session）
-        if attrs_changed == {'updated_at'}:
+        if _only_updated_at_changed(insp):
             objects_to_skip.append(obj)
 
     # 从session中移除不需要flush的对象
@@ -12,17 +12,26 @@
 - with_db_session(): 装饰器方式管理 session
 - on_request_end(): 请求结束清理
 
+读写分离：init_database(replica_urls=[...]) 启用只读副本路由，规则见 yweb.orm.replica。
+
+异步 API（需要 SQLAlchemy asyncio 扩展及异步驱动，如 aiosqlite / asyncpg / aiomysql）:
+- init_async_database(): 初始化异步引擎（连接池参数与 init_database() 一致）
+- get_async_engine(): 获取异步引擎
+- get_async_db(): FastAPI 异步依赖
+- async_db_session_scope(): 异步上下文管理器
+- close_async_database(): 释放异步连接池
+
 内部 API（不建议外部使用）:
 - db_manager.get_session(): 获取 scoped session（低级）
 - db_manager._set_request_id(): 设置请求ID
 - db_manager._get_request_id(): 获取请求ID
 """
 
-from typing import Optional, Callable, Any, TypeVar, Generator
+from typing import Optional, Callable, Any, List, TypeVar, Generator, AsyncGenerator, TYPE_CHECKING
 from uuid import uuid4
 import logging
 import asyncio
-from contextlib import contextmanager
+from contextlib import contextmanager, asynccontextmanager
 from functools import wraps
 
 from sqlalchemy.orm import sessionmaker, scoped_session, Session
@@ -30,6 +39,11 @@ from sqlalchemy import create_engine, event
 from contextvars import ContextVar
 
 from yweb.log import get_logger
+from .pagination import configure_cursor_secret, configure_pagination
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+    from .replica import ReplicaRouter
 
 _logger = get_logger("yweb.orm.session")
 
@@ -47,8 +61,56 @@ __all__ = [
     'db_session_scope',
     'with_db_session',
     'on_request_end',
+    # 异步
+    'init_async_database',
+    'get_async_engine',
+    'get_async_db',
+    'async_db_session_scope',
+    'close_async_database',
 ]
 
+# 同步驱动 -> 异步驱动（init_async_database 传入同步 URL 时自动替换）
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+}
+
+
+def to_async_url(database_url: str) -> str:
+    """把同步数据库 URL 转换为对应的异步驱动 URL
+    
+    已经是异步驱动或无法识别的 URL 原样返回。
+    
+    示例:
+        to_async_url("sqlite:///./app.db")          # sqlite+aiosqlite:///./app.db
+        to_async_url("postgresql://u:p@host/db")    # postgresql+asyncpg://u:p@host/db
+    """
+    scheme, sep, rest = database_url.partition("://")
+    if not sep:
+        return database_url
+    return f"{_ASYNC_DRIVERS.get(scheme, scheme)}://{rest}"
+
+
+def _attach_sql_timing(engine, logger: logging.Logger) -> None:
+    """为引擎注册 SQL 执行耗时日志"""
+    import time
+    sql_logger = logging.getLogger("sqlalchemy.engine")
+    
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start_time', []).append(time.time())
+    
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        total_time = time.time() - conn.info['query_start_time'].pop()
+        sql_logger.debug(f"[执行耗时: {total_time*1000:.2f}ms]")
+    
+    logger.info("SQL执行时间记录已启用")
+
 
 class DatabaseManager:
     """数据库管理器（单例）
@@ -84,10 +146,16 @@ class DatabaseManager:
         self._engine = None
         self._session_scope = None
         self._session_maker = None
+        # 读写分离路由器（未配置只读副本时为 None）
+        self._router = None
         self._request_id_var: ContextVar[str] = ContextVar('request_id', default='')
         # 标记 request_id 是否已锁定（防止覆盖导致 session 泄漏）
         # 锁定时机：_set_request_id() 调用后 或 get_session() 创建 session 后
         self._request_id_explicit: ContextVar[bool] = ContextVar('request_id_explicit', default=False)
+        # 异步栈：引擎、会话工厂、当前上下文中的 AsyncSession
+        self._async_engine = None
+        self._async_session_maker = None
+        self._async_session_var: ContextVar[Optional["AsyncSession"]] = ContextVar('async_session', default=None)
         self._initialized = True
     
     # ==================== 属性访问 ====================
@@ -123,6 +191,32 @@ class DatabaseManager:
         """检查数据库是否已初始化"""
         return self._engine is not None and self._session_scope is not None
     
+    @property
+    def router(self) -> Optional["ReplicaRouter"]:
+        """读写分离路由器（未配置只读副本时为 None）"""
+        return self._router
+    
+    @property
+    def replica_engines(self) -> List[Any]:
+        """只读副本引擎列表（未配置时为空列表）"""
+        return list(self._router.replicas) if self._router is not None else []
+    
+    @property
+    def async_engine(self) -> "AsyncEngine":
+        """获取异步数据库引擎（只读）
+        
+        Raises:
+            RuntimeError: 异步数据库未初始化时
+        """
+        if self._async_engine is None:
+            raise RuntimeError("异步数据库未初始化，请先调用 init_async_database()")
+        return self._async_engine
+    
+    @property
+    def is_async_initialized(self) -> bool:
+        """检查异步数据库是否已初始化"""
+        return self._async_engine is not None
+    
     # ==================== 核心方法 ====================
     
     def init(
@@ -139,7 +233,15 @@ class DatabaseManager:
         scopefunc: Callable = None,
         config: Any = None,
         logging_config: Any = None,
-        auto_setup_query: bool = True
+        auto_setup_query: bool = True,
+        replica_urls: List[str] = None,
+        replica_strategy: str = "round_robin",
+        read_your_writes_seconds: float = 5.0,
+        replica_max_lag_seconds: float = 0,
+        replica_lag_check_interval: float = 10.0,
+        pagination_count_strategy: str = None,
+        pagination_count_ttl: float = None,
+        pagination_cursor_secret: str = None,
     ):
         """初始化数据库连接
         
@@ -157,9 +259,18 @@ class DatabaseManager:
             config: 数据库配置对象（DatabaseSettings），提供后自动提取配置
             logging_config: 日志配置对象（LoggingSettings），提供后自动提取 sql_log_enabled
             auto_setup_query: 是否自动设置 CoreModel.query 属性，默认 True
+            replica_urls: 只读副本URL列表，提供后启用读写分离（如果提供 config 则忽略）
+            replica_strategy: 副本选择策略，round_robin 或 least_connections（如果提供 config 则忽略）
+            read_your_writes_seconds: 提交写入后同一请求内读请求继续走主库的秒数（如果提供 config 则忽略）
+            replica_max_lag_seconds: 副本复制延迟阈值，超过则暂时摘除，0 表示不检测（如果提供 config 则忽略）
+            replica_lag_check_interval: 复制延迟检测结果缓存秒数（如果提供 config 则忽略）
+            pagination_count_strategy: paginate() 默认的总数统计策略，exact / window / estimate / cached，
+                None 表示不修改（如果提供 config 则忽略）
+            pagination_count_ttl: cached 策略的缓存秒数，None 表示不修改（如果提供 config 则忽略）
+            pagination_cursor_secret: 游标分页签名密钥，多实例需一致，None 表示不修改（如果提供 config 则忽略）
         
         Returns:
-            tuple: (engine, session_scope)
+            tuple: (engine, session_scope)，engine 为主库引擎
             
         使用示例:
             from yweb.orm import init_database, get_db, db_session_scope
@@ -202,6 +313,14 @@ class DatabaseManager:
             pool_timeout = getattr(config, "pool_timeout", pool_timeout)
             pool_recycle = getattr(config, "pool_recycle", pool_recycle)
             pool_pre_ping = getattr(config, "pool_pre_ping", pool_pre_ping)
+            replica_urls = getattr(config, "replica_urls", replica_urls)
+            replica_strategy = getattr(config, "replica_strategy", replica_strategy)
+            read_your_writes_seconds = getattr(config, "read_your_writes_seconds", read_your_writes_seconds)
+            replica_max_lag_seconds = getattr(config, "replica_max_lag_seconds", replica_max_lag_seconds)
+            replica_lag_check_interval = getattr(config, "replica_lag_check_interval", replica_lag_check_interval)
+            pagination_count_strategy = getattr(config, "pagination_count_strategy", pagination_count_strategy)
+            pagination_count_ttl = getattr(config, "pagination_count_ttl", pagination_count_ttl)
+            pagination_cursor_secret = getattr(config, "pagination_cursor_secret", pagination_cursor_secret)
         
         # 如果提供了 logging_config，从中提取 SQL 日志配置
         if logging_config is not None:
@@ -211,6 +330,11 @@ class DatabaseManager:
         if not database_url:
             raise ValueError("database_url 是必需的，请通过参数或 config 提供")
         
+        # 分页总数统计默认策略（同时校验取值）
+        configure_pagination(count_strategy=pagination_count_strategy, count_ttl=pagination_count_ttl)
+        if pagination_cursor_secret:
+            configure_cursor_secret(pagination_cursor_secret)
+        
         if logger is None:
             logger = get_logger()
         
@@ -220,6 +344,79 @@ class DatabaseManager:
         # 根据SQL日志配置决定是否启用echo
         engine_echo = "debug" if sql_log_enabled else echo
         
+        self._engine = self._create_engine(
+            database_url, engine_echo, pool_size, max_overflow,
+            pool_timeout, pool_recycle, pool_pre_ping, logger,
+        )
+        
+        # 只读副本：每个副本独立连接池，参数与主库一致
+        self._router = None
+        if replica_urls:
+            from .replica import ReplicaRouter
+            replicas = []
+            for url in replica_urls:
+                logger.info(f"只读副本URL: {url}")
+                replicas.append(self._create_engine(
+                    url, engine_echo, pool_size, max_overflow,
+                    pool_timeout, pool_recycle, pool_pre_ping, logger,
+                ))
+            self._router = ReplicaRouter(
+                self._engine,
+                replicas,
+                strategy=replica_strategy,
+                read_your_writes_seconds=read_your_writes_seconds,
+                max_lag_seconds=replica_max_lag_seconds,
+                lag_check_interval=replica_lag_check_interval,
+            )
+            logger.info(f"读写分离已启用：{len(replicas)} 个只读副本（{replica_strategy}）")
+        
+        # SQL执行时间记录
+        if sql_log_enabled:
+            _attach_sql_timing(self._engine, logger)
+            for replica in self.replica_engines:
+                _attach_sql_timing(replica, logger)
+        
+        # 创建SessionMaker（启用副本时使用按读写路由的 RoutingSession）
+        routing_kwargs = {}
+        if self._router is not None:
+            from .replica import RoutingSession
+            routing_kwargs = {"class_": RoutingSession, "router": self._router}
+        self._session_maker = sessionmaker(
+            autocommit=False,
+            autoflush=True,
+            bind=self._engine,
+            # expire_on_commit=False 是不安全的，在长链接 有可能造成脏数据，导致更新出问题，尤其是多对多关系
+            **routing_kwargs,
+        )
+        
+        # 创建scoped_session
+        if scopefunc is None:
+            scopefunc = self._get_request_id
+        
+        self._session_scope = scoped_session(self._session_maker, scopefunc=scopefunc)
+        
+        # 自动设置 ORM query 属性（延迟导入避免循环依赖）
+        if auto_setup_query:
+            from .core_model import CoreModel
+            CoreModel.query = self._session_scope.query_property()
+            logger.info("CoreModel.query 属性已自动设置")
+        
+        logger.info("数据库session创建成功")
+        
+        return self._engine, self._session_scope
+    
+    def _create_engine(
+        self,
+        database_url: str,
+        engine_echo: Any,
+        pool_size: int,
+        max_overflow: int,
+        pool_timeout: int,
+        pool_recycle: int,
+        pool_pre_ping: bool,
+        logger: logging.Logger,
+    ):
+        """按数据库类型创建同步引擎（主库与只读副本共用同一套连接池参数）"""
         # 检查SQLite数据库
         if database_url.startswith("sqlite:///"):
             import os
@@ -238,7 +435,7 @@ class DatabaseManager:
             try:
                 if is_memory_db:
                     # 内存数据库：使用 StaticPool（单连接）
-                    self._engine = create_engine(
+                    engine = create_engine(
                         database_url,
                         echo=engine_echo,
                         connect_args={
@@ -249,7 +446,7 @@ class DatabaseManager:
                     logger.info("SQLite内存数据库引擎创建成功（StaticPool）")
                 else:
                     # 文件数据库：使用 QueuePool 支持多连接
-                    self._engine = create_engine(
+                    engine = create_engine(
                         database_url,
                         echo=engine_echo,
                         connect_args={
@@ -270,7 +467,7 @@ class DatabaseManager:
         else:
             # 创建其他数据库引擎
             try:
-                self._engine = create_engine(
+                engine = create_engine(
                     database_url,
                     echo=engine_echo,
                     pool_pre_ping=pool_pre_ping,
@@ -284,45 +481,147 @@ class DatabaseManager:
                 logger.error(f"创建数据库引擎失败: {str(e)}")
                 raise
         
-        # SQL执行时间记录
-        if sql_log_enabled:
-            import time
-            sql_logger = logging.getLogger("sqlalchemy.engine")
-            
-            @event.listens_for(self._engine, "before_cursor_execute")
-            def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
-                conn.info.setdefault('query_start_time', []).append(time.time())
+        
+        return engine
+    
+    def init_async(
+        self,
+        database_url: str = None,
+        echo: bool = False,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_timeout: int = 30,
+        pool_recycle: int = 3600,
+        pool_pre_ping: bool = True,
+        sql_log_enabled: bool = False,
+        logger: logging.Logger = None,
+        config: Any = None,
+        logging_config: Any = None,
+    ):
+        """初始化异步数据库连接
+        
+        参数与 init() 一致。同步驱动的 URL 会自动替换为对应的异步驱动
+        （sqlite -> aiosqlite、postgresql -> asyncpg、mysql -> aiomysql），
+        因此可以和同步栈共用同一份 DatabaseSettings。
+        
+        软删除重写、时间戳、提交抑制等规则注册在 Session 类上，
+        对 AsyncSession 内部的同步 Session 同样生效。
+        
+        Returns:
+            tuple: (async_engine, async_session_maker)
+        
+        使用示例:
+            from yweb.orm import init_async_database, get_async_db
             
-            @event.listens_for(self._engine, "after_cursor_execute")
-            def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
-                total_time = time.time() - conn.info['query_start_time'].pop()
-                sql_logger.debug(f"[执行耗时: {total_time*1000:.2f}ms]")
+            @app.on_event("startup")
+            async def startup():
+                init_async_database(config=settings.database)
             
-            logger.info("SQL执行时间记录已启用")
+            @app.get("/users/{user_id}")
+            async def get_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
+                return await User.aget(user_id)
+        """
+        try:
+            from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+        except ImportError as e:  # pragma: no cover - 依赖 greenlet
+            raise ImportError(
+                "异步数据库需要 SQLAlchemy asyncio 扩展。请运行: pip install sqlalchemy[asyncio]"
+            ) from e
         
-        # 创建SessionMaker
-        self._session_maker = sessionmaker(
-            autocommit=False,
-            autoflush=True,
-            bind=self._engine,
-            # expire_on_commit=False 是不安全的，在长链接 有可能造成脏数据，导致更新出问题，尤其是多对多关系
-        )
+        if config is not None:
+            database_url = getattr(config, "url", database_url)
+            echo = getattr(config, "echo", echo)
+            pool_size = getattr(config, "pool_size", pool_size)
+            max_overflow = getattr(config, "max_overflow", max_overflow)
+            pool_timeout = getattr(config, "pool_timeout", pool_timeout)
+            pool_recycle = getattr(config, "pool_recycle", pool_recycle)
+            pool_pre_ping = getattr(config, "pool_pre_ping", pool_pre_ping)
         
-        # 创建scoped_session
-        if scopefunc is None:
-            scopefunc = self._get_request_id
+        if logging_config is not None:
+            sql_log_enabled = getattr(logging_config, "sql_log_enabled", sql_log_enabled)
         
-        self._session_scope = scoped_session(self._session_maker, scopefunc=scopefunc)
+        if not database_url:
+            raise ValueError("database_url 是必需的，请通过参数或 config 提供")
         
-        # 自动设置 ORM query 属性（延迟导入避免循环依赖）
-        if auto_setup_query:
-            from .core_model import CoreModel
-            CoreModel.query = self._session_scope.query_property()
-            logger.info("CoreModel.query 属性已自动设置")
+        if logger is None:
+            logger = get_logger()
         
-        logger.info("数据库session创建成功")
+        database_url = to_async_url(database_url)
+        logger.info(f"异步数据库配置URL: {database_url}")
+        engine_echo = "debug" if sql_log_enabled else echo
         
-        return self._engine, self._session_scope
+        try:
+            if database_url.startswith("sqlite+aiosqlite:///"):
+                from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+                
+                db_path = database_url[len("sqlite+aiosqlite:///"):]
+                if db_path in ("", ":memory:"):
+                    # 内存数据库：单连接
+                    self._async_engine = create_async_engine(
+                        database_url,
+                        echo=engine_echo,
+                        poolclass=StaticPool,
+                    )
+                else:
+                    self._async_engine = create_async_engine(
+                        database_url,
+                        echo=engine_echo,
+                        connect_args={"timeout": pool_timeout},
+                        poolclass=AsyncAdaptedQueuePool,
+                        pool_size=pool_size,
+                        max_overflow=max_overflow,
+                        pool_timeout=pool_timeout,
+                        pool_pre_ping=pool_pre_ping,
+                        pool_recycle=pool_recycle,
+                    )
+            else:
+                self._async_engine = create_async_engine(
+                    database_url,
+                    echo=engine_echo,
+                    pool_pre_ping=pool_pre_ping,
+                    pool_size=pool_size,
+                    max_overflow=max_overflow,
+                    pool_timeout=pool_timeout,
+                    pool_recycle=pool_recycle,
+                )
+            logger.info("异步数据库引擎创建成功")
+        except Exception as e:
+            logger.error(f"创建异步数据库引擎失败: {str(e)}")
+            raise
+        
+        if sql_log_enabled:
+            _attach_sql_timing(self._async_engine.sync_engine, logger)
+        
+        # expire_on_commit=False：异步会话中访问过期属性会触发隐式 IO（MissingGreenlet），
+        # 提交后仍需读取对象属性（如返回响应）时必须保留已加载的值
+        self._async_session_maker = async_sessionmaker(
+            bind=self._async_engine,
+            autoflush=True,
+            expire_on_commit=False,
+        )
+        return self._async_engine, self._async_session_maker
+    
+    def get_async_session(self) -> "AsyncSession":
+        """获取当前上下文中的 AsyncSession
+        
+        CoreModel 的异步方法（aget、apaginate 等）通过它取得会话。
+        
+        Raises:
+            RuntimeError: 不在 async_db_session_scope() / get_async_db 中时
+        """
+        session = self._async_session_var.get()
+        if session is None:
+            raise RuntimeError(
+                "当前上下文没有 AsyncSession，请在 async_db_session_scope() 或 get_async_db 依赖中调用"
+            )
+        return session
+    
+    async def close_async(self) -> None:
+        """释放异步连接池"""
+        if self._async_engine is not None:
+            await self._async_engine.dispose()
+            self._async_engine = None
+            self._async_session_maker = None
     
     def get_session(self) -> Session:
         """获取 scoped session（低级 API）
@@ -469,7 +768,15 @@ def init_database(
     scopefunc: Callable = None,
     config: Any = None,
     logging_config: Any = None,
-    auto_setup_query: bool = True
+    auto_setup_query: bool = True,
+    replica_urls: List[str] = None,
+    replica_strategy: str = "round_robin",
+    read_your_writes_seconds: float = 5.0,
+    replica_max_lag_seconds: float = 0,
+    replica_lag_check_interval: float = 10.0,
+    pagination_count_strategy: str = None,
+    pagination_count_ttl: float = None,
+    pagination_cursor_secret: str = None,
 ):
     """初始化数据库连接
     
@@ -492,7 +799,15 @@ def init_database(
         scopefunc=scopefunc,
         config=config,
         logging_config=logging_config,
-        auto_setup_query=auto_setup_query
+        auto_setup_query=auto_setup_query,
+        replica_urls=replica_urls,
+        replica_strategy=replica_strategy,
+        read_your_writes_seconds=read_your_writes_seconds,
+        replica_max_lag_seconds=replica_max_lag_seconds,
+        replica_lag_check_interval=replica_lag_check_interval,
+        pagination_count_strategy=pagination_count_strategy,
+        pagination_count_ttl=pagination_count_ttl,
+        pagination_cursor_secret=pagination_cursor_secret,
     )
 
 
@@ -586,6 +901,127 @@ def db_session_scope(
         on_request_end()
 
 
+def init_async_database(
+    database_url: str = None,
+    echo: bool = False,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_timeout: int = 30,
+    pool_recycle: int = 3600,
+    pool_pre_ping: bool = True,
+    sql_log_enabled: bool = False,
+    logger: logging.Logger = None,
+    config: Any = None,
+    logging_config: Any = None,
+):
+    """初始化异步数据库连接
+    
+    这是 db_manager.init_async() 的便捷包装函数。
+    详细参数说明请参考 DatabaseManager.init_async()。
+    
+    Returns:
+        tuple: (async_engine, async_session_maker)
+    """
+    return db_manager.init_async(
+        database_url=database_url,
+        echo=echo,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=pool_recycle,
+        pool_pre_ping=pool_pre_ping,
+        sql_log_enabled=sql_log_enabled,
+        logger=logger,
+        config=config,
+        logging_config=logging_config,
+    )
+
+
+def get_async_engine() -> "AsyncEngine":
+    """获取异步数据库引擎
+    
+    Raises:
+        RuntimeError: 异步数据库未初始化时
+    """
+    return db_manager.async_engine
+
+
+async def close_async_database() -> None:
+    """释放异步连接池（应用关闭时调用）"""
+    await db_manager.close_async()
+
+
+@asynccontextmanager
+async def async_db_session_scope(
+    request_id: str = None,
+    auto_commit: bool = True
+) -> AsyncGenerator["AsyncSession", None]:
+    """异步 session 上下文管理器
+    
+    创建 AsyncSession 并绑定到当前上下文，CoreModel 的异步方法自动使用它。
+    正常退出时提交（auto_commit=True），异常时回滚，最后关闭 session。
+    
+    嵌套使用时复用外层 session，由最外层负责提交和关闭。
+    
+    Args:
+        request_id: 请求ID，用于日志追踪，不传则自动生成
+        auto_commit: 是否自动提交，默认 True
+    
+    Yields:
+        AsyncSession 对象
+    
+    使用示例:
+        from yweb.orm import async_db_session_scope
+        
+        async with async_db_session_scope() as session:
+            user = await User.aget(1)
+            user.name = "updated"
+        # 自动提交并关闭
+    """
+    outer = db_manager._async_session_var.get()
+    if outer is not None:
+        yield outer
+        return
+    
+    if db_manager._async_session_maker is None:
+        raise RuntimeError("异步数据库未初始化，请先调用 init_async_database()")
+    
+    request_id = request_id or uuid4().hex[:8]
+    session = db_manager._async_session_maker()
+    session.info["request_id"] = request_id
+    token = db_manager._async_session_var.set(session)
+    try:
+        yield session
+        if auto_commit:
+            await session.commit()
+    except BaseException:
+        await session.rollback()
+        raise
+    finally:
+        try:
+            db_manager._async_session_var.reset(token)
+        except ValueError:
+            # 依赖清理可能在另一个上下文中执行（如 FastAPI 的退出栈），无法用 token 复原
+            db_manager._async_session_var.set(None)
+        await session.close()
+        _logger.debug(f"[request_id={request_id}] async session 已关闭")
+
+
+async def get_async_db() -> AsyncGenerator["AsyncSession", None]:
+    """获取异步数据库 session（FastAPI 依赖注入）
+    
+    使用示例:
+        from sqlalchemy.ext.asyncio import AsyncSession
+        from yweb.orm import get_async_db
+        
+        @app.get("/users")
+        async def list_users(db: AsyncSession = Depends(get_async_db)):
+            return await User.aget_all()
+    """
+    async with async_db_session_scope() as session:
+        yield session
+
+
 def with_db_session(
     request_id: str = None,
     auto_commit: bool = True
@@ -194,7 +194,7 @@ def event_before_insert_generate_pk(mapper, connection, target):
     注意：
     - 只有当主键为 None 时才生成（支持手动指定主键）
     - 使用 generate_with_retry 机制确保 ID 唯一
-    - 访问 model.id 时会自动触发 flush（通过 __getattribute__ 拦截）
+    - 访问 model.id 时会自动触发 flush（见 core_model._AutoFlushIdAttribute）
     """
     from .primary_key_config import PrimaryKeyConfig
     from .primary_key_generators import (
@@ -3,8 +3,7 @@
 from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy import inspect
-from sqlalchemy.event import listens_for
+from sqlalchemy import event, inspect
 from sqlalchemy.orm import Session
 
 from .soft_delete_ignored_table import IgnoredTable
@@ -14,6 +13,12 @@ from .soft_delete_rewriter import SoftDeleteRewriter
 # 全局重写器实例
 global_rewriter: Optional[SoftDeleteRewriter] = None
 
+# 软删除字段名（before_flush 使用）
+_deleted_field_name = "deleted_at"
+
+# 监听器是否已注册：类级监听器无法移除，重复注册会让每条语句被重写多次
+_listeners_registered = False
+
 
 def activate_soft_delete_hook(
     deleted_field_name: str = "deleted_at",
@@ -49,7 +54,7 @@ def activate_soft_delete_hook(
         # 如需包含已删除记录
         all_users = User.query.execution_options(include_deleted=True).all()
     """
-    global global_rewriter
+    global global_rewriter, _deleted_field_name, _listeners_registered
     
     if ignored_tables is None:
         ignored_tables = []
@@ -59,68 +64,79 @@ def activate_soft_delete_hook(
         disable_soft_delete_option_name=disable_soft_delete_option_name,
         ignored_tables=ignored_tables,
     )
+    _deleted_field_name = deleted_field_name
+    
+    # 重复调用只替换重写器配置，监听器只注册一次
+    if not _listeners_registered:
+        # 用于拦截和重写SELECT/DELETE/UPDATE查询
+        event.listen(Session, "do_orm_execute", _do_orm_execute)
+        # 用于自动设置时间戳和处理删除
+        event.listen(Session, "before_flush", _before_flush)
+        _listeners_registered = True
+
+
+def _do_orm_execute(orm_execute_state):
+    """do_orm_execute 监听器：为 SELECT / DELETE 追加软删除过滤条件"""
+    rewriter = global_rewriter
+    if rewriter is None:
+        return
+    if (
+        orm_execute_state.is_select or orm_execute_state.is_delete and
+        not orm_execute_state.is_column_load and
+        not orm_execute_state.is_relationship_load
+    ):
+        # 重写语句
+        orm_execute_state.statement = rewriter.rewrite_statement(orm_execute_state.statement)
+
+
+def _before_flush(session, flush_context, instances):
+    """before_flush 监听器：设置时间戳，并把删除转为软删除"""
+    deleted_field_name = _deleted_field_name
     
-    # 注册do_orm_execute事件监听器
-    # 用于拦截和重写SELECT/DELETE/UPDATE查询
-    @listens_for(Session, "do_orm_execute")
-    def _do_orm_execute(orm_execute_state):
-        if (
-            orm_execute_state.is_select or orm_execute_state.is_delete and
-            not orm_execute_state.is_column_load and
-            not orm_execute_state.is_relationship_load
-        ):
-            # 重写语句
-            adapted = global_rewriter.rewrite_statement(orm_execute_state.statement)
-            orm_execute_state.statement = adapted
+    # 处理新增对象
+    for instance in session.new:
+        # 检查是否有cascade.delete_orphan配置
+        _check_delete_orphan(instance)
+        # 设置创建时间
+        if hasattr(instance, 'created_at'):
+            instance.created_at = datetime.now()
     
-    # 注册before_flush事件监听器
-    # 用于自动设置时间戳和处理删除
-    @listens_for(Session, "before_flush")
-    def _before_flush(session, flush_context, instances):
-        # 处理新增对象
-        for instance in session.new:
-            # 检查是否有cascade.delete_orphan配置
-            _check_delete_orphan(instance)
-            # 设置创建时间
-            if hasattr(instance, 'created_at'):
-                instance.created_at = datetime.now()
-        
-        # 处理更新对象
-        for instance in session.dirty:
-            _check_delete_orphan(instance)
-            # 设置更新时间 - 只有在有实际列属性变更时才设置
-            # 注意：对象可能仅因 ManyToMany back_populates 被标记为 dirty，
-            # 此时没有列属性变更，不应设置 updated_at，否则会导致
-            # event_before_flush 误判并 expunge 该对象，破坏关联表操作
-            if hasattr(instance, 'updated_at'):
-                if session.is_modified(instance, include_collections=False):
-                    instance.updated_at = datetime.now()
-        
-        # 处理删除对象（转为软删除）
-        deleted_instances = list(session.deleted)
-        for instance in deleted_instances:
-            _check_delete_orphan(instance)
-            # 设置删除时间（软删除）
-            if hasattr(instance, deleted_field_name):
-                # 先尝试执行级联软删除
-                from .cascade_soft_delete import get_cascade_manager
-                manager = get_cascade_manager()
-                if manager:
-                    # 使用级联管理器处理（会自动设置 deleted_at 并处理子对象）
-                    deleted_objects = manager.soft_delete_with_cascade(
-                        instance, session, datetime.now()
-                    )
-                    # 将所有软删除的对象加入 session
-                    for obj in deleted_objects:
-                        if obj not in session:
-                            session.add(obj)
-                else:
-                    # 没有级联管理器，只设置当前对象的 deleted_at
-                    setattr(instance, deleted_field_name, datetime.now())
-                
-                # 将对象从deleted集合移到dirty集合
-                session.expunge(instance)
-                session.add(instance)
+    # 处理更新对象
+    for instance in session.dirty:
+        _check_delete_orphan(instance)
+        # 设置更新时间 - 只有在有实际列属性变更时才设置
+        # 注意：对象可能仅因 ManyToMany back_populates 被标记为 dirty，
+        # 此时没有列属性变更，不应设置 updated_at，否则会导致
+        # event_before_flush 误判并 expunge 该对象，破坏关联表操作
+        if hasattr(instance, 'updated_at'):
+            if session.is_modified(instance, include_collections=False):
+                instance.updated_at = datetime.now()
+    
+    # 处理删除对象（转为软删除）
+    deleted_instances = list(session.deleted)
+    for instance in deleted_instances:
+        _check_delete_orphan(instance)
+        # 设置删除时间（软删除）
+        if hasattr(instance, deleted_field_name):
+            # 先尝试执行级联软删除
+            from .cascade_soft_delete import get_cascade_manager
+            manager = get_cascade_manager()
+            if manager:
+                # 使用级联管理器处理（会自动设置 deleted_at 并处理子对象）
+                deleted_objects = manager.soft_delete_with_cascade(
+                    instance, session, datetime.now()
+                )
+                # 将所有软删除的对象加入 session
+                for obj in deleted_objects:
+                    if obj not in session:
+                        session.add(obj)
+            else:
+                # 没有级联管理器，只设置当前对象的 deleted_at
+                setattr(instance, deleted_field_name, datetime.now())
+            
+            # 将对象从deleted集合移到dirty集合
+            session.expunge(instance)
+            session.add(instance)
 
 
 def _check_delete_orphan(instance):
@@ -143,7 +159,7 @@ def deactivate_soft_delete_hook():
     """停用软删除钩子
     
     注意：SQLAlchemy的事件监听器一旦注册就无法移除，
-    此函数只是将全局重写器设为None，使其不再生效
+    此函数只是将全局重写器设为None，使查询重写不再生效
     """
     global global_rewriter
     global_rewriter = None
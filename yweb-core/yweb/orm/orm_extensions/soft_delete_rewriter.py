@@ -2,13 +2,16 @@
 
 from __future__ import annotations
 
-from typing import TypeVar, Union, List
+import threading
+import weakref
+from typing import TypeVar, Union, List, Optional, Tuple
 
+from cachetools import LRUCache
 from sqlalchemy import Table
 from sqlalchemy.orm import FromStatement
 from sqlalchemy.orm.util import _ORMJoin
 from sqlalchemy.sql import Alias, CompoundSelect, Executable, Join, Delete, Update, Select, Subquery, TableClause
-from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.sql.elements import ColumnElement, TextClause
 
 from .soft_delete_ignored_table import IgnoredTable
 
@@ -23,6 +26,13 @@ class SoftDeleteRewriter:
     - 支持子查询、JOIN等复杂查询
     - 可通过execution_options禁用软删除过滤
     
+    分析 FROM 子句需要完整编译一次语句，开销远大于执行本身，因此：
+    - 每张表是否需要过滤（有软删除字段且不在忽略列表中）只判断一次并缓存过滤条件
+    - 按语句的缓存键（结构相同、参数不同的语句共用同一个键）缓存需要追加的过滤条件，
+      重复执行的查询不再分析 FROM 子句
+    - 同一语句的所有过滤条件一次性追加，WHERE 中已有的（同一对象）条件不会再次追加
+    修改 ignored_tables 后需调用 clear_cache()。
+    
     使用示例:
         from yweb.orm.orm_extensions import SoftDeleteRewriter
         
@@ -53,6 +63,38 @@ class SoftDeleteRewriter:
         self.ignored_tables = ignored_tables or []
         self.deleted_field_name = deleted_field_name
         self.disable_soft_delete_option_name = disable_soft_delete_option_name
+        # 表 -> 过滤条件（None 表示不需要过滤）
+        self._criteria_cache: "weakref.WeakKeyDictionary[Table, Optional[ColumnElement]]" = weakref.WeakKeyDictionary()
+        # 语句缓存键 -> 需要追加的过滤条件
+        self._statement_cache: LRUCache = LRUCache(maxsize=2048)
+        self._lock = threading.Lock()
+
+    def clear_cache(self) -> None:
+        """清空按表、按语句缓存的过滤判断（修改 ignored_tables 后调用）"""
+        with self._lock:
+            self._criteria_cache.clear()
+            self._statement_cache.clear()
+
+    def table_criteria(self, table: Table) -> Optional[ColumnElement]:
+        """表的软删除过滤条件 ``deleted_at IS NULL``
+        
+        忽略表、没有软删除字段的表返回 None；结果按表缓存。
+        """
+        try:
+            return self._criteria_cache[table]
+        except KeyError:
+            pass
+        criteria = None
+        if not any(ignored.match_name(table) for ignored in self.ignored_tables):
+            column_obj = table.columns.get(self.deleted_field_name)
+            if column_obj is not None:
+                criteria = column_obj.is_(None)
+        self._criteria_cache[table] = criteria
+        return criteria
+
+    def _skip(self, stmt) -> bool:
+        """语句是否禁用了软删除过滤"""
+        return bool(stmt.get_execution_options().get(self.disable_soft_delete_option_name))
 
     def rewrite_statement(self, stmt: Statement) -> Statement:
         """重写SQL语句
@@ -87,13 +129,42 @@ class SoftDeleteRewriter:
     def rewrite_select(self, stmt: Select) -> Select:
         """重写SELECT语句"""
         # 检查是否禁用软删除过滤
-        if stmt.get_execution_options().get(self.disable_soft_delete_option_name):
+        if self._skip(stmt):
             return stmt
 
-        for from_obj in stmt.get_final_froms():
-            stmt = self._analyze_from(stmt, from_obj)
+        cache_key = stmt._generate_cache_key()
+        key = cache_key.key if cache_key is not None else None
+        criteria = None
+        if key is not None:
+            with self._lock:
+                criteria = self._statement_cache.get(key)
+
+        if criteria is None:
+            criteria, cacheable = self._collect_criteria(stmt)
+            if key is not None and cacheable:
+                with self._lock:
+                    self._statement_cache[key] = criteria
+
+        # 过滤条件按表缓存为同一对象：原地重写过的子查询、UNION 成员再次执行时不会重复追加。
+        # 不能用 execution option 做标记，关系加载（subqueryload 等）的语句会继承父语句的 options
+        existing = stmt._where_criteria
+        criteria = [item for item in criteria if not any(item is where for where in existing)]
+        if not criteria:
+            return stmt
+        return stmt.where(*criteria)
 
-        return stmt
+    def _collect_criteria(self, stmt: Select) -> Tuple[Tuple[ColumnElement, ...], bool]:
+        """分析 FROM 子句，返回需要追加的过滤条件，以及结果能否按语句缓存
+        
+        子查询需要在每个语句对象上原地重写，含子查询的语句不缓存。
+        """
+        criteria: List[ColumnElement] = []
+        cacheable = True
+        for from_obj in stmt.get_final_froms():
+            if isinstance(from_obj, (Subquery, Alias)):
+                cacheable = False
+            self._analyze_from(criteria, from_obj)
+        return tuple(criteria), cacheable
 
     def rewrite_compound_select(self, stmt: CompoundSelect) -> CompoundSelect:
         """重写复合SELECT语句（UNION等）"""
@@ -103,33 +174,24 @@ class SoftDeleteRewriter:
 
     def rewrite_delete(self, stmt: Delete) -> Delete:
         """重写DELETE语句"""
-        if stmt.get_execution_options().get(self.disable_soft_delete_option_name):
-            return stmt
-        
-        table = stmt.table
-        column_obj = table.columns.get(self.deleted_field_name)
-        
-        if column_obj is None:
-            return stmt
-        
-        # 添加软删除过滤条件
-        stmt = stmt.filter(column_obj.is_(None))
-        return stmt
+        return self._rewrite_dml(stmt)
 
     def rewrite_update(self, stmt: Update) -> Update:
         """重写UPDATE语句"""
-        if stmt.get_execution_options().get(self.disable_soft_delete_option_name):
+        return self._rewrite_dml(stmt)
+
+    def _rewrite_dml(self, stmt):
+        """为 DELETE / UPDATE 添加软删除过滤条件"""
+        if self._skip(stmt):
             return stmt
         
-        table = stmt.table
-        column_obj = table.columns.get(self.deleted_field_name)
+        column_obj = stmt.table.columns.get(self.deleted_field_name)
         
         if column_obj is None:
             return stmt
         
         # 添加软删除过滤条件
-        stmt = stmt.filter(column_obj.is_(None))
-        return stmt
+        return stmt.filter(column_obj.is_(None))
 
     def _rewrite_element(self, subquery: Subquery) -> Subquery:
         """重写子查询"""
@@ -143,61 +205,63 @@ class SoftDeleteRewriter:
 
         raise NotImplementedError(f"不支持的子查询类型: {type(subquery.element)}")
 
-    def _rewrite_from_orm_join(self, stmt: Select, join_obj: Union[_ORMJoin, Join]) -> Select:
+    def _rewrite_from_orm_join(self, criteria: List[ColumnElement], join_obj: Union[_ORMJoin, Join]) -> None:
         """处理JOIN查询"""
         # 递归处理多重JOIN
         if isinstance(join_obj.left, (_ORMJoin, Join)):
-            stmt = self._rewrite_from_orm_join(stmt, join_obj.left)
+            self._rewrite_from_orm_join(criteria, join_obj.left)
 
         if isinstance(join_obj.right, (_ORMJoin, Join)):
-            stmt = self._rewrite_from_orm_join(stmt, join_obj.right)
+            self._rewrite_from_orm_join(criteria, join_obj.right)
 
         # 处理普通表
         if isinstance(join_obj.left, Table):
-            stmt = self._rewrite_from_table(stmt, join_obj.left)
+            self._rewrite_from_table(criteria, join_obj.left)
 
         if isinstance(join_obj.right, Table):
-            stmt = self._rewrite_from_table(stmt, join_obj.right)
-
-        return stmt
+            self._rewrite_from_table(criteria, join_obj.right)
 
-    def _analyze_from(self, stmt: Select, from_obj) -> Select:
-        """分析FROM子句"""
+    def _analyze_from(self, criteria: List[ColumnElement], from_obj) -> None:
+        """分析FROM子句，把需要追加的过滤条件收集到 criteria"""
         if isinstance(from_obj, Table):
-            return self._rewrite_from_table(stmt, from_obj)
+            self._rewrite_from_table(criteria, from_obj)
+            return
 
         if isinstance(from_obj, (_ORMJoin, Join)):
-            return self._rewrite_from_orm_join(stmt, from_obj)
+            self._rewrite_from_orm_join(criteria, from_obj)
+            return
 
         if isinstance(from_obj, Subquery):
             self._rewrite_element(from_obj)
-            return stmt
+            return
 
         if isinstance(from_obj, (TableClause, TextClause)):
             # 原始SQL文本，无法处理
-            return stmt
+            return
 
         if isinstance(from_obj, Alias):
             if isinstance(from_obj.element, Subquery):
                 self._rewrite_element(from_obj.element)
-                return stmt
+                return
 
             raise NotImplementedError(f"不支持的Alias内部类型: {type(from_obj.element)}")
 
         raise NotImplementedError(f"不支持的FROM类型: {type(from_obj)}")
 
-    def _rewrite_from_table(self, stmt: Select, table: Table) -> Select:
-        """为表添加软删除过滤条件"""
-        # 检查是否在忽略列表中
-        if any(ignored.match_name(table) for ignored in self.ignored_tables):
-            return stmt
-
-        # 获取软删除字段
-        column_obj = table.columns.get(self.deleted_field_name)
-
-        if column_obj is None:
-            return stmt
-
-        # 添加过滤条件：deleted_at IS NULL
-        return stmt.filter(column_obj.is_(None))
+    def is_deleted(self, instance) -> bool:
+        """已加载的对象是否处于软删除状态
+        
+        身份映射中的对象不经过 SELECT 重写，需要按同样的规则单独判断；
+        忽略表、没有软删除字段的表中的对象始终视为未删除。
+        """
+        table = getattr(type(instance), "__table__", None)
+        if table is None or self.table_criteria(table) is None:
+            return False
+        return getattr(instance, self.deleted_field_name, None) is not None
+
+    def _rewrite_from_table(self, criteria: List[ColumnElement], table: Table) -> None:
+        """为表添加软删除过滤条件：deleted_at IS NULL（忽略表、无软删除字段的表跳过）"""
+        table_criteria = self.table_criteria(table)
+        if table_criteria is not None:
+            criteria.append(table_criteria)
 
@@ -0,0 +1,400 @@
+"""
+分页辅助模块
+
+- 游标（keyset）分页：签名游标编解码、排序键解析、WHERE (k1, k2) > (v1, v2) 谓词构建
+- 总数统计策略：exact（精确 COUNT）、window（COUNT(*) OVER() 随分页查询一起返回）、
+  estimate（执行计划估算）、cached（按查询缓存）
+
+通常不直接使用本模块，而是通过 CoreModel.paginate() / paginate_cursor() 调用；
+默认统计策略可通过 configure_pagination() 或 DatabaseSettings.pagination_count_strategy 设置；
+游标签名密钥通过 configure_cursor_secret() 或 DatabaseSettings.pagination_cursor_secret 设置。
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import date, datetime, time as dt_time
+from decimal import Decimal
+from typing import Any, List, Optional, Sequence, Tuple
+
+from cachetools import LRUCache
+from sqlalchemy import and_, func, or_, select, tuple_
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import QueryableAttribute
+from sqlalchemy.sql.elements import UnaryExpression
+from sqlalchemy.sql.operators import asc_op, desc_op
+
+from yweb.log import get_logger
+
+_logger = get_logger("yweb.orm.pagination")
+
+__all__ = [
+    'InvalidCursorError',
+    'COUNT_STRATEGIES',
+    'configure_cursor_secret',
+    'configure_pagination',
+    'get_count_strategy',
+    'encode_cursor',
+    'decode_cursor',
+    'count_rows',
+    'clear_count_cache',
+]
+
+# 总数统计策略
+COUNT_STRATEGIES = ("exact", "window", "estimate", "cached")
+
+# paginate() 未指定策略时使用的默认值
+_default_count_strategy = "exact"
+_default_count_ttl: float = 60
+
+
+class InvalidCursorError(ValueError):
+    """游标无效（被篡改、格式错误或与当前排序不匹配）"""
+
+
+# ==================== 游标签名 ====================
+
+# 不提供进程内随机默认值：多 Worker / 重启后随机密钥会让其他进程签发的游标全部失效
+_cursor_secret: Optional[bytes] = None
+
+
+def configure_cursor_secret(secret) -> None:
+    """设置游标签名密钥
+
+    使用游标分页前必须设置，所有实例使用同一密钥，游标才能跨 Worker、跨重启有效。
+    init_database() 会读取 DatabaseSettings.pagination_cursor_secret 自动设置。
+
+    Args:
+        secret: 密钥字符串或字节
+    """
+    global _cursor_secret
+    if not secret:
+        raise ValueError("游标签名密钥不能为空")
+    _cursor_secret = secret.encode("utf-8") if isinstance(secret, str) else bytes(secret)
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: bytes) -> str:
+    if _cursor_secret is None:
+        raise RuntimeError(
+            "未设置游标签名密钥，请先调用 configure_cursor_secret() 或配置 database.pagination_cursor_secret"
+        )
+    return _b64encode(hmac.new(_cursor_secret, payload, hashlib.sha256).digest()[:16])
+
+
+# ==================== 游标值编解码 ====================
+
+def _dump_value(value: Any) -> list:
+    """把排序键值转换为带类型标记的 JSON 值"""
+    if value is None:
+        return ["n", None]
+    if isinstance(value, bool):
+        return ["b", value]
+    if isinstance(value, int):
+        return ["i", value]
+    if isinstance(value, float):
+        return ["f", value]
+    if isinstance(value, Decimal):
+        return ["dec", str(value)]
+    if isinstance(value, datetime):
+        return ["dt", value.isoformat()]
+    if isinstance(value, date):
+        return ["d", value.isoformat()]
+    if isinstance(value, dt_time):
+        return ["t", value.isoformat()]
+    if isinstance(value, uuid.UUID):
+        return ["u", str(value)]
+    if isinstance(value, str):
+        return ["s", value]
+    raise TypeError(f"不支持作为游标排序键的类型: {type(value).__name__}")
+
+
+_LOADERS = {
+    "n": lambda v: None,
+    "b": bool,
+    "i": int,
+    "f": float,
+    "dec": Decimal,
+    "dt": datetime.fromisoformat,
+    "d": date.fromisoformat,
+    "t": dt_time.fromisoformat,
+    "u": uuid.UUID,
+    "s": str,
+}
+
+
+def encode_cursor(values: Sequence[Any], fingerprint: str) -> str:
+    """把排序键值元组编码为签名游标
+
+    Args:
+        values: 最后一行的排序键值
+        fingerprint: 排序规则指纹，解码时校验，防止游标被用于其他排序
+    """
+    payload = json.dumps(
+        {"k": [_dump_value(v) for v in values], "o": fingerprint},
+        separators=(",", ":"),
+    ).encode("utf-8")
+    return f"{_b64encode(payload)}.{_sign(payload)}"
+
+
+def decode_cursor(cursor: str, fingerprint: str) -> Tuple[Any, ...]:
+    """校验签名并解码游标
+
+    Raises:
+        InvalidCursorError: 签名不匹配、格式错误或排序规则不一致
+    """
+    try:
+        body, signature = cursor.split(".", 1)
+        payload = _b64decode(body)
+    except (ValueError, AttributeError) as e:
+        raise InvalidCursorError("游标格式错误") from e
+    if not hmac.compare_digest(signature, _sign(payload)):
+        raise InvalidCursorError("游标签名无效")
+    try:
+        data = json.loads(payload)
+        if data["o"] != fingerprint:
+            raise InvalidCursorError("游标与当前排序规则不匹配")
+        return tuple(_LOADERS[tag](value) for tag, value in data["k"])
+    except InvalidCursorError:
+        raise
+    except (KeyError, TypeError, ValueError) as e:
+        raise InvalidCursorError("游标内容无效") from e
+
+
+# ==================== 排序键 ====================
+
+class SortKey:
+    """游标分页的一个排序键（列 + 方向）"""
+
+    __slots__ = ("column", "key", "descending")
+
+    def __init__(self, column, key: str, descending: bool):
+        self.column = column
+        self.key = key
+        self.descending = descending
+
+    @property
+    def clause(self):
+        return self.column.desc() if self.descending else self.column.asc()
+
+
+def resolve_sort_keys(model, order_by=None) -> List[SortKey]:
+    """解析排序规则，并在末尾补充主键保证排序唯一
+
+    order_by 支持：
+    - 属性名字符串，"-" 前缀表示降序：["-created_at", "id"]
+    - 模型列属性：[User.created_at, User.id]
+    - desc()/asc() 表达式：[User.created_at.desc()]
+    """
+    if order_by is None:
+        order_by = []
+    elif not isinstance(order_by, (list, tuple)):
+        order_by = [order_by]
+
+    keys: List[SortKey] = []
+    for item in order_by:
+        descending = False
+        if isinstance(item, str):
+            descending = item.startswith("-")
+            name = item.lstrip("-+")
+            column = getattr(model, name, None)
+            if not isinstance(column, QueryableAttribute):
+                raise ValueError(f"{model.__name__} 没有可排序的属性: {name}")
+        elif isinstance(item, UnaryExpression) and item.modifier in (asc_op, desc_op):
+            descending = item.modifier is desc_op
+            column = getattr(model, getattr(item.element, "key", ""), None)
+            if not isinstance(column, QueryableAttribute):
+                raise ValueError(f"不支持的游标排序键: {item}，请使用 {model.__name__} 的列")
+        elif isinstance(item, QueryableAttribute):
+            column = item
+        else:
+            raise ValueError(f"不支持的游标排序键: {item!r}，请使用属性名或模型列")
+        keys.append(SortKey(column, column.key, descending))
+
+    primary_keys = [getattr(model, col.key) for col in model.__mapper__.primary_key]
+    present = {k.key for k in keys}
+    # 主键作为最后的排序键（方向与最后一个键一致，便于使用行值比较）
+    tail_desc = keys[-1].descending if keys else False
+    for pk in primary_keys:
+        if pk.key not in present:
+            keys.append(SortKey(pk, pk.key, tail_desc))
+    return keys
+
+
+def sort_fingerprint(keys: Sequence[SortKey]) -> str:
+    """排序规则指纹（列名 + 方向）"""
+    return ",".join(("-" if k.descending else "") + str(k.column) for k in keys)
+
+
+def keyset_predicate(keys: Sequence[SortKey], values: Sequence[Any]):
+    """构建“位于游标之后”的 WHERE 条件
+
+    所有键方向一致时使用行值比较 (k1, k2) > (v1, v2)，可以直接利用复合索引定位；
+    方向混合时展开为 (k1 > v1) OR (k1 = v1 AND k2 < v2) ...
+    """
+    if len(values) != len(keys):
+        raise InvalidCursorError("游标与当前排序规则不匹配")
+    directions = {k.descending for k in keys}
+    if len(directions) == 1:
+        left = tuple_(*[k.column for k in keys]) if len(keys) > 1 else keys[0].column
+        right = tuple_(*values) if len(keys) > 1 else values[0]
+        return left < right if keys[0].descending else left > right
+
+    clauses = []
+    for i, key in enumerate(keys):
+        equals = [keys[j].column == values[j] for j in range(i)]
+        beyond = key.column < values[i] if key.descending else key.column > values[i]
+        clauses.append(and_(*equals, beyond))
+    return or_(*clauses)
+
+
+def row_key_values(row, keys: Sequence[SortKey]) -> Tuple[Any, ...]:
+    """从结果行（模型实例或映射）中取出排序键值"""
+    if hasattr(row, "keys") and hasattr(row, "__getitem__"):
+        try:
+            return tuple(row[k.key] for k in keys)
+        except KeyError as e:
+            raise ValueError(f"查询结果中缺少游标排序列: {e}") from e
+    return tuple(getattr(row, k.key) for k in keys)
+
+
+# ==================== 总数统计 ====================
+
+def configure_pagination(count_strategy: Optional[str] = None, count_ttl: Optional[float] = None) -> None:
+    """设置分页总数统计的默认策略
+
+    Args:
+        count_strategy: exact / window / estimate / cached，None 表示不修改
+        count_ttl: cached 策略的缓存秒数，None 表示不修改
+    """
+    global _default_count_strategy, _default_count_ttl
+    if count_strategy is not None:
+        _check_strategy(count_strategy)
+        _default_count_strategy = count_strategy
+    if count_ttl is not None:
+        if count_ttl < 0:
+            raise ValueError("count_ttl 不能为负数")
+        _default_count_ttl = count_ttl
+
+
+def get_count_strategy() -> Tuple[str, float]:
+    """获取默认的 (总数统计策略, 缓存秒数)"""
+    return _default_count_strategy, _default_count_ttl
+
+
+def _check_strategy(strategy: str) -> None:
+    if strategy not in COUNT_STRATEGIES:
+        raise ValueError(f"不支持的总数统计策略: {strategy}，可选: {', '.join(COUNT_STRATEGIES)}")
+
+
+def supports_window_count(bind) -> bool:
+    """数据库是否支持 COUNT(*) OVER() 窗口函数
+
+    PostgreSQL、MariaDB 10.2+、MySQL 8.0+、SQLite 3.25+、Oracle、SQL Server 支持。
+    """
+    dialect = bind.dialect
+    name = dialect.name
+    if name in ("postgresql", "oracle", "mssql"):
+        return True
+    version = getattr(dialect, "server_version_info", None) or ()
+    if name == "mariadb" or getattr(dialect, "is_mariadb", False):
+        return version >= (10, 2)
+    if name == "mysql":
+        return version >= (8, 0)
+    if name == "sqlite":
+        return sqlite3.sqlite_version_info >= (3, 25)
+    return False
+
+_count_cache = LRUCache(maxsize=1024)
+_count_cache_lock = threading.Lock()
+
+
+def clear_count_cache() -> None:
+    """清空 cached 策略的总数缓存"""
+    with _count_cache_lock:
+        _count_cache.clear()
+
+
+def _compile(session: Session, stmt):
+    bind = session.get_bind()
+    return bind, stmt.compile(dialect=bind.dialect, compile_kwargs={"render_postcompile": True})
+
+
+def _exact_count(session: Session, stmt) -> int:
+    count_stmt = select(func.count()).select_from(stmt.order_by(None).subquery())
+    return session.scalar(count_stmt) or 0
+
+
+def _estimate_count(session: Session, stmt) -> Optional[int]:
+    """读取 PostgreSQL / MySQL 执行计划中的行数估算，其他数据库返回 None"""
+    bind, compiled = _compile(session, stmt.order_by(None))
+    dialect = bind.dialect.name
+    if dialect not in ("postgresql", "mysql", "mariadb"):
+        return None
+    if compiled.positiontup is not None:
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+    else:
+        params = compiled.params
+    conn = session.connection()
+    if dialect == "postgresql":
+        plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    row = conn.exec_driver_sql(f"EXPLAIN {compiled}", params).mappings().first()
+    if row is None:
+        return 0
+    return int((row.get("rows") or 0) * float(row.get("filtered") or 100) / 100)
+
+
+def _count_cache_key(session: Session, stmt) -> tuple:
+    bind, compiled = _compile(session, stmt.order_by(None))
+    params = tuple(sorted((k, repr(v)) for k, v in compiled.params.items()))
+    return (str(bind.url), str(compiled), params)
+
+
+def count_rows(session: Session, stmt, strategy: str = "exact", ttl: float = 60) -> Tuple[int, bool]:
+    """按策略统计查询总行数
+
+    Args:
+        session: 执行查询的 session
+        stmt: Select 语句（排序会被去掉）
+        strategy: exact / window / estimate / cached
+        ttl: cached 策略的缓存秒数
+
+    Returns:
+        (总数, 是否为估算值)；estimate 在不支持的数据库上回退为精确计数。
+        window 需要与分页查询合并执行（见 CoreModel.paginate），单独统计时等同于 exact
+    """
+    _check_strategy(strategy)
+    if strategy in ("exact", "window"):
+        return _exact_count(session, stmt), False
+    if strategy == "estimate":
+        estimate = _estimate_count(session, stmt)
+        if estimate is None:
+            return _exact_count(session, stmt), False
+        return estimate, True
+
+    # cached
+    key = _count_cache_key(session, stmt)
+    now = time.monotonic()
+    with _count_cache_lock:
+        cached = _count_cache.get(key)
+    if cached is not None and cached[1] > now:
+        return cached[0], False
+    total = _exact_count(session, stmt)
+    with _count_cache_lock:
+        _count_cache[key] = (total, now + ttl)
+    return total, False
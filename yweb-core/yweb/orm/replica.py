@@ -0,0 +1,282 @@
+"""
+读写分离（只读副本路由）
+
+- ReplicaRouter: 管理主库与只读副本引擎，负责副本选择（轮询 / 最少连接）与复制延迟检测
+- RoutingSession: 按语句类型路由的 Session，读走副本、写走主库
+
+路由规则（RoutingSession.get_bind）:
+1. 显式指定 ``execution_options(use_primary=True)`` → 主库
+2. flush、INSERT/UPDATE/DELETE、原生 SQL、SELECT ... FOR UPDATE → 主库
+3. 显式事务中（session.begin() 或事务管理器上下文）→ 主库
+4. 当前事务已写入过 → 主库（同一事务内读到自己的写入）
+5. 提交写入后的 read_your_writes_seconds 秒内 → 主库（粘滞窗口，按 session 即按请求隔离）
+6. 其他 SELECT → 健康副本；副本全部不可用时回退主库
+
+通常不直接使用本模块，而是通过 init_database(replica_urls=[...]) 启用。
+"""
+
+import itertools
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session, SessionTransactionOrigin
+
+from yweb.log import get_logger
+
+_logger = get_logger("yweb.orm.replica")
+
+__all__ = [
+    'ReplicaRouter',
+    'RoutingSession',
+    'REPLICA_STRATEGIES',
+]
+
+# 副本选择策略
+REPLICA_STRATEGIES = ("round_robin", "least_connections")
+
+# session.info 中记录读写状态的键
+_WROTE_KEY = "_yweb_replica_wrote"
+_STICKY_UNTIL_KEY = "_yweb_replica_primary_until"
+
+# 复制延迟查询语句（返回延迟秒数）
+# PostgreSQL: 已接收的 WAL 全部回放完毕时延迟为 0；否则按最后回放事务的时间计算
+# （主库空闲时 pg_last_xact_replay_timestamp() 不再前进，不能单独使用）
+_LAG_QUERIES = {
+    "postgresql": (
+        "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE COALESCE(EXTRACT(EPOCH FROM (now() - pg_last_xact_replay_timestamp())), 0) END"
+    ),
+}
+
+
+def default_lag_probe(conn: Connection) -> Optional[float]:
+    """按数据库方言查询复制延迟（秒）
+
+    - PostgreSQL: 接收与回放的 WAL 位置一致时为 0，否则为 now() - pg_last_xact_replay_timestamp()
+    - MySQL: SHOW REPLICA STATUS 的 Seconds_Behind_Source（旧版本 Seconds_Behind_Master）
+    - 其他数据库: 返回 None，表示无法检测，视为健康
+    """
+    dialect = conn.dialect.name
+    if dialect in _LAG_QUERIES:
+        value = conn.execute(text(_LAG_QUERIES[dialect])).scalar()
+        return float(value or 0)
+    if dialect in ("mysql", "mariadb"):
+        row = conn.execute(text("SHOW REPLICA STATUS")).mappings().first()
+        if row is None:
+            return None
+        value = row.get("Seconds_Behind_Source", row.get("Seconds_Behind_Master"))
+        # 复制线程停止时为 NULL，视为不可用
+        return float("inf") if value is None else float(value)
+    return None
+
+
+class ReplicaRouter:
+    """主库 / 只读副本路由器
+
+    使用示例:
+        router = ReplicaRouter(
+            primary_engine,
+            [replica1_engine, replica2_engine],
+            strategy="least_connections",
+            max_lag_seconds=5,
+        )
+        engine = router.choose()   # 选择一个健康副本，全部不可用时返回主库
+    """
+
+    def __init__(
+        self,
+        primary: Engine,
+        replicas: Sequence[Engine],
+        strategy: str = "round_robin",
+        read_your_writes_seconds: float = 5.0,
+        max_lag_seconds: float = 0,
+        lag_check_interval: float = 10.0,
+        lag_probe: Callable[[Connection], Optional[float]] = None,
+    ):
+        """初始化路由器
+
+        Args:
+            primary: 主库引擎
+            replicas: 只读副本引擎列表
+            strategy: 副本选择策略，round_robin（轮询）或 least_connections（最少已借出连接）
+            read_your_writes_seconds: 提交写入后，同一 session 的读请求继续走主库的秒数，0 表示关闭
+            max_lag_seconds: 副本复制延迟阈值（秒），超过则暂时摘除；0 表示不检测
+            lag_check_interval: 延迟检测结果的缓存秒数
+            lag_probe: 自定义延迟检测函数，接收副本连接，返回延迟秒数或 None（无法检测）
+        """
+        if strategy not in REPLICA_STRATEGIES:
+            raise ValueError(f"不支持的副本选择策略: {strategy}，可选: {', '.join(REPLICA_STRATEGIES)}")
+        self.primary = primary
+        self.replicas: List[Engine] = list(replicas)
+        self.strategy = strategy
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self.lag_check_interval = lag_check_interval
+        self._lag_probe = lag_probe or default_lag_probe
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        # 副本 -> (延迟秒数, 检测时间)
+        self._lag_cache: Dict[Engine, Tuple[float, float]] = {}
+        # 正在检测的副本 -> 检测完成事件，同一副本同时只有一个线程检测
+        self._lag_probing: Dict[Engine, threading.Event] = {}
+
+    def choose(self) -> Engine:
+        """选择一个只读引擎（健康副本优先，全部不可用时回退主库）"""
+        candidates = self.healthy_replicas()
+        if not candidates:
+            return self.primary
+        if self.strategy == "least_connections":
+            return min(candidates, key=_checked_out)
+        return candidates[next(self._counter) % len(candidates)]
+
+    def healthy_replicas(self) -> List[Engine]:
+        """返回复制延迟在阈值内的副本"""
+        if self.max_lag_seconds <= 0:
+            return self.replicas
+        return [engine for engine in self.replicas if self.replica_lag(engine) <= self.max_lag_seconds]
+
+    def replica_lag(self, engine: Engine) -> float:
+        """获取副本复制延迟（秒），结果缓存 lag_check_interval 秒
+
+        检测失败时返回 inf（该副本被摘除，直到下一次检测成功）。
+        无法检测（探测函数返回 None）时返回 0。
+        缓存过期时只有一个线程执行检测，其他线程沿用上一次结果；
+        尚无结果时等待该次检测完成。
+        """
+        now = time.monotonic()
+        with self._lock:
+            cached = self._lag_cache.get(engine)
+            if cached is not None and now - cached[1] < self.lag_check_interval:
+                return cached[0]
+            probing = self._lag_probing.get(engine)
+            if probing is None:
+                self._lag_probing[engine] = threading.Event()
+        if probing is not None:
+            if cached is not None:
+                return cached[0]
+            probing.wait()
+            with self._lock:
+                cached = self._lag_cache.get(engine)
+            return float("inf") if cached is None else cached[0]
+        try:
+            lag = self._probe_lag(engine)
+        finally:
+            with self._lock:
+                done = self._lag_probing.pop(engine)
+            done.set()
+        return lag
+
+    def _probe_lag(self, engine: Engine) -> float:
+        """执行一次延迟检测并写入缓存"""
+        now = time.monotonic()
+        try:
+            with engine.connect() as conn:
+                lag = self._lag_probe(conn)
+            lag = 0.0 if lag is None else float(lag)
+        except Exception as e:
+            _logger.warning(f"副本延迟检测失败，暂时摘除 {engine.url.render_as_string()}: {e}")
+            lag = float("inf")
+        if lag > self.max_lag_seconds:
+            _logger.warning(f"副本延迟 {lag}s 超过阈值 {self.max_lag_seconds}s: {engine.url.render_as_string()}")
+        with self._lock:
+            self._lag_cache[engine] = (lag, now)
+        return lag
+
+    def reset_lag_cache(self) -> None:
+        """清空延迟检测缓存，下次选择时重新检测"""
+        with self._lock:
+            self._lag_cache.clear()
+
+    def dispose(self) -> None:
+        """释放所有副本连接池（主库由调用方管理）"""
+        for engine in self.replicas:
+            engine.dispose()
+
+
+def _checked_out(engine: Engine) -> int:
+    """引擎当前借出的连接数（StaticPool 等不支持统计的连接池视为 0）"""
+    checkedout = getattr(engine.pool, "checkedout", None)
+    return checkedout() if callable(checkedout) else 0
+
+
+class RoutingSession(Session):
+    """读写分离 Session
+
+    通过 sessionmaker(class_=RoutingSession, router=router) 创建，
+    路由规则见模块说明。软删除、时间戳等注册在 Session 类上的事件同样生效。
+
+    强制走主库:
+        session.execute(select(User), execution_options={"use_primary": True})
+        User.query.execution_options(use_primary=True).all()
+    """
+
+    def __init__(self, *args, router: ReplicaRouter = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.router = router
+
+    def get_bind(self, mapper=None, clause=None, use_primary: bool = False, **kwargs):
+        if self.router is None:
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        if self._is_write(clause):
+            self.info[_WROTE_KEY] = True
+            return self.router.primary
+        if use_primary or self._needs_primary(clause):
+            return self.router.primary
+        return self.router.choose()
+
+    def _is_write(self, clause) -> bool:
+        """flush 及非 SELECT 语句视为写操作"""
+        if self._flushing:
+            return True
+        return clause is not None and not getattr(clause, "is_select", False)
+
+    def _needs_primary(self, clause) -> bool:
+        """读操作是否必须走主库"""
+        # session.connection() 等未携带语句的调用
+        if clause is None:
+            return True
+        if clause._execution_options.get("use_primary"):
+            return True
+        if getattr(clause, "_for_update_arg", None) is not None:
+            return True
+        if self.info.get(_WROTE_KEY):
+            return True
+        if self.info.get(_STICKY_UNTIL_KEY, 0) > time.monotonic():
+            return True
+        return self._in_explicit_transaction()
+
+    def _in_explicit_transaction(self) -> bool:
+        transaction = self.get_transaction()
+        if transaction is not None and transaction.origin is not SessionTransactionOrigin.AUTOBEGIN:
+            return True
+        from .transaction import get_current_transaction
+        return get_current_transaction() is not None
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _route_use_primary(orm_execute_state):
+    """把 execution_options(use_primary=True) 转交给 get_bind
+
+    session.execute(stmt, execution_options=...) 传入的选项不在语句对象上，
+    需要通过 bind_arguments 传递。
+    """
+    if orm_execute_state.execution_options.get("use_primary"):
+        orm_execute_state.bind_arguments["use_primary"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _start_sticky_window(session):
+    """提交了写入时，开启 read-your-writes 粘滞窗口"""
+    router = session.router
+    if session.info.pop(_WROTE_KEY, False) and router is not None and router.read_your_writes_seconds > 0:
+        session.info[_STICKY_UNTIL_KEY] = time.monotonic() + router.read_your_writes_seconds
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _clear_write_flag(session, transaction):
+    """最外层事务结束（提交或回滚）后清除写入标记"""
+    if transaction.parent is None:
+        session.info.pop(_WROTE_KEY, None)
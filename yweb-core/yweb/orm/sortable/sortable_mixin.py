@@ -511,14 +511,18 @@ class SortableMixin:
         return count
     
     @classmethod
-    def normalize_sort_order(cls, group_filters: dict = None) -> int:
+    def normalize_sort_order(cls, group_filters: dict = None, batch_size: int = 1000) -> int:
         """规范化排序号
         
         消除序号间隙，从1开始重新连续编号。
         适用于删除记录后清理间隙的场景。
         
+        只流式读取 id 和排序号计算新序号，再分批加载需要修改的记录写回，
+        大表上也不会一次性加载全部对象。
+        
         Args:
             group_filters: 分组过滤条件
+            batch_size: 流式读取和分批写回的行数
             
         Returns:
             更新的记录数
@@ -532,7 +536,7 @@ class SortableMixin:
         field_name = getattr(cls, '__sort_field__', 'sort_order')
         sort_field = getattr(cls, field_name)
         
-        query = cls.query
+        query = cls.query.with_entities(cls.id, sort_field)
         
         if group_filters:
             for field, value in group_filters.items():
@@ -542,16 +546,15 @@ class SortableMixin:
                 else:
                     query = query.filter(column == value)
         
-        items = query.order_by(sort_field).all()
+        rows = cls.stream_rows(query.order_by(sort_field, cls.id), batch_size=batch_size)
+        changes = {
+            row['id']: {field_name: i}
+            for i, row in enumerate(rows, 1)
+            if row[field_name] != i
+        }
         
-        count = 0
-        for i, item in enumerate(items, 1):
-            current_value = getattr(item, field_name)
-            if current_value != i:
-                setattr(item, field_name, i)
-                count += 1
-        
-        return count
+        cls._apply_changes_by_id(changes, batch_size=batch_size)
+        return len(changes)
     
     @classmethod
     def get_sorted(cls, group_filters: dict = None, desc: bool = False):
@@ -482,32 +482,57 @@ class TreeMixin:
         return build_tree_list(node_dicts)
     
     @classmethod
-    def rebuild_all_paths(cls) -> int:
+    def rebuild_all_paths(cls, batch_size: int = 1000) -> int:
         """重建所有节点的路径
         
         用于修复路径数据不一致的情况。
         
+        先流式读取所有节点的 id / parent_id / path / level（不加载模型对象），
+        在内存中按父子关系重新计算，再只加载路径或层级有变化的节点分批写回，
+        不依赖库中已有的 level 是否正确。
+        
+        Args:
+            batch_size: 流式读取和分批写回的行数
+        
         Returns:
             更新的节点数量
         """
-        # 获取所有节点，按层级排序
-        sort_field_name = getattr(cls, '__tree_sort_field__', 'sort_order')
-        sort_field = getattr(cls, sort_field_name, None)
-        
-        if sort_field is not None:
-            nodes = cls.query.order_by(cls.level.asc(), sort_field).all()
-        else:
-            nodes = cls.query.order_by(cls.level.asc()).all()
-        
-        count = 0
-        for node in nodes:
-            old_path = node.path
-            old_level = node.level
-            node.update_path_and_level()
-            if node.path != old_path or node.level != old_level:
-                count += 1
-        
-        return count
-
+        separator = cls.PATH_SEPARATOR
+        query = cls.query.with_entities(cls.id, cls.parent_id, cls.path, cls.level)
+        nodes = {
+            row['id']: (row['parent_id'], row['path'], row['level'])
+            for row in cls.stream_rows(query, batch_size=batch_size)
+        }
+        
+        computed = {}
+        
+        def resolve(node_id):
+            # 向上找到第一个已计算的祖先（或根节点），再自上而下计算；父节点不存在或成环时按根节点处理
+            chain, seen = [], set()
+            current = node_id
+            while current not in computed and current not in seen:
+                chain.append(current)
+                seen.add(current)
+                parent_id = nodes[current][0]
+                if parent_id not in nodes:
+                    break
+                current = parent_id
+            for item in reversed(chain):
+                parent = computed.get(nodes[item][0])
+                if parent is None:
+                    computed[item] = (f"{separator}{item}{separator}", 1)
+                else:
+                    computed[item] = (f"{parent[0]}{item}{separator}", parent[1] + 1)
+        
+        changes = {}
+        for node_id, (_, old_path, old_level) in nodes.items():
+            if node_id not in computed:
+                resolve(node_id)
+            path, level = computed[node_id]
+            if path != old_path or level != old_level:
+                changes[node_id] = {'path': path, 'level': level}
+        
+        cls._apply_changes_by_id(changes, batch_size=batch_size)
+        return len(changes)
 
 __all__ = ["TreeMixin"]
@@ -0,0 +1,184 @@
+"""
+批量 upsert 语句构建
+
+根据数据库方言生成单条多行的 upsert 语句：
+- PostgreSQL / SQLite：INSERT ... ON CONFLICT (...) DO UPDATE SET ... WHERE <有字段变化>
+- MySQL / MariaDB：INSERT ... ON DUPLICATE KEY UPDATE ...
+
+通常不直接使用本模块，而是通过 CoreModel.bulk_upsert() 调用。
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy import and_, case, func, inspect, not_, or_
+
+__all__ = [
+    'UPSERT_DIALECTS',
+    'build_upsert_statements',
+]
+
+# 支持 upsert 的数据库方言
+UPSERT_DIALECTS = ("postgresql", "sqlite", "mysql", "mariadb")
+
+# 由 upsert 自动维护、忽略调用方传入值的字段
+_MANAGED_FIELDS = frozenset({"created_at", "updated_at", "deleted_at", "ver"})
+
+
+def _column_map(model) -> Dict[str, Any]:
+    """属性名 -> 表列"""
+    return {attr.key: attr.columns[0] for attr in inspect(model).column_attrs}
+
+
+def _primary_key_generator(model):
+    """返回模型的主键生成函数，自增主键返回 None
+
+    与 before_insert 事件使用相同的策略配置，但不做逐个查询的冲突检测：
+    UUID / 雪花 ID 本身可保证唯一，批量导入时逐行查询会抵消批量写入的收益。
+    """
+    from .primary_key_config import IdType, PrimaryKeyConfig
+    from .primary_key_generators import create_primary_key_generator
+
+    if getattr(model, "__use_auto_pk__", True) is False:
+        return None
+    strategy = getattr(model, "__pk_strategy__", None) or PrimaryKeyConfig.get_strategy()
+    if strategy == IdType.AUTO_INCREMENT:
+        return None
+    return create_primary_key_generator(
+        strategy=strategy,
+        short_uuid_length=PrimaryKeyConfig.get_short_uuid_length(),
+        snowflake_worker_id=PrimaryKeyConfig.get_snowflake_worker_id(),
+        snowflake_datacenter_id=PrimaryKeyConfig.get_snowflake_datacenter_id(),
+        custom_generator=PrimaryKeyConfig.get_custom_generator(),
+    )
+
+
+def _normalize_rows(model, rows: Sequence[dict], columns: Dict[str, Any]) -> List[dict]:
+    """校验字段、去掉自动维护字段，并为缺少主键的行批量生成主键"""
+    generate_pk = _primary_key_generator(model)
+    pk_keys = [attr.key for attr in inspect(model).column_attrs if attr.columns[0].primary_key]
+
+    normalized = []
+    for row in rows:
+        unknown = [key for key in row if key not in columns]
+        if unknown:
+            raise ValueError(f"{model.__name__} 没有字段: {', '.join(unknown)}")
+        values = {key: value for key, value in row.items() if key not in _MANAGED_FIELDS}
+        if generate_pk is not None:
+            for key in pk_keys:
+                if values.get(key) is None:
+                    values[key] = generate_pk()
+        normalized.append(values)
+    return normalized
+
+
+def _chunks(rows: List[dict], chunk_size: int) -> Iterator[List[dict]]:
+    """按字段集合分组后再按 chunk_size 切分（多行 VALUES 要求每行字段一致）"""
+    groups: Dict[tuple, List[dict]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    for group in groups.values():
+        for start in range(0, len(group), chunk_size):
+            yield group[start:start + chunk_size]
+
+
+def _insert_values(chunk: List[dict], columns: Dict[str, Any], has_ver: bool) -> List[dict]:
+    values = [{columns[key].key: value for key, value in row.items()} for row in chunk]
+    if has_ver:
+        for row in values:
+            row["ver"] = 1
+    return values
+
+
+def build_upsert_statements(
+    model,
+    rows: Sequence[dict],
+    dialect_name: str,
+    conflict_keys: Optional[Sequence[str]] = None,
+    update_fields: Optional[Sequence[str]] = None,
+    chunk_size: int = 500,
+) -> Iterator[Any]:
+    """按方言生成分块的 upsert 语句
+
+    Args:
+        model: 模型类
+        rows: 字典列表，键为模型属性名
+        dialect_name: 数据库方言名称
+        conflict_keys: 冲突判定字段，默认主键；PostgreSQL / SQLite 要求这些字段上有唯一约束
+        update_fields: 冲突时更新的字段，默认为行中除冲突字段、主键外的全部字段
+        chunk_size: 每条语句包含的最大行数
+
+    Yields:
+        可直接 session.execute() 的 Insert 语句
+    """
+    if dialect_name not in UPSERT_DIALECTS:
+        raise NotImplementedError(f"bulk_upsert 不支持数据库: {dialect_name}，支持: {', '.join(UPSERT_DIALECTS)}")
+    if chunk_size < 1:
+        raise ValueError("chunk_size 必须大于 0")
+
+    mapper = inspect(model)
+    table = mapper.local_table
+    columns = _column_map(model)
+    pk_keys = [attr.key for attr in mapper.column_attrs if attr.columns[0].primary_key]
+    conflict_keys = list(conflict_keys or pk_keys)
+    for key in conflict_keys:
+        if key not in columns:
+            raise ValueError(f"{model.__name__} 没有字段: {key}")
+    if update_fields is not None:
+        unknown = [key for key in update_fields if key not in columns]
+        if unknown:
+            raise ValueError(f"{model.__name__} 没有字段: {', '.join(unknown)}")
+
+    has_ver = "ver" in columns
+    has_updated_at = "updated_at" in columns
+
+    for chunk in _chunks(_normalize_rows(model, rows, columns), chunk_size):
+        # 缺少的主键由数据库自增生成，这些行只会插入
+        missing = [key for key in conflict_keys if key not in chunk[0] and key not in pk_keys]
+        if missing:
+            raise ValueError(f"upsert 数据缺少冲突字段: {', '.join(missing)}")
+
+        if update_fields is None:
+            fields = [key for key in chunk[0] if key not in conflict_keys and key not in pk_keys]
+        else:
+            fields = [key for key in update_fields if key in chunk[0] and key not in _MANAGED_FIELDS]
+        target = [columns[key] for key in fields]
+        values = _insert_values(chunk, columns, has_ver)
+
+        if dialect_name in ("postgresql", "sqlite"):
+            if dialect_name == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            stmt = insert(table).values(values)
+            index_elements = [columns[key] for key in conflict_keys]
+            if not target:
+                yield stmt.on_conflict_do_nothing(index_elements=index_elements)
+                continue
+            excluded = stmt.excluded
+            set_ = {column.key: excluded[column.key] for column in target}
+            if has_ver:
+                set_["ver"] = table.c.ver + 1
+            if has_updated_at:
+                set_["updated_at"] = func.now()
+            # 没有实际变化的行不更新，避免 ver / updated_at 无意义递增
+            changed = or_(*[column.is_distinct_from(excluded[column.key]) for column in target])
+            yield stmt.on_conflict_do_update(index_elements=index_elements, set_=set_, where=changed)
+        else:
+            from sqlalchemy.dialects.mysql import insert
+
+            stmt = insert(table).values(values)
+            inserted = stmt.inserted
+            if not target:
+                # 无字段可更新时用主键自赋值实现 "DO NOTHING"
+                pk = table.c[columns[pk_keys[0]].key]
+                yield stmt.on_duplicate_key_update([(pk.key, pk)])
+                continue
+            # MySQL 按书写顺序赋值：先根据旧值计算 ver / updated_at，再覆盖业务字段
+            changed = not_(and_(*[column.op("<=>")(inserted[column.key]) for column in target]))
+            assignments = []
+            if has_ver:
+                assignments.append(("ver", table.c.ver + case((changed, 1), else_=0)))
+            if has_updated_at:
+                assignments.append(("updated_at", case((changed, func.now()), else_=table.c.updated_at)))
+            assignments.extend((column.key, inserted[column.key]) for column in target)
+            yield stmt.on_duplicate_key_update(assignments)
@@ -36,12 +36,30 @@ def _get_client_ip(request: Request) -> str:
     return "unknown"
 
 
+def _get_verified_user_id(request: Request) -> Optional[str]:
+    """读取认证依赖已验证并写入 request.state 的 Token 数据
+
+    认证依赖（setup_auth 创建的 get_current_user）会把验证结果放到
+    request.state.token_data，此时无需再次解码 token。
+    """
+    token_data = getattr(request.state, "token_data", None)
+    user_id = getattr(token_data, "sub", None) or getattr(token_data, "user_id", None)
+    if isinstance(user_id, (str, int)):
+        return f"user:{user_id}"
+    return None
+
+
 def _try_extract_user_id(request: Request) -> Optional[str]:
     """尝试从 JWT Bearer Token 中提取用户标识
 
-    不做完整认证校验，仅尽力解码 token 以获取 sub / user_id。
+    优先复用认证依赖已验证的结果；否则不做完整认证校验，
+    仅尽力解码 token 以获取 sub / user_id。
     解码失败时静默返回 None，不抛异常。
     """
+    verified = _get_verified_user_id(request)
+    if verified:
+        return verified
+
     auth_header = request.headers.get("authorization", "")
     if not auth_header.lower().startswith("bearer "):
         return None
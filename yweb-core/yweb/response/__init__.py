@@ -24,6 +24,8 @@ from .base_response import (
     # 泛型响应模型
     PageData,
     PageResponse,
+    CursorPageData,
+    CursorPageResponse,
     ItemResponse,
     OkResponse,
     ValidationErrorResponse,
@@ -53,6 +55,12 @@ from .base_response import (
     create_response_model,
 )
 
+from .streaming import (
+    # 流式导出响应
+    stream_json,
+    stream_csv,
+)
+
 __all__ = [
     # ===== 推荐使用 =====
     "Resp",                     # 响应快捷类：Resp.OK, Resp.NotFound 等
@@ -63,6 +71,8 @@ __all__ = [
     # 泛型响应模型
     "PageData",
     "PageResponse",
+    "CursorPageData",
+    "CursorPageResponse",
     "ItemResponse",
     "OkResponse",
     "ValidationErrorResponse",
@@ -90,4 +100,8 @@ __all__ = [
     "create_item_model",
     "create_page_model",
     "create_response_model",
+    
+    # 流式导出响应
+    "stream_json",
+    "stream_csv",
 ]
@@ -51,6 +51,7 @@ class PageData(BaseModel, Generic[T]):
     page: int = Field(description="当前页码")
     page_size: int = Field(description="每页数量")
     total_pages: int = Field(description="总页数")
+    total_is_estimate: bool = Field(default=False, description="总记录数是否为估算值")
     has_prev: bool = Field(description="是否有上一页")
     has_next: bool = Field(description="是否有下一页")
 
@@ -84,6 +85,31 @@ class PageResponse(BaseModel, Generic[T]):
     data: PageData[T] = Field(description="分页数据")
 
 
+class CursorPageData(BaseModel, Generic[T]):
+    """泛型游标分页数据模型（对应 CoreModel.paginate_cursor 的结果）"""
+    rows: List[T] = Field(description="数据列表")
+    page_size: int = Field(description="每页数量")
+    next_cursor: Optional[str] = Field(default=None, description="下一页游标，为空表示没有更多数据")
+    has_next: bool = Field(description="是否有下一页")
+    total_records: Optional[int] = Field(default=None, description="总记录数（未统计时为空）")
+    total_is_estimate: bool = Field(default=False, description="总记录数是否为估算值")
+
+
+class CursorPageResponse(BaseModel, Generic[T]):
+    """泛型游标分页响应模型
+    
+    使用示例:
+        @router.get("", response_model=CursorPageResponse[UserItem])
+        def get_users(cursor: str = None):
+            page = User.paginate_cursor(after=cursor, page_size=20)
+            return Resp.OK(UserItem.from_page(page))
+    """
+    status: str = Field(default="success", description="响应状态")
+    message: str = Field(default="请求成功", description="响应消息")
+    msg_details: List[str] = Field(default=[], description="详细信息")
+    data: CursorPageData[T] = Field(description="游标分页数据")
+
+
 class ItemResponse(BaseModel, Generic[T]):
     """泛型单项响应模型
     
@@ -0,0 +1,191 @@
+"""流式导出响应
+
+逐行序列化并写出查询结果，配合 CoreModel.stream_rows() 使用时，
+无论导出多少数据，内存中只保留一个批次的对象。
+
+使用示例:
+    from yweb.response import stream_csv, stream_json
+
+    @router.get("/users/export")
+    def export_users():
+        rows = User.stream_rows(User.query.filter_by(is_active=True), batch_size=500)
+        return stream_csv(rows, fields=["id", "username", "email"], filename="用户.csv")
+
+    @router.get("/users/dump")
+    def dump_users():
+        return stream_json(User.stream_rows(), schema=UserDTO, ndjson=True)
+
+注意：
+    流式响应在路由函数返回后才开始读取数据，session 需要保持到响应发送完毕，
+    RequestIDMiddleware 会在整个响应结束后才清理 session。
+"""
+
+import csv
+import io
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence
+from urllib.parse import quote
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+__all__ = [
+    'stream_json',
+    'stream_csv',
+]
+
+# 输出缓冲大小：攒够后再写出一个响应块，避免每行一个 body 消息
+_BUFFER_SIZE = 64 * 1024
+
+
+def _content_disposition(filename: str) -> str:
+    """构建下载用的 Content-Disposition 头（非 ASCII 文件名使用 RFC 5987 编码）"""
+    try:
+        filename.encode('ascii')
+        return f'attachment; filename="{filename}"'
+    except UnicodeEncodeError:
+        return f"attachment; filename*=UTF-8''{quote(filename)}"
+
+
+def _row_to_dict(row: Any, schema=None, transform: Optional[Callable[[Any], Any]] = None) -> Dict[str, Any]:
+    """把一行（模型实例、RowMapping、字典或 Pydantic 模型）转换为可 JSON 序列化的字典"""
+    if transform is not None:
+        row = transform(row)
+    elif schema is not None:
+        row = schema.from_entity(row) if hasattr(schema, 'from_entity') else schema.model_validate(row)
+    elif hasattr(row, 'to_dict') and not isinstance(row, Mapping):
+        row = row.to_dict()
+    elif isinstance(row, Mapping):
+        row = dict(row)
+    return jsonable_encoder(row)
+
+
+def _buffered(chunks: Iterable[str], encoding: str) -> Iterator[bytes]:
+    """合并小块输出，攒够 _BUFFER_SIZE 后写出"""
+    buffer: List[str] = []
+    size = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= _BUFFER_SIZE:
+            yield ''.join(buffer).encode(encoding)
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer).encode(encoding)
+
+
+def _closing(rows: Iterable, chunks: Iterator[str]) -> Iterator[str]:
+    """客户端断开或输出结束时关闭数据源（释放服务端游标）"""
+    try:
+        yield from chunks
+    finally:
+        close = getattr(rows, 'close', None)
+        if close is not None:
+            close()
+
+
+def _headers(filename: Optional[str], headers: Optional[Dict[str, str]]) -> Dict[str, str]:
+    result = dict(headers or {})
+    if filename:
+        result['Content-Disposition'] = _content_disposition(filename)
+    return result
+
+
+def stream_json(
+    rows: Iterable,
+    schema=None,
+    transform: Optional[Callable[[Any], Any]] = None,
+    ndjson: bool = False,
+    filename: Optional[str] = None,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+) -> StreamingResponse:
+    """流式 JSON 响应
+
+    Args:
+        rows: 数据行的可迭代对象，通常为 Model.stream_rows(...)
+        schema: 可选的 DTO / Pydantic 模型，用于转换每一行
+        transform: 可选的自定义转换函数，优先于 schema
+        ndjson: True 输出每行一个 JSON 对象（application/x-ndjson），否则输出 JSON 数组
+        filename: 提供时作为附件下载
+        status_code: HTTP 状态码
+        headers: 额外的响应头
+
+    Returns:
+        StreamingResponse
+    """
+    def generate() -> Iterator[str]:
+        if ndjson:
+            for row in rows:
+                yield json.dumps(_row_to_dict(row, schema, transform), ensure_ascii=False) + '\n'
+            return
+        yield '['
+        first = True
+        for row in rows:
+            yield ('' if first else ',') + json.dumps(_row_to_dict(row, schema, transform), ensure_ascii=False)
+            first = False
+        yield ']'
+
+    return StreamingResponse(
+        _buffered(_closing(rows, generate()), 'utf-8'),
+        status_code=status_code,
+        media_type='application/x-ndjson' if ndjson else 'application/json',
+        headers=_headers(filename, headers),
+    )
+
+
+def stream_csv(
+    rows: Iterable,
+    fields: Sequence[str],
+    titles: Optional[Sequence[str]] = None,
+    schema=None,
+    transform: Optional[Callable[[Any], Any]] = None,
+    filename: Optional[str] = None,
+    bom: bool = True,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+) -> StreamingResponse:
+    """流式 CSV 响应
+
+    Args:
+        rows: 数据行的可迭代对象，通常为 Model.stream_rows(...)
+        fields: 输出的字段名（列顺序）
+        titles: 表头，默认使用字段名
+        schema: 可选的 DTO / Pydantic 模型，用于转换每一行
+        transform: 可选的自定义转换函数，优先于 schema
+        filename: 提供时作为附件下载
+        bom: 是否输出 UTF-8 BOM（Excel 直接打开中文不乱码），默认 True
+        status_code: HTTP 状态码
+        headers: 额外的响应头
+
+    Returns:
+        StreamingResponse
+    """
+    if titles is not None and len(titles) != len(fields):
+        raise ValueError("titles 与 fields 的数量不一致")
+
+    def generate() -> Iterator[str]:
+        output = io.StringIO()
+        writer = csv.writer(output)
+
+        def flush_line() -> str:
+            line = output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+            return line
+
+        if bom:
+            yield '\ufeff'
+        writer.writerow(titles or fields)
+        yield flush_line()
+        for row in rows:
+            data = _row_to_dict(row, schema, transform)
+            writer.writerow(['' if data.get(field) is None else data.get(field) for field in fields])
+            yield flush_line()
+
+    return StreamingResponse(
+        _buffered(_closing(rows, generate()), 'utf-8'),
+        status_code=status_code,
+        media_type='text/csv; charset=utf-8',
+        headers=_headers(filename, headers),
+    )